@@ -67,6 +67,9 @@ PREREQUISITES:
     ------Set up your programming environment------
     At a command prompt,run the following code to install the Azure AI Document Intelligence client library for Python with pip:
     pip install azure-ai-documentintelligence --pre
+    The sample also uses the my_project helpers of this repository. Install them from the Python(v4.0) folder
+    (or add that folder to PYTHONPATH):
+    pip install -e .
     
     ------Create your Python application------
     1) Create a new Python file called "sample_analyze_addon_fonts.py" in an editor or IDE.
@@ -78,13 +81,7 @@ PREREQUISITES:
 import os
 from collections import defaultdict
 
-
-# To learn the detailed concept of "span" in the following codes, visit: https://aka.ms/spans 
-def get_styled_text(styles, content):
-    # Iterate over the styles and merge the spans from each style.
-    spans = [span for style in styles for span in style.spans]
-    spans.sort(key=lambda span: span.offset)
-    return ",".join([content[span.offset : span.offset + span.length] for span in spans])
+from my_project.utils.span_index import SpanIndex
 
 
 def analyze_fonts():
@@ -138,43 +135,47 @@ def analyze_fonts():
 
     print("\n----Fonts styles detected in the document----")
 
-    # Iterate over the styles and group them by their font attributes.
-    for style in result.styles:
+    # To learn the detailed concept of "span" in the following codes, visit: https://aka.ms/spans
+    # Index the style spans once; text_of merges the spans of a group of styles in content order.
+    span_index = SpanIndex(result, kinds=["styles"])
+
+    # Iterate over the styles and group their indexes by their font attributes.
+    for style_idx, style in enumerate(result.styles):
         if style.similar_font_family:
-            similar_font_families[style.similar_font_family].append(style)
+            similar_font_families[style.similar_font_family].append(style_idx)
         if style.font_style:
-            font_styles[style.font_style].append(style)
+            font_styles[style.font_style].append(style_idx)
         if style.font_weight:
-            font_weights[style.font_weight].append(style)
+            font_weights[style.font_weight].append(style_idx)
         if style.color:
-            font_colors[style.color].append(style)
+            font_colors[style.color].append(style_idx)
         if style.background_color:
-            font_background_colors[style.background_color].append(style)
+            font_background_colors[style.background_color].append(style_idx)
 
     print(f"Detected {len(similar_font_families)} font families:")
-    for font_family, styles in similar_font_families.items():
+    for font_family, style_indexes in similar_font_families.items():
         print(f"- Font family: '{font_family}'")
-        print(f"  Text: '{get_styled_text(styles, result.content)}'")
+        print(f"  Text: '{span_index.text_of('styles', style_indexes, ',')}'")
 
     print(f"\nDetected {len(font_styles)} font styles:")
-    for font_style, styles in font_styles.items():
+    for font_style, style_indexes in font_styles.items():
         print(f"- Font style: '{font_style}'")
-        print(f"  Text: '{get_styled_text(styles, result.content)}'")
+        print(f"  Text: '{span_index.text_of('styles', style_indexes, ',')}'")
 
     print(f"\nDetected {len(font_weights)} font weights:")
-    for font_weight, styles in font_weights.items():
+    for font_weight, style_indexes in font_weights.items():
         print(f"- Font weight: '{font_weight}'")
-        print(f"  Text: '{get_styled_text(styles, result.content)}'")
+        print(f"  Text: '{span_index.text_of('styles', style_indexes, ',')}'")
 
     print(f"\nDetected {len(font_colors)} font colors:")
-    for font_color, styles in font_colors.items():
+    for font_color, style_indexes in font_colors.items():
         print(f"- Font color: '{font_color}'")
-        print(f"  Text: '{get_styled_text(styles, result.content)}'")
+        print(f"  Text: '{span_index.text_of('styles', style_indexes, ',')}'")
 
     print(f"\nDetected {len(font_background_colors)} font background colors:")
-    for font_background_color, styles in font_background_colors.items():
+    for font_background_color, style_indexes in font_background_colors.items():
         print(f"- Font background color: '{font_background_color}'")
-        print(f"  Text: '{get_styled_text(styles, result.content)}'")
+        print(f"  Text: '{span_index.text_of('styles', style_indexes, ',')}'")
 
     print("----------------------------------------")
     # [END analyze_fonts]
@@ -67,6 +67,9 @@ PREREQUISITES:
     ------Set up your programming environment------
     At a command prompt,run the following code to install the Azure AI Document Intelligence client library for Python with pip:
     pip install azure-ai-documentintelligence --pre
+    The sample also uses the my_project helpers of this repository. Install them from the Python(v4.0) folder
+    (or add that folder to PYTHONPATH):
+    pip install -e .
     
     ------Create your Python application------
     1) Create a new Python file called "sample_analyze_addon_highres.py" in an editor or IDE.
@@ -77,21 +80,7 @@ PREREQUISITES:
 
 import os
 
-
-def get_words(page, line):
-    result = []
-    for word in page.words:
-        if _in_span(word, line.spans):
-            result.append(word)
-    return result
-
-
-# To learn the detailed concept of "span" in the following codes, visit: https://aka.ms/spans 
-def _in_span(word, spans):
-    for span in spans:
-        if word.span.offset >= span.offset and (word.span.offset + word.span.length) <= (span.offset + span.length):
-            return True
-    return False
+from my_project.utils.line_words import assign_words_to_lines
 
 
 def analyze_with_highres():
@@ -141,8 +130,10 @@ def analyze_with_highres():
         
         # To learn the detailed concept of "bounding polygon" in the following content, visit: https://aka.ms/bounding-region 
         if page.lines:
+            # Words of every line, matched by their spans in one pass; to learn the detailed concept of "span", visit: https://aka.ms/spans
+            line_words = assign_words_to_lines(page)
             for line_idx, line in enumerate(page.lines):
-                words = get_words(page, line)
+                words = [page.words[word_idx] for word_idx in line_words[line_idx]]
                 print(
                     f"...Line # {line_idx} has word count {len(words)} and text '{line.content}' "
                     f"within bounding polygon '{line.polygon}'"
@@ -67,6 +67,9 @@ PREREQUISITES:
     ------Set up your programming environment------
     At a command prompt,run the following code to install the Azure AI Document Intelligence client library for Python with pip:
     pip install azure-ai-documentintelligence --pre
+    The sample also uses the my_project helpers of this repository. Install them from the Python(v4.0) folder
+    (or add that folder to PYTHONPATH):
+    pip install -e .
     
     ------Create your Python application------
     1) Create a new Python file called "sample_analyze_addon_languages.py" in an editor or IDE.
@@ -77,6 +80,8 @@ PREREQUISITES:
 
 import os
 
+from my_project.utils.span_index import SpanIndex
+
 
 def analyze_languages():
     from azure.core.credentials import AzureKeyCredential
@@ -117,13 +122,12 @@ def analyze_languages():
     # To learn the detailed concept of "span" in the following codes, visit: https://aka.ms/spans 
     print("----Languages detected in the document----")
     if result.languages:
+        span_index = SpanIndex(result, kinds=["languages"])
         print(f"Detected {len(result.languages)} languages:")
         for lang_idx, lang in enumerate(result.languages):
             print(f"- Language #{lang_idx}: locale '{lang.locale}'")
             print(f"  Confidence: {lang.confidence}")
-            print(
-                f"  Text: '{','.join([result.content[span.offset : span.offset + span.length] for span in lang.spans])}'"
-            )
+            print(f"  Text: '{span_index.text_of('languages', [lang_idx], ',')}'")
 
     print("----------------------------------------")
     # [END analyze_languages]
@@ -28,6 +28,7 @@ PRE-REQUISITES:
 
 SETUP:
 pip install azure-ai-documentintelligence python-dotenv azure-identity
+pip install -e <path to the Python(v4.0) folder>   # the my_project helpers; or add that folder to PYTHONPATH
 
 USAGE:
 
@@ -44,6 +45,8 @@ import os, sys
 from dotenv import load_dotenv
 from azure.core.credentials import AzureKeyCredential
 from azure.ai.documentintelligence import DocumentIntelligenceClient
+from my_project.utils.polling import DocumentProfile, PollingPolicy
+from my_project.utils.table_merge import ParagraphOffsetIndex
 
 load_dotenv()
 
@@ -122,29 +125,6 @@ def find_merge_table_candidates(tables):
     return merge_tables_candidates
 
 
-def check_paragraph_presence(paragraphs, start, end):
-    """
-    Checks if there is a paragraph within the specified range that is not a page header, page footer, or page number. If this were the case, the table would not be a merge table candidate.
-
-    Args:
-        paragraphs (list): List of paragraphs to check.
-        start (int): Start offset of the range.
-        end (int): End offset of the range.
-
-    Returns:
-        bool: True if a paragraph is found within the range that meets the conditions, False otherwise.
-    """
-    for paragraph in paragraphs:
-        for span in paragraph.spans:
-            if span.offset > start and span.offset < end:
-                # The logic role of a parapgaph is used to idenfiy if it's page header, page footer, page number, title, section heading, etc. Learn more: https://learn.microsoft.com/en-us/azure/ai-services/document-intelligence/concept-layout?view=doc-intel-4.0.0#document-layout-analysis
-                if not hasattr(paragraph, 'role'):
-                    return True
-                elif hasattr(paragraph, 'role') and paragraph.role not in ["pageHeader", "pageFooter", "pageNumber"]:
-                    return True
-    return False
-
-
 def identify_cross_page_tables(input_file_path):
     """
     Identifies and merges tables that span across multiple pages in a document.
@@ -160,23 +140,31 @@ def identify_cross_page_tables(input_file_path):
 
     file_path = input_file_path
 
+    # Poll according to the document's size instead of at a fixed interval
+    polling_policy = PollingPolicy()
+
     # You can also use a URL instead of a local file with begin_analyze_document_from_url().
     with open(file_path, "rb") as f:
         poller = document_intelligence_client.begin_analyze_document(
-            "prebuilt-layout", analyze_request=f, content_type="application/octet-stream"  
+            "prebuilt-layout", analyze_request=f, content_type="application/octet-stream",
+            polling=polling_policy.polling_method(DocumentProfile.from_path(file_path)),
         )
 
     result = poller.result()
 
     merge_tables_candidates = find_merge_table_candidates(result.tables)
 
+    # Index the offsets of body paragraphs once; each candidate is then a binary search.
+    # The logic role of a paragraph identifies page headers, footers and numbers. Learn more: https://learn.microsoft.com/en-us/azure/ai-services/document-intelligence/concept-layout?view=doc-intel-4.0.0#document-layout-analysis
+    paragraph_index = ParagraphOffsetIndex(result.paragraphs)
+
     print("----------------------------------------")
 
     for i, candidate in enumerate(merge_tables_candidates):
         table_idx = candidate["pre_table_idx"]
         start = candidate["start"]
         end = candidate["end"]
-        has_paragraph = check_paragraph_presence(result.paragraphs, start, end)
+        has_paragraph = paragraph_index.has_paragraph_between(start, end)
         
         # If there is no paragraph within the range and the columns of the tables match, merge the tables.
         if not has_paragraph and result.tables[table_idx].column_count == result.tables[table_idx + 1].column_count:
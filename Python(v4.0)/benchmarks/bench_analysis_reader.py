@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Compare json.load with AnalysisReader for reading one page of a large analysis.
+
+Writes a synthetic analysis JSON, then times reading page 0 with json.load,
+with AnalysisReader while it builds the sidecar index, and with AnalysisReader
+once the index exists.
+
+Usage: poetry run python benchmarks/bench_analysis_reader.py [--pages N] [--words-per-page N]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.fake_service import canned_layout_result
+from my_project.utils.analysis_reader import AnalysisReader
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def read_first_page(path):
+    with AnalysisReader(path) as reader:
+        return reader.page(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--words-per-page", type=int, default=1000)
+    args = parser.parse_args()
+
+    analyzer = LayoutAnalyzer("https://fake.endpoint", "fake-key")
+    result = canned_layout_result(page_count=args.pages, words_per_page=args.words_per_page)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "sample_analysis.json"
+        analyzer._stream_json(result, path, indent=2)
+        size = path.stat().st_size
+
+        def load_all():
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)["pages"][0]
+
+        full = timed(load_all)
+        cold = timed(lambda: read_first_page(path))
+        warm = timed(lambda: read_first_page(path))
+
+    print(f"analysis size:            {size / 2**20:.1f} MiB, {args.pages} pages")
+    print(f"json.load + page 0:       {full * 1000:9.1f} ms")
+    print(f"reader, building index:   {cold * 1000:9.1f} ms")
+    print(f"reader, existing index:   {warm * 1000:9.1f} ms ({full / warm:.0f}x faster than json.load)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark sequential LayoutAnalyzer.analyze_document against analyze_many.
+
+Runs against the in-process fake service, so it measures how well the batch
+API overlaps service latency rather than the service itself.
+
+Usage: poetry run python benchmarks/bench_analyze_many.py [--documents N] [--latency S] [--max-in-flight N]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.fake_service import FakeDocumentAnalysisClient
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.25, help="Seconds per analyze operation")
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    args = parser.parse_args()
+
+    analyzer = LayoutAnalyzer("https://fake.endpoint", "fake-key")
+    analyzer.client = FakeDocumentAnalysisClient(latency=args.latency)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.documents):
+            path = Path(tmp) / f"doc_{i}.pdf"
+            path.write_bytes(f"%PDF-1.5 {i}".encode())
+            paths.append(str(path))
+
+        start = time.perf_counter()
+        for path in paths:
+            analyzer.analyze_document(path)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = list(analyzer.analyze_many(paths, max_in_flight=args.max_in_flight))
+        batched = time.perf_counter() - start
+
+    totals = [r.total_seconds for r in results]
+    print(f"documents:        {args.documents} @ {args.latency:.3f}s latency")
+    print(f"sequential:       {sequential:.2f}s ({args.documents / sequential:.1f} docs/s)")
+    print(f"analyze_many({args.max_in_flight}): {batched:.2f}s ({args.documents / batched:.1f} docs/s)")
+    print(f"speedup:          {sequential / batched:.1f}x")
+    print(f"per-document:     median {statistics.median(totals):.3f}s, max {max(totals):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
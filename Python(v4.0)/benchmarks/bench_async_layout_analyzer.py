@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark AsyncLayoutAnalyzer against a local stub of the REST API.
+
+Keeps --documents analyses in flight on a single event loop and reports the
+throughput and how many operations the stub saw running at the same time.
+
+Usage: poetry run python benchmarks/bench_async_layout_analyzer.py [--documents N] [--latency S] [--connections N]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+from azure.core.pipeline.transport import AioHttpTransport
+
+from my_project.models.async_layout_analyzer import AsyncLayoutAnalyzer
+from my_project.testing.stub_server import StubDocumentIntelligenceServer
+
+
+async def run(endpoint: str, document_path: str, documents: int, connections: int) -> float:
+    session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=connections))
+    transport = AioHttpTransport(session=session, session_owner=False)
+    try:
+        async with AsyncLayoutAnalyzer(endpoint, "stub-key", transport=transport) as analyzer:
+            start = time.perf_counter()
+            await asyncio.gather(*[analyzer.analyze_document(document_path) for _ in range(documents)])
+            return time.perf_counter() - start
+    finally:
+        await session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds per analyze operation")
+    parser.add_argument("--connections", type=int, default=100, help="aiohttp connection pool size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, StubDocumentIntelligenceServer(latency=args.latency) as server:
+        document_path = Path(tmp) / "sample.pdf"
+        document_path.write_bytes(b"%PDF-1.5")
+        elapsed = asyncio.run(run(server.endpoint, str(document_path), args.documents, args.connections))
+
+        print(f"documents:      {args.documents} @ {args.latency:.3f}s latency")
+        print(f"elapsed:        {elapsed:.2f}s ({args.documents / elapsed:.1f} docs/s)")
+        print(f"peak in flight: {server.max_in_flight}")
+        print(f"requests:       {server.analyze_requests} analyze, {server.poll_requests} poll "
+              f"over {server.connections} connections")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Compare disambiguating every field one by one with BatchDisambiguator on a large batch.
+
+Builds a batch of result dicts whose documents carry ICD-10 code, policy
+number and VIN fields. The values are drawn from a limited pool of codes, as
+in a real batch where the same codes recur, and some characters are swapped
+for their OCR look-alikes. The fields are disambiguated three ways: calling
+``disambiguate`` per field, ``BatchDisambiguator`` in this process (distinct
+strings searched once) and ``BatchDisambiguator`` with a process pool.
+A second run of the same batch through the warm disambiguator shows the memo.
+
+Usage: poetry run python benchmarks/bench_batch_disambiguation.py [--results N] [--distinct N] [--workers N]
+"""
+
+import argparse
+import random
+import time
+
+from my_project.utils.batch_disambiguation import BatchDisambiguator
+from my_project.utils.disambiguation import disambiguate
+
+VALIDATORS = {
+    "ICD10": r'^[A-TV-Z]\d\d(\.\d{1,2})?$',
+    "PolicyNumber": r'^[A-Z]{3}\d{9}(-\d{2})?$',
+    "VIN": r'^[A-HJ-NPR-Z0-9]{17}$',
+}
+LOOK_ALIKES = {"0": "O", "1": "l", "I": "1", "O": "0"}
+
+
+def misread(code, rng, rate=0.5):
+    return "".join(LOOK_ALIKES[char] if char in LOOK_ALIKES and rng.random() < rate else char for char in code)
+
+
+def code_pool(rng, distinct):
+    digits = "0101010123456789"
+    pool = {name: [] for name in VALIDATORS}
+    for _ in range(distinct):
+        pool["ICD10"].append(rng.choice("ABCDEFGHIJ") + rng.choice(digits) + rng.choice(digits) + "."
+                             + rng.choice(digits))
+        pool["PolicyNumber"].append("POL" + "".join(rng.choice(digits) for _ in range(9)) + "-10")
+        pool["VIN"].append("".join(rng.choice("1ABCD0EFGH" + digits) for _ in range(17)))
+    return {name: [misread(code, rng) for code in codes] for name, codes in pool.items()}
+
+
+def batch(rng, results, distinct):
+    pool = code_pool(rng, distinct)
+    return [{"documents": [{"fields": {name: {"content": rng.choice(pool[name]), "confidence": rng.uniform(0.5, 1)}
+                                       for name in VALIDATORS}}]} for _ in range(results)]
+
+
+def one_by_one(results):
+    corrections = []
+    for result in results:
+        for name, field in result["documents"][0]["fields"].items():
+            candidate = next(disambiguate(field["content"], VALIDATORS[name], field["confidence"]), None)
+            corrections.append(None if candidate is None else candidate.text)
+    return corrections
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    value = function(*args)
+    return time.perf_counter() - start, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--results", type=int, default=5000)
+    parser.add_argument("--distinct", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    results = batch(random.Random(0), args.results, args.distinct)
+    fields = args.results * len(VALIDATORS)
+    print(f"{args.results} results, {fields} fields drawn from {args.distinct} codes per validator")
+
+    baseline_seconds, expected = timed(one_by_one, results)
+    print(f"{'one by one':>16} {baseline_seconds * 1000:8.0f}ms")
+    for label, workers in (("batch", 1), (f"batch, {args.workers} procs", args.workers)):
+        disambiguator = BatchDisambiguator(VALIDATORS, max_workers=workers)
+        seconds, corrections = timed(disambiguator.run, results)
+        assert [correction.value for correction in corrections] == expected, "Corrections differ"
+        warm_seconds, _ = timed(disambiguator.run, results)
+        print(f"{label:>16} {seconds * 1000:8.0f}ms {baseline_seconds / seconds:6.1f}x "
+              f"({disambiguator.searches} searches; warm rerun {warm_seconds * 1000:.0f}ms)")
+
+
+if __name__ == "__main__":
+    main()
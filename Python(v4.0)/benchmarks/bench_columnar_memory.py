@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Compare memory of the dict and columnar analysis formats.
+
+Converts a synthetic prebuilt-layout result (many pages of dense text) with
+both formats and reports the memory retained by each converted analysis, as
+measured with tracemalloc, and the conversion time.
+
+Usage: poetry run python benchmarks/bench_columnar_memory.py [--pages N] [--words-per-page N]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.fake_service import canned_layout_result
+
+
+def measure(analyzer, result, result_format):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    analysis = analyzer._convert_result(result, result_format)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del analysis
+    return retained, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--words-per-page", type=int, default=1000)
+    args = parser.parse_args()
+
+    analyzer = LayoutAnalyzer("https://fake.endpoint", "fake-key")
+    result = canned_layout_result(page_count=args.pages, words_per_page=args.words_per_page)
+    words = args.pages * args.words_per_page
+
+    print(f"{args.pages} pages x {args.words_per_page} words ({words} words)")
+    measurements = {}
+    for result_format in ("dict", "columnar"):
+        retained, peak, elapsed = measure(analyzer, result, result_format)
+        measurements[result_format] = retained
+        print(f"{result_format:>9}: retained {retained / 2**20:8.1f} MiB ({retained / words:6.1f} B/word), "
+              f"peak {peak / 2**20:8.1f} MiB, {elapsed:.2f}s")
+    print(f"reduction: {measurements['dict'] / measurements['columnar']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
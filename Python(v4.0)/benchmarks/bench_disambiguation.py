@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Compare the sample's enumerate-then-validate disambiguation with the pruned automaton search.
+
+For 20-digit codes with a growing number of digits misread as O, I or l,
+finds the valid corrections two ways: ``generate_confusing_strings`` followed by
+``verify_icd10_code``-style ``re.match`` on every candidate, as the sample
+did, and ``disambiguate``, which drops a prefix as soon as the validator
+rejects it and returns candidates ranked by confidence. The time to the first,
+most likely candidate is reported too: the search is lazy.
+
+Usage: poetry run python benchmarks/bench_disambiguation.py [--confusable N [N ...]]
+"""
+
+import argparse
+import re
+import time
+
+from my_project.utils.disambiguation import disambiguate
+
+# A 20-digit account number
+PATTERN = r'^\d{20}$'
+
+
+def generate_confusing_strings(input_string):
+    confusing_chars = {
+        '0': ['O'],
+        'O': ['0'],
+        '1': ['I', 'l'],
+        'I': ['1', 'l'],
+        'l': ['1', 'I']
+    }
+
+    result = [input_string]
+
+    def generate_combinations(input_str, index, current_combination):
+        if index == len(input_str):
+            result.append(current_combination)
+            return
+
+        char = input_str[index]
+        if char in confusing_chars:
+            replacements = confusing_chars[char]
+            for replacement in replacements:
+                new_combination = current_combination[:index] + replacement + current_combination[index+1:]
+                generate_combinations(input_str, index+1, new_combination)
+        else:
+            generate_combinations(input_str, index+1, current_combination)
+
+    generate_combinations(input_string, 0, input_string)
+    return result
+
+
+def enumerate_then_validate(code):
+    return {candidate for candidate in generate_confusing_strings(code) if re.match(PATTERN, candidate)}
+
+
+def code_with(confusable):
+    """A 20-digit code with ``confusable`` ones and zeros misread as letters."""
+    return ("lIlIlIlIlO" * 2)[:confusable] + "23456789234567892345"[confusable:]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    value = function(*args)
+    return time.perf_counter() - start, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--confusable", type=int, nargs="+", default=[10, 15, 20])
+    args = parser.parse_args()
+
+    list(disambiguate(code_with(4), PATTERN))  # Build the automaton's first states
+    print(f"{'code':>21} {'strings':>9} {'valid':>6} {'enumerate':>10} {'search':>9} {'first':>9} {'speedup':>8}")
+    for confusable in args.confusable:
+        code = code_with(confusable)
+        enumerate_seconds, expected = timed(enumerate_then_validate, code)
+        search_seconds, candidates = timed(lambda: list(disambiguate(code, PATTERN)))
+        first_seconds, _ = timed(lambda: next(disambiguate(code, PATTERN)))
+        # The search also keeps characters as read, so it finds a superset of the sample's codes
+        assert expected <= {candidate.text for candidate in candidates}, "Candidates differ"
+        strings = len(generate_confusing_strings(code))
+        print(f"{code:>21} {strings:>9} {len(candidates):>6} {enumerate_seconds * 1000:8.0f}ms "
+              f"{search_seconds * 1000:7.2f}ms {first_seconds * 1000:7.2f}ms {enumerate_seconds / search_seconds:7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Compare describing figures one at a time with FigureDescriptionStage against a local fake model.
+
+The fake model answers each describe request after ``--latency`` seconds.
+The sequential run mirrors the figure notebook's former loop: it saves each
+crop, re-reads and base64-encodes the file and awaits one request before the
+next. The stage describes the crops from memory with ``--max-concurrency``
+requests in flight and reuses the descriptions of repeated images, which make
+up ``--repeated`` of the figures (logos, charts reused across reports).
+
+Usage: poetry run python benchmarks/bench_figure_description.py [--figures N] [--latency S] [--max-concurrency N]
+"""
+
+import argparse
+import asyncio
+import base64
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from my_project.testing.fake_describer import FakeDescriber
+from my_project.utils.figure_description import FigureDescriptionStage
+from my_project.utils.figure_extractor import FigureCrop, FigureRegion
+
+
+def synthetic_crops(count: int, repeated: float, size: int, seed: int = 0):
+    rng = random.Random(seed)
+    distinct = max(1, round(count * (1 - repeated)))
+    images = [rng.randbytes(size) for _ in range(distinct)]
+    # Every distinct image appears at least once; the others repeat some of them
+    chosen = images + [rng.choice(images) for _ in range(count - distinct)]
+    rng.shuffle(chosen)
+    return [FigureCrop(FigureRegion(figure, 0, figure // 3 + 1, (1.0, 1.0, 4.0, 4.0)), image, "png", 900, 900)
+            for figure, image in enumerate(chosen)]
+
+
+async def one_at_a_time(crops, describer, folder: Path):
+    descriptions = []
+    for crop in crops:
+        path = folder / f"cropped_image_{crop.region.figure}.png"
+        path.write_bytes(crop.data)
+        # As local_image_to_data_url did for every request
+        image = base64.b64decode(base64.b64encode(path.read_bytes()))
+        descriptions.append(await describer(image, "image/png", ""))
+    return descriptions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--figures", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--repeated", type=float, default=0.2)
+    parser.add_argument("--image-bytes", type=int, default=200_000)
+    args = parser.parse_args()
+
+    crops = synthetic_crops(args.figures, args.repeated, args.image_bytes)
+
+    sequential_describer = FakeDescriber(latency=args.latency)
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        expected = asyncio.run(one_at_a_time(crops, sequential_describer, Path(folder)))
+        sequential_seconds = time.perf_counter() - start
+
+    describer = FakeDescriber(latency=args.latency)
+    stage = FigureDescriptionStage(describer, max_concurrency=args.max_concurrency)
+    start = time.perf_counter()
+    described = asyncio.run(stage.describe_all(crops))
+    stage_seconds = time.perf_counter() - start
+    assert [description.description for description in described] == expected, "Descriptions differ"
+
+    print(f"{args.figures} figures, {args.latency * 1000:.0f}ms per request")
+    print(f"{'one at a time':>14} {sequential_seconds:7.2f}s {len(sequential_describer.calls):5} requests")
+    print(f"{'stage':>14} {stage_seconds:7.2f}s {stage.requests:5} requests "
+          f"(max {describer.max_in_flight} in flight, {stage.cache_hits} cached) "
+          f"{sequential_seconds / stage_seconds:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
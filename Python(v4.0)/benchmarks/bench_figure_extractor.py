@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Compare cropping figures one at a time with FigureExtractor on a multi-page PDF.
+
+Builds a PDF whose pages carry text, embedded photos and vector drawings,
+with several figures each, and crops every figure to a PNG at 300 DPI two
+ways: the figure notebook's former per-figure approach, which opens the PDF
+and renders a clip of the page for each figure, and
+``FigureExtractor.extract``, which renders each page once in a process pool
+and writes the files from a background thread. PNG encoding is most of the
+work either way; the pool spreads it over the CPUs.
+
+Usage: poetry run python benchmarks/bench_figure_extractor.py [--pages N] [--figures-per-page N] [--max-workers N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import fitz
+
+from my_project.utils.figure_extractor import FigureExtractor, FigureRegion
+
+
+def build_pdf(path: Path, page_count: int, figures_per_page: int) -> list:
+    """Write the PDF; returns the figure regions, in inches."""
+    regions = []
+    # A scanned photo behind every figure, which each render decodes again
+    photo = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 1200, 600), False)
+    photo.set_rect(photo.irect, (200, 220, 240))
+    for row in range(0, 600, 20):
+        photo.set_rect(fitz.IRect(0, row, 1200, row + 10), ((row * 7) % 256, 120, (row * 3) % 256))
+    photo_jpeg = photo.tobytes("jpg")
+    with fitz.open() as document:
+        for page_index in range(page_count):
+            page = document.new_page()  # 8.5 x 11 inches
+            for line in range(40):
+                page.insert_text((36, 30 + 18 * line), f"Page {page_index + 1} line {line} " * 4, fontsize=9)
+            for figure in range(figures_per_page):
+                top = 0.8 + figure * (9.5 / figures_per_page)
+                box = (1.0, top, 7.5, top + 0.8 * 9.5 / figures_per_page)
+                page.insert_image(fitz.Rect([value * 72 for value in box]), stream=photo_jpeg)
+                for bar in range(30):
+                    left = 72 * (box[0] + bar * 0.2)
+                    height = 72 * (box[3] - box[1]) * ((bar * 7 + figure) % 10 + 1) / 10
+                    page.draw_rect(fitz.Rect(left, 72 * box[3] - height, left + 10, 72 * box[3]),
+                                   color=(0, 0, 0), fill=(bar / 30, 0.4, 1 - bar / 30))
+                regions.append(FigureRegion(len(regions), 0, page_index + 1, box))
+        document.save(str(path))
+    return regions
+
+
+def crop_one_at_a_time(pdf_path: Path, regions, output_folder: Path):
+    """The notebook's crop_image_from_pdf_page and save, once per figure."""
+    for region in regions:
+        document = fitz.open(str(pdf_path))
+        page = document.load_page(region.page_number - 1)
+        rect = fitz.Rect([value * 72 for value in region.box])
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(300 / 72, 300 / 72), clip=rect)
+        (output_folder / f"figure_{region.figure}.png").write_bytes(pixmap.tobytes("png"))
+        document.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--figures-per-page", type=int, default=3)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        pdf_path = directory / "figures.pdf"
+        regions = build_pdf(pdf_path, args.pages, args.figures_per_page)
+        (directory / "single").mkdir()
+
+        start = time.perf_counter()
+        crop_one_at_a_time(pdf_path, regions, directory / "single")
+        single_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        crops = FigureExtractor(max_workers=args.max_workers).extract(pdf_path, regions, directory / "extracted")
+        extractor_seconds = time.perf_counter() - start
+        assert len(crops) == len(regions) == len(list((directory / "extracted").iterdir()))
+
+    print(f"{len(regions)} figures on {args.pages} pages, {args.max_workers} worker(s)")
+    print(f"{'one at a time':>16} {single_seconds:8.2f}s")
+    print(f"{'FigureExtractor':>16} {extractor_seconds:8.2f}s {single_seconds / extractor_seconds:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Compare the per-point geometry loops with the vectorized my_project.geometry functions.
+
+Builds a synthetic page of word polygons in the analysis JSON format (points
+grouped in pairs) and times each operation both ways: bounding boxes, areas,
+word/line IoU, scaling to PDF points as the visualizer did it, and the
+cross-page table check over a synthetic result. NumPy timings include packing
+the polygons into an array with ``as_polygons``.
+
+Usage: poetry run python benchmarks/bench_geometry.py [--words N] [--lines N] [--pages N] [--repeat N]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from my_project import geometry
+from my_project.testing.synthetic_tables import synthetic_cross_page_result
+from my_project.utils.table_merge import THRESHOLD_RATE_OF_LEFT_COVER, THRESHOLD_RATE_OF_RIGHT_COVER
+from my_project.utils.table_merge import check_tables_are_horizontal_distribution, table_edge_flags
+
+
+def synthetic_polygons(count, columns=20):
+    """Word-sized rectangles on a grid, nested in pairs as in the analysis JSON."""
+    polygons = []
+    for index in range(count):
+        x, y = 0.5 + 0.4 * (index % columns), 0.5 + 0.2 * (index // columns)
+        polygons.append([[[x, y], [x + 0.35, y]], [[x + 0.35, y + 0.15], [x, y + 0.15]]])
+    return polygons
+
+
+def flatten(polygon):
+    return [point for pair in polygon for point in pair]
+
+
+def loop_bounding_boxes(polygons):
+    boxes = []
+    for polygon in polygons:
+        points = flatten(polygon)
+        xs, ys = [x for x, _ in points], [y for _, y in points]
+        boxes.append((min(xs), min(ys), max(xs), max(ys)))
+    return boxes
+
+
+def loop_areas(polygons):
+    areas = []
+    for polygon in polygons:
+        points = flatten(polygon)
+        doubled = 0.0
+        for i, (x, y) in enumerate(points):
+            next_x, next_y = points[(i + 1) % len(points)]
+            doubled += x * next_y - next_x * y
+        areas.append(abs(doubled) / 2)
+    return areas
+
+
+def loop_iou(polygons_a, polygons_b):
+    boxes_b = loop_bounding_boxes(polygons_b)
+    rows = []
+    for left, top, right, bottom in loop_bounding_boxes(polygons_a):
+        area = (right - left) * (bottom - top)
+        row = []
+        for other_left, other_top, other_right, other_bottom in boxes_b:
+            width = min(right, other_right) - max(left, other_left)
+            height = min(bottom, other_bottom) - max(top, other_top)
+            intersection = width * height if width > 0 and height > 0 else 0.0
+            union = area + (other_right - other_left) * (other_bottom - other_top) - intersection
+            row.append(intersection / union if union > 0 else 0.0)
+        rows.append(row)
+    return rows
+
+
+def loop_scaled_points(polygons):
+    """The visualizer's previous _flatten_polygon and _scaled_points."""
+    scaled = []
+    for polygon in polygons:
+        seen = set()
+        points = [(float(x), float(y)) for x, y in flatten(polygon) if (x, y) not in seen and not seen.add((x, y))]
+        scaled.append([(x * 72, y * 72) for x, y in points])
+    return scaled
+
+
+def loop_horizontal_check(result, pre_table_idx):
+    """The previous check_tables_are_horizontal_distribution, indexing polygon coordinates."""
+    table, next_table = result.tables[pre_table_idx], result.tables[pre_table_idx + 1]
+    if table.row_count != next_table.row_count:
+        return False
+    is_right_covered = any(
+        max(region.polygon[2], region.polygon[4]) / result.pages[region.page_number - 1].width
+        > THRESHOLD_RATE_OF_RIGHT_COVER for region in table.bounding_regions)
+    is_left_covered = any(
+        min(region.polygon[0], region.polygon[6]) / result.pages[region.page_number - 1].width
+        < THRESHOLD_RATE_OF_LEFT_COVER for region in next_table.bounding_regions)
+    return is_left_covered and is_right_covered
+
+
+def batch_horizontal_checks(result, pairs):
+    """The checks as find_table_merges runs them, with the edge flags of every table computed at once."""
+    edge_flags = table_edge_flags(result)
+    return [check_tables_are_horizontal_distribution(result, i, edge_flags) for i in pairs]
+
+
+def best_of(repeat, function, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--words", type=int, default=2000)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    words, lines = synthetic_polygons(args.words), synthetic_polygons(args.lines, columns=2)
+    result = synthetic_cross_page_result(args.pages, rows_per_page=2)
+    pairs = range(len(result.tables) - 1)
+
+    cases = [
+        ("bounding boxes", loop_bounding_boxes, geometry.bounding_boxes, (words,)),
+        ("areas", loop_areas, geometry.areas, (words,)),
+        (f"iou {args.words}x{args.lines}", loop_iou, geometry.iou, (words, lines)),
+        ("scale to points", loop_scaled_points,
+         lambda polygons: geometry.convert_units(geometry.drop_duplicate_points(polygons), "inch", "point"),
+         (words,)),
+        (f"table checks x{len(pairs)}", lambda r: [loop_horizontal_check(r, i) for i in pairs],
+         lambda r: batch_horizontal_checks(r, pairs), (result,)),
+    ]
+
+    pack_seconds, _ = best_of(args.repeat, geometry.as_polygons, words)
+    print(f"{args.words} word polygons, {args.lines} line polygons; packing with as_polygons: "
+          f"{pack_seconds * 1000:.2f} ms")
+    print(f"{'operation':22} {'loops':>10} {'numpy':>10} {'speedup':>8}")
+    for name, loop, vectorized, case_args in cases:
+        loop_seconds, expected = best_of(args.repeat, loop, *case_args)
+        numpy_seconds, actual = best_of(args.repeat, vectorized, *case_args)
+        if isinstance(actual, np.ndarray):
+            assert np.allclose(np.asarray(expected, dtype=float).reshape(actual.shape), actual)
+        else:
+            assert actual == expected
+        print(f"{name:22} {loop_seconds * 1000:8.2f}ms {numpy_seconds * 1000:8.2f}ms "
+              f"{loop_seconds / numpy_seconds:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
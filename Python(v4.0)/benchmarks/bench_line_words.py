@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Compare the samples' per-line word scan with assign_words_to_lines on dense pages.
+
+Builds synthetic pages of growing word counts, converts them to SDK-like
+objects, and finds the words of every line with the ``get_words``/``_in_span``
+scan the samples used (O(lines x words)) and with ``assign_words_to_lines``
+(one pass over sorted span offsets).
+
+Usage: poetry run python benchmarks/bench_line_words.py [--words N [N ...]] [--words-per-line N]
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+
+from my_project.testing.synthetic_pages import synthetic_page
+from my_project.utils.line_words import assign_words_to_lines
+
+
+def get_words(page, line):
+    result = []
+    for word in page.words:
+        if _in_span(word, line.spans):
+            result.append(word)
+    return result
+
+
+def _in_span(word, spans):
+    for span in spans:
+        if word.span.offset >= span.offset and (word.span.offset + word.span.length) <= (span.offset + span.length):
+            return True
+    return False
+
+
+def as_objects(value):
+    """Turn a page dict into nested namespaces with attribute access, like the SDK models."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: as_objects(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [as_objects(item) for item in value]
+    return value
+
+
+def scan(page):
+    return [get_words(page, line) for line in page.lines]
+
+
+def assigned(page):
+    line_words = assign_words_to_lines(page)
+    return [[page.words[word_idx] for word_idx in line_words[line_idx]] for line_idx in range(len(page.lines))]
+
+
+def timed(function, page):
+    start = time.perf_counter()
+    value = function(page)
+    return time.perf_counter() - start, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--words-per-line", type=int, default=12)
+    args = parser.parse_args()
+
+    assigned(as_objects(synthetic_page(word_count=10)))  # Warm up NumPy
+    print(f"{'words':>6} {'lines':>6} {'scan':>10} {'assign':>10} {'speedup':>8}")
+    for word_count in args.words:
+        page = as_objects(synthetic_page(word_count=word_count, words_per_line=args.words_per_line))
+        scan_seconds, expected = timed(scan, page)
+        assign_seconds, actual = timed(assigned, page)
+        assert actual == expected, "Word assignments differ"
+        print(f"{word_count:6} {len(page.lines):6} {scan_seconds * 1000:8.1f}ms {assign_seconds * 1000:8.2f}ms "
+              f"{scan_seconds / assign_seconds:7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Compare string re-merging with the row-fragment merge engine on one long table.
+
+Builds a synthetic markdown result whose table continues over every page,
+then times rewriting the content with the previous approach (re-merging the
+accumulated table and growing the output with ``+=``) and with
+``merge_tables`` plus ``iter_merged_markdown``. Both outputs are checked to
+be identical.
+
+Usage: poetry run python benchmarks/bench_merged_markdown.py [--pages N] [--rows-per-page N]
+"""
+
+import argparse
+import time
+
+from my_project.testing.synthetic_tables import synthetic_cross_page_result
+from my_project.utils.table_merge import (
+    BORDER_SYMBOL, find_table_merges, get_table_span_offsets, iter_merged_markdown, merge_tables
+)
+
+
+def merge_vertical_tables(md_table_1, md_table_2):
+    """The previous merge: re-split the whole accumulated table for every fragment."""
+    table2 = ""
+    for line in md_table_2.splitlines():
+        if set(line.split(" - ")) != {BORDER_SYMBOL}:
+            table2 += f"{line}\n"
+    rows1 = md_table_1.strip().splitlines()
+    rows2 = table2.strip().splitlines()
+    if len(rows1[0].split(BORDER_SYMBOL)) != len(rows2[0].split(BORDER_SYMBOL)):
+        raise ValueError("Different count of columns")
+    return "\n".join(rows1 + rows2)
+
+
+def string_merge(result):
+    offsets = [get_table_span_offsets(table) for table in result.tables]
+    merged_table_list = []
+    for table_merge in find_table_merges(result):
+        pre, cur = table_merge.pre_table_idx, table_merge.pre_table_idx + 1
+        cur_content = result.content[offsets[cur][0]:offsets[cur][1]]
+        if merged_table_list and merged_table_list[-1]["table_idx_list"][-1] == pre:
+            merged_table_list[-1]["table_idx_list"].append(cur)
+            merged_table_list[-1]["max_offset"] = offsets[cur][1]
+            merged_table_list[-1]["content"] = merge_vertical_tables(merged_table_list[-1]["content"], cur_content)
+        else:
+            pre_content = result.content[offsets[pre][0]:offsets[pre][1]]
+            merged_table_list.append({"table_idx_list": [pre, cur], "min_offset": offsets[pre][0],
+                                      "max_offset": offsets[cur][1],
+                                      "content": merge_vertical_tables(pre_content, cur_content)})
+
+    optimized_content = ""
+    start_idx = 0
+    for merged_table in merged_table_list:
+        optimized_content += result.content[start_idx:merged_table["min_offset"]] + merged_table["content"]
+        start_idx = merged_table["max_offset"]
+    optimized_content += result.content[start_idx:]
+    return optimized_content
+
+
+def fragment_merge(result):
+    return "".join(iter_merged_markdown(result, merge_tables(result)))
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    value = func(*args)
+    return time.perf_counter() - start, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--rows-per-page", type=int, default=50)
+    args = parser.parse_args()
+
+    result = synthetic_cross_page_result(args.pages, rows_per_page=args.rows_per_page)
+    previous, expected = timed(string_merge, result)
+    engine, actual = timed(fragment_merge, result)
+    assert actual == expected
+
+    print(f"{args.pages} pages, one continuous table of {args.pages * args.rows_per_page} rows, "
+          f"{len(result.content) / 2**20:.1f} MiB of markdown")
+    print(f"re-merging strings:     {previous * 1000:9.1f} ms")
+    print(f"row-fragment engine:    {engine * 1000:9.1f} ms ({previous / engine:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark polling schedules on a mix of small and large documents.
+
+The local stub server takes ``--base-latency`` plus ``--seconds-per-page`` per
+page to finish each operation and asks for polls every second, like the SDK
+default. For each schedule the script reports the status requests sent and how
+long results sat finished on the server before the client noticed. The
+documents are analyzed ``--rounds`` times and only the last round is reported,
+so the learned schedule is measured once it has seen some history.
+
+Usage: poetry run python benchmarks/bench_polling.py [--receipts N] [--reports N] [--report-pages N] [--rounds N]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import fitz
+from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.stub_server import StubDocumentIntelligenceServer
+from my_project.utils.client_registry import ClientRegistry
+from my_project.utils.polling import (
+    ExponentialSchedule, FixedSchedule, LearnedSchedule, PollingPolicy
+)
+from my_project.utils.sharding import count_pages
+
+
+def write_pdf(path: Path, pages: int) -> str:
+    with fitz.open() as document:
+        for _ in range(pages):
+            document.new_page()
+        document.save(str(path))
+    return str(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--receipts", type=int, default=40, help="One-page documents")
+    parser.add_argument("--reports", type=int, default=8, help="Large documents")
+    parser.add_argument("--report-pages", type=int, default=300)
+    parser.add_argument("--base-latency", type=float, default=0.8)
+    parser.add_argument("--seconds-per-page", type=float, default=0.05)
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=2)
+    args = parser.parse_args()
+
+    def latency(document: bytes, pages) -> float:
+        return args.base_latency + args.seconds_per_page * count_pages(document)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [write_pdf(Path(tmp) / f"receipt_{i}.pdf", 1) for i in range(args.receipts)]
+        paths += [write_pdf(Path(tmp) / f"report_{i}.pdf", args.report_pages) for i in range(args.reports)]
+        random.Random(0).shuffle(paths)
+
+        print(f"{args.receipts} receipts (1 page), {args.reports} reports ({args.report_pages} pages)")
+        print(f"{'schedule':12} {'wall':>7} {'polls':>6} {'idle total':>11} {'idle mean':>10} {'idle max':>9}")
+        # Polling every second is what the SDK does against this stub
+        schedules = (("fixed 1s", FixedSchedule(1.0)),
+                     ("exponential", ExponentialSchedule()),
+                     ("learned", LearnedSchedule()))
+        for label, schedule in schedules:
+            with StubDocumentIntelligenceServer(latency=latency, poll_after_ms=1000) as server:
+                policy = PollingPolicy(schedule)
+                registry = ClientRegistry(pool_maxsize=args.max_in_flight)
+                analyzer = LayoutAnalyzer(server.endpoint, "bench-key", registry=registry, polling=policy)
+                for _ in range(args.rounds):
+                    policy.timings.clear()
+                    start = time.perf_counter()
+                    for result in analyzer.analyze_many(paths, max_in_flight=args.max_in_flight):
+                        if result.error:
+                            raise result.error
+                    elapsed = time.perf_counter() - start
+                registry.close()
+
+            summary = policy.summary()
+            print(f"{label:12} {elapsed:6.2f}s {summary['polls']:6d} {summary['idle_seconds']:10.2f}s "
+                  f"{summary['mean_idle_seconds']:9.3f}s {summary['max_idle_seconds']:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
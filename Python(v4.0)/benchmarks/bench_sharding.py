@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark single-call analysis of a large PDF against page-range sharding.
+
+The local stub server takes ``--base-latency`` plus ``--seconds-per-page`` for
+every page it analyzes, so one operation over the whole document is as slow as
+its page count, while shards run concurrently.
+
+Usage: poetry run python benchmarks/bench_sharding.py [--pages N] [--shard-pages N] [--max-in-flight N]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import fitz
+
+from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.fake_service import layout_result_for_document, parse_page_range
+from my_project.testing.stub_server import StubDocumentIntelligenceServer
+from my_project.utils.client_registry import ClientRegistry
+from my_project.utils.sharding import count_pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--shard-pages", type=int, default=100)
+    parser.add_argument("--max-in-flight", type=int, default=10)
+    parser.add_argument("--base-latency", type=float, default=0.5)
+    parser.add_argument("--seconds-per-page", type=float, default=0.01)
+    args = parser.parse_args()
+
+    def latency(document: bytes, pages) -> float:
+        if pages is None:
+            page_count = count_pages(document)
+        else:
+            first, last = parse_page_range(pages)
+            page_count = last - first + 1
+        return args.base_latency + args.seconds_per_page * page_count
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "large.pdf"
+        with fitz.open() as document:
+            for _ in range(args.pages):
+                document.new_page()
+            document.save(str(pdf_path))
+
+        with StubDocumentIntelligenceServer(result=layout_result_for_document, latency=latency) as server:
+            analyzer = LayoutAnalyzer(server.endpoint, "bench-key",
+                                      registry=ClientRegistry(pool_maxsize=args.max_in_flight))
+
+            start = time.perf_counter()
+            single = analyzer.analyze_document(str(pdf_path))
+            single_seconds = time.perf_counter() - start
+
+            timings = {}
+            for split in ("service", "local"):
+                start = time.perf_counter()
+                sharded = analyzer.analyze_document_sharded(str(pdf_path), shard_pages=args.shard_pages, split=split,
+                                                            max_in_flight=args.max_in_flight)
+                timings[split] = time.perf_counter() - start
+                assert len(sharded["pages"]) == args.pages
+                if split == "service":
+                    assert sharded == single, "Sharded analysis differs from the single call"
+
+    shards = -(-args.pages // args.shard_pages)
+    print(f"{args.pages} pages, {shards} shards of {args.shard_pages}, {args.max_in_flight} in flight")
+    print(f"single call:     {single_seconds:6.2f}s")
+    for split, seconds in timings.items():
+        print(f"sharded ({split + ')':8} {seconds:6.2f}s  ({single_seconds / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
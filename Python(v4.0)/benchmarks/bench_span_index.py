@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compare scanning every span with SpanIndex for offset-range lookups on large results.
+
+Builds synthetic results with 100k+ spans across paragraphs, words, lines,
+styles, languages and figures, and finds the elements of every kind that
+overlap random offset ranges two ways: a Python scan over all spans (what the
+samples' content-slicing loops amount to) and ``SpanIndex.lookup``. Index
+build time is reported separately; it is paid once per result.
+
+Usage: poetry run python benchmarks/bench_span_index.py [--pages N [N ...]] [--words-per-page N] [--queries N]
+"""
+
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from my_project.testing.synthetic_pages import synthetic_result
+from my_project.utils.span_index import SPAN_KINDS, SpanIndex
+
+
+def as_objects(value):
+    """Turn a result dict into nested namespaces with attribute access, like the SDK models."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: as_objects(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [as_objects(item) for item in value]
+    return value
+
+
+def scan(result, start, end):
+    found = {}
+    for kind in SPAN_KINDS:
+        if kind in ("words", "lines"):
+            elements = [element for page in result.pages for element in getattr(page, kind)]
+        else:
+            elements = getattr(result, kind)
+        hits = []
+        for index, element in enumerate(elements):
+            spans = element.spans if hasattr(element, "spans") else [element.span]
+            for span in spans:
+                if span.offset < end and span.offset + span.length > start:
+                    hits.append(index)
+                    break
+        found[kind] = hits
+    return found
+
+
+def indexed(index, start, end):
+    return {kind: indexes.tolist() for kind, indexes in index.lookup(start, end).items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[2, 10, 20])
+    parser.add_argument("--words-per-page", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'spans':>8} {'build':>9} {'scan':>10} {'index':>9} {'speedup':>8}")
+    for page_count in args.pages:
+        result = as_objects(synthetic_result(page_count=page_count, words_per_page=args.words_per_page))
+
+        start = time.perf_counter()
+        index = SpanIndex(result)
+        build_seconds = time.perf_counter() - start
+
+        ranges = []
+        for _ in range(args.queries):
+            offset = rng.randrange(len(result.content))
+            ranges.append((offset, offset + rng.randint(1, 200)))
+        scanned_ranges = ranges[:max(len(ranges) // 20, 1)]
+
+        start = time.perf_counter()
+        expected = [scan(result, *query) for query in scanned_ranges]
+        scan_seconds = (time.perf_counter() - start) / len(scanned_ranges)
+        start = time.perf_counter()
+        actual = [indexed(index, *query) for query in ranges]
+        index_seconds = (time.perf_counter() - start) / len(ranges)
+        assert actual[:len(expected)] == expected, "Lookups differ"
+        print(f"{len(index):8} {build_seconds * 1000:7.0f}ms {scan_seconds * 1000:8.1f}ms "
+              f"{index_seconds * 1e6:7.0f}us {scan_seconds / index_seconds:7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
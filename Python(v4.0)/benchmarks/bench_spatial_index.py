@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Compare scanning every word with the grid spatial index for region, point and nearest queries.
+
+Builds synthetic dense pages and runs field-sized region queries, point
+queries and 5-nearest-neighbour queries three ways: a Python scan over the
+word polygons (what post-processing steps did per field), a NumPy scan over
+precomputed bounding boxes, and ``PageSpatialIndex``. Index build time is
+reported separately; it is paid once per page.
+
+Usage: poetry run python benchmarks/bench_spatial_index.py [--words N [N ...]] [--queries N]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from my_project.geometry import bounding_boxes
+from my_project.testing.synthetic_pages import synthetic_page
+from my_project.utils.spatial_index import PageSpatialIndex
+
+
+def python_region(words, box):
+    left, top, right, bottom = box
+    hits = []
+    for index, word in enumerate(words):
+        xs = [point[0] for pair in word["polygon"] for point in pair]
+        ys = [point[1] for pair in word["polygon"] for point in pair]
+        if min(xs) <= right and max(xs) >= left and min(ys) <= bottom and max(ys) >= top:
+            hits.append(index)
+    return hits
+
+
+def numpy_region(boxes, box):
+    left, top, right, bottom = box
+    return np.flatnonzero((boxes[:, 0] <= right) & (boxes[:, 2] >= left)
+                          & (boxes[:, 1] <= bottom) & (boxes[:, 3] >= top)).tolist()
+
+
+def numpy_nearest(boxes, x, y, k):
+    dx = np.maximum(np.maximum(boxes[:, 0] - x, 0), x - boxes[:, 2])
+    dy = np.maximum(np.maximum(boxes[:, 1] - y, 0), y - boxes[:, 3])
+    distances = np.hypot(dx, dy)
+    return np.lexsort((np.arange(len(boxes)), distances))[:k].tolist()
+
+
+def timed(function, queries):
+    start = time.perf_counter()
+    results = [function(*query) for query in queries]
+    return (time.perf_counter() - start) / len(queries), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[5000, 10000, 20000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'words':>6} {'build':>9} {'query':>8} {'python scan':>12} {'numpy scan':>11} {'index':>9} "
+          f"{'vs python':>10} {'vs numpy':>9}")
+    for word_count in args.words:
+        page = synthetic_page(word_count=word_count, words_per_line=20)
+        words = page["words"]
+
+        start = time.perf_counter()
+        index = PageSpatialIndex(page)
+        build_seconds = time.perf_counter() - start
+        boxes = bounding_boxes([word["polygon"] for word in words])
+
+        regions = []
+        for _ in range(args.queries):
+            left, top = rng.uniform(0, 7), rng.uniform(0, 10.5)
+            regions.append(((left, top, left + 1.5, top + 0.3),))
+        points = [(rng.uniform(0, 8.5), rng.uniform(0, 11)) for _ in range(args.queries)]
+
+        cases = [
+            ("region", lambda box: python_region(words, box), lambda box: numpy_region(boxes, box),
+             lambda box: index.query_region("words", box).tolist(), regions),
+            ("point", lambda x, y: python_region(words, (x, y, x, y)), lambda x, y: numpy_region(boxes, (x, y, x, y)),
+             lambda x, y: index.query_point("words", x, y).tolist(), points),
+            ("nearest5", None, lambda x, y: numpy_nearest(boxes, x, y, 5),
+             lambda x, y: index.nearest("words", x, y, 5).tolist(), points),
+        ]
+        for name, python_scan, numpy_scan, indexed, queries in cases:
+            numpy_seconds, expected = timed(numpy_scan, queries)
+            index_seconds, actual = timed(indexed, queries)
+            assert actual == expected, f"{name} results differ"
+            if python_scan is not None:
+                python_seconds, scanned = timed(python_scan, queries[:max(len(queries) // 10, 1)])
+                assert scanned == expected[:len(scanned)]
+                python_column = f"{python_seconds * 1e6:10.0f}us"
+                python_speedup = f"{python_seconds / index_seconds:9.1f}x"
+            else:
+                python_column, python_speedup = f"{'-':>12}", f"{'-':>10}"
+            print(f"{word_count:6} {build_seconds * 1000:7.1f}ms {name:>8} {python_column} "
+                  f"{numpy_seconds * 1e6:9.0f}us {index_seconds * 1e6:7.0f}us "
+                  f"{python_speedup} {numpy_seconds / index_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Compare scanning paragraphs per candidate with the indexed cross-page table merge.
+
+Builds synthetic results of growing page counts, with one table fragment per
+page and every table cell reported as a paragraph, then times deciding which
+tables to merge with a full paragraph scan per candidate (the previous
+approach) and with ``find_table_merges``.
+
+Usage: poetry run python benchmarks/bench_table_merge.py [--pages N [N ...]] [--rows-per-page N]
+"""
+
+import argparse
+import time
+
+from my_project.testing.synthetic_tables import synthetic_cross_page_result
+from my_project.utils.table_merge import (
+    PAGE_FURNITURE_ROLES, ParagraphOffsetIndex, find_merge_table_candidates, find_table_merges
+)
+
+
+def check_paragraph_presence(paragraphs, start, end):
+    """The previous check: scan every paragraph span for every candidate."""
+    for paragraph in paragraphs:
+        for span in paragraph.spans:
+            if start < span.offset < end and paragraph.role not in PAGE_FURNITURE_ROLES:
+                return True
+    return False
+
+
+def scan_candidates(result):
+    candidates, _ = find_merge_table_candidates(result.tables)
+    return [check_paragraph_presence(result.paragraphs, c.start, c.end) for c in candidates]
+
+
+def indexed_candidates(result):
+    candidates, _ = find_merge_table_candidates(result.tables)
+    index = ParagraphOffsetIndex(result.paragraphs)
+    return [index.has_paragraph_between(c.start, c.end) for c in candidates]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    value = func(*args)
+    return time.perf_counter() - start, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[250, 500, 1000, 2000])
+    parser.add_argument("--rows-per-page", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'paragraphs':>11} {'scan':>10} {'indexed':>10} {'find_table_merges':>18}")
+    for pages in args.pages:
+        result = synthetic_cross_page_result(pages, rows_per_page=args.rows_per_page, break_every=50)
+        scan, expected = timed(scan_candidates, result)
+        indexed, actual = timed(indexed_candidates, result)
+        assert actual == expected
+        merges, _ = timed(find_table_merges, result)
+        print(f"{pages:>6} {len(result.paragraphs):>11} {scan * 1000:>8.1f}ms {indexed * 1000:>8.1f}ms "
+              f"{merges * 1000:>16.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
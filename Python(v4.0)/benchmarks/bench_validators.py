@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Measure validator throughput: inline re.match per call, compiled validators and combined matching.
+
+Checks a stream of mixed values (ICD-10 codes, SSNs, EINs, routing numbers,
+IBANs, VINs and noise) three ways. First, one validator over every value:
+``verify_icd10_code`` as the sample wrote it (``re.match`` with an inline
+pattern on each call) against ``Validator.validate_many``. Then every
+validator over every value with ``ValidatorRegistry.matching_many``, running
+each compiled pattern in turn (``regex``) or walking one automaton combining
+all patterns (``dfa``), as the registry grows with extra validators.
+
+Usage: poetry run python benchmarks/bench_validators.py [--values N] [--extra N [N ...]]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from my_project.utils.validators import ValidatorRegistry, default_registry
+
+SAMPLES = ["A12.3", "Z99", "J45.90", "123-45-6789", "12-3456789", "021000021", "011000015",
+           "DE89370400440532013000", "GB29NWBK60161331926819", "1HGCM82633A004352", "1M8GDM9AXKP042788"]
+
+
+def verify_icd10_code(code):
+    pattern = r'^[A-TV-Z]\d\d(\.\d{1,2})?$'
+    return re.match(pattern, code) is not None
+
+
+def values(count, rng):
+    noise = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789-."
+    return [rng.choice(SAMPLES) if rng.random() < 0.5 else
+            "".join(rng.choice(noise) for _ in range(rng.randint(3, 20))) for _ in range(count)]
+
+
+def with_extra(count):
+    """The default validators plus ``count`` made-up ID formats, such as ``XK-123456``."""
+    registry = ValidatorRegistry(default_registry().values())
+    for index in range(count):
+        prefix = chr(65 + index % 26) + chr(65 + index // 26 % 26)
+        registry.register(f"Extra{index}", rf"^{prefix}-\d{{{4 + index % 5}}}[A-Z]?$")
+    return registry
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    value = function(*args, **kwargs)
+    return time.perf_counter() - start, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--values", type=int, default=200000)
+    parser.add_argument("--extra", type=int, nargs="+", default=[0, 20, 60])
+    args = parser.parse_args()
+
+    stream = values(args.values, random.Random(0))
+    inline_seconds, expected = timed(lambda: [verify_icd10_code(value) for value in stream])
+    compiled_seconds, actual = timed(default_registry()["ICD10"].validate_many, stream)
+    assert actual == expected, "ICD-10 results differ"
+    print(f"ICD-10 over {len(stream)} values: inline re.match {len(stream) / inline_seconds / 1e6:.2f}M/s, "
+          f"validate_many {len(stream) / compiled_seconds / 1e6:.2f}M/s "
+          f"({inline_seconds / compiled_seconds:.1f}x)")
+
+    print(f"{'validators':>10} {'regex':>12} {'dfa':>12} {'dfa vs regex':>13}")
+    for extra in args.extra:
+        registry = with_extra(extra)
+        registry.matching_many(stream[:2000])  # Let the automaton build its states
+        regex_seconds, by_regex = timed(registry.matching_many, stream, engine="regex")
+        dfa_seconds, by_dfa = timed(registry.matching_many, stream, engine="dfa")
+        assert by_regex == by_dfa, "Engines differ"
+        print(f"{len(registry):10} {len(stream) / regex_seconds / 1e3:9.0f}k/s {len(stream) / dfa_seconds / 1e3:9.0f}k/s "
+              f"{regex_seconds / dfa_seconds:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
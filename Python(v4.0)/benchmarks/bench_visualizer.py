@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Compare per-element and single-pass rendering in LayoutVisualizer.
+
+Generates a synthetic PDF with PyMuPDF and a matching analysis JSON, then
+times drawing every page with one shape per element (the previous approach),
+with one shape per page and element type, and with the pages split across a
+process pool.
+
+Usage: poetry run python benchmarks/bench_visualizer.py [--pages N] [--words-per-page N] [--workers N]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import fitz
+
+from examples.visualize_analysis import LayoutVisualizer
+from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.fake_service import canned_layout_result
+from my_project.utils.analysis_reader import AnalysisReader
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def write_sample(directory, pages, words_per_page):
+    pdf_path = directory / "sample.pdf"
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page(width=612, height=792)
+        page.insert_text((72, 72), f"Synthetic page {number + 1}")
+    doc.save(pdf_path)
+    doc.close()
+
+    analysis_path = directory / "sample_analysis.json"
+    analyzer = LayoutAnalyzer("https://fake.endpoint", "fake-key")
+    analyzer._stream_json(canned_layout_result(page_count=pages, words_per_page=words_per_page), analysis_path)
+    return pdf_path, analysis_path
+
+
+def render_per_element(visualizer, output_path):
+    """The previous approach: a new shape committed for every polygon."""
+    pdf = fitz.open(visualizer.pdf_path)
+    with AnalysisReader(visualizer.analysis_path) as reader:
+        for index, page_data in enumerate(reader.pages()):
+            for key, element_type in (("lines", "line"), ("words", "word"), ("selection_marks", "selection_mark")):
+                for element in page_data[key]:
+                    visualizer._draw_polygon(pdf[index], element["polygon"], element_type)
+    pdf.save(output_path)
+    pdf.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--words-per-page", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        pdf_path, analysis_path = write_sample(tmp, args.pages, args.words_per_page)
+        visualizer = LayoutVisualizer(str(pdf_path), str(analysis_path), str(tmp / "annotated.pdf"))
+        visualizer.process_analysis()  # Build the sidecar index outside the timings
+
+        per_element = timed(lambda: render_per_element(visualizer, tmp / "per_element.pdf"))
+        single_pass = timed(visualizer.process_analysis)
+        pooled = timed(lambda: visualizer.process_analysis(workers=args.workers))
+
+    print(f"{args.pages} pages, {args.words_per_page} words per page")
+    print(f"shape per element:          {per_element:7.2f} s")
+    print(f"shape per page and type:    {single_pass:7.2f} s ({per_element / single_pass:.1f}x faster)")
+    print(f"{args.workers} worker processes:         {pooled:7.2f} s ({per_element / pooled:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
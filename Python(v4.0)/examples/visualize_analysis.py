@@ -5,9 +5,73 @@ Script to visualize layout analysis results by drawing polygons on the PDF.
 
 import fitz  # PyMuPDF
 import sys
-import json
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional, TextIO
+from my_project.geometry import convert_units, drop_duplicate_points, point_counts
+from my_project.utils.analysis_reader import AnalysisReader
+
+class VisualizerTracer:
+    """
+    Receives drawing events from ``LayoutVisualizer``.
+
+    The default implementation ignores every event; subclass it and override
+    the methods you need.
+    """
+
+    def element_type_drawn(self, page_number: int, element_type: str, count: int, seconds: float) -> None:
+        """Called after all elements of one type are drawn on a page."""
+
+    def page_drawn(self, page_number: int, count: int, seconds: float) -> None:
+        """Called after a page is drawn, with its total element count."""
+
+
+class VisualizerMetrics(VisualizerTracer):
+    """
+    Tracer that accumulates element counts and drawing time per element type and per page.
+
+    Args:
+        stream: Optional text stream, e.g. ``sys.stdout``, that receives one line per drawn page
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream
+        self.by_element_type: Dict[str, Dict[str, float]] = {}
+        self.by_page: Dict[int, Dict[str, float]] = {}
+
+    def element_type_drawn(self, page_number: int, element_type: str, count: int, seconds: float) -> None:
+        totals = self.by_element_type.setdefault(element_type, {"count": 0, "seconds": 0.0})
+        totals["count"] += count
+        totals["seconds"] += seconds
+
+    def page_drawn(self, page_number: int, count: int, seconds: float) -> None:
+        self.by_page[page_number] = {"count": count, "seconds": seconds}
+        if self.stream is not None:
+            self.stream.write(f"Page {page_number}: {count} elements in {seconds * 1000:.1f} ms\n")
+
+    def summary(self) -> Dict:
+        """Return totals over all pages along with the per element type breakdown."""
+        return {
+            "pages": len(self.by_page),
+            "elements": sum(page["count"] for page in self.by_page.values()),
+            "seconds": sum(page["seconds"] for page in self.by_page.values()),
+            "by_element_type": {key: dict(value) for key, value in self.by_element_type.items()},
+        }
+
+
+class _RecordingTracer(VisualizerTracer):
+    """Records events in worker processes so they can be replayed on the caller's tracer."""
+
+    def __init__(self):
+        self.events = []
+
+    def element_type_drawn(self, *args) -> None:
+        self.events.append(("element_type_drawn", args))
+
+    def page_drawn(self, *args) -> None:
+        self.events.append(("page_drawn", args))
+
 
 class LayoutVisualizer:
     """Class for visualizing layout analysis results on PDF documents."""
@@ -22,141 +86,199 @@ class LayoutVisualizer:
         'selection_mark': (0, 0.7, 0.7)  # Teal
     }
 
-    def __init__(self, pdf_path: str, analysis_path: str, output_path: str):
-        """Initialize the visualizer with input and output paths."""
+    # Element types from background to foreground
+    DRAW_ORDER = ('paragraph', 'line', 'word', 'table', 'cell', 'selection_mark')
+
+    def __init__(self, pdf_path: str, analysis_path: str, output_path: str,
+                 tracer: Optional[VisualizerTracer] = None):
+        """
+        Initialize the visualizer with input and output paths.
+
+        Args:
+            pdf_path: PDF document to annotate
+            analysis_path: Analysis JSON of the document
+            output_path: Where to save the annotated PDF
+            tracer: Optional ``VisualizerTracer``, e.g. ``VisualizerMetrics``, that
+                receives element counts and timings; nothing is reported by default
+        """
         self.pdf_path = Path(pdf_path)
         self.analysis_path = Path(analysis_path)
         self.output_path = Path(output_path)
+        self.tracer = tracer
         
         if not self.pdf_path.exists():
             raise FileNotFoundError(f"PDF file not found: {self.pdf_path}")
         if not self.analysis_path.exists():
             raise FileNotFoundError(f"Analysis file not found: {self.analysis_path}")
 
-    def _flatten_polygon(self, polygon: List[List[List[float]]]) -> List[Tuple[float, float]]:
-        """Convert nested polygon format to flat list of points."""
-        points = []
-        try:
-            # Extract points from the polygon data
-            for segment in polygon:
-                points.extend((point[0], point[1]) for point in segment)
-            
-            # Remove duplicates while preserving order
-            seen = set()
-            return [(float(x), float(y)) for x, y in points if (x, y) not in seen and not seen.add((x, y))]
-        except Exception as e:
-            print(f"Error flattening polygon: {e}")
-            print(f"Polygon data: {polygon}")
-            return []
-
-    def _draw_polygon(self, page, polygon: List[List[List[float]]], element_type: str = 'word', content: str = ""):
-        """Draw a polygon on the page with color based on element type."""
-        try:
-            # Use standard US Letter dimensions (8.5 x 11 inches)
-            STANDARD_WIDTH = 8.5 * 72  # 612 points
-            STANDARD_HEIGHT = 11.0 * 72  # 792 points
-            
-            print(f"\nDrawing {element_type} polygon for content: '{content}'")
-            print(f"Using standard dimensions: {STANDARD_WIDTH} x {STANDARD_HEIGHT} points")
-
-            # Flatten and scale the points
-            points = self._flatten_polygon(polygon)
-            if not points:
-                return
+    def _draw_polygon(self, page, polygon: List[List[List[float]]], element_type: str = 'word'):
+        """Draw a single polygon on the page with color based on element type."""
+        shape = page.new_shape()
+        operators = self._path_operators(shape, [polygon])
+        if not operators:
+            return
 
-            # Scale the points to page coordinates
-            scaled_points = []
-            for x, y in points:
-                scaled_x = x * 72  # Convert inches directly to points
-                scaled_y = y * 72  # Convert inches directly to points
-                scaled_points.append((scaled_x, scaled_y))
+        # Get color for element type
+        color = self.COLORS.get(element_type, (0, 0, 0))  # Default to black if type unknown
 
-            if len(scaled_points) < 2:
-                return
+        # Draw filled polygon with semi-transparency
+        shape.draw_cont += operators
+        shape.finish(fill=color, fill_opacity=0.2, color=color, width=1.0)
+        shape.commit()
+
+    @staticmethod
+    def _table_regions(tables: List[Dict]) -> Dict[Optional[int], Dict[str, List]]:
+        """
+        Group the table and cell polygons of ``tables`` by page number, in one pass.
+
+        Regions without a page number are kept under ``None``; they are drawn on every page.
+        """
+        regions: Dict[Optional[int], Dict[str, List]] = {}
+        for table in tables:
+            located = [("table", region) for region in table.get("bounding_regions", [])]
+            located += [("cell", region) for cell in table.get("cells", []) for region in cell.get("bounding_regions", [])]
+            for element_type, region in located:
+                if region.get("polygon"):
+                    page = regions.setdefault(region.get("page_number"), {"table": [], "cell": []})
+                    page[element_type].append(region["polygon"])
+        return regions
+
+    def _page_polygons(self, page_data: Dict, table_regions: Dict[Optional[int], Dict[str, List]]) -> Dict[str, List]:
+        """Collect the polygons to draw on one page, grouped by element type."""
+        polygons = {element_type: [] for element_type in self.DRAW_ORDER}
+        for key, element_type in (("paragraphs", "paragraph"), ("lines", "line"),
+                                  ("words", "word"), ("selection_marks", "selection_mark")):
+            for element in page_data.get(key, []):
+                if element.get("polygon"):
+                    polygons[element_type].append(element["polygon"])
 
-            # Get color for element type
-            color = self.COLORS.get(element_type, (0, 0, 0))  # Default to black if type unknown
-            
-            # Create a shape for drawing
+        # Tables are stored per document and grouped by page up front; a page may also carry its own
+        page_number = page_data.get("page_number")
+        own_regions = self._table_regions(page_data.get("tables", []))
+        for regions in (own_regions.get(page_number), own_regions.get(None),
+                        table_regions.get(page_number), table_regions.get(None)):
+            if regions:
+                polygons["table"].extend(regions["table"])
+                polygons["cell"].extend(regions["cell"])
+        return polygons
+
+    def _path_operators(self, shape, polygons: List, unit: str = "inch") -> str:
+        """Build the PDF path operators that outline ``polygons``, given in ``unit``, on the shape's page."""
+        points = convert_units(drop_duplicate_points(polygons), unit, "point")
+        # Same transformation Shape.draw_polyline applies point by point, for all points at once
+        a, b, c, d, e, f = shape.ipctm
+        xs = a * points[..., 0] + c * points[..., 1] + e
+        ys = b * points[..., 0] + d * points[..., 1] + f
+        operators = []
+        for row_x, row_y, count in zip(xs.tolist(), ys.tolist(), point_counts(points).tolist()):
+            if count < 2:
+                continue
+            for i in range(count + 1):  # Close the polygon
+                operators.append(f"{row_x[i % count]:g} {row_y[i % count]:g} {'l' if i else 'm'}\n")
+        return "".join(operators)
+
+    def _draw_page(self, page, page_data: Dict, table_regions: Dict[Optional[int], Dict[str, List]]) -> None:
+        """Draw every element of a page with one shape per element type."""
+        page_number = page_data.get("page_number", page.number + 1)
+        page_start = time.perf_counter()
+        page_count = 0
+        for element_type, polygons in self._page_polygons(page_data, table_regions).items():
+            start = time.perf_counter()
             shape = page.new_shape()
-            
-            # Draw filled polygon with semi-transparency
-            shape.draw_polyline(scaled_points + [scaled_points[0]])  # Close the polygon
-            shape.finish(fill=color, fill_opacity=0.2, color=color, width=1.0)
-            
-            # Commit the shape to the page
-            shape.commit()
-
-        except Exception as e:
-            print(f"Error drawing {element_type} polygon: {e}")
-            raise
-
-    def process_analysis(self):
-        """Process the analysis file and create annotated PDF."""
-        with open(self.analysis_path, 'r', encoding='utf-8') as f:
-            analysis = json.load(f)
+            operators = self._path_operators(shape, polygons, page_data.get("unit") or "inch")
+            if operators:
+                shape.draw_cont += operators
+                color = self.COLORS.get(element_type, (0, 0, 0))
+                shape.finish(fill=color, fill_opacity=0.2, color=color, width=1.0)
+                shape.commit()
+            if self.tracer is not None and polygons:
+                self.tracer.element_type_drawn(page_number, element_type, len(polygons),
+                                               time.perf_counter() - start)
+            page_count += len(polygons)
+        if self.tracer is not None:
+            self.tracer.page_drawn(page_number, page_count, time.perf_counter() - page_start)
+
+    def _annotate_range(self, pdf, start: int, stop: int) -> None:
+        """Draw analysis pages ``start`` to ``stop`` (exclusive) onto the matching PDF pages."""
+        with AnalysisReader(self.analysis_path) as reader:
+            table_regions = self._table_regions(reader.tables())
+            stop = min(stop, reader.page_count)
+            for index, page_data in zip(range(start, stop), reader.pages(range(start, stop))):
+                self._draw_page(pdf[index], page_data, table_regions)
+
+    def render_page_range(self, start: int, stop: int) -> bytes:
+        """
+        Annotate a range of pages and return them as a standalone PDF.
+
+        Args:
+            start: Index of the first PDF page to render
+            stop: Index one past the last PDF page to render
+
+        Returns:
+            PDF bytes holding only the annotated pages of the range
+        """
+        pdf = fitz.open(self.pdf_path)
+        try:
+            self._annotate_range(pdf, start, stop)
+            pdf.select(list(range(start, stop)))
+            return pdf.tobytes()
+        finally:
+            pdf.close()
+
+    def process_analysis(self, workers: Optional[int] = None):
+        """
+        Process the analysis file and create an annotated PDF covering every page.
+
+        Args:
+            workers: Number of processes to split the pages across; by default
+                all pages are drawn in this process in a single pass
+        """
+        # Build the page index once up front so workers only decode their own pages
+        with AnalysisReader(self.analysis_path):
+            pass
 
         pdf = fitz.open(self.pdf_path)
-        
         try:
-            if not analysis.get("pages"):
+            if not workers or workers <= 1 or pdf.page_count <= 1:
+                self._annotate_range(pdf, 0, pdf.page_count)
+                pdf.save(self.output_path)
                 return
-                
-            page_data = analysis["pages"][0]
-            page = pdf[0]
-            
-            # Process elements in order (background to foreground)
-            
-            # Draw paragraphs first (background)
-            for paragraph in page_data.get("paragraphs", []):
-                polygon = paragraph.get("polygon")
-                if polygon:
-                    self._draw_polygon(page, polygon, 'paragraph', paragraph.get('content', ''))
-
-            # Draw lines next
-            for line in page_data.get("lines", []):
-                polygon = line.get("polygon")
-                if polygon:
-                    self._draw_polygon(page, polygon, 'line', line.get('content', ''))
-
-            # Draw words on top
-            for word in page_data.get("words", []):
-                polygon = word.get("polygon")
-                if polygon:
-                    self._draw_polygon(page, polygon, 'word', word.get('content', ''))
-
-            # Draw tables
-            for table in page_data.get("tables", []):
-                # Draw table boundary
-                for region in table.get("bounding_regions", []):
-                    polygon = region.get("polygon")
-                    if polygon:
-                        self._draw_polygon(page, polygon, 'table')
-                
-                # Draw cells
-                for cell in table.get("cells", []):
-                    for region in cell.get("bounding_regions", []):
-                        polygon = region.get("polygon")
-                        if polygon:
-                            self._draw_polygon(page, polygon, 'cell')
-
-            # Draw selection marks last (on top)
-            for mark in page_data.get("selection_marks", []):
-                polygon = mark.get("polygon")
-                if polygon:
-                    self._draw_polygon(page, polygon, 'selection_mark')
 
+            chunk = -(-pdf.page_count // workers)
+            ranges = [(start, min(start + chunk, pdf.page_count)) for start in range(0, pdf.page_count, chunk)]
+            merged = fitz.open()
+            merged.set_metadata(pdf.metadata)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parts = executor.map(_render_page_range,
+                                     [(str(self.pdf_path), str(self.analysis_path), start, stop,
+                                       self.tracer is not None) for start, stop in ranges])
+                # map yields in submission order, so pages are merged in order
+                for part, events in parts:
+                    with fitz.open("pdf", part) as part_pdf:
+                        merged.insert_pdf(part_pdf)
+                    for name, args in events:
+                        getattr(self.tracer, name)(*args)
+            merged.save(self.output_path)
+            merged.close()
         finally:
-            pdf.save(self.output_path)
             pdf.close()
 
+
+def _render_page_range(args: Tuple[str, str, int, int, bool]) -> Tuple[bytes, List]:
+    """Process pool entry point for ``LayoutVisualizer.render_page_range``, also returning trace events."""
+    pdf_path, analysis_path, start, stop, trace = args
+    tracer = _RecordingTracer() if trace else None
+    part = LayoutVisualizer(pdf_path, analysis_path, "", tracer=tracer).render_page_range(start, stop)
+    return part, tracer.events if tracer else []
+
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python visualize_analysis.py <sample_name>")
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python visualize_analysis.py <sample_name> [workers]")
         print("Example: python visualize_analysis.py sample")
         sys.exit(1)
 
     sample_name = sys.argv[1]
+    workers = int(sys.argv[2]) if len(sys.argv) == 3 else None
     script_dir = Path(__file__).parent
     sample_dir = script_dir / "sample_documents"
 
@@ -165,14 +287,18 @@ def main():
     analysis_path = sample_dir / f"{sample_name}_analysis.json"
     output_path = sample_dir / f"{sample_name}_annotated.pdf"
 
+    metrics = VisualizerMetrics()
     try:
         visualizer = LayoutVisualizer(
             str(pdf_path),
             str(analysis_path),
-            str(output_path)
+            str(output_path),
+            tracer=metrics
         )
         print(f"Processing {pdf_path}...")
-        visualizer.process_analysis()
+        visualizer.process_analysis(workers)
+        summary = metrics.summary()
+        print(f"✓ Drew {summary['elements']} elements on {summary['pages']} pages in {summary['seconds']:.2f}s")
         print(f"✓ Annotated PDF saved to: {output_path}")
     except Exception as e:
         print(f"Error: {e}")
@@ -1,33 +1,32 @@
 """
 My Project initialization
-"""
-import os
-from dotenv import load_dotenv
-from azure.ai.formrecognizer import DocumentAnalysisClient
-from azure.core.credentials import AzureKeyCredential
-
-# Load environment variables from .env file
-load_dotenv()
 
-# Access environment variables
-AZURE_ENDPOINT = os.getenv('AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT')
-AZURE_KEY = os.getenv('AZURE_DOCUMENT_INTELLIGENCE_KEY')
-DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
+Importing the package has no side effects: settings are read from the
+environment and ``.env`` file when first used, the Azure SDK is imported by the
+modules that need it, and credentials are only checked when
+``validate_credentials`` (cached) or ``test_azure_credentials`` is called.
+"""
+import importlib
 
-# Import utility functions
-from .utils.azure_client import test_azure_credentials
+# Public names resolved on first access, mapped to the module that defines them
+_LAZY_ATTRIBUTES = {
+    "test_azure_credentials": "my_project.utils.azure_client",
+    "validate_credentials": "my_project.utils.azure_client",
+    "get_azure_credentials": "my_project.utils.environment",
+    "load_environment": "my_project.utils.environment",
+}
 
-# Test credentials on import if in debug mode
-if DEBUG:
-    success, message = test_azure_credentials()
-    print(f"Azure Credentials Test: {message}")
+__all__ = sorted(_LAZY_ATTRIBUTES) + ["AZURE_ENDPOINT", "AZURE_KEY", "DEBUG"]
 
-from my_project import test_azure_credentials
 
-success, message = test_azure_credentials()
-if success:
-    print("Azure credentials are valid!")
-    # Proceed with document analysis
-else:
-    print(f"Error: {message}")
-    # Handle the error appropriately 
\ No newline at end of file
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    if name in ("AZURE_ENDPOINT", "AZURE_KEY"):
+        from .utils.environment import get_azure_credentials
+        endpoint, key = get_azure_credentials()
+        return endpoint if name == "AZURE_ENDPOINT" else key
+    if name == "DEBUG":
+        from .utils.environment import debug_enabled
+        return debug_enabled()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,219 @@
+"""
+Vectorized polygon geometry for layout analysis results.
+
+Document Intelligence reports bounding polygons as points, clockwise from the
+top left, in the unit of their page: inches for PDFs and pixels for images.
+``as_polygons`` packs the polygons of a whole page, in any of the shapes they
+take across this project, into one ``(n, k, 2)`` array. The other functions
+compute bounding boxes, areas, overlap and unit conversions for all of them in
+one call instead of one point at a time.
+
+Polygons with fewer points than the widest one are padded with NaN.
+"""
+from itertools import chain
+from numbers import Number
+from typing import List, Sequence
+
+import numpy as np
+
+# PDF user space units (points) per inch
+POINTS_PER_INCH = 72.0
+# Resolution assumed for pixel coordinates; PyMuPDF renders pages at 72 pixels per inch by default
+DEFAULT_DPI = 72.0
+UNITS = ("inch", "pixel", "point")
+
+
+def _nesting(polygons: Sequence) -> int:
+    """Levels of lists inside each polygon: 0 for flat coordinates, 1 for points, 2 for pairs of points."""
+    for polygon in polygons:
+        if polygon is not None and len(polygon):
+            depth, item = 0, polygon[0]
+            while not isinstance(item, Number):
+                depth, item = depth + 1, item[0]
+            return depth
+    return 0
+
+
+def as_polygons(polygons) -> np.ndarray:
+    """
+    Pack polygons into one float64 array of shape ``(n, k, 2)``.
+
+    Args:
+        polygons: An ``(n, k, 2)`` array, an ``(n, 2k)`` array of flat rows such
+            as ``ElementColumns.polygons``, or a sequence of polygons all given
+            as flat coordinates (v4 SDK), ``Point`` tuples (v3 SDK) or pairs of
+            points (analysis JSON)
+
+    Returns:
+        Array of ``x, y`` points, NaN-padded where a polygon has fewer points
+    """
+    if isinstance(polygons, np.ndarray):
+        array = polygons.astype(np.float64, copy=False)
+        if array.ndim == 2 and array.shape[1] % 2 == 0:
+            return array.reshape(len(array), -1, 2)
+        if array.ndim == 3 and array.shape[2] == 2:
+            return array
+        raise ValueError(f"Expected an (n, 2k) or (n, k, 2) array, got shape {array.shape}")
+
+    polygons = [polygon if polygon is not None else () for polygon in polygons]
+    nesting = _nesting(polygons)
+    if nesting == 0:
+        counts = np.fromiter(map(len, polygons), dtype=np.int64, count=len(polygons))
+    elif nesting == 1:
+        counts = 2 * np.fromiter(map(len, polygons), dtype=np.int64, count=len(polygons))
+    else:
+        counts = 2 * np.fromiter((sum(map(len, polygon)) for polygon in polygons), dtype=np.int64,
+                                 count=len(polygons))
+    if (counts % 2).any():
+        raise ValueError("Polygon coordinates must come in x, y pairs")
+    coordinates = polygons
+    for _ in range(nesting + 1):
+        coordinates = chain.from_iterable(coordinates)
+    coordinates = np.fromiter(coordinates, dtype=np.float64, count=int(counts.sum()))
+    width = int(counts.max()) if len(counts) else 0
+    if (counts == width).all():
+        # Every polygon has the same point count (quadrilaterals in practice)
+        return coordinates.reshape(len(polygons), width // 2, 2)
+    padded = np.full((len(polygons), width), np.nan)
+    padded[np.arange(width) < counts[:, None]] = coordinates
+    return padded.reshape(len(polygons), width // 2, 2)
+
+
+def point_counts(polygons) -> np.ndarray:
+    """Number of points, not counting NaN padding, of each polygon."""
+    polygons = as_polygons(polygons)
+    return (~np.isnan(polygons).any(axis=2)).sum(axis=1)
+
+
+def pair_points(points: Sequence) -> List[List]:
+    """Group points in pairs, the nesting polygons have in the analysis JSON."""
+    points = iter(points)
+    return [[first, second] for first, second in zip(points, points)]
+
+
+def bounding_boxes(polygons) -> np.ndarray:
+    """
+    Axis-aligned bounding box of each polygon.
+
+    Returns:
+        ``(n, 4)`` array of ``left, top, right, bottom``; NaN for empty polygons
+    """
+    polygons = as_polygons(polygons)
+    if polygons.shape[1] == 0:
+        return np.full((len(polygons), 4), np.nan)
+    # fmin/fmax skip the NaN padding
+    return np.concatenate([np.fmin.reduce(polygons, axis=1), np.fmax.reduce(polygons, axis=1)], axis=1)
+
+
+def box_areas(boxes: np.ndarray) -> np.ndarray:
+    """Area of each ``left, top, right, bottom`` box, zero for inverted boxes."""
+    boxes = np.asarray(boxes, dtype=np.float64)
+    return np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+
+
+def areas(polygons) -> np.ndarray:
+    """Area of each polygon by the shoelace formula; zero for empty polygons."""
+    polygons = as_polygons(polygons)
+    if polygons.shape[1] == 0:
+        return np.zeros(len(polygons))
+    # Padding repeats the first point, which only adds edges of zero length
+    filled = np.where(np.isnan(polygons), polygons[:, :1], polygons)
+    x, y = filled[..., 0], filled[..., 1]
+    doubled = (x * np.roll(y, -1, axis=1) - np.roll(x, -1, axis=1) * y).sum(axis=1)
+    return np.nan_to_num(0.5 * np.abs(doubled))
+
+
+def intersection_areas(polygons_a, polygons_b) -> np.ndarray:
+    """``(n, m)`` areas shared by the bounding boxes of every pair of polygons."""
+    boxes_a, boxes_b = bounding_boxes(polygons_a), bounding_boxes(polygons_b)
+    left = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    top = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    right = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    bottom = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    return np.nan_to_num(np.clip(right - left, 0, None) * np.clip(bottom - top, 0, None))
+
+
+def iou(polygons_a, polygons_b) -> np.ndarray:
+    """
+    Intersection over union of the bounding boxes of every pair of polygons.
+
+    Args:
+        polygons_a: ``n`` polygons, in any form accepted by ``as_polygons``
+        polygons_b: ``m`` polygons
+
+    Returns:
+        ``(n, m)`` array in ``[0, 1]``, zero where either polygon is empty
+    """
+    intersection = intersection_areas(polygons_a, polygons_b)
+    union = (box_areas(bounding_boxes(polygons_a))[:, None] + box_areas(bounding_boxes(polygons_b))[None, :]
+             - intersection)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, intersection / union, 0.0)
+
+
+def contains(outer, inner, tolerance: float = 0.0) -> np.ndarray:
+    """
+    Whether each bounding box of ``outer`` encloses each bounding box of ``inner``.
+
+    Args:
+        outer: ``n`` polygons, in any form accepted by ``as_polygons``
+        inner: ``m`` polygons
+        tolerance: Distance, in the polygons' unit, ``inner`` may stick out by
+
+    Returns:
+        ``(n, m)`` boolean array, False where either polygon is empty
+    """
+    outer_boxes, inner_boxes = bounding_boxes(outer), bounding_boxes(inner)
+    return ((outer_boxes[:, None, 0] - tolerance <= inner_boxes[None, :, 0])
+            & (outer_boxes[:, None, 1] - tolerance <= inner_boxes[None, :, 1])
+            & (outer_boxes[:, None, 2] + tolerance >= inner_boxes[None, :, 2])
+            & (outer_boxes[:, None, 3] + tolerance >= inner_boxes[None, :, 3]))
+
+
+def unit_scale(from_unit: str, to_unit: str, dpi: float = DEFAULT_DPI) -> float:
+    """
+    Factor that converts coordinates from one unit to another.
+
+    Args:
+        from_unit: ``"inch"``, ``"pixel"`` or ``"point"``
+        to_unit: ``"inch"``, ``"pixel"`` or ``"point"``
+        dpi: Pixels per inch of pixel coordinates
+
+    Returns:
+        The multiplier for the coordinates
+    """
+    per_inch = {"inch": 1.0, "pixel": dpi, "point": POINTS_PER_INCH}
+    for unit in (from_unit, to_unit):
+        if unit not in per_inch:
+            raise ValueError(f"Unknown unit: {unit}")
+    return per_inch[to_unit] / per_inch[from_unit]
+
+
+def convert_units(coordinates, from_unit: str, to_unit: str, dpi: float = DEFAULT_DPI) -> np.ndarray:
+    """
+    Convert an array of coordinates, such as packed polygons or bounding boxes, to another unit.
+
+    Args:
+        coordinates: Array of coordinates; lists of polygons are packed with ``as_polygons``
+        from_unit: Unit of ``coordinates``, e.g. a page's ``unit``
+        to_unit: Unit to convert to
+        dpi: Pixels per inch of pixel coordinates
+
+    Returns:
+        A new float64 array in ``to_unit``
+    """
+    if not isinstance(coordinates, np.ndarray):
+        coordinates = as_polygons(coordinates)
+    return coordinates.astype(np.float64) * unit_scale(from_unit, to_unit, dpi)
+
+
+def drop_duplicate_points(polygons) -> np.ndarray:
+    """Remove points that repeat an earlier point of the same polygon, keeping the others in order."""
+    polygons = as_polygons(polygons)
+    same = (polygons[:, :, None, :] == polygons[:, None, :, :]).all(axis=3)
+    dropped = np.tril(same, k=-1).any(axis=2) | np.isnan(polygons).any(axis=2)
+    # Stable sort moves the dropped points to the end without reordering the kept ones
+    order = np.argsort(dropped, axis=1, kind="stable")
+    kept = np.take_along_axis(polygons, order[:, :, None], axis=1)
+    kept[np.take_along_axis(dropped, order, axis=1)] = np.nan
+    return kept
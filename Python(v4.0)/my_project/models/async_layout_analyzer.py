@@ -0,0 +1,114 @@
+import asyncio
+from azure.core.credentials import AzureKeyCredential
+from azure.ai.formrecognizer.aio import DocumentAnalysisClient
+from typing import Any, Dict, Optional
+from pathlib import Path
+
+from ..utils.analysis_cache import AnalysisCache
+from ..utils.polling import DocumentProfile, PollingPolicy
+from .layout_analyzer import _LayoutAnalyzerBase
+
+
+class AsyncLayoutAnalyzer(_LayoutAnalyzerBase):
+    """
+    Asyncio counterpart of ``LayoutAnalyzer`` built on the SDK's async client.
+
+    Each analysis only holds a connection while submitting or polling, so a
+    single event loop can keep hundreds of operations in flight, e.g. with
+    ``asyncio.gather``. Use it as an async context manager, or call ``close()``,
+    to release the underlying HTTP session.
+    """
+
+    def __init__(self, endpoint: Optional[str] = None, key: Optional[str] = None,
+                 transport: Optional[Any] = None, cache: Optional[AnalysisCache] = None,
+                 polling: Optional[PollingPolicy] = None, **client_kwargs: Any):
+        """
+        Initialize the AsyncLayoutAnalyzer with Azure credentials.
+
+        Args:
+            endpoint: Document Intelligence endpoint, defaults to the environment variable
+            key: Document Intelligence key, defaults to the environment variable
+            transport: Optional ``azure.core`` async transport, e.g. an ``AioHttpTransport``
+                with a custom session, or one pointed at a local stub server
+            cache: Optional result cache; byte-identical documents are then served
+                from disk without contacting the service
+            polling: Polling policy spacing the status requests of each operation, as for ``LayoutAnalyzer``
+            client_kwargs: Extra keyword arguments for the async ``DocumentAnalysisClient``
+        """
+        super().__init__(endpoint, key, cache, polling)
+        if transport is not None:
+            client_kwargs["transport"] = transport
+        self.client = DocumentAnalysisClient(
+            endpoint=self.endpoint,
+            credential=AzureKeyCredential(self.key),
+            **client_kwargs
+        )
+
+    async def __aenter__(self) -> "AsyncLayoutAnalyzer":
+        await self.client.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the underlying client session."""
+        await self.client.close()
+
+    async def analyze_document(self, document_path: str, result_format: str = "dict") -> Dict:
+        """
+        Analyze the layout of a document and return JSON-formatted results.
+
+        Args:
+            document_path: Path to the document file
+            result_format: ``"dict"`` (default) or ``"columnar"``, as for ``LayoutAnalyzer``
+
+        Returns:
+            Dict containing the analysis results
+        """
+        return self._convert_result(await self._analyze_result(document_path), result_format)
+
+    async def _analyze_result(self, document_path: str):
+        """Return the SDK result for a document, from the cache when possible."""
+        # Hash and read off the event loop so large files do not stall other analyses
+        cache_key, result = await asyncio.to_thread(self._cache_lookup, document_path)
+        if result is None:
+            document = await asyncio.to_thread(Path(document_path).read_bytes)
+            polling_kwargs = {}
+            if self.polling is not None:
+                # Counting the pages parses the PDF, so it too runs off the event loop
+                profile = await asyncio.to_thread(DocumentProfile.from_bytes, document)
+                polling_kwargs["polling"] = self.polling.polling_method(profile, asynchronous=True)
+            poller = await self.client.begin_analyze_document(self.MODEL_ID, document, **polling_kwargs)
+            result = await poller.result()
+            await asyncio.to_thread(self._cache_store, cache_key, result)
+        return result
+
+    async def analyze_and_save_json(self, document_path: str, output_path: str, stream: bool = False,
+                                    indent: Optional[int] = None) -> None:
+        """
+        Analyze document layout and save results as JSON.
+
+        Args:
+            document_path: Path to the document file
+            output_path: Path where to save the JSON results
+            stream: Write each page and table as soon as it is converted, as for ``LayoutAnalyzer``
+            indent: Indentation used when streaming; compact output by default
+        """
+        if stream:
+            result = await self._analyze_result(document_path)
+            await asyncio.to_thread(self._stream_json, result, output_path, indent)
+            return
+        analysis = await self.analyze_document(document_path)
+        await asyncio.to_thread(self._write_json, analysis, output_path)
+
+    async def analyze_and_save_ndjson(self, document_path: str, output_path: str) -> None:
+        """
+        Analyze document layout and save results as newline-delimited JSON, one page per line.
+
+        Args:
+            document_path: Path to the document file
+            output_path: Path where to save the NDJSON results
+        """
+        result = await self._analyze_result(document_path)
+        await asyncio.to_thread(self._write_ndjson, result, output_path)
@@ -0,0 +1,227 @@
+"""
+Columnar page representation for layout analysis results.
+
+Instead of one dict per word, each page stores its words, lines and selection
+marks as parallel NumPy arrays plus one concatenated content buffer. Element
+dicts in the regular analysis format are only built when indexed, so existing
+code that reads ``page["words"][i]["content"]`` keeps working.
+"""
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..geometry import pair_points
+
+SELECTION_STATES = ("unselected", "selected")
+
+
+def _to_float(value: np.float32) -> Optional[float]:
+    """
+    Convert a float32 to the Python float with the same shortest repr (0.99, not 0.9900000095).
+
+    NaN, which stands in for a missing value, converts to None.
+    """
+    if np.isnan(value):
+        return None
+    return float(str(value))
+
+
+class ElementColumns(Sequence):
+    """
+    Parallel arrays for one kind of page element, indexable as element dicts.
+
+    Attributes:
+        kind: ``"line"``, ``"word"`` or ``"selection_mark"``
+        content: All element contents concatenated into one string
+        content_offsets: int64 array; element ``i`` is ``content[content_offsets[i]:content_offsets[i + 1]]``
+        polygons: float32 matrix with one row per element and ``x, y`` pairs as columns,
+            NaN-padded when elements have different point counts
+        confidences: float32 array, NaN where an element has no confidence, or None for
+            lines, which never have one
+        span_offsets, span_lengths: int64 arrays of every span of every element
+        span_index: int64 array; element ``i`` owns spans ``span_index[i]:span_index[i + 1]``
+        states: uint8 array of indexes into ``SELECTION_STATES`` for selection marks
+    """
+
+    def __init__(self, kind: str, content: str, content_offsets: np.ndarray, polygons: np.ndarray,
+                 confidences: Optional[np.ndarray], span_offsets: np.ndarray, span_lengths: np.ndarray,
+                 span_index: np.ndarray, states: Optional[np.ndarray] = None):
+        self.kind = kind
+        self.content = content
+        self.content_offsets = content_offsets
+        self.polygons = polygons
+        self.confidences = confidences
+        self.span_offsets = span_offsets
+        self.span_lengths = span_lengths
+        self.span_index = span_index
+        self.states = states
+
+    def __len__(self) -> int:
+        return len(self.polygons)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"{self.kind} index out of range")
+
+        row = self.polygons[index]
+        row = [_to_float(value) for value in row[~np.isnan(row)]]
+        polygon = pair_points(row[i:i + 2] for i in range(0, len(row), 2))
+        spans = [{"offset": int(offset), "length": int(length)} for offset, length in zip(
+            self.span_offsets[self.span_index[index]:self.span_index[index + 1]],
+            self.span_lengths[self.span_index[index]:self.span_index[index + 1]])]
+
+        if self.kind == "selection_mark":
+            return {
+                "state": SELECTION_STATES[self.states[index]],
+                "confidence": _to_float(self.confidences[index]),
+                "polygon": polygon
+            }
+        element = {"content": self.content[self.content_offsets[index]:self.content_offsets[index + 1]]}
+        if self.kind == "word":
+            element["confidence"] = _to_float(self.confidences[index])
+            element["polygon"] = polygon
+            element["span"] = spans[0] if spans else None
+        else:
+            element["polygon"] = polygon
+            element["spans"] = spans
+        return element
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the arrays and the content buffer."""
+        arrays = [self.content_offsets, self.polygons, self.confidences, self.span_offsets,
+                  self.span_lengths, self.span_index, self.states]
+        return sum(a.nbytes for a in arrays if a is not None) + len(self.content.encode("utf-8"))
+
+
+class _ColumnBuilder:
+    """Accumulates elements into compact stdlib arrays before freezing them into NumPy arrays."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.contents: List[str] = []
+        self.content_offsets = array("q", [0])
+        self.coordinates = array("f")
+        self.coordinate_counts = array("q")
+        self.confidences = array("f")
+        self.span_offsets = array("q")
+        self.span_lengths = array("q")
+        self.span_index = array("q", [0])
+        self.states = array("B")
+
+    def add(self, content: str = "", polygon=None, confidence: Optional[float] = None,
+            spans=(), state: Optional[str] = None) -> None:
+        self.contents.append(content)
+        self.content_offsets.append(self.content_offsets[-1] + len(content))
+        polygon = polygon or []
+        for point in polygon:
+            self.coordinates.append(point.x)
+            self.coordinates.append(point.y)
+        self.coordinate_counts.append(2 * len(polygon))
+        if self.kind != "line":
+            # NaN keeps the array parallel to the elements when a confidence is missing
+            self.confidences.append(np.nan if confidence is None else confidence)
+        for span in spans:
+            self.span_offsets.append(span.offset)
+            self.span_lengths.append(span.length)
+        self.span_index.append(len(self.span_offsets))
+        if state is not None:
+            self.states.append(SELECTION_STATES.index(state))
+
+    def build(self) -> ElementColumns:
+        counts = np.frombuffer(self.coordinate_counts, dtype=np.int64)
+        coordinates = np.frombuffer(self.coordinates, dtype=np.float32)
+        width = int(counts.max()) if len(counts) else 0
+        if len(counts) and (counts == width).all():
+            # Every element has the same point count (quadrilaterals in practice)
+            polygons = coordinates.reshape(len(counts), width)
+        else:
+            polygons = np.full((len(counts), width), np.nan, dtype=np.float32)
+            ends = np.cumsum(counts)
+            for row, (end, count) in enumerate(zip(ends, counts)):
+                polygons[row, :count] = coordinates[end - count:end]
+        return ElementColumns(
+            kind=self.kind,
+            content="".join(self.contents),
+            content_offsets=np.frombuffer(self.content_offsets, dtype=np.int64),
+            polygons=polygons,
+            confidences=np.frombuffer(self.confidences, dtype=np.float32) if self.kind != "line" else None,
+            span_offsets=np.frombuffer(self.span_offsets, dtype=np.int64),
+            span_lengths=np.frombuffer(self.span_lengths, dtype=np.int64),
+            span_index=np.frombuffer(self.span_index, dtype=np.int64),
+            states=np.frombuffer(self.states, dtype=np.uint8) if self.kind == "selection_mark" else None,
+        )
+
+
+class ColumnarPage(Mapping):
+    """
+    One analyzed page with its elements held in ``ElementColumns``.
+
+    Behaves like the page dict produced by ``LayoutAnalyzer.analyze_document``,
+    so ``page["words"][0]["content"]`` works, while the arrays stay accessible
+    through ``page.words.polygons`` and friends for vectorized processing.
+    """
+
+    _KEYS = ("page_number", "width", "height", "unit", "lines", "words", "selection_marks")
+
+    def __init__(self, page_number: int, width: float, height: float, unit: str,
+                 lines: ElementColumns, words: ElementColumns, selection_marks: ElementColumns):
+        self.page_number = page_number
+        self.width = width
+        self.height = height
+        self.unit = unit
+        self.lines = lines
+        self.words = words
+        self.selection_marks = selection_marks
+
+    @classmethod
+    def from_sdk_page(cls, page) -> "ColumnarPage":
+        """Build a columnar page from an SDK ``DocumentPage``."""
+        lines = _ColumnBuilder("line")
+        for line in page.lines or []:
+            lines.add(line.content, line.polygon, spans=line.spans)
+
+        words = _ColumnBuilder("word")
+        for word in page.words or []:
+            words.add(word.content, word.polygon, word.confidence, spans=[word.span])
+
+        marks = _ColumnBuilder("selection_mark")
+        for mark in page.selection_marks or []:
+            marks.add(polygon=mark.polygon, confidence=mark.confidence, state=mark.state)
+
+        return cls(page.page_number, page.width, page.height, page.unit,
+                   lines.build(), words.build(), marks.build())
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the page's element arrays."""
+        return self.lines.nbytes + self.words.nbytes + self.selection_marks.nbytes
+
+    def to_dict(self) -> Dict:
+        """Materialize the page in the regular analysis dict format."""
+        return {
+            "page_number": self.page_number,
+            "width": self.width,
+            "height": self.height,
+            "unit": self.unit,
+            "lines": list(self.lines),
+            "words": list(self.words),
+            "selection_marks": list(self.selection_marks),
+        }
@@ -1,135 +1,485 @@
-import os
-from azure.core.credentials import AzureKeyCredential
-from azure.ai.formrecognizer import DocumentAnalysisClient
-from typing import Dict, List, Optional
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
 from pathlib import Path
 import json
 
-class LayoutAnalyzer:
-    """Class for analyzing document layouts using Azure Document Intelligence."""
+from ..geometry import pair_points
+from ..utils.analysis_cache import AnalysisCache
+from ..utils.client_registry import ClientRegistry, get_client_registry
+from ..utils.environment import get_azure_credentials
+from ..utils.json_stream import write_analysis_json, write_analysis_ndjson
+from ..utils.sharding import count_pages, format_page_range, page_ranges, split_pdf, stitch_results
+from .columnar import ColumnarPage
+
+if TYPE_CHECKING:
+    from ..utils.polling import PollingPolicy
+
+
+def _to_json(value):
+    """``json.dump`` fallback that materializes columnar pages."""
+    if isinstance(value, ColumnarPage):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+@dataclass
+class BatchAnalysisResult:
+    """Outcome and timing of a single document analyzed by ``LayoutAnalyzer.analyze_many``."""
+
+    document_path: str
+    analysis: Optional[Dict] = None
+    error: Optional[Exception] = None
+    submit_seconds: float = 0.0
+    service_seconds: float = 0.0
+    total_seconds: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """Whether the document was analyzed without error."""
+        return self.error is None
 
-    def __init__(self, endpoint: Optional[str] = None, key: Optional[str] = None):
-        """Initialize the LayoutAnalyzer with Azure credentials."""
-        self.endpoint = endpoint or os.getenv('AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT')
-        self.key = key or os.getenv('AZURE_DOCUMENT_INTELLIGENCE_KEY')
+
+class _LayoutAnalyzerBase:
+    """Credential handling, caching and result conversion shared by the sync and async analyzers."""
+
+    MODEL_ID = "prebuilt-layout"
+
+    def __init__(self, endpoint: Optional[str] = None, key: Optional[str] = None,
+                 cache: Optional[AnalysisCache] = None, polling: Optional["PollingPolicy"] = None):
+        """Resolve Azure credentials from the arguments or environment variables."""
+        if not endpoint or not key:
+            env_endpoint, env_key = get_azure_credentials()
+            endpoint = endpoint or env_endpoint
+            key = key or env_key
+        self.endpoint = endpoint
+        self.key = key
+        self.cache = cache
+        self.polling = polling
         
         if not self.endpoint or not self.key:
             raise ValueError("Missing Azure credentials. Set environment variables or provide credentials.")
-        
-        self.client = DocumentAnalysisClient(
-            endpoint=self.endpoint,
-            credential=AzureKeyCredential(self.key)
-        )
+
+    def _polling_kwargs(self, document, page_count: Optional[int] = None) -> Dict:
+        """
+        Return ``begin_analyze_document`` arguments selecting the polling policy, if any.
+
+        Args:
+            document: Path to the document being analyzed, or its bytes
+            page_count: Pages actually analyzed, when only a range of the document is
+        """
+        if self.polling is None:
+            return {}
+        from ..utils.polling import DocumentProfile
+
+        if isinstance(document, bytes):
+            profile = DocumentProfile.from_bytes(document)
+        else:
+            profile = DocumentProfile.from_path(document)
+        if page_count is not None:
+            profile = DocumentProfile(page_count, profile.size_bytes)
+        return {"polling": self.polling.polling_method(profile)}
+
+    def _check_document(self, document_path: str) -> Path:
+        """Return the document path, raising FileNotFoundError if it does not exist."""
+        document_path = Path(document_path)
+        if not document_path.exists():
+            raise FileNotFoundError(f"Document not found: {document_path}")
+        return document_path
+
+    def _cache_lookup(self, document_path: str):
+        """
+        Look a document up in the result cache.
+
+        Returns:
+            Tuple of (cache key, cached AnalyzeResult); the key is None without a
+            cache and the result is None on a miss
+        """
+        document_path = self._check_document(document_path)
+        if self.cache is None:
+            return None, None
+        cache_key = self.cache.key_for(document_path, self.MODEL_ID)
+        return cache_key, self.cache.get(cache_key)
+
+    def _cache_store(self, cache_key: Optional[str], result) -> None:
+        """Store a freshly analyzed result under the key returned by ``_cache_lookup``."""
+        if self.cache is not None and cache_key is not None:
+            self.cache.put(cache_key, result)
 
     def _format_polygon(self, polygon) -> List[List[float]]:
         """Format polygon coordinates into a list of points."""
         if not polygon:
             return []
-        return [[polygon[i], polygon[i + 1]] for i in range(0, len(polygon), 2)]
+        return pair_points(polygon)
+
+    def _convert_result(self, result, result_format: str = "dict") -> Dict:
+        """
+        Convert an SDK ``AnalyzeResult`` to the JSON-friendly analysis dict.
+
+        Args:
+            result: The SDK analyze result
+            result_format: ``"dict"`` for one dict per element, or ``"columnar"``
+                for ``ColumnarPage`` pages backed by parallel arrays
+        """
+        if result_format == "dict":
+            convert_page = self._convert_page
+        elif result_format == "columnar":
+            convert_page = ColumnarPage.from_sdk_page
+        else:
+            raise ValueError(f"Unknown result format: {result_format}")
+
+        # Convert analysis to JSON-friendly format
+        return {
+            "pages": [convert_page(page) for page in result.pages],
+            "tables": [self._convert_table(table) for table in result.tables or []],
+            "has_handwritten_content": self._has_handwritten_content(result)
+        }
+
+    def _has_handwritten_content(self, result) -> bool:
+        """Whether any style in the result marks content as handwritten."""
+        return bool(result.styles and any(style.is_handwritten for style in result.styles))
+
+    def _convert_page(self, page) -> Dict:
+        """Convert an SDK ``DocumentPage`` to its analysis dict."""
+        page_data = {
+            "page_number": page.page_number,
+            "width": page.width,
+            "height": page.height,
+            "unit": page.unit,
+            "lines": [],
+            "words": [],
+            "selection_marks": []
+        }
+
+        # Process lines
+        for line in page.lines or []:
+            page_data["lines"].append({
+                "content": line.content,
+                "polygon": self._format_polygon(line.polygon),
+                "spans": [{"offset": span.offset, "length": span.length} for span in line.spans]
+            })
+
+        # Process words
+        for word in page.words or []:
+            page_data["words"].append({
+                "content": word.content,
+                "confidence": word.confidence,
+                "polygon": self._format_polygon(word.polygon),
+                "span": {"offset": word.span.offset, "length": word.span.length}
+            })
+
+        # Process selection marks
+        for mark in page.selection_marks or []:
+            page_data["selection_marks"].append({
+                "state": mark.state,
+                "confidence": mark.confidence,
+                "polygon": self._format_polygon(mark.polygon)
+            })
+
+        return page_data
+
+    def _convert_table(self, table) -> Dict:
+        """Convert an SDK ``DocumentTable`` to its analysis dict."""
+        table_data = {
+            "row_count": table.row_count,
+            "column_count": table.column_count,
+            "cells": [],
+            "bounding_regions": [{
+                "page_number": region.page_number,
+                "polygon": self._format_polygon(region.polygon)
+            } for region in table.bounding_regions or []]
+        }
+
+        for cell in table.cells:
+            table_data["cells"].append({
+                "row_index": cell.row_index,
+                "column_index": cell.column_index,
+                "content": cell.content,
+                "bounding_regions": [{
+                    "page_number": region.page_number,
+                    "polygon": self._format_polygon(region.polygon)
+                } for region in cell.bounding_regions or []]
+            })
+
+        return table_data
+
+    def _stream_json(self, result, output_path: str, indent: Optional[int] = None) -> None:
+        """Convert and write ``result`` to ``output_path`` one page and table at a time."""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            write_analysis_json(
+                f,
+                (self._convert_page(page) for page in result.pages),
+                (self._convert_table(table) for table in result.tables or []),
+                self._has_handwritten_content(result),
+                indent=indent
+            )
+
+    def _write_ndjson(self, result, output_path: str) -> None:
+        """Convert and write ``result`` to ``output_path`` as NDJSON, one page per line."""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            write_analysis_ndjson(
+                f,
+                (self._convert_page(page) for page in result.pages),
+                (self._convert_table(table) for table in result.tables or []),
+                self._has_handwritten_content(result)
+            )
+
+    def _write_json(self, analysis: Dict, output_path: str) -> None:
+        """Write an analysis dict to ``output_path``, creating parent directories."""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(analysis, f, indent=2, ensure_ascii=False, default=_to_json)
+
+
+class LayoutAnalyzer(_LayoutAnalyzerBase):
+    """Class for analyzing document layouts using Azure Document Intelligence."""
+
+    def __init__(self, endpoint: Optional[str] = None, key: Optional[str] = None,
+                 cache: Optional[AnalysisCache] = None, registry: Optional[ClientRegistry] = None,
+                 polling: Optional["PollingPolicy"] = None):
+        """
+        Initialize the LayoutAnalyzer with Azure credentials.
 
-    def analyze_document(self, document_path: str) -> Dict:
+        Args:
+            endpoint: Document Intelligence endpoint, defaults to the environment variable
+            key: Document Intelligence key, defaults to the environment variable
+            cache: Optional result cache; byte-identical documents are then served
+                from disk without contacting the service
+            registry: Client registry to take the pooled client from, defaults to the
+                process-wide one, so analyzers with the same credentials share connections
+            polling: Polling policy spacing the status requests of each operation by the
+                document's size; the SDK's fixed interval when omitted
+        """
+        super().__init__(endpoint, key, cache, polling)
+        self.client = (registry or get_client_registry()).get_client(self.endpoint, self.key)
+
+    def analyze_document(self, document_path: str, result_format: str = "dict") -> Dict:
         """
         Analyze the layout of a document and return JSON-formatted results.
         
         Args:
             document_path: Path to the document file
+            result_format: ``"dict"`` (default) or ``"columnar"``, which holds each
+                page's elements in parallel arrays to cut memory on large documents
             
         Returns:
             Dict containing the analysis results
         """
-        document_path = Path(document_path)
-        if not document_path.exists():
-            raise FileNotFoundError(f"Document not found: {document_path}")
+        return self._convert_result(self._analyze_result(document_path), result_format)
 
+    def _analyze_result(self, document_path: str):
+        """Return the SDK result for a document, from the cache when possible."""
+        cache_key, result = self._cache_lookup(document_path)
+        if result is None:
+            result = self._begin_analyze(document_path).result()
+            self._cache_store(cache_key, result)
+        return result
+
+    def analyze_document_sharded(self, document_path: str, shard_pages: int = 50, split: str = "service",
+                                 max_in_flight: int = 8, result_format: str = "dict") -> Dict:
+        """
+        Analyze a large document as concurrent page-range operations and stitch the results.
+
+        The returned analysis has the same format, page numbers and offsets as
+        ``analyze_document`` for the whole document. Documents with at most
+        ``shard_pages`` pages are analyzed in a single operation.
+
+        Args:
+            document_path: Path to the document file
+            shard_pages: Pages per operation
+            split: ``"service"`` uploads the whole document for every shard and selects
+                its pages with the service's ``pages`` parameter; ``"local"`` splits the
+                PDF with PyMuPDF and uploads only each shard's pages
+            max_in_flight: Maximum number of shard operations outstanding at once
+            result_format: ``"dict"`` (default) or ``"columnar"``, as for ``analyze_document``
+
+        Returns:
+            Dict containing the analysis results
+        """
+        return self._convert_result(self._sharded_result(document_path, shard_pages, split, max_in_flight),
+                                    result_format)
+
+    def _sharded_result(self, document_path: str, shard_pages: int, split: str, max_in_flight: int):
+        """Return the stitched SDK result of a sharded analysis, from the cache when possible."""
+        if split not in ("service", "local"):
+            raise ValueError(f"Unknown split mode: {split}")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        cache_key, result = self._cache_lookup(document_path)
+        if result is not None:
+            return result
+
+        ranges = page_ranges(count_pages(document_path), shard_pages)
+        if len(ranges) == 1:
+            result = self._begin_analyze(document_path).result()
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_in_flight, len(ranges))) as executor:
+                if split == "service":
+                    futures = [executor.submit(self._analyze_page_range, document_path, page_range)
+                               for page_range in ranges]
+                    # The service numbers the pages of a range as in the whole document
+                    page_shifts = [0] * len(ranges)
+                else:
+                    futures = [executor.submit(self._analyze_shard, shard) for shard in split_pdf(document_path, ranges)]
+                    page_shifts = [first - 1 for first, _ in ranges]
+                results = [future.result() for future in futures]
+            result = stitch_results(results, page_shifts)
+
+        self._cache_store(cache_key, result)
+        return result
+
+    def _analyze_page_range(self, document_path: str, page_range):
+        """Analyze one page range of a document with the service's ``pages`` parameter."""
+        first, last = page_range
+        polling_kwargs = self._polling_kwargs(document_path, page_count=last - first + 1)
         with open(document_path, "rb") as document:
-            poller = self.client.begin_analyze_document("prebuilt-layout", document)
-            result = poller.result()
+            poller = self.client.begin_analyze_document(self.MODEL_ID, document, pages=format_page_range(page_range),
+                                                        **polling_kwargs)
+        return poller.result()
 
-        # Convert analysis to JSON-friendly format
-        analysis = {
-            "pages": [],
-            "tables": [],
-            "has_handwritten_content": bool(result.styles and any(style.is_handwritten for style in result.styles))
-        }
+    def _analyze_shard(self, shard: bytes):
+        """Analyze a PDF holding one page range of a document."""
+        return self.client.begin_analyze_document(self.MODEL_ID, shard, **self._polling_kwargs(shard)).result()
 
-        # Process pages
-        for page in result.pages:
-            page_data = {
-                "page_number": page.page_number,
-                "width": page.width,
-                "height": page.height,
-                "unit": page.unit,
-                "lines": [],
-                "words": [],
-                "selection_marks": []
-            }
-
-            # Process lines
-            for line in page.lines or []:
-                page_data["lines"].append({
-                    "content": line.content,
-                    "polygon": self._format_polygon(line.polygon),
-                    "spans": [{"offset": span.offset, "length": span.length} for span in line.spans]
-                })
-
-            # Process words
-            for word in page.words or []:
-                page_data["words"].append({
-                    "content": word.content,
-                    "confidence": word.confidence,
-                    "polygon": self._format_polygon(word.polygon),
-                    "span": {"offset": word.span.offset, "length": word.span.length}
-                })
-
-            # Process selection marks
-            for mark in page.selection_marks or []:
-                page_data["selection_marks"].append({
-                    "state": mark.state,
-                    "confidence": mark.confidence,
-                    "polygon": self._format_polygon(mark.polygon)
-                })
-
-            analysis["pages"].append(page_data)
-
-        # Process tables
-        for table in result.tables or []:
-            table_data = {
-                "row_count": table.row_count,
-                "column_count": table.column_count,
-                "cells": [],
-                "bounding_regions": [{
-                    "page_number": region.page_number,
-                    "polygon": self._format_polygon(region.polygon)
-                } for region in table.bounding_regions or []]
-            }
+    def _begin_analyze(self, document_path: str):
+        """Submit a document for layout analysis and return the service poller."""
+        document_path = self._check_document(document_path)
+
+        polling_kwargs = self._polling_kwargs(document_path)
+        with open(document_path, "rb") as document:
+            return self.client.begin_analyze_document(self.MODEL_ID, document, **polling_kwargs)
 
-            for cell in table.cells:
-                table_data["cells"].append({
-                    "row_index": cell.row_index,
-                    "column_index": cell.column_index,
-                    "content": cell.content,
-                    "bounding_regions": [{
-                        "page_number": region.page_number,
-                        "polygon": self._format_polygon(region.polygon)
-                    } for region in cell.bounding_regions or []]
-                })
+    def analyze_many(self, document_paths: Iterable[str], max_in_flight: int = 8,
+                     result_format: str = "dict") -> Iterator[BatchAnalysisResult]:
+        """
+        Analyze many documents concurrently and yield results as they finish.
 
-            analysis["tables"].append(table_data)
+        Up to ``max_in_flight`` analyze operations are outstanding at any time. The
+        SDK pollers run in the background, so the service works on all of them at
+        once while this generator waits for whichever finishes first. Failures are
+        reported on the yielded result instead of aborting the batch.
 
-        return analysis
+        Args:
+            document_paths: Paths of the documents to analyze
+            max_in_flight: Maximum number of operations submitted but not yet finished
+            result_format: ``"dict"`` or ``"columnar"``, as for ``analyze_document``
 
-    def analyze_and_save_json(self, document_path: str, output_path: str) -> None:
+        Yields:
+            BatchAnalysisResult for each document, in completion order
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if result_format not in ("dict", "columnar"):
+            raise ValueError(f"Unknown result format: {result_format}")
+
+        pending = iter(document_paths)
+        in_flight = {}
+        finished = queue.Queue()
+
+        def on_done(key):
+            def callback(_polling_method):
+                finished.put((key, time.perf_counter()))
+            return callback
+
+        exhausted = False
+        while True:
+            # Top up the in-flight window before waiting on anything
+            while not exhausted and len(in_flight) < max_in_flight:
+                try:
+                    path = next(pending)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                started = time.perf_counter()
+                try:
+                    cache_key, cached = self._cache_lookup(path)
+                    if cached is None:
+                        poller = self._begin_analyze(path)
+                except Exception as e:
+                    elapsed = time.perf_counter() - started
+                    yield BatchAnalysisResult(str(path), error=e, submit_seconds=elapsed, total_seconds=elapsed)
+                    continue
+
+                if cached is not None:
+                    yield BatchAnalysisResult(str(path), analysis=self._convert_result(cached, result_format), cached=True,
+                                              total_seconds=time.perf_counter() - started)
+                    continue
+
+                key = object()
+                in_flight[key] = (str(path), poller, started, time.perf_counter(), cache_key)
+                poller.add_done_callback(on_done(key))
+
+            if not in_flight:
+                return
+
+            try:
+                key, completed = finished.get(timeout=0.5)
+            except queue.Empty:
+                # Sweep for operations whose completion callback was missed
+                key = next((k for k, entry in in_flight.items() if entry[1].done()), None)
+                if key is None:
+                    continue
+                completed = time.perf_counter()
+
+            if key not in in_flight:
+                continue
+            path, poller, started, accepted, cache_key = in_flight.pop(key)
+
+            result = BatchAnalysisResult(
+                path,
+                submit_seconds=accepted - started,
+                service_seconds=max(completed - accepted, 0.0),
+            )
+            try:
+                sdk_result = poller.result()
+                self._cache_store(cache_key, sdk_result)
+                result.analysis = self._convert_result(sdk_result, result_format)
+            except Exception as e:
+                result.error = e
+            result.total_seconds = time.perf_counter() - started
+            yield result
+
+    def analyze_and_save_json(self, document_path: str, output_path: str, stream: bool = False,
+                              indent: Optional[int] = None) -> None:
         """
         Analyze document layout and save results as JSON.
         
         Args:
             document_path: Path to the document file
             output_path: Path where to save the JSON results
+            stream: Write each page and table as soon as it is converted instead of
+                building the whole analysis first, keeping peak memory to one page
+            indent: Indentation used when streaming; compact output by default
         """
+        if stream:
+            self._stream_json(self._analyze_result(document_path), output_path, indent)
+            return
         analysis = self.analyze_document(document_path)
-        
-        output_path = Path(output_path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(analysis, f, indent=2, ensure_ascii=False) 
\ No newline at end of file
+        self._write_json(analysis, output_path)
+
+    def analyze_and_save_ndjson(self, document_path: str, output_path: str) -> None:
+        """
+        Analyze document layout and save results as newline-delimited JSON.
+
+        Each line holds one record (``{"page": ...}``, ``{"table": ...}`` and a
+        final ``{"summary": ...}``), so consumers can read pages incrementally
+        with ``my_project.utils.json_stream.read_analysis_ndjson``.
+
+        Args:
+            document_path: Path to the document file
+            output_path: Path where to save the NDJSON results
+        """
+        self._write_ndjson(self._analyze_result(document_path), output_path)
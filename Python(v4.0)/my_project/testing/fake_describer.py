@@ -0,0 +1,46 @@
+"""
+Local stand-in for a vision model that describes figures.
+
+Answers describe requests after a configurable latency with a deterministic
+description of the image bytes, so figure description pipelines can be tested
+and benchmarked without an Azure OpenAI deployment.
+"""
+import asyncio
+import hashlib
+from typing import Callable, Dict, Optional, Union
+
+
+class FakeDescriber:
+    """
+    Describer, as for ``FigureDescriptionStage``, that answers locally.
+
+    Args:
+        latency: Seconds each request takes, or a callable mapping the image bytes to seconds
+        errors: Optional mapping of image bytes to the exception that request should raise
+    """
+
+    def __init__(self, latency: Union[float, Callable[[bytes], float]] = 0.0,
+                 errors: Optional[Dict[bytes, Exception]] = None):
+        self.latency = latency
+        self.errors = errors or {}
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @staticmethod
+    def description(image: bytes, caption: str = "") -> str:
+        """The description the fake gives ``image``."""
+        text = f"An image of {len(image)} bytes ({hashlib.sha256(image).hexdigest()[:12]})"
+        return f"{text} captioned {caption!r}" if caption else text
+
+    async def __call__(self, image: bytes, mime_type: str, caption: str) -> str:
+        self.calls.append({"image": image, "mime_type": mime_type, "caption": caption})
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency(image) if callable(self.latency) else self.latency)
+            if image in self.errors:
+                raise self.errors[image]
+            return self.description(image, caption)
+        finally:
+            self.in_flight -= 1
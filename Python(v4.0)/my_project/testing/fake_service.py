@@ -0,0 +1,205 @@
+"""
+In-process fake of the Document Intelligence analyze service.
+
+Returns canned ``AnalyzeResult`` objects through real ``LROPoller`` instances so
+code under test exercises the same polling machinery as against the service,
+with a configurable latency per operation.
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from azure.ai.formrecognizer import AnalyzeResult
+from azure.core.polling import LROPoller, PollingMethod
+
+
+def canned_layout_result(page_count: int = 1, words_per_page: int = 3, first_page: int = 1) -> AnalyzeResult:
+    """
+    Build a small but complete prebuilt-layout ``AnalyzeResult``.
+
+    Args:
+        page_count: Number of pages in the result
+        words_per_page: Number of words (and one line holding them) per page
+        first_page: Number of the first page, as when the service analyzes only a page range
+
+    Returns:
+        AnalyzeResult with pages, lines, words, a selection mark and, when page 1
+        is included, one table
+    """
+    page_texts = []
+    pages = []
+    offset = 0
+    for page_number in range(first_page, first_page + page_count):
+        words = []
+        page_start = offset
+        for word_idx in range(words_per_page):
+            text = f"w{page_number}_{word_idx}"
+            x = 1.0 + word_idx
+            words.append({
+                "content": text,
+                "confidence": 0.99,
+                "polygon": [{"x": x, "y": 1.0}, {"x": x + 0.8, "y": 1.0},
+                            {"x": x + 0.8, "y": 1.2}, {"x": x, "y": 1.2}],
+                "span": {"offset": offset, "length": len(text)},
+            })
+            offset += len(text) + 1
+        line_length = offset - page_start - 1
+        page_texts.append(" ".join(word["content"] for word in words))
+        pages.append({
+            "page_number": page_number,
+            "angle": 0.0,
+            "width": 8.5,
+            "height": 11.0,
+            "unit": "inch",
+            "spans": [{"offset": page_start, "length": line_length}],
+            "words": words,
+            "lines": [{
+                "content": " ".join(word["content"] for word in words),
+                "polygon": [{"x": 1.0, "y": 1.0}, {"x": 1.0 + words_per_page, "y": 1.0},
+                            {"x": 1.0 + words_per_page, "y": 1.2}, {"x": 1.0, "y": 1.2}],
+                "spans": [{"offset": page_start, "length": line_length}],
+            }],
+            "selection_marks": [{
+                "state": "selected",
+                "confidence": 0.95,
+                "polygon": [{"x": 0.5, "y": 2.0}, {"x": 0.7, "y": 2.0},
+                            {"x": 0.7, "y": 2.2}, {"x": 0.5, "y": 2.2}],
+                "span": {"offset": page_start, "length": 0},
+            }],
+        })
+
+    cell_region = [{"page_number": 1, "polygon": [{"x": 1.0, "y": 3.0}, {"x": 2.0, "y": 3.0},
+                                                  {"x": 2.0, "y": 3.5}, {"x": 1.0, "y": 3.5}]}]
+    tables = [] if first_page != 1 else [{
+        "row_count": 1,
+        "column_count": 1,
+        "cells": [{
+            "kind": "content",
+            "row_index": 0,
+            "column_index": 0,
+            "row_span": 1,
+            "column_span": 1,
+            "content": "w1_0",
+            "bounding_regions": cell_region,
+            "spans": [{"offset": 0, "length": 4}],
+        }],
+        "bounding_regions": cell_region,
+        "spans": [{"offset": 0, "length": 4}],
+    }]
+
+    return AnalyzeResult.from_dict({
+        "api_version": "2022-08-31",
+        "model_id": "prebuilt-layout",
+        "content": "\n".join(page_texts),
+        "pages": pages,
+        "tables": tables,
+        "styles": [],
+        "paragraphs": [],
+        "languages": [],
+        "key_value_pairs": [],
+        "documents": [],
+    })
+
+
+def parse_page_range(pages: str) -> Tuple[int, int]:
+    """Parse a single ``pages`` range such as ``"51-100"`` or ``"7"`` into ``(first, last)``."""
+    first, _, last = pages.partition("-")
+    return int(first), int(last or first)
+
+
+def layout_result_for_document(document: bytes, pages: Optional[str] = None,
+                               words_per_page: int = 3) -> AnalyzeResult:
+    """
+    Build the canned result the service would return for a PDF and ``pages`` parameter.
+
+    Usable as the ``result`` factory of ``StubDocumentIntelligenceServer``, so
+    results cover exactly the pages that were uploaded or requested.
+
+    Args:
+        document: Uploaded PDF bytes
+        pages: Requested page range, all pages when None
+        words_per_page: Number of words per page
+
+    Returns:
+        AnalyzeResult numbering pages as the service does
+    """
+    from ..utils.sharding import count_pages
+
+    if pages is None:
+        return canned_layout_result(count_pages(document), words_per_page)
+    first, last = parse_page_range(pages)
+    return canned_layout_result(last - first + 1, words_per_page, first_page=first)
+
+
+class _FakePollingMethod(PollingMethod):
+    """Polling method that finishes after a fixed delay with a canned result."""
+
+    def __init__(self, result, latency: float, error: Optional[Exception] = None):
+        self._result = result
+        self._latency = latency
+        self._error = error
+        self._status = "running"
+
+    def initialize(self, client, initial_response, deserialization_callback):
+        pass
+
+    def run(self):
+        time.sleep(self._latency)
+        self._status = "failed" if self._error else "succeeded"
+        if self._error:
+            raise self._error
+
+    def status(self):
+        return self._status
+
+    def finished(self):
+        return self._status in ("succeeded", "failed")
+
+    def resource(self):
+        return self._result
+
+    def get_continuation_token(self):
+        return ""
+
+
+class FakeDocumentAnalysisClient:
+    """
+    Stand-in for ``DocumentAnalysisClient`` that serves canned results locally.
+
+    Args:
+        result: AnalyzeResult returned by every operation (defaults to ``canned_layout_result()``)
+        latency: Seconds each operation takes, or a callable mapping the document bytes to seconds
+        errors: Optional mapping of document bytes to the exception that operation should raise
+    """
+
+    def __init__(self, result: Optional[AnalyzeResult] = None,
+                 latency: Union[float, Callable[[bytes], float]] = 0.0,
+                 errors: Optional[Dict[bytes, Exception]] = None):
+        self.result = result if result is not None else canned_layout_result()
+        self.latency = latency
+        self.errors = errors or {}
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def begin_analyze_document(self, model_id: str, document, **kwargs) -> LROPoller:
+        """Accept an analyze request and return a poller for the canned result."""
+        data = document if isinstance(document, bytes) else document.read()
+        latency = self.latency(data) if callable(self.latency) else self.latency
+        with self._lock:
+            self.calls.append({"model_id": model_id, "document": data, "kwargs": kwargs})
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        polling_method = _FakePollingMethod(self.result, latency, self.errors.get(data))
+        poller = LROPoller(None, None, lambda response: response, polling_method)
+        poller.add_done_callback(self._on_done)
+        return poller
+
+    def _on_done(self, _polling_method):
+        with self._lock:
+            self.in_flight -= 1
+
+    def close(self) -> None:
+        pass
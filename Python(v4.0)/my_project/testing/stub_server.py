@@ -0,0 +1,273 @@
+"""
+Local HTTP stub of the Document Intelligence REST API.
+
+Speaks enough of the analyze protocol (submit, then poll the operation
+location) and of the resource details endpoint for the real SDK clients to
+run against it over a socket, which makes it suitable for transport-level
+tests and benchmarks. An optional quota throttles analyze submissions with 429
+and Retry-After the way the service does.
+"""
+import json
+import math
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timezone
+from urllib.parse import parse_qs
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from azure.ai.formrecognizer import AnalyzeResult
+
+from .fake_service import canned_layout_result
+
+# Builds the result of an operation from the uploaded document and the ``pages`` parameter
+ResultFactory = Callable[[bytes, Optional[str]], AnalyzeResult]
+
+_ANALYZE_PATH = re.compile(r"^/formrecognizer/documentModels/(?P<model_id>[^/:]+):analyze$")
+_INFO_PATH = "/formrecognizer/info"
+_RESULT_PATH = re.compile(r"^/formrecognizer/documentModels/(?P<model_id>[^/:]+)/analyzeResults/(?P<operation_id>[^/]+)$")
+
+
+def _timestamp(seconds: float) -> str:
+    """Format a wall-clock time like the service, with millisecond precision."""
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _rest_json(result: AnalyzeResult) -> str:
+    return json.dumps(to_rest_payload(result.to_dict()))
+
+
+def _camel_case(name: str) -> str:
+    head, *tail = name.split("_")
+    return head + "".join(part.title() for part in tail)
+
+
+def to_rest_payload(value):
+    """
+    Convert ``AnalyzeResult.to_dict()`` output to the service's REST JSON shape.
+
+    Keys become camelCase and ``[{"x": .., "y": ..}, ...]`` polygons become flat
+    coordinate lists.
+    """
+    if isinstance(value, dict):
+        return {_camel_case(key): to_rest_payload(item) for key, item in value.items()}
+    if isinstance(value, list):
+        if value and all(isinstance(item, dict) and set(item) == {"x", "y"} for item in value):
+            return [coordinate for point in value for coordinate in (point["x"], point["y"])]
+        return [to_rest_payload(item) for item in value]
+    return value
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Clients open many connections at once when driving hundreds of operations
+    request_queue_size = 512
+
+
+class StubDocumentIntelligenceServer:
+    """
+    Threaded HTTP server that answers analyze requests with a canned result.
+
+    Args:
+        result: AnalyzeResult served for every operation (defaults to ``canned_layout_result()``),
+            or a callable building one from the uploaded document bytes and the
+            request's ``pages`` parameter (None when absent)
+        latency: Seconds between submitting an operation and it reporting success, or a
+            callable computing them from the uploaded document bytes and ``pages`` parameter
+        poll_after_ms: Value of the ``retry-after-ms`` header sent while an operation is running
+        api_key: When set, requests with a different ``Ocp-Apim-Subscription-Key`` are
+            rejected with 401, as the service does for a wrong key
+        quota_tps: When set, analyze submissions beyond this many per second are
+            rejected with 429 and a Retry-After delay
+        throttle_polls: Number of result polls, the first ones, rejected with 429 and a
+            Retry-After of ``poll_after_ms``, as the service does when polling is metered
+    """
+
+    def __init__(self, result: Union[AnalyzeResult, ResultFactory, None] = None,
+                 latency: Union[float, Callable[[bytes, Optional[str]], float]] = 0.0, poll_after_ms: int = 10,
+                 api_key: Optional[str] = None, quota_tps: Optional[float] = None,
+                 throttle_polls: int = 0):
+        self.latency = latency
+        self.poll_after_ms = poll_after_ms
+        self.api_key = api_key
+        self.quota_tps = quota_tps
+        self.throttle_polls = throttle_polls
+        # The quota is a token bucket holding one second's worth of requests
+        self._quota_tokens = quota_tps or 0.0
+        self._quota_updated = time.monotonic()
+        self._result_factory = result if callable(result) else None
+        self._payload = None if self._result_factory else _rest_json(result or canned_layout_result())
+        # Operation id -> (created, ready) wall-clock times and the result JSON
+        self._operations: Dict[str, Tuple[float, float, str]] = {}
+        self._lock = threading.Lock()
+        self.analyze_requests = 0
+        self.poll_requests = 0
+        self.info_requests = 0
+        self.unauthorized_requests = 0
+        self.throttled_requests = 0
+        self.throttled_polls = 0
+        self.connections = 0
+        self.max_in_flight = 0
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def endpoint(self) -> str:
+        """Base URL to pass to the SDK client as its endpoint."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubDocumentIntelligenceServer":
+        """Start serving on an ephemeral localhost port in a background thread."""
+        self._httpd = _Server(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Shut the server down and wait for the serving thread to exit."""
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _throttle_delay(self) -> float:
+        """Take a quota token for a submission, or return how long to wait for one."""
+        if self.quota_tps is None:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._quota_tokens = min(self.quota_tps,
+                                     self._quota_tokens + (now - self._quota_updated) * self.quota_tps)
+            self._quota_updated = now
+            if self._quota_tokens >= 1:
+                self._quota_tokens -= 1
+                return 0.0
+            self.throttled_requests += 1
+            return (1 - self._quota_tokens) / self.quota_tps
+
+    def _throttle_poll(self) -> bool:
+        """Whether to reject a result poll, counting it if so."""
+        with self._lock:
+            if self.throttled_polls >= self.throttle_polls:
+                return False
+            self.throttled_polls += 1
+            return True
+
+    def _submit(self, model_id: str, document: bytes = b"", pages: Optional[str] = None) -> str:
+        operation_id = uuid.uuid4().hex
+        latency = self.latency(document, pages) if callable(self.latency) else self.latency
+        payload = _rest_json(self._result_factory(document, pages)) if self._result_factory else self._payload
+        with self._lock:
+            self.analyze_requests += 1
+            created = time.time()
+            self._operations[operation_id] = (created, created + latency, payload)
+            self.max_in_flight = max(self.max_in_flight, len(self._operations))
+        return f"{self.endpoint}/formrecognizer/documentModels/{model_id}/analyzeResults/{operation_id}?api-version=2022-08-31"
+
+    def _poll(self, operation_id: str) -> Optional[Tuple[str, float, float, str]]:
+        """Return the operation's status with its created and last updated times and result JSON."""
+        with self._lock:
+            self.poll_requests += 1
+            operation = self._operations.get(operation_id)
+            if operation is None:
+                return None
+            created, ready_at, payload = operation
+            now = time.time()
+            if now < ready_at:
+                return "running", created, now, payload
+            del self._operations[operation_id]
+            return "succeeded", created, ready_at, payload
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: str = "", headers: Optional[Dict[str, str]] = None):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_throttled(self, operation: str, delay: float):
+                self._send(429, json.dumps({"error": {
+                    "code": "429",
+                    "message": f"Requests to the {operation} operation have exceeded the rate limit of your "
+                               "current pricing tier. Please retry after the delay."}}),
+                    headers={"Retry-After": str(math.ceil(delay)), "retry-after-ms": str(math.ceil(delay * 1000))})
+
+            def _authorized(self) -> bool:
+                if stub.api_key is None or self.headers.get("Ocp-Apim-Subscription-Key") == stub.api_key:
+                    return True
+                with stub._lock:
+                    stub.unauthorized_requests += 1
+                self._send(401, json.dumps({"error": {
+                    "code": "401",
+                    "message": "Access denied due to invalid subscription key or wrong API endpoint."}}))
+                return False
+
+            def do_POST(self):
+                document = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if not self._authorized():
+                    return
+                path, _, query = self.path.partition("?")
+                match = _ANALYZE_PATH.match(path)
+                if not match:
+                    self._send(404, json.dumps({"error": {"code": "NotFound", "message": self.path}}))
+                    return
+                delay = stub._throttle_delay()
+                if delay:
+                    self._send_throttled("Analyze", delay)
+                    return
+                pages = parse_qs(query).get("pages")
+                location = stub._submit(match.group("model_id"), document, pages[0] if pages else None)
+                self._send(202, headers={"Operation-Location": location})
+
+            def do_GET(self):
+                if not self._authorized():
+                    return
+                if self.path.split("?", 1)[0] == _INFO_PATH:
+                    with stub._lock:
+                        stub.info_requests += 1
+                    self._send(200, json.dumps({"customDocumentModels": {"count": 0, "limit": 250}}))
+                    return
+                match = _RESULT_PATH.match(self.path.split("?", 1)[0])
+                if match and stub._throttle_poll():
+                    self._send_throttled("Get Analyze Result", stub.poll_after_ms / 1000)
+                    return
+                operation = stub._poll(match.group("operation_id")) if match else None
+                if operation is None:
+                    self._send(404, json.dumps({"error": {"code": "NotFound", "message": self.path}}))
+                    return
+                status, created, updated, payload = operation
+                timestamps = f'"createdDateTime": "{_timestamp(created)}", "lastUpdatedDateTime": "{_timestamp(updated)}"'
+                if status == "running":
+                    self._send(200, f'{{"status": "running", {timestamps}}}',
+                               headers={"retry-after-ms": str(stub.poll_after_ms)})
+                else:
+                    self._send(200, f'{{"status": "succeeded", {timestamps}, "analyzeResult": {payload}}}')
+
+        return Handler
@@ -0,0 +1,131 @@
+"""
+Synthetic dense pages in the ``LayoutAnalyzer`` analysis format.
+
+Words are laid out in rows of text lines filling the page, like a dense
+high-resolution scan. Every word and line carries a polygon (points grouped in
+pairs, as in the analysis JSON) and spans into the page content, so the pages
+exercise both geometric and offset-based post-processing.
+"""
+from typing import Dict
+
+
+def _rectangle(left: float, top: float, right: float, bottom: float):
+    return [[[left, top], [right, top]], [[right, bottom], [left, bottom]]]
+
+
+def synthetic_page(word_count: int = 5000, words_per_line: int = 12, page_number: int = 1,
+                   width: float = 8.5, height: float = 11.0, selection_mark_every: int = 25) -> Dict:
+    """
+    Build one page dict with ``word_count`` words in lines of ``words_per_line``.
+
+    Args:
+        word_count: Number of words on the page
+        words_per_line: Words per text line; the last line may be shorter
+        page_number: Number of the page
+        width: Page width in inches
+        height: Page height in inches
+        selection_mark_every: Put a selection mark in the left margin of every
+            this many lines; 0 for none
+
+    Returns:
+        Page dict with ``lines``, ``words``, ``selection_marks`` and a ``content``
+        string the spans index into
+    """
+    line_count = -(-word_count // words_per_line)
+    line_height = (height - 1.0) / max(line_count, 1)
+    word_width = (width - 1.0) / words_per_line
+
+    words, lines, marks, parts = [], [], [], []
+    offset = 0
+    for line_index in range(line_count):
+        top = 0.5 + line_index * line_height
+        bottom = top + 0.8 * line_height
+        line_start = offset
+        first = line_index * words_per_line
+        texts = []
+        for word_index in range(first, min(first + words_per_line, word_count)):
+            text = f"w{word_index}"
+            left = 0.5 + (word_index - first) * word_width
+            words.append({
+                "content": text,
+                "confidence": 0.99,
+                "polygon": _rectangle(left, top, left + 0.8 * word_width, bottom),
+                "span": {"offset": offset, "length": len(text)},
+            })
+            texts.append(text)
+            offset += len(text) + 1
+        line_text = " ".join(texts)
+        lines.append({
+            "content": line_text,
+            "polygon": _rectangle(0.5, top, 0.5 + (len(texts) - 0.2) * word_width, bottom),
+            "spans": [{"offset": line_start, "length": len(line_text)}],
+        })
+        parts.append(line_text)
+        if selection_mark_every and line_index % selection_mark_every == 0:
+            marks.append({
+                "state": "unselected",
+                "confidence": 0.9,
+                "polygon": _rectangle(0.1, top, 0.1 + 0.8 * line_height, bottom),
+            })
+
+    return {
+        "page_number": page_number,
+        "width": width,
+        "height": height,
+        "unit": "inch",
+        "lines": lines,
+        "words": words,
+        "selection_marks": marks,
+        "content": "\n".join(parts),
+    }
+
+
+def synthetic_result(page_count: int = 10, words_per_page: int = 5000, words_per_line: int = 12,
+                     lines_per_paragraph: int = 5, style_every: int = 7, figure_every: int = 100) -> Dict:
+    """
+    Build an analyze result dict of ``page_count`` synthetic pages sharing one content string.
+
+    Page spans are shifted into the result's content, and the result gets one
+    paragraph per ``lines_per_paragraph`` lines, a bold style and an italic style
+    spanning every ``style_every``-th word each, one language spanning every
+    paragraph and a figure spanning every ``figure_every``-th line.
+
+    Returns:
+        Dict with ``content``, ``pages``, ``paragraphs``, ``styles``,
+        ``languages``, ``tables`` and ``figures``, shaped like an SDK
+        ``AnalyzeResult`` in dict form
+    """
+    pages, lines, parts = [], [], []
+    offset = 0
+    for page_number in range(1, page_count + 1):
+        page = synthetic_page(word_count=words_per_page, words_per_line=words_per_line, page_number=page_number)
+        for word in page["words"]:
+            word["span"]["offset"] += offset
+        for line in page["lines"]:
+            line["spans"][0]["offset"] += offset
+        lines.extend(page["lines"])
+        parts.append(page.pop("content"))
+        pages.append(page)
+        offset += len(parts[-1]) + 1
+
+    paragraphs = []
+    for first in range(0, len(lines), lines_per_paragraph):
+        group = lines[first:first + lines_per_paragraph]
+        start = group[0]["spans"][0]["offset"]
+        end = group[-1]["spans"][0]["offset"] + group[-1]["spans"][0]["length"]
+        paragraphs.append({"content": " ".join(line["content"] for line in group),
+                           "spans": [{"offset": start, "length": end - start}]})
+
+    words = [word for page in pages for word in page["words"]]
+    styles = [{"font_weight": "bold", "spans": [dict(word["span"]) for word in words[::style_every]]},
+              {"font_style": "italic", "spans": [dict(word["span"]) for word in words[style_every // 2::style_every]]}]
+    return {
+        "content": "\n".join(parts),
+        "pages": pages,
+        "paragraphs": paragraphs,
+        "styles": styles,
+        "languages": [{"locale": "en", "confidence": 0.99,
+                       "spans": [dict(paragraph["spans"][0]) for paragraph in paragraphs]}],
+        "tables": [],
+        "figures": [{"spans": [dict(line["spans"][0])]} for line in lines[::figure_every]] if figure_every else [],
+    }
@@ -0,0 +1,89 @@
+"""
+Synthetic layout results with tables that continue across pages.
+
+The results mimic the markdown output of the layout model: each page holds
+one pipe table fragment, every table cell is also reported as a paragraph, and
+page headers, footers and numbers are paragraphs with their roles set. Objects
+are plain namespaces shaped like the SDK models, with flat polygons.
+"""
+from types import SimpleNamespace
+from typing import List
+
+
+def _span(offset: int, length: int) -> SimpleNamespace:
+    return SimpleNamespace(offset=offset, length=length)
+
+
+def _markdown_row(cells: List[str]) -> str:
+    return "| " + " | ".join(cells) + " |\n"
+
+
+def synthetic_cross_page_result(page_count: int, rows_per_page: int = 10, column_count: int = 4,
+                                break_every: int = 0, page_width: float = 8.5) -> SimpleNamespace:
+    """
+    Build a result with one table fragment per page.
+
+    Consecutive fragments are separated only by a blank line, so they form one
+    continuous table, except that every ``break_every`` pages a body paragraph
+    precedes the fragment and starts a new table.
+
+    Args:
+        page_count: Number of pages, and of table fragments
+        rows_per_page: Body rows in each fragment, below its header row
+        column_count: Columns of every fragment
+        break_every: Start a new table every this many pages; 0 never does
+        page_width: Page width in inches
+
+    Returns:
+        Namespace with ``content``, ``pages``, ``tables`` and ``paragraphs``
+    """
+    parts = []
+    offset = 0
+    pages, tables, paragraphs = [], [], []
+
+    def add(text: str, role=None, paragraph: bool = True) -> int:
+        nonlocal offset
+        start = offset
+        parts.append(text)
+        offset += len(text)
+        if paragraph:
+            paragraphs.append(SimpleNamespace(content=text.strip(), role=role, spans=[_span(start, len(text))]))
+        return start
+
+    header = [f"Column {c}" for c in range(column_count)]
+    polygon = [0.5, 1.0, page_width - 0.5, 1.0, page_width - 0.5, 10.0, 0.5, 10.0]
+    for page_number in range(1, page_count + 1):
+        pages.append(SimpleNamespace(page_number=page_number, width=page_width, height=11.0))
+        if page_number > 1:
+            add("\n\n", paragraph=False)
+        if page_number == 1 or (break_every and (page_number - 1) % break_every == 0):
+            add(f"Statement {page_number}\n\n")
+
+        rows = [_markdown_row(header), _markdown_row(["-"] * column_count)]
+        rows += [_markdown_row([f"p{page_number}r{row}c{c}" for c in range(column_count)])
+                 for row in range(rows_per_page)]
+        # Tables are written without their trailing newline
+        table_start = add("".join(rows)[:-1], paragraph=False)
+
+        # Every body cell is also reported as a paragraph
+        cell_offset = table_start + len(rows[0]) + len(rows[1]) + 2
+        for row in range(rows_per_page):
+            for c in range(column_count):
+                cell = f"p{page_number}r{row}c{c}"
+                paragraphs.append(SimpleNamespace(content=cell, role=None, spans=[_span(cell_offset, len(cell))]))
+                cell_offset += len(cell) + 3
+            cell_offset += 2
+
+        tables.append(SimpleNamespace(
+            row_count=rows_per_page + 1,
+            column_count=column_count,
+            spans=[_span(table_start, offset - table_start)],
+            bounding_regions=[SimpleNamespace(page_number=page_number, polygon=polygon)],
+        ))
+        # Page furniture sits right after the table it belongs to
+        for role, text in (("pageHeader", "Annual report"), ("pageFooter", "Confidential"),
+                           ("pageNumber", str(page_number))):
+            paragraphs.append(SimpleNamespace(content=text, role=role, spans=[_span(offset + 1, 0)]))
+
+    paragraphs.sort(key=lambda paragraph: paragraph.spans[0].offset)
+    return SimpleNamespace(content="".join(parts), pages=pages, tables=tables, paragraphs=paragraphs)
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from azure.ai.formrecognizer import AnalyzeResult
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+class AnalysisCache:
+    """
+    Content-addressed on-disk cache of ``AnalyzeResult`` objects.
+
+    Entries are keyed by the SHA-256 of the document bytes together with the
+    model id and requested feature set, so byte-identical resubmissions are
+    served from disk without contacting the service. Raw SDK results are
+    stored rather than converted analyses, so every output format can be
+    produced from a cache hit.
+
+    Args:
+        directory: Directory holding the cache entries (created if missing)
+        max_bytes: Evict least recently used entries once the cache exceeds this size
+        max_age_seconds: Treat entries older than this as misses and evict them
+    """
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None, max_age_seconds: Optional[float] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+
+    @staticmethod
+    def key_for(document_path: str, model_id: str, features: Iterable[str] = ()) -> str:
+        """
+        Compute the cache key of a document analyzed with a model and feature set.
+
+        Args:
+            document_path: Path to the document file
+            model_id: Model the document is analyzed with
+            features: Optional add-on features or options that change the result
+
+        Returns:
+            Hex digest identifying the document contents and analysis options
+        """
+        digest = hashlib.sha256()
+        with open(document_path, "rb") as document:
+            for chunk in iter(lambda: document.read(_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        options = json.dumps({"model_id": model_id, "features": sorted(features)}, sort_keys=True)
+        return hashlib.sha256(digest.hexdigest().encode("ascii") + options.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _entries(self):
+        return self.directory.glob("*.json")
+
+    def get(self, key: str) -> Optional[AnalyzeResult]:
+        """Return the cached result for ``key``, or None on a miss or expired entry."""
+        path = self._path(key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if self.max_age_seconds is not None and time.time() - stat.st_mtime > self.max_age_seconds:
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            # Evicted concurrently or left truncated; treat as a miss
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # The modification time records when the entry was stored and the access
+        # time when it was last used, for age-based and LRU eviction respectively
+        os.utime(path, (time.time(), stat.st_mtime))
+        with self._lock:
+            self.hits += 1
+        return AnalyzeResult.from_dict(data)
+
+    def put(self, key: str, result: AnalyzeResult) -> None:
+        """Store ``result`` under ``key`` and evict entries beyond the size limit."""
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(result.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+
+        size = os.path.getsize(tmp_path)
+        try:
+            previous = path.stat().st_size
+        except FileNotFoundError:
+            previous = 0
+        # Atomic rename so concurrent readers never see a partial entry
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._size += size - previous
+            over_limit = self.max_bytes is not None and self._size > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove expired entries and, if over ``max_bytes``, least recently used ones.
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        entries = []
+        removed = 0
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if self.max_age_seconds is not None and now - stat.st_mtime > self.max_age_seconds:
+                removed += self._remove(path)
+            else:
+                entries.append((stat.st_atime, path))
+
+        if self.max_bytes is not None and self._size > self.max_bytes:
+            for _, path in sorted(entries):
+                if self._size <= self.max_bytes:
+                    break
+                removed += self._remove(path)
+        return removed
+
+    def _remove(self, path: Path) -> int:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return 0
+        with self._lock:
+            self._size -= size
+            self.evictions += 1
+        return 1
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        for path in list(self._entries()):
+            self._remove(path)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and eviction counters along with the entry count and total size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": sum(1 for _ in self._entries()),
+                "bytes": self._size,
+            }
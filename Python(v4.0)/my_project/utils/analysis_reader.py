@@ -0,0 +1,219 @@
+"""
+Lazy, indexed access to saved analysis JSON files.
+
+The first time a file is read, a single scan records the byte range of every
+page and table and writes it to a sidecar ``<file>.index.json``. Later reads
+memory-map the analysis and decode only the requested elements, so reading
+page 0 of an 800 MB analysis costs about as much as reading page 0 of a small one.
+"""
+import json
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".index.json"
+_INDEXED_ARRAYS = ("pages", "tables")
+
+_BRACKET = re.compile(rb'[\[\]{}]')
+# Remainder of a string literal, matched right after its opening quote
+_STRING_TAIL = re.compile(rb'(?:[^"\\]|\\.)*"', re.DOTALL)
+_KEY_SEPARATOR = re.compile(rb'\s*:\s*')
+_SCALAR = re.compile(rb'[^,}\]\s]+')
+# bytes.translate arguments that reduce a segment to just its brackets
+_NON_BRACKETS = bytes(b for b in range(256) if b not in b"[]{}")
+
+
+def _bracket_profile(brackets: bytes, cache: Dict[bytes, Tuple[int, int]]) -> Tuple[int, int]:
+    """Return (net depth change, lowest relative depth) of a run of brackets, memoized."""
+    profile = cache.get(brackets)
+    if profile is None:
+        depth = lowest = 0
+        for bracket in brackets:
+            depth += 1 if bracket in b"[{" else -1
+            lowest = min(lowest, depth)
+        profile = cache[brackets] = (depth, lowest)
+    return profile
+
+
+def build_index(buffer) -> Dict:
+    """
+    Scan an analysis JSON document and record where its elements live.
+
+    The scan hops from string literal to string literal. The brackets between
+    two strings are reduced to a pattern (such as ``[[[][]][[][]]]`` for a
+    polygon) whose depth profile is memoized; they are only inspected one by
+    one when they could open or close a page or table, so the bulk of the
+    file is skipped by C-level searches.
+
+    Args:
+        buffer: bytes-like object or mmap holding the analysis JSON
+
+    Returns:
+        Dict with ``[start, end)`` byte ranges of each page and table, and of
+        every other top-level value under ``"values"``
+    """
+    ranges: Dict[str, List[Tuple[int, int]]] = {name: [] for name in _INDEXED_ARRAYS}
+    values: Dict[str, Tuple[int, int]] = {}
+    depth = 0
+    key = None
+    value_start = element_start = 0
+    pos = 0
+    size = len(buffer)
+    profiles: Dict[bytes, Tuple[int, int]] = {}
+
+    while pos < size:
+        quote = buffer.find(b'"', pos)
+        stop = size if quote == -1 else quote
+        segment = buffer[pos:stop]
+        net, lowest = _bracket_profile(segment.translate(None, _NON_BRACKETS), profiles)
+
+        if depth + lowest >= 3:
+            # Stays inside the current element until the next string
+            depth += net
+        else:
+            for match in _BRACKET.finditer(segment):
+                if match.group() in (b"[", b"{"):
+                    depth += 1
+                    if depth == 3 and key in ranges:
+                        element_start = pos + match.start()
+                else:
+                    depth -= 1
+                    if depth == 2 and key in ranges:
+                        ranges[key].append((element_start, pos + match.end()))
+                    elif depth == 1 and key not in ranges:
+                        values[key] = (value_start, pos + match.end())
+
+        if quote == -1:
+            break
+        pos = _STRING_TAIL.match(buffer, quote + 1).end()
+        if depth != 1:
+            continue
+
+        # At the top level a string followed by a colon is a key
+        separator = _KEY_SEPARATOR.match(buffer, pos)
+        if separator is None:
+            continue
+        key = json.loads(buffer[quote:pos])
+        value_start = separator.end()
+        first = buffer[value_start:value_start + 1]
+        if first == b'"':
+            pos = _STRING_TAIL.match(buffer, value_start + 1).end()
+            values[key] = (value_start, pos)
+        elif first not in (b"[", b"{"):
+            pos = _SCALAR.match(buffer, value_start).end()
+            values[key] = (value_start, pos)
+        else:
+            pos = value_start
+
+    return {"values": values, **ranges}
+
+
+class AnalysisReader:
+    """
+    Read pages and tables from a saved ``*_analysis.json`` without loading it whole.
+
+    Args:
+        analysis_path: Path to an analysis JSON written by ``LayoutAnalyzer``
+        index_path: Where to keep the sidecar index, defaults to ``<analysis_path>.index.json``
+        write_index: Whether to persist a freshly built index for later reads; when the
+            index cannot be written, it is kept in memory only
+    """
+
+    def __init__(self, analysis_path: str, index_path: Optional[str] = None, write_index: bool = True):
+        self.analysis_path = Path(analysis_path)
+        if not self.analysis_path.exists():
+            raise FileNotFoundError(f"Analysis file not found: {self.analysis_path}")
+        self.index_path = Path(index_path) if index_path else self.analysis_path.with_name(
+            self.analysis_path.name + INDEX_SUFFIX)
+
+        self._file = open(self.analysis_path, "rb")
+        try:
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be memory-mapped
+            self._buffer = b""
+        self.index = self._load_index()
+        if self.index is None:
+            self.index = self._build_index(write_index)
+
+    def _source_stamp(self) -> Dict:
+        stat = os.stat(self.analysis_path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _load_index(self) -> Optional[Dict]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            # Missing, unreadable or corrupt: the index is rebuilt
+            return None
+        if index.get("version") != INDEX_VERSION or index.get("source") != self._source_stamp():
+            return None
+        return index
+
+    def _build_index(self, write_index: bool) -> Dict:
+        index = {"version": INDEX_VERSION, "source": self._source_stamp(), **build_index(self._buffer)}
+        if write_index:
+            tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(index, f)
+                os.replace(tmp_path, self.index_path)
+            except OSError:
+                # e.g. a read-only directory; the in-memory index still serves this reader
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+        # Round-trip through JSON so fresh and loaded indexes look the same
+        return json.loads(json.dumps(index))
+
+    def close(self) -> None:
+        """Release the memory map and file handle."""
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._file.close()
+
+    def __enter__(self) -> "AnalysisReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _decode(self, byte_range) -> object:
+        start, end = byte_range
+        return json.loads(self._buffer[start:end])
+
+    @property
+    def page_count(self) -> int:
+        return len(self.index["pages"])
+
+    @property
+    def table_count(self) -> int:
+        return len(self.index["tables"])
+
+    def page(self, index: int) -> Dict:
+        """Decode and return a single page by its position in ``pages``."""
+        return self._decode(self.index["pages"][index])
+
+    def pages(self, indexes: Optional[Iterable[int]] = None) -> Iterator[Dict]:
+        """Decode the requested pages (all by default) one at a time."""
+        for index in range(self.page_count) if indexes is None else indexes:
+            yield self.page(index)
+
+    def table(self, index: int) -> Dict:
+        """Decode and return a single table by its position in ``tables``."""
+        return self._decode(self.index["tables"][index])
+
+    def tables(self, indexes: Optional[Iterable[int]] = None) -> Iterator[Dict]:
+        """Decode the requested tables (all by default) one at a time."""
+        for index in range(self.table_count) if indexes is None else indexes:
+            yield self.table(index)
+
+    def value(self, key: str, default=None):
+        """Decode another top-level value, e.g. ``has_handwritten_content``."""
+        byte_range = self.index["values"].get(key)
+        return default if byte_range is None else self._decode(byte_range)
@@ -1,49 +1,175 @@
-from azure.ai.formrecognizer import DocumentAnalysisClient
-from azure.core.credentials import AzureKeyCredential
-from azure.core.exceptions import ResourceNotFoundError, HttpResponseError
-import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
 
-def test_azure_credentials():
-    """
-    Test Azure Document Intelligence credentials from environment variables.
-    
-    Returns:
-        tuple: (bool, str) - (success status, message)
-    """
-    endpoint = os.getenv('AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT')
-    key = os.getenv('AZURE_DOCUMENT_INTELLIGENCE_KEY')
-    
-    # Check if either credential is missing
+from .client_registry import ClientRegistry, get_client_registry
+from .environment import get_azure_credentials
+
+SUCCESS_MESSAGE = "Successfully connected to Azure Document Intelligence service"
+
+
+def _missing_credentials_message(endpoint: Optional[str], key: Optional[str]) -> Optional[str]:
     if not endpoint and not key:
-        return False, "Missing Azure credentials in environment variables"
+        return "Missing Azure credentials in environment variables"
     if not endpoint:
-        return False, "Missing Azure endpoint in environment variables"
+        return "Missing Azure endpoint in environment variables"
     if not key:
-        return False, "Missing Azure key in environment variables"
-    
+        return "Missing Azure key in environment variables"
+    return None
+
+
+def _probe_credentials(endpoint: str, key: str, registry: Optional[ClientRegistry] = None) -> Tuple[bool, str, bool]:
+    """
+    Check credentials with a metadata call that does not count against analyze quotas.
+
+    Fetches the resource details (custom model count and limit), a small GET
+    that fails with 401 for a wrong key and 404 for a wrong endpoint.
+
+    Returns:
+        tuple: (bool, str, bool) - (success status, message, whether the outcome is definitive)
+    """
+    # Imported here so that importing my_project does not load the SDK
+    from azure.core.exceptions import ClientAuthenticationError, HttpResponseError, ResourceNotFoundError
+
     try:
-        # Initialize the client
-        document_analysis_client = DocumentAnalysisClient(
-            endpoint=endpoint, 
-            credential=AzureKeyCredential(key)
-        )
-        
-        # Test the credentials by beginning a simple read operation
-        # This is a lightweight operation that won't complete but will validate credentials
-        document_analysis_client.begin_analyze_document(
-            "prebuilt-read", 
-            b"test"  # Minimal document content for testing
-        )
-        
-        return True, "Successfully connected to Azure Document Intelligence service"
-        
+        # Share the pooled connections of the analysis client for the same endpoint
+        client = (registry or get_client_registry()).get_administration_client(endpoint, key)
+        client.get_resource_details()
+        return True, SUCCESS_MESSAGE, True
+
     except ResourceNotFoundError:
-        return False, "Invalid endpoint URL"
+        return False, "Invalid endpoint URL", True
+    except ClientAuthenticationError as e:
+        return False, f"Invalid credentials: {e.message}", True
     except HttpResponseError as e:
-        if "InvalidRequest" in str(e):
-            # This is expected as we sent invalid document content
-            # But it means our credentials were accepted
-            return True, "Successfully connected to Azure Document Intelligence service"
-        return False, f"Invalid credentials or service error: {str(e)}"
+        # Throttling and server errors say nothing about the credentials
+        definitive = e.status_code is not None and e.status_code < 500 and e.status_code != 429
+        return False, f"Invalid credentials or service error: {str(e)}", definitive
     except Exception as e:
-        return False, f"Unexpected error: {str(e)}" 
\ No newline at end of file
+        # Network errors and the like may be transient
+        return False, f"Unexpected error: {str(e)}", False
+
+
+def test_azure_credentials():
+    """
+    Test Azure Document Intelligence credentials from environment variables.
+
+    Returns:
+        tuple: (bool, str) - (success status, message)
+    """
+    endpoint, key = get_azure_credentials()
+
+    # Check if either credential is missing
+    message = _missing_credentials_message(endpoint, key)
+    if message:
+        return False, message
+
+    success, message, _ = _probe_credentials(endpoint, key)
+    return success, message
+
+
+class CredentialProbe:
+    """
+    Cached credential check, cheap enough to serve as a high-frequency health check.
+
+    Outcomes are cached per endpoint and key for ``ttl_seconds``. Concurrent
+    callers of an expired entry wait for a single probe instead of each
+    contacting the service. Unexpected errors, such as network failures, are
+    not cached.
+
+    Args:
+        ttl_seconds: How long an outcome is served from the cache
+        registry: Client registry to probe with, defaults to the process-wide one
+        clock: Monotonic clock, replaceable in tests
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, registry: Optional[ClientRegistry] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.registry = registry
+        self.clock = clock
+        self.probes = 0
+        self.cache_hits = 0
+        self._cache: Dict[Tuple[str, str], Tuple[float, Tuple[bool, str]]] = {}
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, cache_key: Tuple[str, str]) -> Optional[Tuple[bool, str]]:
+        with self._lock:
+            entry = self._cache.get(cache_key)
+            if entry is not None and self.clock() < entry[0]:
+                self.cache_hits += 1
+                return entry[1]
+        return None
+
+    def check(self, endpoint: Optional[str] = None, key: Optional[str] = None,
+              refresh: bool = False) -> Tuple[bool, str]:
+        """
+        Return whether the credentials are valid, probing the service only when the cache has no fresh outcome.
+
+        Args:
+            endpoint: Document Intelligence endpoint, defaults to the environment variable
+            key: Document Intelligence key, defaults to the environment variable
+            refresh: Ignore a cached outcome and probe again
+
+        Returns:
+            tuple: (bool, str) - (success status, message)
+        """
+        if not endpoint or not key:
+            env_endpoint, env_key = get_azure_credentials()
+            endpoint = endpoint or env_endpoint
+            key = key or env_key
+
+        message = _missing_credentials_message(endpoint, key)
+        if message:
+            return False, message
+
+        cache_key = (endpoint, key)
+        if not refresh:
+            cached = self._cached(cache_key)
+            if cached is not None:
+                return cached
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(cache_key, threading.Lock())
+        with key_lock:
+            # Another caller may have refreshed the entry while this one waited
+            if not refresh:
+                cached = self._cached(cache_key)
+                if cached is not None:
+                    return cached
+
+            success, message, definitive = _probe_credentials(endpoint, key, self.registry)
+            with self._lock:
+                self.probes += 1
+                if definitive:
+                    self._cache[cache_key] = (self.clock() + self.ttl_seconds, (success, message))
+                else:
+                    self._cache.pop(cache_key, None)
+        return success, message
+
+    def clear(self) -> None:
+        """Forget every cached outcome."""
+        with self._lock:
+            self._cache.clear()
+
+
+_default_probe = CredentialProbe()
+
+
+def validate_credentials(endpoint: Optional[str] = None, key: Optional[str] = None,
+                         refresh: bool = False) -> Tuple[bool, str]:
+    """
+    Validate Azure Document Intelligence credentials with the process-wide cached probe.
+
+    See ``CredentialProbe.check``; outcomes are reused for five minutes.
+
+    Returns:
+        tuple: (bool, str) - (success status, message)
+    """
+    return _default_probe.check(endpoint, key, refresh)
+
+
+def clear_credentials_cache() -> None:
+    """Forget every cached ``validate_credentials`` outcome."""
+    _default_probe.clear()
@@ -0,0 +1,306 @@
+"""
+Disambiguate the fields of many analysis results at once.
+
+Codes such as ICD-10 codes, policy numbers and VINs repeat across the
+documents of a batch, often with the same OCR misreadings. The
+``BatchDisambiguator`` collects every value to check from a batch of results,
+searches the candidates of each distinct (validator, string) pair once,
+spread over a process pool, and memoizes them for later batches. Each
+occurrence is then ranked with its own OCR confidence and reported with where
+it came from. A candidate set cut short at ``max_candidates`` holds the best
+candidates for the search confidence only, so it is searched again for each
+other confidence it occurs with.
+"""
+import os
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .analysis_reader import AnalysisReader
+from .disambiguation import CONFUSABLE_CHARACTERS, ScoreProfile, disambiguate, score_profile
+from .validators import Validator
+
+# Candidate sets are searched with this confidence, then re-ranked per occurrence when complete
+_SEARCH_CONFIDENCE = 0.9
+
+
+@dataclass(frozen=True)
+class FieldCorrection:
+    """
+    The disambiguated value of one field or text element, with its provenance.
+
+    Attributes:
+        source: The result's path, or its position in the batch
+        location: Where the value is in the result, e.g. ``documents[0].fields.PolicyNumber``
+            or ``pages[2].words[17]``
+        validator: Name of the validator the value was checked against
+        raw: The value as read by OCR
+        confidence: OCR confidence of the value
+        value: The most likely valid value, or None when no candidate is valid
+        score: Score of ``value``, see ``disambiguate``
+        substitutions: ``(position, read, replacement)`` for each character of
+            ``raw`` changed in ``value``
+        alternatives: The other valid candidates, most likely first
+    """
+    source: str
+    location: str
+    validator: str
+    raw: str
+    confidence: float
+    value: Optional[str]
+    score: float
+    substitutions: Tuple[Tuple[int, str, str], ...]
+    alternatives: Tuple[str, ...]
+
+    @property
+    def corrected(self) -> bool:
+        """Whether the value differs from what OCR read."""
+        return self.value is not None and self.value != self.raw
+
+
+def _field(element, name: str, default=None):
+    """Read ``name`` from a result dict or an SDK model, or ``default`` if it is missing."""
+    if isinstance(element, Mapping):
+        return element.get(name, default)
+    return getattr(element, name, default)
+
+
+def _first(element, *names):
+    """The first of several spellings of a member (REST camelCase, SDK snake_case) that is set."""
+    for name in names:
+        value = _field(element, name)
+        if value is not None:
+            return value
+    return None
+
+
+def _field_children(field) -> List[Tuple[str, Optional[str], object]]:
+    """``(location suffix, name, child)`` of the items of an array field or the members of an object field."""
+    items = _first(field, "valueArray", "value_array")
+    members = _first(field, "valueObject", "value_object")
+    value_type = _field(field, "value_type")
+    if value_type == "list":  # SDK 3.x fields keep both in ``value``
+        items = _field(field, "value")
+    elif value_type == "dictionary":
+        members = _field(field, "value")
+    if items:
+        return [(f"[{index}]", None, item) for index, item in enumerate(items)]
+    if members:
+        return [(f".{name}", name, member) for name, member in members.items()]
+    return []
+
+
+def _document_fields(result) -> Iterator[Tuple[str, str, object]]:
+    """``(location, field name, field)`` of every field of every document, nested fields included."""
+    stack = []
+    for document_index, document in enumerate(_field(result, "documents") or []):
+        for name, field in (_field(document, "fields") or {}).items():
+            stack.append((f"documents[{document_index}].fields.{name}", name, field))
+    stack.reverse()
+    while stack:
+        location, name, field = stack.pop()
+        if field is None:
+            continue
+        yield location, name, field
+        children = _field_children(field)
+        stack.extend(reversed([(location + suffix, child_name or name, child)
+                               for suffix, child_name, child in children]))
+
+
+def _text_elements(result) -> Iterator[Tuple[str, object]]:
+    """``(location, element)`` of every word and table cell."""
+    for page_index, page in enumerate(_field(result, "pages") or []):
+        for word_index, word in enumerate(_field(page, "words") or []):
+            yield f"pages[{page_index}].words[{word_index}]", word
+    for table_index, table in enumerate(_field(result, "tables") or []):
+        for cell_index, cell in enumerate(_field(table, "cells") or []):
+            yield f"tables[{table_index}].cells[{cell_index}]", cell
+
+
+# A memoized candidate: its text, substitutions and score profile
+_Memo = Tuple[str, Tuple[Tuple[int, str, str], ...], ScoreProfile]
+
+
+def _candidate_chunk(jobs: Sequence[Tuple[str, str, float]], validators: Dict[str, Validator],
+                     confusions: Dict[str, Tuple[str, ...]],
+                     max_candidates: int) -> List[Tuple[Tuple[_Memo, ...], bool]]:
+    """
+    Candidates of each ``(validator, raw, confidence)`` job that pass the validator's check,
+    and whether they are all of them; runs in the worker processes.
+    """
+    results = []
+    for name, raw, confidence in jobs:
+        validator = validators[name]
+        candidates = disambiguate(raw, validator.pattern, confidence, confusions)
+        if validator.check is not None:
+            candidates = (candidate for candidate in candidates if validator.check(candidate.text))
+        # One more than kept tells whether the set was cut short
+        found = list(islice(candidates, max_candidates + 1))
+        results.append((tuple((candidate.text, candidate.substitutions, score_profile(raw, candidate.text, confusions))
+                              for candidate in found[:max_candidates]), len(found) <= max_candidates))
+    return results
+
+
+class BatchDisambiguator:
+    """
+    Disambiguate validated fields across batches of analysis results.
+
+    Args:
+        validators: Map from validator name to the pattern valid values match,
+            e.g. ``{"ICD10": r"^[A-TV-Z]\\d\\d(\\.\\d{1,2})?$"}``, or to a ``Validator``
+            whose check candidates must also pass; a ``ValidatorRegistry`` works too
+        field_validators: Map from document field name to validator name; by
+            default a field is checked by the validator with its name
+        scan_validators: Validators every word and table cell is checked
+            against; only elements with a valid candidate are reported
+        confusions: Map from a character to the characters it may have been
+        default_confidence: Confidence of elements without one, e.g. table cells
+        max_candidates: Most candidates kept per string; a string with more is
+            searched again for each confidence it occurs with
+        max_workers: Worker processes; 1 searches in this process, None uses
+            one per CPU
+        chunk_size: Distinct strings sent to a worker at a time
+
+    Raises:
+        ValueError: If a validator's pattern is unsupported or a validator name is unknown
+    """
+
+    def __init__(self, validators: Mapping[str, Union[str, Validator]], field_validators: Optional[Dict[str, str]] = None,
+                 scan_validators: Sequence[str] = (),
+                 confusions: Dict[str, Tuple[str, ...]] = CONFUSABLE_CHARACTERS,
+                 default_confidence: float = _SEARCH_CONFIDENCE, max_candidates: int = 100,
+                 max_workers: Optional[int] = None, chunk_size: int = 256):
+        # Plain patterns become validators without a check, compiled here to fail early
+        self.validators = {name: validator if isinstance(validator, Validator) else Validator(name, validator)
+                           for name, validator in validators.items()}
+        self.field_validators = dict(field_validators) if field_validators is not None else {
+            name: name for name in self.validators}
+        self.scan_validators = tuple(scan_validators)
+        for name in (*self.field_validators.values(), *self.scan_validators):
+            if name not in self.validators:
+                raise ValueError(f"Unknown validator: {name}")
+        self.confusions = {char: tuple(alternatives) for char, alternatives in confusions.items()}
+        self.default_confidence = default_confidence
+        self.max_candidates = max_candidates
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        # Candidates of every (validator, raw string) searched so far, and whether the set is complete
+        self._candidates: Dict[Tuple[str, str], Tuple[Tuple[_Memo, ...], bool]] = {}
+        # Incomplete sets searched again at the confidence of an occurrence: (validator, raw, confidence)
+        self._ranked: Dict[Tuple[str, str, float], Tuple[_Memo, ...]] = {}
+        self.searches = 0
+        self.reuses = 0
+
+    def _occurrences(self, source: str, result) -> Iterator[Tuple[str, str, str, str, float, bool]]:
+        """``(source, location, validator, raw, confidence, always_report)`` of every value to check."""
+        for location, name, field in _document_fields(result):
+            validator = self.field_validators.get(name)
+            raw = _field(field, "content")
+            if validator is not None and raw is not None:
+                confidence = _field(field, "confidence")
+                yield (source, location, validator, raw,
+                       self.default_confidence if confidence is None else confidence, True)
+        if self.scan_validators:
+            for location, element in _text_elements(result):
+                raw = _field(element, "content")
+                if not raw:
+                    continue
+                confidence = _field(element, "confidence")
+                for validator in self.scan_validators:
+                    yield (source, location, validator, raw,
+                           self.default_confidence if confidence is None else confidence, False)
+
+    def _search(self, jobs: List[Tuple[str, str, float]]) -> List[Tuple[Tuple[_Memo, ...], bool]]:
+        """Find the candidates of ``(validator, raw, confidence)`` jobs, in worker processes when there are enough."""
+        chunks = [jobs[start:start + self.chunk_size] for start in range(0, len(jobs), self.chunk_size)]
+        arguments = (self.validators, self.confusions, self.max_candidates)
+        if self.max_workers <= 1 or len(chunks) <= 1:
+            results = [_candidate_chunk(chunk, *arguments) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+                results = list(executor.map(_candidate_chunk, chunks, *[[argument] * len(chunks)
+                                                                         for argument in arguments]))
+        self.searches += len(jobs)
+        return [candidate_set for chunk_results in results for candidate_set in chunk_results]
+
+    def _needs_own_search(self, validator: str, raw: str, confidence: float) -> bool:
+        """Whether an occurrence's ranking may differ from that of its cut-short candidate set."""
+        _, complete = self._candidates[validator, raw]
+        return not complete and confidence != _SEARCH_CONFIDENCE
+
+    def _correction(self, source: str, location: str, validator: str, raw: str,
+                    confidence: float) -> FieldCorrection:
+        if self._needs_own_search(validator, raw, confidence):
+            candidates = self._ranked[validator, raw, confidence]
+        else:
+            candidates, _ = self._candidates[validator, raw]
+        if not candidates:
+            return FieldCorrection(source, location, validator, raw, confidence, None, 0.0, (), ())
+        scores = [profile.score(confidence) for _, _, profile in candidates]
+        # Stable: ties keep the search order
+        order = sorted(range(len(candidates)), key=lambda index: -scores[index]) if len(candidates) > 1 else [0]
+        value, substitutions, _ = candidates[order[0]]
+        return FieldCorrection(source, location, validator, raw, confidence, value, scores[order[0]], substitutions,
+                               tuple(candidates[index][0] for index in order[1:]))
+
+    def run(self, results: Iterable) -> List[FieldCorrection]:
+        """
+        Disambiguate the fields of a batch of results.
+
+        Args:
+            results: Results to check; each is a path to a saved analysis JSON,
+                a result or analysis dict, or an SDK ``AnalyzeResult``
+
+        Returns:
+            One ``FieldCorrection`` per checked document field, and per scanned
+            word or cell with a valid candidate, in batch order
+        """
+        occurrences = []
+        for position, result in enumerate(results):
+            if isinstance(result, (str, Path)):
+                # Saved analyses are decoded one page and table at a time
+                with AnalysisReader(str(result), write_index=False) as reader:
+                    saved = {"documents": reader.value("documents", []), "pages": reader.pages(),
+                             "tables": reader.tables()}
+                    occurrences.extend(self._occurrences(str(result), saved))
+            else:
+                occurrences.extend(self._occurrences(str(position), result))
+
+        # Identical strings across the batch, and strings seen in earlier batches, are searched once
+        keys = list(dict.fromkeys((validator, raw) for _, _, validator, raw, _, _ in occurrences))
+        missing = [key for key in keys if key not in self._candidates]
+        self.reuses += len(occurrences) - len(missing)
+        if missing:
+            found = self._search([(validator, raw, _SEARCH_CONFIDENCE) for validator, raw in missing])
+            self._candidates.update(zip(missing, found))
+
+        # Cut-short sets may lack the best candidates at another confidence, so those are searched at it
+        ranked = list(dict.fromkeys((validator, raw, confidence) for _, _, validator, raw, confidence, _ in occurrences
+                                    if self._needs_own_search(validator, raw, confidence)))
+        missing = [key for key in ranked if key not in self._ranked]
+        if missing:
+            self._ranked.update(zip(missing, (candidates for candidates, _ in self._search(missing))))
+
+        corrections = []
+        for source, location, validator, raw, confidence, always_report in occurrences:
+            if always_report or self._candidates[validator, raw][0]:
+                corrections.append(self._correction(source, location, validator, raw, confidence))
+        return corrections
+
+
+def disambiguate_results(results: Iterable, validators: Mapping[str, Union[str, Validator]], **options) -> List[FieldCorrection]:
+    """
+    Disambiguate the fields of a batch of results with a one-off ``BatchDisambiguator``.
+
+    Args:
+        results: Paths to saved analyses, result dicts or SDK results
+        validators: Map from validator name to pattern or ``Validator``
+        **options: Other ``BatchDisambiguator`` arguments
+
+    Returns:
+        The corrections, as ``BatchDisambiguator.run``
+    """
+    return BatchDisambiguator(validators, **options).run(results)
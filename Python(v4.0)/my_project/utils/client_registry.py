@@ -0,0 +1,199 @@
+"""
+Process-wide registry of pooled Document Intelligence clients.
+
+Every component that talks to the service asks the registry for its client
+instead of constructing one, so requests to the same endpoint share one
+connection pool and TLS handshakes are paid once per connection rather than
+once per component.
+"""
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from .environment import get_azure_credentials
+
+if TYPE_CHECKING:
+    from .rate_limiter import AdaptiveRateLimiter
+
+
+class ClientRegistry:
+    """
+    Hands out one pooled ``DocumentAnalysisClient`` per endpoint, key and API version.
+
+    Clients for the same endpoint, including the ``DocumentModelAdministrationClient``
+    used for metadata calls, share one HTTP session and connection pool.
+
+    Args:
+        pool_connections: Number of per-host connection pools kept for each endpoint
+        pool_maxsize: Maximum connections kept open per host, which bounds how many
+            requests can run concurrently without opening throwaway connections
+        keep_alive: Keep connections open between requests; when False every
+            request asks the service to close its connection
+        rate_limiter: ``AdaptiveRateLimiter`` every client's analyze submissions go
+            through, so all threads of the process share one request budget
+        client_kwargs: Extra keyword arguments for every client
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 16, keep_alive: bool = True,
+                 rate_limiter: Optional["AdaptiveRateLimiter"] = None, **client_kwargs: Any):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.rate_limiter = rate_limiter
+        self.client_kwargs = client_kwargs
+        self._clients: Dict[Tuple[str, str, str, Optional[str]], Any] = {}
+        self._sessions: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _new_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def _resolve_credentials(self, endpoint: Optional[str], key: Optional[str]) -> Tuple[str, str]:
+        if not endpoint or not key:
+            env_endpoint, env_key = get_azure_credentials()
+            endpoint = endpoint or env_endpoint
+            key = key or env_key
+        if not endpoint or not key:
+            raise ValueError("Missing Azure credentials. Set environment variables or provide credentials.")
+        return endpoint, key
+
+    def _get(self, kind: str, endpoint: Optional[str], key: Optional[str], api_version: Optional[str]):
+        endpoint, key = self._resolve_credentials(endpoint, key)
+        client_key = (kind, endpoint, key, api_version)
+        with self._lock:
+            client = self._clients.get(client_key)
+            if client is None:
+                from azure.ai.formrecognizer import DocumentAnalysisClient, DocumentModelAdministrationClient
+                from azure.core.credentials import AzureKeyCredential
+                from azure.core.pipeline.transport import RequestsTransport
+
+                # Clients of one endpoint share a session, and so its open connections
+                session = self._sessions.get(endpoint)
+                if session is None:
+                    session = self._sessions[endpoint] = self._new_session()
+                client_class = DocumentAnalysisClient if kind == "analysis" else DocumentModelAdministrationClient
+                kwargs = dict(self.client_kwargs)
+                if api_version:
+                    kwargs["api_version"] = api_version
+                if self.rate_limiter is not None:
+                    from .rate_limiter import rate_limited_client_kwargs
+
+                    kwargs.update(rate_limited_client_kwargs(self.rate_limiter))
+                client = client_class(
+                    endpoint=endpoint,
+                    credential=AzureKeyCredential(key),
+                    transport=RequestsTransport(session=session, session_owner=False),
+                    **kwargs
+                )
+                self._clients[client_key] = client
+            return client
+
+    def get_client(self, endpoint: Optional[str] = None, key: Optional[str] = None,
+                   api_version: Optional[str] = None):
+        """
+        Return the shared client for an endpoint, key and API version, creating it on first use.
+
+        Args:
+            endpoint: Document Intelligence endpoint, defaults to the environment variable
+            key: Document Intelligence key, defaults to the environment variable
+            api_version: Service API version, the SDK default when omitted
+
+        Returns:
+            A ``DocumentAnalysisClient`` shared by every caller with the same arguments
+        """
+        return self._get("analysis", endpoint, key, api_version)
+
+    def get_administration_client(self, endpoint: Optional[str] = None, key: Optional[str] = None,
+                                  api_version: Optional[str] = None):
+        """
+        Return the shared ``DocumentModelAdministrationClient``, pooled with the analysis client.
+
+        Takes the same arguments as ``get_client``.
+        """
+        return self._get("administration", endpoint, key, api_version)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report connection pool usage across every client.
+
+        Returns:
+            Dict with the number of clients, requests sent, connections opened and
+            connections reused (requests sent over an already open connection)
+        """
+        requests_sent = connections_opened = 0
+        with self._lock:
+            for session in self._sessions.values():
+                for adapter in set(session.adapters.values()):
+                    pools = adapter.poolmanager.pools
+                    for pool_key in pools.keys():
+                        pool = pools[pool_key]
+                        requests_sent += pool.num_requests
+                        connections_opened += pool.num_connections
+            clients = len(self._clients)
+        return {
+            "clients": clients,
+            "requests": requests_sent,
+            "connections_opened": connections_opened,
+            "connections_reused": max(requests_sent - connections_opened, 0),
+        }
+
+    def close(self) -> None:
+        """Close every client and its connections."""
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            for session in self._sessions.values():
+                session.close()
+            self._clients.clear()
+            self._sessions.clear()
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_pid: Optional[int] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """
+    Return the process-wide registry.
+
+    A forked child process gets a fresh registry rather than sharing its
+    parent's open sockets.
+    """
+    global _registry, _registry_pid
+    with _registry_lock:
+        if _registry is None or _registry_pid != os.getpid():
+            _registry = ClientRegistry()
+            _registry_pid = os.getpid()
+        return _registry
+
+
+def configure_client_registry(**options: Any) -> ClientRegistry:
+    """
+    Replace the process-wide registry with one built from ``ClientRegistry`` options.
+
+    Clients handed out by the previous registry are closed.
+    """
+    global _registry, _registry_pid
+    with _registry_lock:
+        previous = _registry if _registry_pid == os.getpid() else None
+        _registry = ClientRegistry(**options)
+        _registry_pid = os.getpid()
+    if previous is not None:
+        previous.close()
+    return _registry
+
+
+def get_document_analysis_client(endpoint: Optional[str] = None, key: Optional[str] = None,
+                                 api_version: Optional[str] = None):
+    """Return the shared client from the process-wide registry, see ``ClientRegistry.get_client``."""
+    return get_client_registry().get_client(endpoint, key, api_version)
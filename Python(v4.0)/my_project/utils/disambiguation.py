@@ -0,0 +1,173 @@
+"""
+Correct OCR confusions between similar-looking characters using a validator pattern.
+
+OCR can read ``0`` as ``O`` or ``1`` as ``I`` or ``l``. Enumerating every
+substitution of a string and validating each result afterwards grows as
+``3 ** n`` with the number ``n`` of confusable characters. ``disambiguate``
+instead walks the validator's automaton together with the confusion map: a
+prefix the pattern rejects is dropped with every string that extends it, and
+candidates come out lazily, most likely first, in a best-first search.
+
+A candidate's score is the probability of the OCR reading given the
+candidate: each character kept as read has the word's confidence, and each
+substitution shares the remaining probability with the other alternatives
+for that character.
+"""
+import heapq
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterator, Mapping, Optional, Sequence, Tuple, Union
+
+from .pattern_automaton import DEAD, PatternAutomaton, compile_pattern
+
+# Characters OCR confuses, mapped to what they may have been
+CONFUSABLE_CHARACTERS: Dict[str, Tuple[str, ...]] = {
+    "0": ("O",),
+    "O": ("0",),
+    "1": ("I", "l"),
+    "I": ("1", "l"),
+    "l": ("1", "I"),
+}
+
+# Confidences are kept inside this range so every candidate has a nonzero score
+_MIN_CONFIDENCE, _MAX_CONFIDENCE = 0.01, 0.99
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """
+    A string the OCR reading may stand for that passes the validator.
+
+    Attributes:
+        text: The candidate string
+        score: Probability of the OCR reading given this candidate, between 0 and 1
+        substitutions: ``(position, read, replacement)`` for each changed character
+    """
+    text: str
+    score: float
+    substitutions: Tuple[Tuple[int, str, str], ...]
+
+
+def _options(text: str, confidence: float,
+             confusions: Mapping[str, Sequence[str]]) -> Tuple[Tuple[Tuple[str, float], ...], ...]:
+    """For each position, the characters it may hold with their cost, the negative log probability."""
+    confidence = min(max(confidence, _MIN_CONFIDENCE), _MAX_CONFIDENCE)
+    keep_cost = -math.log(confidence)
+    options = []
+    for char in text:
+        alternatives = [alternative for alternative in confusions.get(char, ()) if alternative != char]
+        if not alternatives:
+            options.append(((char, 0.0),))
+            continue
+        swap_cost = -math.log((1 - confidence) / len(alternatives))
+        options.append(((char, keep_cost),) + tuple((alternative, swap_cost) for alternative in alternatives))
+    return tuple(options)
+
+
+@dataclass(frozen=True)
+class ScoreProfile:
+    """
+    What a candidate's score depends on, to score it at any confidence.
+
+    Lets a candidate set found once for a string be ranked against the
+    confidences of the string's different occurrences.
+
+    Attributes:
+        kept: Confusable characters kept as read
+        swapped: Characters substituted
+        factor: Product of ``1 / alternatives`` over the substituted characters
+    """
+    kept: int
+    swapped: int
+    factor: float
+
+    def score(self, confidence: float) -> float:
+        """The candidate's score for a reading with ``confidence``, as ``disambiguate`` computes it."""
+        confidence = min(max(confidence, _MIN_CONFIDENCE), _MAX_CONFIDENCE)
+        return confidence ** self.kept * (1 - confidence) ** self.swapped * self.factor
+
+
+def score_profile(text: str, candidate: str,
+                  confusions: Mapping[str, Sequence[str]] = CONFUSABLE_CHARACTERS) -> ScoreProfile:
+    """
+    The ``ScoreProfile`` of a candidate for the reading ``text``.
+
+    Raises:
+        ValueError: If ``candidate`` is not a substitution of ``text`` under ``confusions``
+    """
+    if len(candidate) != len(text):
+        raise ValueError(f"{candidate!r} is not a substitution of {text!r}")
+    kept = swapped = 0
+    factor = 1.0
+    for read, char in zip(text, candidate):
+        alternatives = [alternative for alternative in confusions.get(read, ()) if alternative != read]
+        if char == read:
+            kept += bool(alternatives)
+        elif char in alternatives:
+            swapped += 1
+            factor /= len(alternatives)
+        else:
+            raise ValueError(f"{candidate!r} is not a substitution of {text!r}")
+    return ScoreProfile(kept, swapped, factor)
+
+
+def disambiguate(text: str, validator: Union[str, PatternAutomaton], confidence: float = 0.9,
+                 confusions: Mapping[str, Sequence[str]] = CONFUSABLE_CHARACTERS,
+                 limit: Optional[int] = None) -> Iterator[Candidate]:
+    """
+    Yield the valid strings an OCR reading may stand for, most likely first.
+
+    The reading itself is a candidate like any other, so a valid reading comes
+    first whenever the confidence is above one half.
+
+    Args:
+        text: The string as read by OCR
+        validator: Regular expression every candidate must fully match, or its
+            compiled ``PatternAutomaton``
+        confidence: OCR confidence of the word, e.g. ``DocumentWord.confidence``
+        confusions: Map from a character to the characters it may have been
+        limit: Stop after this many candidates
+
+    Returns:
+        Iterator of ``Candidate``; stopping early skips the rest of the search
+
+    Raises:
+        ValueError: If ``validator`` uses pattern syntax the automaton does not support
+    """
+    automaton = compile_pattern(validator) if isinstance(validator, str) else validator
+    options = _options(text, confidence, confusions)
+    length = len(options)
+    if limit is not None and limit < 1:
+        return
+    # Entries are (cost, -position, prefix, state); deeper prefixes first among equal costs
+    heap = [(0.0, 0, "", automaton.start)]
+    found = 0
+    while heap:
+        cost, depth, prefix, state = heapq.heappop(heap)
+        position = -depth
+        if position == length:
+            if automaton.accepts(state):
+                substitutions = tuple((index, read, char) for index, (read, char) in enumerate(zip(text, prefix))
+                                      if read != char)
+                yield Candidate(prefix, math.exp(-cost), substitutions)
+                found += 1
+                if found == limit:
+                    return
+            continue
+        # Runs of characters with a single option cost nothing; follow them without the heap
+        while position < length and len(options[position]) == 1:
+            char = options[position][0][0]
+            state = automaton.step(state, char)
+            if state == DEAD:
+                break
+            prefix += char
+            position += 1
+        if state == DEAD:
+            continue
+        if position == length:
+            heapq.heappush(heap, (cost, -position, prefix, state))
+            continue
+        for char, char_cost in options[position]:
+            next_state = automaton.step(state, char)
+            if next_state != DEAD:
+                heapq.heappush(heap, (cost + char_cost, -position - 1, prefix + char, next_state))
@@ -0,0 +1,38 @@
+"""
+Deferred loading of settings from the environment.
+
+Nothing is read when the package is imported; the ``.env`` file is loaded the
+first time a setting is requested, once per process.
+"""
+import functools
+import os
+from typing import Optional, Tuple
+
+ENDPOINT_VARIABLE = "AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT"
+KEY_VARIABLE = "AZURE_DOCUMENT_INTELLIGENCE_KEY"
+
+
+@functools.lru_cache(maxsize=None)
+def load_environment() -> bool:
+    """
+    Load variables from a ``.env`` file into ``os.environ``, without overriding existing ones.
+
+    Returns:
+        Whether a ``.env`` file was found
+    """
+    from dotenv import load_dotenv
+
+    # Searches upwards from this package, as it did when run from my_project/__init__.py
+    return load_dotenv()
+
+
+def get_azure_credentials() -> Tuple[Optional[str], Optional[str]]:
+    """Return the Document Intelligence (endpoint, key) from the environment or ``.env`` file."""
+    load_environment()
+    return os.getenv(ENDPOINT_VARIABLE), os.getenv(KEY_VARIABLE)
+
+
+def debug_enabled() -> bool:
+    """Whether the ``DEBUG`` setting is turned on."""
+    load_environment()
+    return os.getenv("DEBUG", "False").lower() == "true"
@@ -0,0 +1,254 @@
+"""
+Describe cropped figures with a vision model, many requests at a time.
+
+Describing figures one after another leaves the client idle for the whole
+latency of every request, and re-reading each crop from disk to encode it
+adds to that. ``FigureDescriptionStage`` takes crops in memory, e.g. straight
+from ``FigureExtractor.iter_crops`` as pages render, and keeps up to
+``max_concurrency`` describe requests in flight on one event loop.
+Descriptions are cached by a hash of the image, so a figure that repeats
+(a logo, a chart reused across reports) is described once.
+
+The model is a pluggable describer: any async callable taking the image
+bytes, its MIME type and the figure caption and returning the description.
+``AzureOpenAIDescriber`` calls a GPT-4V deployment through one shared
+client; ``my_project.testing.fake_describer.FakeDescriber`` answers locally
+for tests and benchmarks.
+"""
+import asyncio
+import base64
+import hashlib
+from collections.abc import AsyncIterable, MutableMapping
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from .figure_extractor import FigureCrop
+
+# Async callable from (image bytes, MIME type, caption) to the image's description
+Describer = Callable[[bytes, str, str], Awaitable[str]]
+
+
+@dataclass(frozen=True)
+class FigureDescription:
+    """
+    The description of one cropped figure region.
+
+    Attributes:
+        crop: The described crop
+        caption: The caption sent along with the image
+        description: What the model made of the image
+        cached: Whether the description was reused rather than requested
+    """
+    crop: FigureCrop
+    caption: str
+    description: str
+    cached: bool
+
+
+def image_data_url(image: bytes, mime_type: str) -> str:
+    """A ``data:`` URL embedding ``image``, as vision models accept images."""
+    return f"data:{mime_type};base64,{base64.b64encode(image).decode('ascii')}"
+
+
+class AzureOpenAIDescriber:
+    """
+    Describer backed by an Azure OpenAI vision deployment, such as GPT-4V.
+
+    All requests share one ``AsyncAzureOpenAI`` client, created on first use.
+    Needs the ``openai`` package.
+
+    Args:
+        api_base: Azure OpenAI endpoint
+        api_key: Azure OpenAI key
+        deployment_name: Name of the vision model deployment
+        api_version: Azure OpenAI API version
+        max_tokens: Most tokens per description
+        client: Client to use instead, e.g. one with custom retries
+    """
+
+    def __init__(self, api_base: str, api_key: str, deployment_name: str, api_version: str = "2024-02-15-preview",
+                 max_tokens: int = 2000, client: Optional[Any] = None):
+        self.api_base = api_base
+        self.api_key = api_key
+        self.deployment_name = deployment_name
+        self.api_version = api_version
+        self.max_tokens = max_tokens
+        self._client = client
+
+    @property
+    def client(self):
+        """The shared ``AsyncAzureOpenAI`` client."""
+        if self._client is None:
+            from openai import AsyncAzureOpenAI
+
+            self._client = AsyncAzureOpenAI(api_key=self.api_key, api_version=self.api_version,
+                                            base_url=f"{self.api_base}/openai/deployments/{self.deployment_name}")
+        return self._client
+
+    def messages(self, image: bytes, mime_type: str, caption: str) -> List[Dict]:
+        """The chat messages asking for a description; the caption helps the model understand the figure."""
+        prompt = f"Describe this image (note: it has image caption: {caption}):" if caption else "Describe this image:"
+        return [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": [
+                {"type": "text", "text": prompt},
+                {"type": "image_url", "image_url": {"url": image_data_url(image, mime_type)}},
+            ]},
+        ]
+
+    async def __call__(self, image: bytes, mime_type: str, caption: str) -> str:
+        response = await self.client.chat.completions.create(model=self.deployment_name,
+                                                             messages=self.messages(image, mime_type, caption),
+                                                             max_tokens=self.max_tokens)
+        return response.choices[0].message.content
+
+    async def close(self) -> None:
+        """Close the client's HTTP session."""
+        if self._client is not None:
+            await self._client.close()
+
+
+async def _aiter(items: Union[Iterable, AsyncIterable]) -> AsyncIterator:
+    """Iterate ``items`` on the event loop; lazy sync iterators are advanced in a worker thread."""
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    elif isinstance(items, (list, tuple)):
+        for item in items:
+            yield item
+    else:
+        # e.g. FigureExtractor.iter_crops, which blocks while pages render
+        iterator, done = iter(items), object()
+        while True:
+            item = await asyncio.to_thread(next, iterator, done)
+            if item is done:
+                return
+            yield item
+
+
+class FigureDescriptionStage:
+    """
+    Pipeline stage from figure crops to their descriptions.
+
+    Args:
+        describer: Async callable from ``(image, mime_type, caption)`` to the
+            description, e.g. an ``AzureOpenAIDescriber``
+        max_concurrency: Most describe requests in flight at once
+        cache: Map from ``cache_key`` to description, shared across runs; an
+            in-memory dict by default, or e.g. a ``shelve`` to keep it on disk
+    """
+
+    def __init__(self, describer: Describer, max_concurrency: int = 8,
+                 cache: Optional[MutableMapping] = None):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.describer = describer
+        self.max_concurrency = max_concurrency
+        self.cache = {} if cache is None else cache
+        self.requests = 0
+        self.cache_hits = 0
+        # Requests in flight by cache key, so concurrent duplicates wait for the same one
+        self._pending: Dict[str, asyncio.Task] = {}
+        # Semaphores are bound to the event loop they are first used on
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+    @staticmethod
+    def cache_key(image: bytes, caption: str = "") -> str:
+        """SHA-256 of the image, with the caption's when there is one since it changes the prompt."""
+        key = hashlib.sha256(image).hexdigest()
+        return f"{key}:{hashlib.sha256(caption.encode('utf-8')).hexdigest()}" if caption else key
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores = {loop: asyncio.Semaphore(self.max_concurrency)}
+        return self._semaphores[loop]
+
+    async def _request(self, key: str, image: bytes, mime_type: str, caption: str) -> str:
+        async with self._semaphore():
+            self.requests += 1
+            description = await self.describer(image, mime_type, caption)
+        self.cache[key] = description
+        return description
+
+    async def _describe(self, image: bytes, mime_type: str, caption: str) -> Tuple[str, bool]:
+        key = self.cache_key(image, caption)
+        if key in self.cache:
+            self.cache_hits += 1
+            return self.cache[key], True
+        task = self._pending.get(key)
+        if task is not None:
+            self.cache_hits += 1
+            return await asyncio.shield(task), True
+        task = asyncio.ensure_future(self._request(key, image, mime_type, caption))
+        self._pending[key] = task
+        task.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(task), False
+
+    async def describe(self, image: bytes, mime_type: str = "image/png", caption: str = "") -> str:
+        """Describe one image, from the cache when it was seen before."""
+        description, _ = await self._describe(image, mime_type, caption)
+        return description
+
+    async def _stream(self, crops: Union[Iterable[FigureCrop], AsyncIterable[FigureCrop]],
+                      captions: Mapping[int, str]) -> AsyncIterator[Tuple[int, FigureDescription]]:
+        """``(position in crops, description)`` of each crop, in completion order."""
+
+        async def describe(position: int, crop: FigureCrop) -> Tuple[int, FigureDescription]:
+            caption = captions.get(crop.region.figure) or ""
+            description, cached = await self._describe(crop.data, crop.mime_type, caption)
+            return position, FigureDescription(crop, caption, description, cached)
+
+        pending = set()
+        position = 0
+        try:
+            async for crop in _aiter(crops):
+                pending.add(asyncio.ensure_future(describe(position, crop)))
+                position += 1
+                while len(pending) >= 2 * self.max_concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def stream(self, crops: Union[Iterable[FigureCrop], AsyncIterable[FigureCrop]],
+                     captions: Optional[Mapping[int, str]] = None) -> AsyncIterator[FigureDescription]:
+        """
+        Describe crops as they arrive, yielding each description as soon as it is ready.
+
+        At most ``2 * max_concurrency`` crops are held at once: taking in more
+        waits for descriptions to finish, so a fast producer does not pile up
+        images in memory.
+
+        Args:
+            crops: ``FigureCrop`` objects; a list, a sync iterator such as
+                ``FigureExtractor.iter_crops`` (advanced in a worker thread), or
+                an async iterator
+            captions: Map from figure index to caption
+
+        Yields:
+            ``FigureDescription`` of each crop, in completion order
+        """
+        async for _, description in self._stream(crops, {} if captions is None else captions):
+            yield description
+
+    async def describe_all(self, crops: Union[Iterable[FigureCrop], AsyncIterable[FigureCrop]],
+                           captions: Optional[Mapping[int, str]] = None) -> List[FigureDescription]:
+        """
+        Describe crops as ``stream`` does, and return the descriptions in crop order.
+
+        Args:
+            crops: ``FigureCrop`` objects, as for ``stream``
+            captions: Map from figure index to caption
+
+        Returns:
+            ``FigureDescription`` of each crop, in the order the crops came in
+        """
+        described = [item async for item in self._stream(crops, {} if captions is None else captions)]
+        return [description for _, description in sorted(described, key=lambda item: item[0])]
@@ -0,0 +1,282 @@
+"""
+Crop the figures of an analyzed document into images.
+
+Cropping each figure on its own opens the document and rasterizes part of a
+page every time, so a page with several figures is parsed and rendered once
+per figure. ``FigureExtractor`` groups the figure regions by page, renders
+each page once, clipped to the area holding its figures, and cuts all the
+figures out of that raster. Pages are spread
+over a process pool whose workers open the document once each, and the
+encoded images are written to disk by a background thread while later pages
+render.
+
+Crops have the size and pixels of rendering each region with a clip rectangle
+at the same resolution, except for a few anti-aliased pixels where a shape
+crosses the edge of the crop.
+"""
+import importlib.util
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections.abc import Mapping
+from dataclasses import dataclass
+from itertools import groupby
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..geometry import POINTS_PER_INCH, bounding_boxes
+
+IMAGE_FORMATS = ("png", "webp")
+MIME_TYPES = {"png": "image/png", "webp": "image/webp"}
+
+# The document opened by each worker process
+_worker_document = None
+
+
+@dataclass(frozen=True)
+class FigureRegion:
+    """
+    One bounding region of a figure's body.
+
+    Attributes:
+        figure: Index of the figure in ``result.figures``
+        region: Position of the region among the figure's body regions
+        page_number: 1-based number of the page the region is on
+        box: ``(left, top, right, bottom)`` in the page's unit, inches for PDFs
+    """
+    figure: int
+    region: int
+    page_number: int
+    box: Tuple[float, float, float, float]
+
+
+@dataclass(frozen=True)
+class FigureCrop:
+    """
+    The image cropped for a ``FigureRegion``.
+
+    Attributes:
+        region: The cropped region
+        data: The encoded image
+        image_format: ``"png"`` or ``"webp"``
+        width: Width in pixels
+        height: Height in pixels
+        path: File the image was written to, if any
+    """
+    region: FigureRegion
+    data: bytes
+    image_format: str
+    width: int
+    height: int
+    path: Optional[str] = None
+
+    @property
+    def mime_type(self) -> str:
+        """MIME type of ``data``, e.g. for a data URL."""
+        return MIME_TYPES[self.image_format]
+
+
+def _field(element, name: str, default=None):
+    """Read ``name`` from a result dict or an SDK model, or ``default`` if it is missing."""
+    if isinstance(element, Mapping):
+        return element.get(name, default)
+    return getattr(element, name, default)
+
+
+def _region_key(region) -> Tuple:
+    """What identifies a bounding region, to compare regions from dicts and SDK models alike."""
+    box = bounding_boxes([_field(region, "polygon")])[0]
+    return _field(region, "page_number", _field(region, "pageNumber")), tuple(box.tolist())
+
+
+def figure_regions(result) -> List[FigureRegion]:
+    """
+    The body regions of every figure of a result.
+
+    Figure bounding regions cover the caption as well as the body; regions
+    that are also caption regions are left out.
+
+    Args:
+        result: An SDK ``AnalyzeResult`` or its dict form, with ``figures``
+
+    Returns:
+        The regions, in figure order
+    """
+    regions = []
+    for figure_index, figure in enumerate(_field(result, "figures") or []):
+        caption = _field(figure, "caption")
+        caption_keys = {_region_key(region) for region in (_field(caption, "bounding_regions")
+                                                           or _field(caption, "boundingRegions") or [])} if caption else set()
+        bounding = [region for region in (_field(figure, "bounding_regions") or _field(figure, "boundingRegions") or [])
+                    if _region_key(region) not in caption_keys]
+        boxes = bounding_boxes([_field(region, "polygon") for region in bounding])
+        for position, (region, box) in enumerate(zip(bounding, boxes.tolist())):
+            page_number = _field(region, "page_number", _field(region, "pageNumber"))
+            regions.append(FigureRegion(figure_index, position, page_number, tuple(box)))
+    return regions
+
+
+def _encode(pixmap, image_format: str) -> bytes:
+    return pixmap.tobytes("png") if image_format == "png" else pixmap.pil_tobytes(format="WEBP", lossless=True)
+
+
+def _crop_page(document, page_number: int, boxes: Sequence[Tuple[int, Tuple[float, float, float, float]]],
+               dpi: float, image_format: str) -> List[Tuple[int, bytes, int, int]]:
+    """Render one page and crop ``(index, box)`` regions from it; returns ``(index, data, width, height)``."""
+    import fitz
+
+    matrix = fitz.Matrix(dpi / POINTS_PER_INCH, dpi / POINTS_PER_INCH)
+    page = document.load_page(page_number - 1)
+    # Whole pixels, rounded as PyMuPDF rounds a clip rectangle, in the page's 0, 0-based raster
+    rects = [(fitz.Rect([value * POINTS_PER_INCH for value in box]) * matrix).irect for _, box in boxes]
+    # Only the part of the page holding the figures is rasterized
+    clip = fitz.Rect(rects[0])
+    for rect in rects[1:]:
+        clip |= rect
+    raster = page.get_pixmap(matrix=matrix, clip=clip * ~matrix, alpha=False)
+    pixels = np.frombuffer(raster.samples_mv, dtype=np.uint8).reshape(raster.height, raster.width, raster.n)
+    crops = []
+    for (index, box), rect in zip(boxes, rects):
+        rect &= raster.irect  # Keep inside the page
+        if rect.is_empty:
+            raise ValueError(f"Figure region {box} is outside page {page_number}")
+        left, top, right, bottom = rect.x0 - raster.x, rect.y0 - raster.y, rect.x1 - raster.x, rect.y1 - raster.y
+        cropped = np.ascontiguousarray(pixels[top:bottom, left:right])
+        pixmap = fitz.Pixmap(raster.colorspace, right - left, bottom - top, cropped.tobytes(), False)
+        crops.append((index, _encode(pixmap, image_format), right - left, bottom - top))
+    return crops
+
+
+def _open_worker_document(document_path: str) -> None:
+    """Pool initializer: open the document once for all the pages the worker crops."""
+    import fitz
+
+    global _worker_document
+    _worker_document = fitz.open(document_path)
+
+
+def _crop_worker_page(job: Tuple[int, Sequence], dpi: float, image_format: str) -> List[Tuple[int, bytes, int, int]]:
+    page_number, boxes = job
+    return _crop_page(_worker_document, page_number, boxes, dpi, image_format)
+
+
+class FigureExtractor:
+    """
+    Crop figure regions out of PDF pages, rendering every page once.
+
+    Args:
+        dpi: Resolution of the crops
+        image_format: ``"png"``, or ``"webp"`` (lossless, needs Pillow)
+        max_workers: Worker processes; 1 renders in this process, None uses
+            one per CPU
+    """
+
+    def __init__(self, dpi: float = 300, image_format: str = "png", max_workers: Optional[int] = None):
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format: {image_format}")
+        if image_format == "webp" and importlib.util.find_spec("PIL") is None:
+            raise ImportError("WebP output needs Pillow: pip install pillow")
+        self.dpi = dpi
+        self.image_format = image_format
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+
+    def _page_jobs(self, regions: Sequence[FigureRegion]) -> List[Tuple[int, List]]:
+        """``(page number, [(region index, box), ...])`` of each page with regions, in page order."""
+        order = sorted(range(len(regions)), key=lambda index: regions[index].page_number)
+        return [(page_number, [(index, regions[index].box) for index in indexes])
+                for page_number, indexes in groupby(order, key=lambda index: regions[index].page_number)]
+
+    def iter_crops(self, document_path, regions: Sequence[FigureRegion], output_folder=None,
+                   name: Optional[str] = None) -> Iterator[FigureCrop]:
+        """
+        Crop ``regions`` out of a PDF, yielding each page's crops as soon as it is rendered.
+
+        Lets a later stage, such as ``FigureDescriptionStage``, work on the
+        first figures while the rest of the document renders.
+
+        Args:
+            document_path: Path to the PDF the regions were analyzed from
+            regions: Regions to crop, e.g. from ``figure_regions``
+            output_folder: Folder to also write the images to, as for ``extract``;
+                a file is complete once the iteration has ended
+            name: File name prefix, as for ``extract``
+
+        Yields:
+            ``FigureCrop`` of each region, in page order
+
+        Raises:
+            ValueError: If a region lies outside its page
+        """
+        for _, crop in self._written_crops(document_path, list(regions), output_folder, name):
+            yield crop
+
+    def _indexed_crops(self, document_path, regions: List[FigureRegion]) -> Iterator[Tuple[int, FigureCrop]]:
+        """``(index in regions, crop)`` of each region, in page order."""
+        import fitz
+
+        jobs = self._page_jobs(regions)
+        if not jobs:
+            return
+        if self.max_workers <= 1 or len(jobs) == 1:
+            with fitz.open(str(document_path)) as document:
+                for page_number, boxes in jobs:
+                    yield from self._crops(regions, _crop_page(document, page_number, boxes, self.dpi,
+                                                               self.image_format))
+            return
+        workers = min(self.max_workers, len(jobs))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_open_worker_document,
+                                 initargs=(str(document_path),)) as executor:
+            page_crops = executor.map(_crop_worker_page, jobs, [self.dpi] * len(jobs),
+                                      [self.image_format] * len(jobs), chunksize=max(1, len(jobs) // (4 * workers)))
+            for crops in page_crops:
+                yield from self._crops(regions, crops)
+
+    def _crops(self, regions: Sequence[FigureRegion], crops) -> Iterator[Tuple[int, FigureCrop]]:
+        for index, data, width, height in crops:
+            yield index, FigureCrop(regions[index], data, self.image_format, width, height)
+
+    def _written_crops(self, document_path, regions: List[FigureRegion], output_folder,
+                       name: Optional[str]) -> Iterator[Tuple[int, FigureCrop]]:
+        """``_indexed_crops``, writing each image from a background thread if ``output_folder`` is given."""
+        if output_folder is None:
+            yield from self._indexed_crops(document_path, regions)
+            return
+        folder = Path(output_folder)
+        folder.mkdir(parents=True, exist_ok=True)
+        name = Path(document_path).stem if name is None else name
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            writes = []
+            for index, crop in self._indexed_crops(document_path, regions):
+                region = crop.region
+                suffix = f"_{region.region}" if region.region else ""
+                path = folder / f"{name}_cropped_image_{region.figure}{suffix}.{self.image_format}"
+                writes.append(writer.submit(path.write_bytes, crop.data))
+                yield index, FigureCrop(region, crop.data, crop.image_format, crop.width, crop.height, str(path))
+            for write in writes:
+                write.result()
+
+    def extract(self, document_path, regions: Sequence[FigureRegion], output_folder=None,
+                name: Optional[str] = None) -> List[FigureCrop]:
+        """
+        Crop ``regions`` out of a PDF, and write the images if ``output_folder`` is given.
+
+        Files are named ``{name}_cropped_image_{figure}.png``, with ``_{region}``
+        appended for the second and later regions of a figure. They are written
+        by a background thread while the next pages render.
+
+        Args:
+            document_path: Path to the PDF the regions were analyzed from
+            regions: Regions to crop, e.g. from ``figure_regions``
+            output_folder: Folder to write the images to, created if missing;
+                None keeps them in memory only
+            name: File name prefix, the document's file name without extension by default
+
+        Returns:
+            ``FigureCrop`` of each region, in the order of ``regions``
+        """
+        regions = list(regions)
+        crops: List[Optional[FigureCrop]] = [None] * len(regions)
+        for index, crop in self._written_crops(document_path, regions, output_folder, name):
+            crops[index] = crop
+        return crops
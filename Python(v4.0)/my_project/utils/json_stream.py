@@ -0,0 +1,88 @@
+"""
+Incremental writers and readers for analysis JSON.
+
+The writers take iterables of already converted pages and tables and write
+each one as soon as it is produced, so only a single page or table needs to
+be held in memory while an analysis is saved.
+"""
+import json
+from typing import IO, Any, Dict, Iterable, Iterator, Optional, Tuple
+
+
+def _dumps(value: Any, indent: Optional[int], level: int) -> str:
+    text = json.dumps(value, indent=indent, ensure_ascii=False)
+    if indent is None:
+        return text
+    return text.replace("\n", "\n" + " " * (indent * level))
+
+
+def _write_array(f: IO[str], items: Iterable[Dict], indent: Optional[int]) -> None:
+    item_separator = "," if indent is not None else ", "
+    item_prefix = "\n" + " " * (indent * 2) if indent is not None else ""
+    empty = True
+    for item in items:
+        f.write(("" if empty else item_separator) + item_prefix + _dumps(item, indent, 2))
+        empty = False
+    if not empty and indent is not None:
+        f.write("\n" + " " * indent)
+
+
+def write_analysis_json(f: IO[str], pages: Iterable[Dict], tables: Iterable[Dict],
+                        has_handwritten_content: bool, indent: Optional[int] = None) -> None:
+    """
+    Write an analysis as one JSON document, one page or table at a time.
+
+    The output is byte-for-byte what ``json.dump(analysis, f, indent=indent,
+    ensure_ascii=False)`` writes for the equivalent analysis dict.
+
+    Args:
+        f: Text file to write to
+        pages: Iterable of page dicts, consumed lazily
+        tables: Iterable of table dicts, consumed lazily
+        has_handwritten_content: Value of the ``has_handwritten_content`` key
+        indent: Indentation as for ``json.dump``; None writes compact output
+    """
+    newline = "\n" + " " * indent if indent is not None else ""
+    f.write("{" + newline + '"pages": [')
+    _write_array(f, pages, indent)
+    f.write("]," + (newline if indent is not None else " ") + '"tables": [')
+    _write_array(f, tables, indent)
+    f.write("]," + (newline if indent is not None else " ")
+            + '"has_handwritten_content": ' + json.dumps(has_handwritten_content)
+            + ("\n" if indent is not None else "") + "}")
+
+
+def write_analysis_ndjson(f: IO[str], pages: Iterable[Dict], tables: Iterable[Dict],
+                          has_handwritten_content: bool) -> None:
+    """
+    Write an analysis as newline-delimited JSON with one record per line.
+
+    Each page is written as ``{"page": {...}}`` and each table as
+    ``{"table": {...}}``, followed by a final
+    ``{"summary": {"has_handwritten_content": ...}}`` record.
+
+    Args:
+        f: Text file to write to
+        pages: Iterable of page dicts, consumed lazily
+        tables: Iterable of table dicts, consumed lazily
+        has_handwritten_content: Value recorded in the summary record
+    """
+    for page in pages:
+        f.write(json.dumps({"page": page}, ensure_ascii=False) + "\n")
+    for table in tables:
+        f.write(json.dumps({"table": table}, ensure_ascii=False) + "\n")
+    f.write(json.dumps({"summary": {"has_handwritten_content": has_handwritten_content}}) + "\n")
+
+
+def read_analysis_ndjson(path: str) -> Iterator[Tuple[str, Dict]]:
+    """
+    Read records written by ``write_analysis_ndjson`` one line at a time.
+
+    Yields:
+        Tuples of (record kind, record), e.g. ``("page", {...})``
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                (kind, record), = json.loads(line).items()
+                yield kind, record
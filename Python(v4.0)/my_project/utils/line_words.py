@@ -0,0 +1,85 @@
+"""
+Assign the words of a page to the lines that contain them.
+
+A word belongs to a line when the word's span lies inside one of the line's
+spans. Testing every word against every line is O(lines x words), which is
+slow on dense high-resolution pages. ``assign_words_to_lines`` sorts the word
+offsets once and finds the words of each line span with a binary search, in
+O((lines + words) log words) overall.
+"""
+from collections.abc import Mapping
+from typing import List, Tuple
+
+import numpy as np
+
+
+def _field(element, name: str):
+    """Read ``name`` from an analysis dict or an SDK model."""
+    return element[name] if isinstance(element, Mapping) else getattr(element, name)
+
+
+def _span_arrays(page) -> Tuple[np.ndarray, ...]:
+    """Return (word offsets, word lengths, line span offsets, line span lengths, line of each span)."""
+    lines, words = _field(page, "lines") or [], _field(page, "words") or []
+    if hasattr(lines, "span_index") and hasattr(words, "span_index"):
+        # Columnar pages already hold their spans in arrays; words have one span each
+        word_spans = np.repeat(np.arange(len(words)), np.diff(words.span_index))
+        word_offsets = np.full(len(words), -1, dtype=np.int64)
+        word_lengths = np.zeros(len(words), dtype=np.int64)
+        word_offsets[word_spans] = words.span_offsets
+        word_lengths[word_spans] = words.span_lengths
+        span_lines = np.repeat(np.arange(len(lines)), np.diff(lines.span_index))
+        return word_offsets, word_lengths, lines.span_offsets, lines.span_lengths, span_lines
+
+    word_offsets, word_lengths = [], []
+    for word in words:
+        span = _field(word, "span")
+        word_offsets.append(_field(span, "offset") if span is not None else -1)
+        word_lengths.append(_field(span, "length") if span is not None else 0)
+    span_offsets, span_lengths, span_lines = [], [], []
+    for line_idx, line in enumerate(lines):
+        for span in _field(line, "spans") or []:
+            span_offsets.append(_field(span, "offset"))
+            span_lengths.append(_field(span, "length"))
+            span_lines.append(line_idx)
+    return tuple(np.array(values, dtype=np.int64) for values in
+                 (word_offsets, word_lengths, span_offsets, span_lengths, span_lines))
+
+
+def assign_words_to_lines(page) -> List[List[int]]:
+    """
+    Find the words of every line of a page in one pass over sorted span offsets.
+
+    Gives the same words as testing each word against each line, including
+    for lines with several spans and for overlapping spans.
+
+    Args:
+        page: A page with ``lines`` and ``words``: an SDK ``DocumentPage``, a
+            page dict from ``LayoutAnalyzer`` or a ``ColumnarPage``
+
+    Returns:
+        List with, for each line, the indexes into the page's words of the
+        words inside it, in ascending order
+    """
+    word_offsets, word_lengths, span_offsets, span_lengths, span_lines = _span_arrays(page)
+    line_count = len(_field(page, "lines") or [])
+    has_span = word_offsets >= 0
+    order = np.flatnonzero(has_span)[np.argsort(word_offsets[has_span], kind="stable")]
+    sorted_offsets = word_offsets[order]
+    span_ends = span_offsets + span_lengths
+
+    # Words starting inside each span are one contiguous run of the sorted words
+    starts = np.searchsorted(sorted_offsets, span_offsets, side="left")
+    stops = np.searchsorted(sorted_offsets, span_ends, side="right")
+    counts = np.maximum(stops - starts, 0)
+    owners = np.repeat(np.arange(len(span_offsets)), counts)
+    positions = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts) + starts[owners]
+    words = order[positions]
+    inside = word_offsets[words] + word_lengths[words] <= span_ends[owners]
+
+    # Sort by line, then word, dropping words found through two spans of one line
+    pairs = np.unique(span_lines[owners[inside]] * max(len(word_offsets), 1) + words[inside])
+    pair_lines, pair_words = np.divmod(pairs, max(len(word_offsets), 1))
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(pair_lines, minlength=line_count)))).tolist()
+    pair_words = pair_words.tolist()
+    return [pair_words[bounds[line_idx]:bounds[line_idx + 1]] for line_idx in range(line_count)]
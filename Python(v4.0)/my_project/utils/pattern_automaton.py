@@ -0,0 +1,317 @@
+"""
+Finite automata for the regular expressions used as field validators.
+
+``re`` can only tell whether a whole string matches. Generating candidate
+corrections one character at a time needs more: whether a *prefix* can still
+be completed into a match, so hopeless candidates are dropped as soon as they
+go wrong. ``PatternAutomaton`` compiles a validator pattern into a
+nondeterministic automaton and walks it as a DFA whose states are built
+lazily and cached, so each ``step`` after the first visit is a dict lookup.
+``CombinedAutomaton`` does the same for several patterns at once, so one walk
+over a string tells which of them it matches.
+
+Supported syntax is the subset validators use: literals, ``.``, character
+classes with ranges and negation, ``\\d \\w \\s`` and their negations, groups
+(``(...)``, ``(?:...)``), alternation and the quantifiers ``? * + {m} {m,}
+{m,n}``. Patterns always match the whole string; a leading ``^`` and trailing
+``$`` are accepted and ignored.
+"""
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+DEAD = -1
+
+_CLASS_ESCAPES: Dict[str, Callable[[str], bool]] = {
+    "d": str.isdecimal,
+    "w": lambda char: char.isalnum() or char == "_",
+    "s": str.isspace,
+}
+
+
+def _any(char: str) -> bool:
+    return char != "\n"
+
+
+class _Parser:
+    """Recursive-descent parser from pattern text to a small AST of tuples."""
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.position = 0
+
+    def parse(self):
+        body = self.pattern
+        if body.startswith("^"):
+            self.position = 1
+        end = len(body) - 1 if body.endswith("$") and not body.endswith("\\$") else len(body)
+        node = self._alternation(end)
+        if self.position != end:
+            self._fail("unbalanced parenthesis")
+        return node
+
+    def _fail(self, message: str):
+        raise ValueError(f"Unsupported pattern {self.pattern!r} at {self.position}: {message}")
+
+    def _peek(self, end: int) -> Optional[str]:
+        return self.pattern[self.position] if self.position < end else None
+
+    def _alternation(self, end: int):
+        branches = [self._concatenation(end)]
+        while self._peek(end) == "|":
+            self.position += 1
+            branches.append(self._concatenation(end))
+        return branches[0] if len(branches) == 1 else ("alt", branches)
+
+    def _concatenation(self, end: int):
+        items = []
+        while self._peek(end) not in (None, "|", ")"):
+            items.append(self._repeat(end))
+        return ("cat", items)
+
+    def _repeat(self, end: int):
+        node = self._atom(end)
+        char = self._peek(end)
+        if char in ("?", "*", "+"):
+            self.position += 1
+            low, high = {"?": (0, 1), "*": (0, None), "+": (1, None)}[char]
+        elif char == "{" and self._bounds(end) is not None:
+            low, high = self._bounds(end, consume=True)
+        else:
+            return node
+        if self._peek(end) == "?":  # Lazy quantifiers match the same strings
+            self.position += 1
+        return ("repeat", node, low, high)
+
+    def _bounds(self, end: int, consume: bool = False) -> Optional[Tuple[int, Optional[int]]]:
+        close = self.pattern.find("}", self.position, end)
+        if close < 0:
+            return None
+        low, comma, high = self.pattern[self.position + 1:close].partition(",")
+        if not low.isdigit() or (high and not high.isdigit()):
+            return None
+        if consume:
+            self.position = close + 1
+        return int(low), (int(high) if high else None) if comma else int(low)
+
+    def _atom(self, end: int):
+        char = self._peek(end)
+        self.position += 1
+        if char == "(":
+            if self.pattern.startswith("?:", self.position):
+                self.position += 2
+            elif self._peek(end) == "?":
+                self._fail("only non-capturing groups are supported")
+            node = self._alternation(end)
+            if self._peek(end) != ")":
+                self._fail("missing )")
+            self.position += 1
+            return node
+        if char == "[":
+            return ("char", self._class(end))
+        if char == ".":
+            return ("char", _any)
+        if char == "\\":
+            return ("char", self._escape(end))
+        if char in ("*", "+", "?", "{", "^", "$"):
+            self.position -= 1
+            self._fail(f"unexpected {char!r}")
+        return ("char", char.__eq__)
+
+    def _escape(self, end: int) -> Callable[[str], bool]:
+        char = self._peek(end)
+        if char is None:
+            self._fail("trailing backslash")
+        self.position += 1
+        if char.lower() in _CLASS_ESCAPES:
+            test = _CLASS_ESCAPES[char.lower()]
+            return test if char.islower() else (lambda other: not test(other))
+        if char.isalnum():
+            self.position -= 1
+            self._fail(f"unsupported escape \\{char}")
+        return char.__eq__
+
+    def _class(self, end: int) -> Callable[[str], bool]:
+        negated = self._peek(end) == "^"
+        if negated:
+            self.position += 1
+        chars, ranges, tests = set(), [], []
+        first = True
+        while True:
+            char = self._peek(end)
+            if char is None:
+                self._fail("missing ]")
+            if char == "]" and not first:
+                self.position += 1
+                break
+            first = False
+            self.position += 1
+            if char == "\\":
+                escaped = self._peek(end)
+                if escaped is not None and escaped.lower() in _CLASS_ESCAPES:
+                    tests.append(self._escape(end))
+                    continue
+                self.position += 1
+                char = escaped
+            if self._peek(end) == "-" and self.pattern[self.position + 1:self.position + 2] not in ("]", ""):
+                self.position += 1
+                high = self._peek(end)
+                self.position += 1
+                if high == "\\":
+                    high = self._peek(end)
+                    self.position += 1
+                if high < char:
+                    self._fail("bad character range")
+                ranges.append((char, high))
+            else:
+                chars.add(char)
+        chars = frozenset(chars)
+
+        def test(other: str) -> bool:
+            found = (other in chars or any(low <= other <= high for low, high in ranges)
+                     or any(member(other) for member in tests))
+            return found != negated
+        return test
+
+
+class CombinedAutomaton:
+    """
+    Lazily determinized automaton for several validator patterns at once.
+
+    One walk over a string tells which of the patterns match it, however many
+    there are. States are small integers; ``start`` is the state before any
+    character and ``step`` returns ``DEAD`` once no pattern can match.
+
+    Args:
+        patterns: Regular expressions in the supported subset, matched against
+            whole strings
+
+    Raises:
+        ValueError: If a pattern uses unsupported syntax
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = tuple(patterns)
+        # NFA: states 0 .. len(patterns) - 1 accept their pattern; any other state
+        # either tests one character and moves to its single target, or (test None)
+        # moves to all its targets without input
+        self._tests: List[Optional[Callable[[str], bool]]] = [None] * len(self.patterns)
+        self._targets: List[List[int]] = [[] for _ in self.patterns]
+        nfa_start = self._add(None, [self._build(_Parser(pattern).parse(), accept)
+                                     for accept, pattern in enumerate(self.patterns)])
+
+        self._ids: Dict[FrozenSet[int], int] = {}
+        # Per DFA state: (test, target) of its testing NFA states, and the patterns it accepts
+        self._moves: List[Tuple[Tuple[Callable[[str], bool], int], ...]] = []
+        self._accepted: List[Tuple[int, ...]] = []
+        self._transitions: List[Dict[str, int]] = []
+        self.start = self._state(self._closure([nfa_start]))
+
+    def _add(self, test: Optional[Callable[[str], bool]], targets: List[int]) -> int:
+        self._tests.append(test)
+        self._targets.append(targets)
+        return len(self._tests) - 1
+
+    def _build(self, node, target: int) -> int:
+        """Add the NFA states of ``node`` that lead to ``target``; returns its entry state."""
+        kind = node[0]
+        if kind == "char":
+            return self._add(node[1], [target])
+        if kind == "cat":
+            for child in reversed(node[1]):
+                target = self._build(child, target)
+            return target
+        if kind == "alt":
+            return self._add(None, [self._build(child, target) for child in node[1]])
+        _, child, low, high = node
+        if high is None:
+            loop = self._add(None, [])
+            self._targets[loop] = [self._build(child, loop), target]
+            target = loop
+        else:
+            for _ in range(high - low):
+                target = self._add(None, [self._build(child, target), target])
+        for _ in range(low):
+            target = self._build(child, target)
+        return target
+
+    def _closure(self, states) -> FrozenSet[int]:
+        """The states reachable from ``states`` without input, keeping only testing and accepting ones."""
+        seen, stack, kept = set(states), list(states), set()
+        while stack:
+            state = stack.pop()
+            if self._tests[state] is not None or state < len(self.patterns):
+                kept.add(state)
+                continue
+            for target in self._targets[state]:
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return frozenset(kept)
+
+    def _state(self, states: FrozenSet[int]) -> int:
+        if not states:
+            return DEAD
+        if states not in self._ids:
+            self._ids[states] = len(self._moves)
+            self._moves.append(tuple((self._tests[nfa], self._targets[nfa][0]) for nfa in sorted(states)
+                                     if self._tests[nfa] is not None))
+            self._accepted.append(tuple(sorted(nfa for nfa in states if nfa < len(self.patterns))))
+            self._transitions.append({})
+        return self._ids[states]
+
+    def step(self, state: int, char: str) -> int:
+        """The state after reading ``char`` in ``state``, or ``DEAD``."""
+        if state == DEAD:
+            return DEAD
+        transitions = self._transitions[state]
+        if char not in transitions:
+            moved = [target for test, target in self._moves[state] if test(char)]
+            transitions[char] = self._state(self._closure(moved))
+        return transitions[char]
+
+    def accepted(self, state: int) -> Tuple[int, ...]:
+        """Indexes of the patterns the characters read so far match completely."""
+        return () if state == DEAD else self._accepted[state]
+
+    def matching(self, text: str) -> Tuple[int, ...]:
+        """Indexes of the patterns ``text`` matches."""
+        state = self.start
+        transitions = self._transitions
+        for char in text:
+            # Inline the cached case of step, the bulk of the work on long texts
+            next_state = transitions[state].get(char)
+            state = self.step(state, char) if next_state is None else next_state
+            if state == DEAD:
+                return ()
+        return self._accepted[state]
+
+
+class PatternAutomaton(CombinedAutomaton):
+    """
+    Lazily determinized automaton for a validator pattern.
+
+    Args:
+        pattern: Regular expression in the supported subset, matched against
+            whole strings
+
+    Raises:
+        ValueError: If the pattern uses unsupported syntax
+    """
+
+    def __init__(self, pattern: str):
+        super().__init__([pattern])
+        self.pattern = pattern
+
+    def accepts(self, state: int) -> bool:
+        """Whether the characters read so far form a complete match."""
+        return state != DEAD and bool(self._accepted[state])
+
+    def fullmatch(self, text: str) -> bool:
+        """Whether ``text`` matches the whole pattern."""
+        return bool(self.matching(text))
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern: str) -> PatternAutomaton:
+    """The shared, cached automaton of ``pattern``; its DFA states fill in as it is used."""
+    return PatternAutomaton(pattern)
@@ -0,0 +1,402 @@
+"""
+Pluggable polling schedules for analyze operations.
+
+By default the SDK polls every operation at the same interval: a one-page
+receipt that finishes in a second waits for the next tick, and a 300-page
+report is polled dozens of times before it is done. A ``PollingPolicy`` hands
+out polling methods that space the status requests of each operation by a
+schedule, which can take the document's page count and size into account,
+and records for every operation how long the result sat finished on the
+service before the client picked it up.
+"""
+import math
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+from azure.core.polling.async_base_polling import AsyncLROBasePolling
+from azure.core.polling.base_polling import LROBasePolling
+
+from .sharding import count_pages
+
+MEGABYTE = 1024 * 1024
+# Top-level operation timestamps; the service writes them before analyzeResult,
+# so only the head of a (possibly very large) final response is searched
+_STATUS_HEAD_BYTES = 4096
+_TIMESTAMPS = re.compile(r'"(createdDateTime|lastUpdatedDateTime)"\s*:\s*"([^"]+)"')
+_FRACTION = re.compile(r"(\.\d{6})\d+")
+
+
+@dataclass(frozen=True)
+class DocumentProfile:
+    """Size of a document, used to pick a polling schedule for it."""
+
+    page_count: int = 1
+    size_bytes: int = 0
+
+    @property
+    def size_megabytes(self) -> float:
+        return self.size_bytes / MEGABYTE
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DocumentProfile":
+        """Profile a document held in memory; anything but a PDF counts as one page."""
+        page_count = count_pages(data) if data[:5] == b"%PDF-" else 1
+        return cls(page_count=page_count, size_bytes=len(data))
+
+    @classmethod
+    def from_path(cls, path) -> "DocumentProfile":
+        """Profile a document on disk without reading it whole; anything but a PDF counts as one page."""
+        path = Path(path)
+        with open(path, "rb") as f:
+            is_pdf = f.read(5) == b"%PDF-"
+        return cls(page_count=count_pages(str(path)) if is_pdf else 1, size_bytes=path.stat().st_size)
+
+
+@dataclass
+class OperationTiming:
+    """
+    How one analyze operation was polled.
+
+    ``service_seconds`` comes from the operation's own ``createdDateTime`` and
+    ``lastUpdatedDateTime``, so comparing it with the client-side duration
+    needs no clock synchronization. The service reports whole seconds, which
+    bounds the precision of ``idle_seconds`` against a real endpoint.
+    """
+
+    profile: DocumentProfile
+    polls: int
+    observed_seconds: float
+    service_seconds: Optional[float] = None
+    succeeded: bool = True
+
+    @property
+    def idle_seconds(self) -> Optional[float]:
+        """Time the result waited on the service after the operation had finished."""
+        if self.service_seconds is None:
+            return None
+        return max(self.observed_seconds - self.service_seconds, 0.0)
+
+
+def _parse_timestamp(value: str) -> datetime:
+    # fromisoformat accepts at most six fractional digits; the service may send seven
+    return datetime.fromisoformat(_FRACTION.sub(r"\1", value).replace("Z", "+00:00"))
+
+
+def service_duration(body: str) -> Optional[float]:
+    """
+    Return the seconds between an operation's creation and its last update.
+
+    Args:
+        body: JSON text of an operation status response
+
+    Returns:
+        The duration, or None when the response carries no timestamps
+    """
+    timestamps: Dict[str, str] = {}
+    for match in _TIMESTAMPS.finditer(body):
+        timestamps.setdefault(match.group(1), match.group(2))
+        if len(timestamps) == 2:
+            break
+    if len(timestamps) < 2:
+        return None
+    try:
+        created = _parse_timestamp(timestamps["createdDateTime"])
+        updated = _parse_timestamp(timestamps["lastUpdatedDateTime"])
+    except ValueError:
+        return None
+    return max((updated - created).total_seconds(), 0.0)
+
+
+class PollingSchedule:
+    """
+    Decides how long to wait before each status request of an operation.
+
+    Subclasses implement ``delay``; schedules that learn from finished
+    operations also implement ``observe``. Schedules are shared by every
+    operation of a policy, so ``observe`` must be thread-safe.
+    """
+
+    def delay(self, profile: DocumentProfile, polls: int, elapsed: float) -> float:
+        """
+        Return the seconds to wait before the next status request.
+
+        Args:
+            profile: Document being analyzed
+            polls: Status requests sent so far
+            elapsed: Seconds since the operation was accepted
+        """
+        raise NotImplementedError
+
+    def observe(self, timing: OperationTiming) -> None:
+        """Learn from a finished operation; the default schedule ignores it."""
+
+
+class FixedSchedule(PollingSchedule):
+    """
+    Poll at a constant interval, like the SDK does.
+
+    Args:
+        interval: Seconds between status requests
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+
+    def delay(self, profile: DocumentProfile, polls: int, elapsed: float) -> float:
+        return self.interval
+
+
+class ExponentialSchedule(PollingSchedule):
+    """
+    Wait most of the expected duration, then poll with exponentially growing gaps.
+
+    The expected duration grows with page count and file size, so a receipt
+    is checked within a second while a long report is left alone until it is
+    nearly done. If it is not done yet, the gaps start at ``minimum`` and grow
+    by ``factor`` up to ``maximum``.
+
+    Args:
+        minimum: Shortest wait in seconds
+        maximum: Longest wait after the first status request
+        factor: Growth of the wait from one status request to the next
+        base_seconds: Expected service time of any document
+        seconds_per_page: Expected service time per page
+        seconds_per_megabyte: Expected service time per megabyte uploaded
+        first_fraction: Share of the expected duration to wait before the first request
+    """
+
+    def __init__(self, minimum: float = 0.25, maximum: float = 10.0, factor: float = 1.5,
+                 base_seconds: float = 1.0, seconds_per_page: float = 0.05, seconds_per_megabyte: float = 0.1,
+                 first_fraction: float = 0.8):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.base_seconds = base_seconds
+        self.seconds_per_page = seconds_per_page
+        self.seconds_per_megabyte = seconds_per_megabyte
+        self.first_fraction = first_fraction
+
+    def expected_seconds(self, profile: DocumentProfile) -> float:
+        """Rough service time for a document."""
+        return (self.base_seconds + self.seconds_per_page * profile.page_count
+                + self.seconds_per_megabyte * profile.size_megabytes)
+
+    def delay(self, profile: DocumentProfile, polls: int, elapsed: float) -> float:
+        if polls == 0:
+            return max(self.minimum, self.first_fraction * self.expected_seconds(profile) - elapsed)
+        return min(self.maximum, self.minimum * self.factor ** (polls - 1))
+
+
+class LearnedSchedule(PollingSchedule):
+    """
+    Predict each operation's duration from the page counts of finished ones.
+
+    Service time is fitted as ``overhead + seconds_per_page * pages`` by
+    exponentially weighted least squares over the operations seen so far.
+    The first status request is sent when the prediction says the operation
+    is done; if it is not, later requests follow at intervals sized by the
+    prediction error, growing by ``factor``. While the history cannot predict
+    a document (fewer than ``min_samples`` operations, or only other page
+    counts seen so far), ``fallback`` decides.
+
+    Args:
+        fallback: Schedule used while there is too little history
+        min_samples: Finished operations needed before predicting
+        decay: Weight kept by older observations at each new one
+        minimum: Shortest wait in seconds
+        maximum: Longest wait after the first status request
+        factor: Growth of the wait between requests after the predicted finish
+    """
+
+    def __init__(self, fallback: Optional[PollingSchedule] = None, min_samples: int = 3, decay: float = 0.98,
+                 minimum: float = 0.05, maximum: float = 10.0, factor: float = 1.5):
+        self.fallback = fallback or ExponentialSchedule()
+        self.min_samples = min_samples
+        self.decay = decay
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.samples = 0
+        self._sums = [0.0] * 5  # weight, x, y, xx, xy
+        self._squared_error = 0.0
+        self._lock = threading.Lock()
+
+    def _predict(self, pages: float) -> Optional[float]:
+        weight, sx, sy, sxx, sxy = self._sums
+        denominator = weight * sxx - sx * sx
+        if denominator <= 1e-9 * weight * sxx:
+            # Every document so far had the same page count: only that one can be predicted
+            return sy / weight if abs(pages - sx / weight) < 0.5 else None
+        slope = max((weight * sxy - sx * sy) / denominator, 0.0)
+        overhead = max((sy - slope * sx) / weight, 0.0)
+        return overhead + slope * pages
+
+    def predict(self, profile: DocumentProfile) -> Optional[float]:
+        """Predicted service seconds for a document, None while the history cannot tell."""
+        with self._lock:
+            if self.samples < self.min_samples:
+                return None
+            return self._predict(profile.page_count)
+
+    def observe(self, timing: OperationTiming) -> None:
+        if timing.service_seconds is None or not timing.succeeded:
+            return
+        x, y = float(timing.profile.page_count), timing.service_seconds
+        with self._lock:
+            predicted = self._predict(x) if self.samples else None
+            if predicted is not None:
+                error = y - predicted
+                self._squared_error = self.decay * self._squared_error + (1 - self.decay) * error * error
+            self._sums = [self.decay * total + value for total, value in zip(self._sums, (1.0, x, y, x * x, x * y))]
+            self.samples += 1
+
+    def delay(self, profile: DocumentProfile, polls: int, elapsed: float) -> float:
+        predicted = self.predict(profile)
+        if predicted is None:
+            return self.fallback.delay(profile, polls, elapsed)
+        if polls == 0:
+            return max(self.minimum, predicted - elapsed)
+        with self._lock:
+            spread = math.sqrt(self._squared_error)
+        # Past the prediction: poll at about the typical error, a little wider each time
+        spread = max(spread, 0.05 * predicted, self.minimum)
+        return min(self.maximum, spread * self.factor ** (polls - 1))
+
+
+class _ScheduledPollingMixin:
+    """Scheduling and timing shared by the sync and async polling methods."""
+
+    def _setup_schedule(self, policy: "PollingPolicy", profile: DocumentProfile) -> None:
+        self._policy = policy
+        self._profile = profile
+        self._polls = 0
+        self._accepted_at = time.perf_counter()
+        self._recorded = False
+
+    def initialize(self, client, initial_response, deserialization_callback) -> None:
+        super().initialize(client, initial_response, deserialization_callback)
+        self._accepted_at = time.perf_counter()
+
+    def _extract_delay(self) -> float:
+        delay = self._policy.schedule.delay(self._profile, self._polls, time.perf_counter() - self._accepted_at)
+        if self._policy.respect_retry_after:
+            delay = max(delay, super()._extract_delay())
+        return delay
+
+    def _status_updated(self) -> None:
+        self._polls += 1
+        if self._recorded or not self.finished():
+            return
+        self._recorded = True
+        response = self._pipeline_response.http_response
+        self._policy.record(OperationTiming(
+            profile=self._profile,
+            polls=self._polls,
+            observed_seconds=time.perf_counter() - self._accepted_at,
+            service_seconds=service_duration(response.body()[:_STATUS_HEAD_BYTES].decode("utf-8", "replace")),
+            succeeded=self.status().lower() == "succeeded",
+        ))
+
+
+class ScheduledPolling(_ScheduledPollingMixin, LROBasePolling):
+    """``LROBasePolling`` that waits according to a ``PollingPolicy``; see ``PollingPolicy.polling_method``."""
+
+    def __init__(self, policy: "PollingPolicy", profile: DocumentProfile, **kwargs):
+        # The base timeout is only the fallback when a response has no Retry-After
+        super().__init__(timeout=0, **kwargs)
+        self._setup_schedule(policy, profile)
+
+    def run(self) -> None:
+        # The SDK polls once straight away; wait for the schedule's first delay instead
+        if not self.finished():
+            self._delay()
+        super().run()
+
+    def update_status(self) -> None:
+        super().update_status()
+        self._status_updated()
+
+
+class AsyncScheduledPolling(_ScheduledPollingMixin, AsyncLROBasePolling):
+    """Async counterpart of ``ScheduledPolling``."""
+
+    def __init__(self, policy: "PollingPolicy", profile: DocumentProfile, **kwargs):
+        # The base timeout is only the fallback when a response has no Retry-After
+        super().__init__(timeout=0, **kwargs)
+        self._setup_schedule(policy, profile)
+
+    async def run(self) -> None:
+        if not self.finished():
+            await self._delay()
+        await super().run()
+
+    async def update_status(self) -> None:
+        await super().update_status()
+        self._status_updated()
+
+
+class PollingPolicy:
+    """
+    Polling strategy for analyze operations, and a record of how it performed.
+
+    Pass ``polling_method(profile)`` as the ``polling`` argument of
+    ``begin_analyze_document``; ``LayoutAnalyzer`` does so when constructed
+    with ``polling=``.
+
+    Args:
+        schedule: Schedule spacing the status requests, ``ExponentialSchedule()`` by default
+        respect_retry_after: Never poll sooner than the service's Retry-After header asks
+        history: Number of operation timings kept for ``summary``
+    """
+
+    def __init__(self, schedule: Optional[PollingSchedule] = None, respect_retry_after: bool = False,
+                 history: int = 1000):
+        self.schedule = schedule or ExponentialSchedule()
+        self.respect_retry_after = respect_retry_after
+        self.timings: Deque[OperationTiming] = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def polling_method(self, profile: Optional[DocumentProfile] = None, asynchronous: bool = False):
+        """
+        Return a polling method for one operation.
+
+        Args:
+            profile: Document being analyzed; a one-page document when omitted
+            asynchronous: Return a method for the async client
+
+        Returns:
+            A ``ScheduledPolling`` or ``AsyncScheduledPolling``
+        """
+        polling_class = AsyncScheduledPolling if asynchronous else ScheduledPolling
+        return polling_class(self, profile or DocumentProfile())
+
+    def record(self, timing: OperationTiming) -> None:
+        """Store a finished operation's timing and let the schedule learn from it."""
+        with self._lock:
+            self.timings.append(timing)
+        self.schedule.observe(timing)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarize the recorded operations.
+
+        Returns:
+            Dict with the number of operations and status requests, and the total,
+            mean and maximum seconds results waited after the service had finished
+        """
+        with self._lock:
+            timings: List[OperationTiming] = list(self.timings)
+        idle = [timing.idle_seconds for timing in timings if timing.idle_seconds is not None]
+        return {
+            "operations": len(timings),
+            "polls": sum(timing.polls for timing in timings),
+            "idle_seconds": sum(idle),
+            "mean_idle_seconds": sum(idle) / len(idle) if idle else 0.0,
+            "max_idle_seconds": max(idle, default=0.0),
+        }
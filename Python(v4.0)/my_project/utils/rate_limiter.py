@@ -0,0 +1,268 @@
+"""
+Adaptive client-side rate limiting for Document Intelligence requests.
+
+The service answers requests beyond a resource's transactions-per-second
+quota with 429 and a Retry-After header. When every worker retries on its own
+schedule, the retries arrive together and are throttled again. An
+``AdaptiveRateLimiter`` shared by all clients of a process spaces requests
+with a token bucket, pauses everyone for the Retry-After period on a 429 and
+learns the sustainable rate from when 429s occur.
+"""
+import threading
+import time
+from io import SEEK_SET
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from azure.core.pipeline.policies import HTTPPolicy, RetryPolicy
+
+# Headers the service uses to say when to retry, most precise first
+_RETRY_AFTER_HEADERS = (("retry-after-ms", 0.001), ("x-ms-retry-after-ms", 0.001), ("Retry-After", 1.0))
+
+
+def parse_retry_after(headers) -> Optional[float]:
+    """
+    Return the delay requested by a throttled response, in seconds.
+
+    Args:
+        headers: Response headers (case-insensitive mapping)
+
+    Returns:
+        The delay, or None when the response does not name one
+    """
+    for name, unit in _RETRY_AFTER_HEADERS:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(float(value) * unit, 0.0)
+        except ValueError:
+            # Retry-After may also be an HTTP date, which the service does not send
+            continue
+    return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe token bucket whose rate adapts to throttling (AIMD).
+
+    Each success raises the rate by ``increase`` requests per second, up to
+    ``max_rate``. A 429 multiplies it by ``decrease``, no lower than
+    ``min_rate``, and holds every caller back until its Retry-After delay has
+    passed. The rate therefore settles just below the service quota.
+
+    Args:
+        rate: Initial rate in requests per second
+        min_rate: Lowest rate the limiter backs off to
+        max_rate: Highest rate the limiter climbs to
+        burst: Bucket capacity, i.e. requests that may be sent back to back after an idle period
+        increase: Requests per second added per successful request
+        decrease: Factor applied to the rate on a 429
+        default_retry_after: Pause used for a 429 without a Retry-After header
+        clock: Monotonic clock, replaceable in tests
+    """
+
+    def __init__(self, rate: float = 15.0, min_rate: float = 0.5, max_rate: float = 1000.0, burst: float = 1.0,
+                 increase: float = 0.1, decrease: float = 0.5, default_retry_after: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if not 0 < min_rate <= rate <= max_rate:
+            raise ValueError("Rates must satisfy 0 < min_rate <= rate <= max_rate")
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = max(burst, 1.0)
+        self.increase = increase
+        self.decrease = decrease
+        self.default_retry_after = default_retry_after
+        self.clock = clock
+        self.acquired = 0
+        self.throttled = 0
+        self._rate = rate
+        self._tokens = self.burst
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._waiting = 0
+        self._condition = threading.Condition()
+
+    @property
+    def rate(self) -> float:
+        """Current allowed rate in requests per second."""
+        with self._condition:
+            return self._rate
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers currently waiting for a token."""
+        with self._condition:
+            return self._waiting
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+    def _delay(self, now: float) -> float:
+        """Seconds until a token is available, 0 when one can be taken now."""
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._refill(now)
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self._rate
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take a token, waiting until one is available.
+
+        Args:
+            timeout: Longest time to wait in seconds; waits indefinitely when None
+
+        Returns:
+            True once a token was taken, False if the timeout expired first
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        with self._condition:
+            self._waiting += 1
+            try:
+                while True:
+                    now = self.clock()
+                    delay = self._delay(now)
+                    if delay == 0:
+                        self._tokens -= 1
+                        self.acquired += 1
+                        return True
+                    if deadline is not None:
+                        if now >= deadline:
+                            return False
+                        delay = min(delay, deadline - now)
+                    self._condition.wait(delay)
+            finally:
+                self._waiting -= 1
+
+    def on_success(self) -> None:
+        """Record an accepted request, probing a slightly higher rate."""
+        with self._condition:
+            self._rate = min(self.max_rate, self._rate + self.increase)
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Record a 429, backing off the rate and pausing every caller.
+
+        Args:
+            retry_after: Delay requested by the service in seconds
+        """
+        with self._condition:
+            now = self.clock()
+            self.throttled += 1
+            # Requests sent before the first 429 was seen all come back throttled;
+            # only the first of a burst lowers the rate
+            if now >= self._paused_until:
+                self._rate = max(self.min_rate, self._rate * self.decrease)
+            delay = self.default_retry_after if retry_after is None else retry_after
+            self._paused_until = max(self._paused_until, now + delay)
+            # Tokens banked at the old rate must not be spent in a burst after the pause
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, self._paused_until)
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Report the limiter's state.
+
+        Returns:
+            Dict with the current rate, queue depth, tokens acquired and 429s seen
+        """
+        with self._condition:
+            return {
+                "rate": self._rate,
+                "queue_depth": self._waiting,
+                "acquired": self.acquired,
+                "throttled": self.throttled,
+            }
+
+
+class ThrottleAwareRetryPolicy(RetryPolicy):
+    """
+    SDK retry policy that leaves 429 responses to a ``RateLimitPolicy`` in front of it.
+
+    Only 429s to the methods the ``RateLimitPolicy`` limits are left to it;
+    others, such as throttled status polls, are retried by the SDK as usual,
+    honoring their Retry-After header.
+
+    Args:
+        absorbed_methods: HTTP methods whose 429s the ``RateLimitPolicy`` absorbs
+        kwargs: Options for ``RetryPolicy``, e.g. ``retry_total``
+    """
+
+    def __init__(self, absorbed_methods: Iterable[str] = ("POST",), **kwargs: Any):
+        super().__init__(**kwargs)
+        self.absorbed_methods = frozenset(method.upper() for method in absorbed_methods)
+
+    def is_retry(self, settings, response) -> bool:
+        if (response.http_response.status_code == 429
+                and response.http_request.method.upper() in self.absorbed_methods):
+            return False
+        return super().is_retry(settings, response)
+
+
+class RateLimitPolicy(HTTPPolicy):
+    """
+    Pipeline policy that sends requests through an ``AdaptiveRateLimiter``.
+
+    It absorbs 429s itself: the request is resent once the limiter admits it
+    again, so workers never schedule their own, uncoordinated retries for
+    throttling. Requests with other methods pass through untouched, and
+    their 429s are left to the SDK retry policy. Use
+    ``rate_limited_client_kwargs`` to install it together with a
+    ``ThrottleAwareRetryPolicy``.
+
+    Args:
+        limiter: Limiter shared by every client that should draw from one budget
+        methods: HTTP methods to limit; by default only analyze submissions (POST),
+            since the service meters polling separately
+        max_attempts: Attempts per request before the 429 is handed to the SDK
+    """
+
+    def __init__(self, limiter: AdaptiveRateLimiter, methods: Iterable[str] = ("POST",), max_attempts: int = 20):
+        super().__init__()
+        self.limiter = limiter
+        self.methods = frozenset(method.upper() for method in methods)
+        self.max_attempts = max_attempts
+
+    def send(self, request):
+        if request.http_request.method.upper() not in self.methods:
+            return self.next.send(request)
+
+        body = request.http_request.body
+        position = body.tell() if hasattr(body, "seek") and hasattr(body, "tell") else None
+        for attempt in range(1, self.max_attempts + 1):
+            self.limiter.acquire()
+            response = self.next.send(request)
+            if response.http_response.status_code != 429:
+                self.limiter.on_success()
+                return response
+            self.limiter.on_throttled(parse_retry_after(response.http_response.headers))
+            if attempt == self.max_attempts or (body is not None and position is None and hasattr(body, "read")):
+                # Out of attempts, or the body stream cannot be replayed
+                return response
+            if position is not None:
+                body.seek(position, SEEK_SET)
+        return response
+
+
+def rate_limited_client_kwargs(limiter: AdaptiveRateLimiter, **retry_kwargs: Any) -> Dict[str, Any]:
+    """
+    Return client keyword arguments that route requests through ``limiter``.
+
+    Args:
+        limiter: Limiter shared by the clients
+        retry_kwargs: Options for the SDK retry policy, e.g. ``retry_total``
+
+    Returns:
+        Dict with ``per_call_policies`` and ``retry_policy`` to pass to a client constructor
+    """
+    policy = RateLimitPolicy(limiter)
+    return {
+        "per_call_policies": [policy],
+        "retry_policy": ThrottleAwareRetryPolicy(absorbed_methods=policy.methods, **retry_kwargs),
+    }
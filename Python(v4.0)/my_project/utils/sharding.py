@@ -0,0 +1,162 @@
+"""
+Split large documents into page ranges and stitch the shard results back together.
+
+One analyze operation over a 1,000-page PDF is a single long wait. Analyzing
+page ranges as separate, concurrent operations finishes in roughly the time of
+the slowest shard. ``stitch_results`` then merges the shard results into one
+``AnalyzeResult`` indistinguishable from a single call: content is
+concatenated, span offsets and page numbers are rebased, and element
+references such as ``/tables/3`` are renumbered.
+"""
+import re
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+PageRange = Tuple[int, int]
+
+# Collections of an AnalyzeResult whose items may be referenced as "/<collection>/<index>"
+_ELEMENT_REFERENCE = re.compile(r"^/(?P<collection>\w+)/(?P<index>\d+)(?P<rest>.*)$", re.DOTALL)
+# Attributes that never hold spans, page numbers or references; skipped for speed
+_SKIPPED_ATTRIBUTES = frozenset(("polygon", "content", "confidence", "state", "kind", "role", "unit"))
+
+
+def page_ranges(page_count: int, shard_pages: int) -> List[PageRange]:
+    """
+    Cut pages ``1..page_count`` into consecutive ranges of at most ``shard_pages``.
+
+    Args:
+        page_count: Number of pages in the document
+        shard_pages: Maximum pages per range
+
+    Returns:
+        List of inclusive, 1-based ``(first, last)`` page ranges
+    """
+    if shard_pages < 1:
+        raise ValueError("shard_pages must be at least 1")
+    return [(first, min(first + shard_pages - 1, page_count)) for first in range(1, page_count + 1, shard_pages)]
+
+
+def format_page_range(page_range: PageRange) -> str:
+    """Format a range for the service's ``pages`` parameter, e.g. ``"51-100"``."""
+    first, last = page_range
+    return str(first) if first == last else f"{first}-{last}"
+
+
+def count_pages(document) -> int:
+    """
+    Return the page count of a PDF, or 1 for documents PyMuPDF cannot open as one.
+
+    Args:
+        document: Path to the document, or its bytes
+    """
+    import fitz
+
+    try:
+        opened = fitz.open(stream=document, filetype="pdf") if isinstance(document, bytes) else fitz.open(document)
+        with opened:
+            return opened.page_count if opened.is_pdf else 1
+    except (fitz.FileDataError, RuntimeError):
+        return 1
+
+
+def split_pdf(document_path, ranges: Sequence[PageRange]) -> Iterator[bytes]:
+    """
+    Yield a standalone PDF holding each page range.
+
+    Args:
+        document_path: Path to the PDF to split
+        ranges: Inclusive, 1-based page ranges
+
+    Yields:
+        PDF bytes of each range, in order
+    """
+    import fitz
+
+    with fitz.open(document_path) as document:
+        for first, last in ranges:
+            with fitz.open() as shard:
+                shard.insert_pdf(document, from_page=first - 1, to_page=last - 1)
+                yield shard.tobytes(garbage=1)
+
+
+def _rebase_reference(reference: str, index_shifts: Dict[str, int]) -> str:
+    match = _ELEMENT_REFERENCE.match(reference)
+    if match is None or match.group("collection") not in index_shifts:
+        return reference
+    index = int(match.group("index")) + index_shifts[match.group("collection")]
+    return f"/{match.group('collection')}/{index}{match.group('rest')}"
+
+
+def _rebase(value, offset_shift: int, page_shift: int, index_shifts: Dict[str, int], seen: set) -> None:
+    """Shift spans, page numbers and element references found anywhere inside ``value``."""
+    if isinstance(value, list):
+        for item in value:
+            _rebase(item, offset_shift, page_shift, index_shifts, seen)
+        return
+    if isinstance(value, dict):
+        for item in value.values():
+            _rebase(item, offset_shift, page_shift, index_shifts, seen)
+        return
+    if not hasattr(value, "__dict__") or id(value) in seen:
+        return
+    seen.add(id(value))
+
+    for name, attribute in vars(value).items():
+        if attribute is None or name in _SKIPPED_ATTRIBUTES:
+            continue
+        if name == "span":
+            attribute.offset += offset_shift
+        elif name == "spans":
+            for span in attribute:
+                span.offset += offset_shift
+        elif name == "page_number":
+            setattr(value, name, attribute + page_shift)
+        elif name == "elements" and all(isinstance(item, str) for item in attribute):
+            setattr(value, name, [_rebase_reference(item, index_shifts) for item in attribute])
+        else:
+            _rebase(attribute, offset_shift, page_shift, index_shifts, seen)
+
+
+def stitch_results(results: Sequence, page_shifts: Optional[Sequence[int]] = None, separator: str = "\n"):
+    """
+    Merge the ``AnalyzeResult`` of each shard, in page order, into one result.
+
+    The shard results are modified in place and the first one is returned.
+
+    Args:
+        results: Shard results, ordered by their first page
+        page_shifts: Number to add to each shard's page numbers; zeros (the
+            default) when the service numbered pages itself via ``pages``, and
+            ``first - 1`` for shards split into separate files
+        separator: Text placed between the content of consecutive shards
+
+    Returns:
+        The stitched ``AnalyzeResult``
+    """
+    if not results:
+        raise ValueError("No shard results to stitch")
+    page_shifts = list(page_shifts) if page_shifts is not None else [0] * len(results)
+    if len(page_shifts) != len(results):
+        raise ValueError("Expected one page shift per shard")
+
+    stitched = results[0]
+    merged = {name: [] for result in results for name, value in vars(result).items() if isinstance(value, list)}
+    content_parts = []
+    offset = 0
+
+    for result, page_shift in zip(results, page_shifts):
+        content = result.content or ""
+        if offset and content:
+            content_parts.append(separator)
+            offset += len(separator)
+        if offset or page_shift or result is not stitched:
+            index_shifts = {name: len(items) for name, items in merged.items()}
+            _rebase(result, offset, page_shift, index_shifts, set())
+        content_parts.append(content)
+        offset += len(content)
+        for name, items in merged.items():
+            items.extend(getattr(result, name, None) or [])
+
+    for name, items in merged.items():
+        setattr(stitched, name, items)
+    stitched.content = "".join(content_parts)
+    return stitched
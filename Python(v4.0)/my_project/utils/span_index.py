@@ -0,0 +1,199 @@
+"""
+Interval index over the spans of an analyze result's content.
+
+Paragraphs, words, lines, styles, languages, tables and figures all point into
+``result.content`` through spans (see https://aka.ms/spans). Finding the
+elements covering an offset range by scanning every span is O(spans) per
+query. ``SpanIndex`` sorts the spans of each element kind by offset once and
+keeps a running maximum of their ends, so a query binary-searches the rows that
+can overlap the range and only tests those.
+
+Offsets are counted in Unicode code points, the default string index type of
+the Python SDK, so they index ``str`` content directly.
+"""
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SPAN_KINDS = ("paragraphs", "words", "lines", "styles", "languages", "tables", "figures")
+# Kinds listed per page rather than on the result
+PAGE_KINDS = ("words", "lines")
+
+
+def _field(element, name: str, default=None):
+    """Read ``name`` from a result dict or an SDK model, or ``default`` if it is missing."""
+    if isinstance(element, Mapping):
+        return element.get(name, default)
+    return getattr(element, name, default)
+
+
+def _element_spans(element) -> List:
+    """The spans of an element: words have a single ``span``, other elements a ``spans`` list."""
+    spans = _field(element, "spans")
+    if spans is None:
+        span = _field(element, "span")
+        return [span] if span is not None else []
+    return spans
+
+
+class _KindSpans:
+    """The spans of one element kind, sorted by offset."""
+
+    def __init__(self, elements: Sequence):
+        offsets, lengths, owners = [], [], []
+        for index, element in enumerate(elements):
+            for span in _element_spans(element):
+                offsets.append(_field(span, "offset"))
+                lengths.append(_field(span, "length"))
+                owners.append(index)
+        offsets = np.array(offsets, dtype=np.int64)
+        order = np.argsort(offsets, kind="stable")
+        self.offsets = offsets[order]
+        self.ends = self.offsets + np.array(lengths, dtype=np.int64)[order]
+        self.owners = np.array(owners, dtype=np.int64)[order]
+        # Every span before row i ends at or before max_ends[i]
+        self.max_ends = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+        # Rows of element i are by_owner[owner_starts[i]:owner_starts[i + 1]]
+        self.by_owner = np.argsort(self.owners, kind="stable")
+        self.owner_starts = np.concatenate(([0], np.cumsum(np.bincount(self.owners, minlength=len(elements)))))
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def overlapping(self, start: int, end: int) -> np.ndarray:
+        """Rows of the spans sharing at least one character with ``[start, end)``."""
+        first = int(np.searchsorted(self.max_ends, start, side="right"))
+        stop = int(np.searchsorted(self.offsets, end, side="left"))
+        return first + np.flatnonzero(self.ends[first:stop] > start)
+
+    def covering(self, start: int, end: int) -> np.ndarray:
+        """Rows of the spans containing all of ``[start, end)``."""
+        first = int(np.searchsorted(self.max_ends, end, side="left"))
+        stop = int(np.searchsorted(self.offsets, start, side="right"))
+        return first + np.flatnonzero(self.ends[first:stop] >= end)
+
+    def within(self, start: int, end: int) -> np.ndarray:
+        """Rows of the spans lying inside ``[start, end)``."""
+        first = int(np.searchsorted(self.offsets, start, side="left"))
+        stop = int(np.searchsorted(self.offsets, end, side="right"))
+        return first + np.flatnonzero(self.ends[first:stop] <= end)
+
+
+class SpanIndex:
+    """
+    Index from offset ranges of a result's content to the elements whose spans cover them.
+
+    Built once per result. Queries take an element kind from ``SPAN_KINDS``
+    and return sorted indexes into ``elements[kind]``; words and lines of all
+    pages are numbered in page order, and ``page_of`` gives their page index.
+    Ranges are half-open, ``[start, end)``, like ``offset`` and ``offset + length``.
+
+    Args:
+        result: An SDK ``AnalyzeResult`` or its dict form, with ``content``
+        kinds: The element kinds to index; kinds the result lacks are empty
+    """
+
+    def __init__(self, result, kinds: Iterable[str] = SPAN_KINDS):
+        self.content: str = _field(result, "content") or ""
+        self.elements: Dict[str, List] = {}
+        self.page_of: Dict[str, np.ndarray] = {}
+        self._spans: Dict[str, _KindSpans] = {}
+        self._buffer: Optional[memoryview] = None
+        pages = _field(result, "pages") or []
+        for kind in kinds:
+            if kind not in SPAN_KINDS:
+                raise ValueError(f"Unknown element kind: {kind}")
+            if kind in PAGE_KINDS:
+                per_page = [_field(page, kind) or [] for page in pages]
+                self.elements[kind] = [element for elements in per_page for element in elements]
+                self.page_of[kind] = np.repeat(np.arange(len(per_page)), [len(elements) for elements in per_page])
+            else:
+                self.elements[kind] = list(_field(result, kind) or [])
+            self._spans[kind] = _KindSpans(self.elements[kind])
+
+    def __len__(self) -> int:
+        """Number of indexed spans."""
+        return sum(len(spans) for spans in self._spans.values())
+
+    def _kind(self, kind: str) -> _KindSpans:
+        if kind not in self._spans:
+            raise ValueError(f"Unknown element kind: {kind}")
+        return self._spans[kind]
+
+    def _owners(self, spans: _KindSpans, rows: np.ndarray) -> np.ndarray:
+        return np.unique(spans.owners[rows])
+
+    def overlapping(self, kind: str, start: int, end: int) -> np.ndarray:
+        """Indexes of the elements of ``kind`` with a span sharing a character with ``[start, end)``."""
+        spans = self._kind(kind)
+        return self._owners(spans, spans.overlapping(start, end))
+
+    def covering(self, kind: str, start: int, end: int) -> np.ndarray:
+        """Indexes of the elements of ``kind`` with a span containing all of ``[start, end)``."""
+        spans = self._kind(kind)
+        return self._owners(spans, spans.covering(start, end))
+
+    def within(self, kind: str, start: int, end: int) -> np.ndarray:
+        """Indexes of the elements of ``kind`` with a span lying inside ``[start, end)``."""
+        spans = self._kind(kind)
+        return self._owners(spans, spans.within(start, end))
+
+    def lookup(self, start: int, end: Optional[int] = None,
+               kinds: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        The elements of every kind overlapping an offset range.
+
+        Args:
+            start: First offset of the range
+            end: Offset just past the range; by default the single character at ``start``
+            kinds: Kinds to look up, all indexed kinds by default
+
+        Returns:
+            Dict from kind to sorted element indexes
+        """
+        end = start + 1 if end is None else end
+        return {kind: self.overlapping(kind, start, end) for kind in (self._spans if kinds is None else kinds)}
+
+    def get(self, kind: str, indexes: Sequence[int]) -> List:
+        """The elements of ``kind`` at ``indexes``."""
+        elements = self.elements[kind]
+        return [elements[int(index)] for index in indexes]
+
+    def spans(self, kind: str, indexes: Sequence[int]) -> List[Tuple[int, int]]:
+        """The ``(offset, end)`` of every span of the elements at ``indexes``, in content order."""
+        spans = self._kind(kind)
+        starts = spans.owner_starts
+        rows = np.sort(np.concatenate([spans.by_owner[starts[index]:starts[index + 1]] for index in indexes]
+                                      or [np.empty(0, dtype=np.int64)]))
+        return list(zip(spans.offsets[rows].tolist(), spans.ends[rows].tolist()))
+
+    def text(self, start: int, end: int) -> str:
+        """The content in ``[start, end)``."""
+        return self.content[start:end]
+
+    def text_of(self, kind: str, indexes: Sequence[int], separator: str = "") -> str:
+        """
+        The content of the spans of some elements, in content order.
+
+        Args:
+            kind: One of the indexed kinds
+            indexes: Indexes of the elements into ``elements[kind]``
+            separator: String put between the texts of consecutive spans
+
+        Returns:
+            The joined span texts
+        """
+        content = self.content
+        return separator.join(content[offset:end] for offset, end in self.spans(kind, indexes))
+
+    def view(self, start: int, end: int) -> memoryview:
+        """
+        Zero-copy view of the content in ``[start, end)``.
+
+        The content is encoded once as UTF-32-LE, four bytes per code point, so
+        slicing the view copies nothing; ``str(view, "utf-32-le")`` decodes it.
+        """
+        if self._buffer is None:
+            self._buffer = memoryview(self.content.encode("utf-32-le"))
+        return self._buffer[4 * start:4 * end]
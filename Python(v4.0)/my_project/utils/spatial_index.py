@@ -0,0 +1,253 @@
+"""
+Uniform-grid spatial index over the elements of analyzed pages.
+
+Finding the words inside a field's region by testing every word on the page
+costs O(words) per query. ``GridIndex`` buckets bounding boxes into a grid of
+cells sized so that each cell holds about one element, stored as one sorted
+array (CSR layout), so region, point and nearest-neighbour queries only look
+at the elements in the cells they touch. ``PageSpatialIndex`` builds one grid
+per element kind of a ``LayoutAnalyzer`` page, once, and maps query results
+back to the element dicts.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..geometry import as_polygons, bounding_boxes
+
+Box = Tuple[float, float, float, float]
+ELEMENT_KINDS = ("words", "lines", "selection_marks", "cells")
+
+
+class GridIndex:
+    """
+    Uniform grid over axis-aligned boxes.
+
+    Args:
+        boxes: ``(n, 4)`` array of ``left, top, right, bottom``; rows with NaN
+            (elements without a polygon) are never returned
+        cell_size: Side of a grid cell, in the boxes' unit; by default sized so
+            the grid has about one cell per box
+    """
+
+    def __init__(self, boxes: np.ndarray, cell_size: Optional[float] = None):
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        valid = ~np.isnan(self.boxes).any(axis=1)
+        ids = np.flatnonzero(valid)
+        valid_boxes = self.boxes[ids]
+
+        if len(ids):
+            self.origin = valid_boxes[:, :2].min(axis=0)
+            extent = np.maximum(valid_boxes[:, 2:].max(axis=0) - self.origin, 1e-9)
+        else:
+            self.origin, extent = np.zeros(2), np.ones(2)
+        if cell_size is None:
+            cell_size = float(np.sqrt(extent[0] * extent[1] / max(len(ids), 1)))
+            # Nor so small that a flat extent (boxes along one line) spreads into more cells than boxes
+            cell_size = max(cell_size, float(extent.max()) / max(len(ids), 1))
+            # Never smaller than a typical box, or every box would span many cells
+            if len(ids):
+                cell_size = max(cell_size, float(np.median(valid_boxes[:, 2:] - valid_boxes[:, :2])))
+        self.cell_size = max(cell_size, 1e-9)
+        self.shape = np.maximum(np.ceil(extent / self.cell_size).astype(np.int64), 1)  # columns, rows
+
+        # Every cell a box overlaps gets an entry, sorted by cell number
+        first, last = self._cells(valid_boxes[:, :2]), self._cells(valid_boxes[:, 2:])
+        spans = last - first + 1
+        counts = spans[:, 0] * spans[:, 1]
+        owners = np.repeat(np.arange(len(ids)), counts)
+        local = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        columns = first[owners, 0] + local % spans[owners, 0]
+        rows = first[owners, 1] + local // spans[owners, 0]
+        cells = rows * self.shape[0] + columns
+        order = np.argsort(cells, kind="stable")
+        self._entries = ids[owners[order]]
+        self._cell_starts = np.concatenate(
+            ([0], np.cumsum(np.bincount(cells, minlength=int(self.shape.prod()))))).tolist()
+        self._origin_x, self._origin_y = self.origin.tolist()
+        self._columns, self._rows = self.shape.tolist()
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def _cells(self, points: np.ndarray) -> np.ndarray:
+        """Grid column and row of each point, clamped to the grid."""
+        cells = np.floor((np.asarray(points, dtype=np.float64) - self.origin) / self.cell_size)
+        return np.clip(cells, 0, self.shape - 1).astype(np.int64)
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        """Grid column and row of one point, clamped to the grid; faster than ``_cells`` for a single point."""
+        column = int((x - self._origin_x) // self.cell_size)
+        row = int((y - self._origin_y) // self.cell_size)
+        return min(max(column, 0), self._columns - 1), min(max(row, 0), self._rows - 1)
+
+    def _candidates(self, box: Box) -> np.ndarray:
+        """Ids of the boxes registered in any cell that ``box`` touches, without duplicates."""
+        left, top, right, bottom = box
+        if (right < self._origin_x or bottom < self._origin_y
+                or left > self._origin_x + self._columns * self.cell_size
+                or top > self._origin_y + self._rows * self.cell_size):
+            return np.empty(0, dtype=np.int64)
+        first_column, first_row = self._cell(left, top)
+        last_column, last_row = self._cell(right, bottom)
+        # Cells of one grid row are consecutive, so each row is one slice of the entries
+        starts, columns = self._cell_starts, self._columns
+        slices = [self._entries[starts[row * columns + first_column]:starts[row * columns + last_column + 1]]
+                  for row in range(first_row, last_row + 1)]
+        candidates = np.concatenate(slices) if len(slices) > 1 else slices[0]
+        if first_column == last_column and first_row == last_row:
+            return candidates
+        return np.unique(candidates)
+
+    def intersecting(self, box: Box, min_overlap: float = 0.0) -> np.ndarray:
+        """
+        Ids of the boxes that overlap ``box``.
+
+        Args:
+            box: Query region as ``left, top, right, bottom``
+            min_overlap: Fraction of a box's area that must lie inside the
+                region; 0 returns every box that touches it, 1 only boxes
+                entirely inside
+
+        Returns:
+            Sorted array of box ids
+        """
+        ids = self._candidates(box)
+        boxes = self.boxes[ids]
+        left, top, right, bottom = box
+        touching = ((boxes[:, 0] <= right) & (boxes[:, 2] >= left)
+                    & (boxes[:, 1] <= bottom) & (boxes[:, 3] >= top))
+        if min_overlap > 0:
+            width = np.minimum(boxes[:, 2], right) - np.maximum(boxes[:, 0], left)
+            height = np.minimum(boxes[:, 3], bottom) - np.maximum(boxes[:, 1], top)
+            area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                # Boxes without area count as inside when they touch the region
+                overlap = np.where(area > 0, np.clip(width, 0, None) * np.clip(height, 0, None) / area, 1.0)
+            touching &= overlap >= min_overlap
+        return ids[touching]
+
+    def containing(self, x: float, y: float) -> np.ndarray:
+        """Sorted ids of the boxes that contain the point ``(x, y)``."""
+        return self.intersecting((x, y, x, y))
+
+    def nearest(self, x: float, y: float, k: int = 1) -> np.ndarray:
+        """
+        Ids of the ``k`` boxes closest to the point ``(x, y)``.
+
+        Distance is zero inside a box. The grid is searched in growing squares
+        around the point until ``k`` boxes are found; every box within the
+        distance of the ``k``-th one is then ranked exactly.
+
+        Returns:
+            Up to ``k`` box ids, nearest first, ties in id order
+        """
+        if k < 1 or not len(self._entries):
+            return np.empty(0, dtype=np.int64)
+        radius = self.cell_size
+        # Past this radius the square covers the whole grid
+        limit = self.cell_size * (max(self._columns, self._rows) + 1) + max(abs(x - self._origin_x),
+                                                                            abs(y - self._origin_y))
+        while True:
+            ids = self._candidates((x - radius, y - radius, x + radius, y + radius))
+            if len(ids) >= k or radius > limit:
+                break
+            radius *= 2
+        distances = self._distances(ids, x, y)
+        if len(ids) >= k:
+            reach = np.partition(distances, k - 1)[k - 1]
+            # Padded so that rounding in x - reach and the like cannot move the square off the k-th box
+            reach += 1e-9 * max(1.0, abs(x), abs(y), reach)
+            ids = self._candidates((x - reach, y - reach, x + reach, y + reach))
+            distances = self._distances(ids, x, y)
+        order = np.lexsort((ids, distances))[:k]
+        return ids[order]
+
+    def _distances(self, ids: np.ndarray, x: float, y: float) -> np.ndarray:
+        boxes = self.boxes[ids]
+        dx = np.maximum(np.maximum(boxes[:, 0] - x, 0), x - boxes[:, 2])
+        dy = np.maximum(np.maximum(boxes[:, 1] - y, 0), y - boxes[:, 3])
+        return np.hypot(dx, dy)
+
+
+class PageSpatialIndex:
+    """
+    Spatial index over the words, lines, selection marks and table cells of one page.
+
+    Built once per page from ``LayoutAnalyzer`` output, in the dict or the
+    columnar format. Queries take an element kind from ``ELEMENT_KINDS`` and
+    return indexes into ``elements[kind]``; ``get`` turns them into element dicts.
+
+    Args:
+        page: Page of an analysis, e.g. ``analysis["pages"][0]``
+        tables: The analysis' ``tables``; cells with a region on this page are indexed
+        cell_size: Grid cell side in the page's unit, sized per kind by default
+    """
+
+    def __init__(self, page, tables: Sequence[Dict] = (), cell_size: Optional[float] = None):
+        self.page_number = page["page_number"]
+        self.unit = page["unit"]
+        self.elements: Dict[str, Sequence] = {kind: page[kind] for kind in ELEMENT_KINDS[:3]}
+        self.elements["cells"] = []
+        # Table index of every cell in elements["cells"]
+        cell_tables = []
+        cell_polygons = []
+        for table_index, table in enumerate(tables):
+            for cell in table.get("cells", []):
+                for region in cell.get("bounding_regions", []):
+                    if region.get("page_number") == self.page_number:
+                        self.elements["cells"].append(cell)
+                        cell_tables.append(table_index)
+                        cell_polygons.append(region["polygon"])
+                        break
+        self.cell_tables = np.array(cell_tables, dtype=np.int64)
+
+        self.grids: Dict[str, GridIndex] = {}
+        for kind in ELEMENT_KINDS:
+            if kind == "cells":
+                polygons = as_polygons(cell_polygons)
+            elif hasattr(self.elements[kind], "polygons"):
+                # Columnar pages already hold their polygons in one array
+                polygons = as_polygons(self.elements[kind].polygons)
+            else:
+                polygons = as_polygons([element["polygon"] for element in self.elements[kind]])
+            self.grids[kind] = GridIndex(bounding_boxes(polygons), cell_size)
+
+    @classmethod
+    def from_analysis(cls, analysis: Dict, cell_size: Optional[float] = None) -> List["PageSpatialIndex"]:
+        """Build the index of every page of an analysis returned by ``LayoutAnalyzer``."""
+        tables = analysis.get("tables", [])
+        return [cls(page, tables, cell_size) for page in analysis["pages"]]
+
+    def _grid(self, kind: str) -> GridIndex:
+        if kind not in self.grids:
+            raise ValueError(f"Unknown element kind: {kind}")
+        return self.grids[kind]
+
+    def query_region(self, kind: str, box: Box, min_overlap: float = 0.0) -> np.ndarray:
+        """
+        Indexes of the elements of ``kind`` that overlap a region.
+
+        Args:
+            kind: One of ``ELEMENT_KINDS``
+            box: Region as ``left, top, right, bottom`` in the page's unit
+            min_overlap: Fraction of an element's bounding box that must lie in
+                the region; 1 selects the elements entirely inside
+
+        Returns:
+            Sorted element indexes, i.e. in reading order
+        """
+        return self._grid(kind).intersecting(box, min_overlap)
+
+    def query_point(self, kind: str, x: float, y: float) -> np.ndarray:
+        """Indexes of the elements of ``kind`` whose bounding box contains the point."""
+        return self._grid(kind).containing(x, y)
+
+    def nearest(self, kind: str, x: float, y: float, k: int = 1) -> np.ndarray:
+        """Indexes of the ``k`` elements of ``kind`` nearest to the point, nearest first."""
+        return self._grid(kind).nearest(x, y, k)
+
+    def get(self, kind: str, indexes: Sequence[int]) -> List[Dict]:
+        """The element dicts of ``kind`` at ``indexes``."""
+        elements = self.elements[kind]
+        return [elements[int(index)] for index in indexes]
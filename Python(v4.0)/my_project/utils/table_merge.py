@@ -0,0 +1,357 @@
+"""
+Identify tables that continue across pages in a layout analysis result.
+
+Works on any result object shaped like the Document Intelligence layout
+output (``result.tables``, ``result.paragraphs``, ``result.pages``), so it can
+be used with the SDK models or with plain objects loaded from JSON.
+
+The candidate checks are driven by a ``ParagraphOffsetIndex`` built once per
+result. It answers "is there a body paragraph between these two offsets" with
+a binary search instead of scanning every paragraph for every candidate.
+
+Merged tables are assembled as lists of row fragments that are joined once,
+and the rewritten markdown is produced as a stream of chunks, so the work
+stays linear in the size of the document however many pages a table spans.
+"""
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..geometry import bounding_boxes
+
+# Paragraph roles that may sit between two parts of one table
+PAGE_FURNITURE_ROLES = ("pageHeader", "pageFooter", "pageNumber")
+# Characters allowed between two vertically merged tables in markdown output
+SEPARATOR_LENGTH_IN_MARKDOWN_FORMAT = 2
+BORDER_SYMBOL = "|"
+HEADER_SEPARATOR_CELL_CONTENT = " - "
+
+THRESHOLD_RATE_OF_RIGHT_COVER = 0.99
+THRESHOLD_RATE_OF_LEFT_COVER = 0.01
+
+
+@dataclass
+class TableSpan:
+    """Offset range ``[min_offset, max_offset)`` of a table's content, (-1, -1) if it has no spans."""
+    idx: int
+    min_offset: int
+    max_offset: int
+
+
+@dataclass
+class TableMergeCandidate:
+    """A table on the page after ``pre_table_idx``; ``start``/``end`` bound the content between them."""
+    pre_table_idx: int
+    start: int
+    end: int
+
+
+@dataclass
+class TableMerge:
+    """Decision to merge table ``pre_table_idx`` with the table that follows it."""
+    pre_table_idx: int
+    is_vertical: bool
+    is_horizontal: bool
+
+
+def get_table_page_numbers(table) -> List[int]:
+    """Return the page numbers a table appears on."""
+    return [region.page_number for region in table.bounding_regions]
+
+
+def get_table_span_offsets(table) -> Tuple[int, int]:
+    """
+    Calculate the minimum and maximum offsets of a table's spans.
+
+    Returns:
+        Tuple of (min_offset, max_offset), or (-1, -1) if the table has no spans
+    """
+    if not table.spans:
+        return -1, -1
+    return (min(span.offset for span in table.spans),
+            max(span.offset + span.length for span in table.spans))
+
+
+class ParagraphOffsetIndex:
+    """
+    Sorted span offsets of the paragraphs that prevent two tables from merging.
+
+    Paragraphs whose role is one of ``ignored_roles`` (page headers, footers and
+    numbers by default) are left out, so a query only has to find whether any
+    remaining offset falls strictly between two offsets.
+
+    Args:
+        paragraphs: Paragraphs of the analysis result
+        ignored_roles: Roles that do not separate two parts of a table
+    """
+
+    def __init__(self, paragraphs: Iterable, ignored_roles: Sequence[str] = PAGE_FURNITURE_ROLES):
+        self.offsets = sorted(
+            span.offset
+            for paragraph in paragraphs or []
+            if getattr(paragraph, "role", None) not in ignored_roles
+            for span in paragraph.spans
+        )
+
+    def has_paragraph_between(self, start: int, end: int) -> bool:
+        """Whether a non-ignored paragraph span starts strictly between ``start`` and ``end``."""
+        i = bisect_right(self.offsets, start)
+        return i < len(self.offsets) and self.offsets[i] < end
+
+
+def find_merge_table_candidates(tables: Sequence) -> Tuple[List[TableMergeCandidate], List[TableSpan]]:
+    """
+    Find tables that start on the page right after the previous table.
+
+    Args:
+        tables: Tables of the analysis result
+
+    Returns:
+        Tuple of the merge candidates and the offset range of every table
+    """
+    candidates = []
+    table_spans = []
+    pre_table_idx = -1
+    pre_table_page = -1
+    pre_max_offset = 0
+
+    for table_idx, table in enumerate(tables):
+        min_offset, max_offset = get_table_span_offsets(table)
+        table_spans.append(TableSpan(table_idx, min_offset, max_offset))
+        if min_offset < 0:
+            continue
+
+        table_page = min(get_table_page_numbers(table))
+        # A table on the next page is a candidate for merging with the previous table
+        if table_page == pre_table_page + 1:
+            candidates.append(TableMergeCandidate(pre_table_idx, pre_max_offset, min_offset))
+
+        pre_table_idx = table_idx
+        pre_table_page = table_page
+        pre_max_offset = max_offset
+
+    return candidates, table_spans
+
+
+def table_edge_flags(result, tables: Optional[Sequence] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Which tables reach the right edge of their page, and which start at its left edge.
+
+    The bounding boxes of all the tables' regions are computed in one batch.
+
+    Args:
+        result: The analysis result, for the page widths
+        tables: Tables to check, all of ``result.tables`` by default
+
+    Returns:
+        Tuple of boolean arrays ``(reaches_right, reaches_left)`` with one entry per table
+    """
+    tables = result.tables if tables is None else tables
+    regions = [region for table in tables for region in table.bounding_regions]
+    owners = np.fromiter((idx for idx, table in enumerate(tables) for _ in table.bounding_regions),
+                         dtype=np.int64, count=len(regions))
+    widths = np.fromiter((result.pages[region.page_number - 1].width for region in regions),
+                         dtype=np.float64, count=len(regions))
+    boxes = bounding_boxes([region.polygon for region in regions])
+
+    reaches_right = np.zeros(len(tables), dtype=bool)
+    reaches_left = np.zeros(len(tables), dtype=bool)
+    np.logical_or.at(reaches_right, owners, boxes[:, 2] / widths > THRESHOLD_RATE_OF_RIGHT_COVER)
+    np.logical_or.at(reaches_left, owners, boxes[:, 0] / widths < THRESHOLD_RATE_OF_LEFT_COVER)
+    return reaches_right, reaches_left
+
+
+def check_tables_are_horizontal_distribution(result, pre_table_idx: int,
+                                             edge_flags: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> bool:
+    """
+    Whether a table runs off the right edge of its page and the next one starts at the left edge.
+
+    Args:
+        result: The analysis result
+        pre_table_idx: Index of the first of the two tables
+        edge_flags: ``table_edge_flags(result)``, to reuse over many checks;
+            computed for the two tables when omitted
+
+    Returns:
+        True if the two tables look like one table split horizontally
+    """
+    table, next_table = result.tables[pre_table_idx], result.tables[pre_table_idx + 1]
+    if table.row_count != next_table.row_count:
+        return False
+
+    if edge_flags is None:
+        edge_flags, pre_table_idx = table_edge_flags(result, [table, next_table]), 0
+    reaches_right, reaches_left = edge_flags
+    return bool(reaches_right[pre_table_idx] and reaches_left[pre_table_idx + 1])
+
+
+def find_table_merges(result, paragraph_index: Optional[ParagraphOffsetIndex] = None) -> List[TableMerge]:
+    """
+    Decide which consecutive tables of a result should be merged.
+
+    Two tables on consecutive pages are merged vertically when only page
+    furniture separates them and they have the same column count, and
+    horizontally when the first reaches the right edge of its page, the second
+    starts at the left edge of the next one and their row counts match.
+
+    Args:
+        result: The analysis result
+        paragraph_index: Prebuilt index of ``result.paragraphs``, built when omitted
+
+    Returns:
+        One ``TableMerge`` per pair of tables to merge, in document order
+    """
+    if paragraph_index is None:
+        paragraph_index = ParagraphOffsetIndex(result.paragraphs)
+    candidates, table_spans = find_merge_table_candidates(result.tables)
+    edge_flags = table_edge_flags(result) if candidates else None
+
+    merges = []
+    for candidate in candidates:
+        pre_table_idx = candidate.pre_table_idx
+        has_paragraph = paragraph_index.has_paragraph_between(candidate.start, candidate.end)
+        is_horizontal = check_tables_are_horizontal_distribution(result, pre_table_idx, edge_flags)
+        is_vertical = (
+            not has_paragraph
+            and result.tables[pre_table_idx].column_count == result.tables[pre_table_idx + 1].column_count
+            and table_spans[pre_table_idx + 1].min_offset - table_spans[pre_table_idx].max_offset
+            <= SEPARATOR_LENGTH_IN_MARKDOWN_FORMAT
+        )
+        if is_vertical or is_horizontal:
+            merges.append(TableMerge(pre_table_idx, is_vertical, is_horizontal))
+    return merges
+
+
+def _is_header_separator(line: str) -> bool:
+    """Whether a markdown table line is the ``| - | - |`` row below the header."""
+    return set(line.split(HEADER_SEPARATOR_CELL_CONTENT)) == {BORDER_SYMBOL}
+
+
+class MergedTable:
+    """
+    A table assembled from fragments on consecutive pages.
+
+    Each row is kept as a list of the pieces contributed by every fragment and
+    is only joined into markdown by ``content``, so appending a fragment costs
+    time proportional to the fragment rather than to the table built so far.
+
+    Args:
+        table_idx: Index of the first table
+        min_offset: Content offset where the first table starts
+        max_offset: Content offset where the first table ends
+        markdown: Markdown of the first table
+    """
+
+    def __init__(self, table_idx: int, min_offset: int, max_offset: int, markdown: str):
+        self.table_idx_list = [table_idx]
+        self.min_offset = min_offset
+        self.max_offset = max_offset
+        self.rows: List[List[str]] = [[row] for row in markdown.strip().splitlines()]
+        self.remarks: List[str] = []
+
+    def append_vertical(self, table_idx: int, max_offset: int, markdown: str) -> None:
+        """
+        Append the rows of a table continued on the next page, dropping its header separator.
+
+        Raises:
+            ValueError: If the fragment has a different column count than the table
+        """
+        rows = "\n".join(line for line in markdown.splitlines()
+                         if not _is_header_separator(line)).strip().splitlines()
+        if len("".join(self.rows[0]).split(BORDER_SYMBOL)) != len(rows[0].split(BORDER_SYMBOL)):
+            raise ValueError("Different count of columns")
+        self.rows.extend([row] for row in rows)
+        self.table_idx_list.append(table_idx)
+        self.max_offset = max_offset
+
+    def append_horizontal(self, table_idx: int, max_offset: int, markdown: str, remark: str = "") -> None:
+        """Append the columns of a table continued to the right on the next page."""
+        rows = markdown.strip().splitlines()
+        # Like zip(), rows without a counterpart in the other table are dropped
+        del self.rows[len(rows):]
+        for pieces, row in zip(self.rows, rows):
+            if pieces[-1].endswith(BORDER_SYMBOL):
+                pieces[-1] = pieces[-1][:-1]
+            pieces.append(BORDER_SYMBOL + (row[1:] if row.startswith(BORDER_SYMBOL) else row))
+        self.remarks.append(remark)
+        self.table_idx_list.append(table_idx)
+        self.max_offset = max_offset
+
+    @property
+    def content(self) -> str:
+        """The merged table as markdown."""
+        return "\n".join("".join(pieces) for pieces in self.rows)
+
+    @property
+    def remark(self) -> str:
+        """Text found between horizontally merged parts, kept to be written after the table."""
+        return "".join(self.remarks)
+
+
+def merge_tables(result, table_merges: Optional[List[TableMerge]] = None) -> List[MergedTable]:
+    """
+    Assemble the tables of a markdown result that continue across pages.
+
+    Args:
+        result: The analysis result, analyzed with markdown output
+        table_merges: Merge decisions, computed with ``find_table_merges`` when omitted
+
+    Returns:
+        One ``MergedTable`` per chain of merged tables, in document order
+
+    Raises:
+        ValueError: If vertically merged fragments have different column counts
+    """
+    if table_merges is None:
+        table_merges = find_table_merges(result)
+    offsets = [get_table_span_offsets(table) for table in result.tables]
+
+    merged_tables: List[MergedTable] = []
+    for table_merge in table_merges:
+        pre_idx = table_merge.pre_table_idx
+        next_idx = pre_idx + 1
+        markdown = result.content[offsets[next_idx][0]:offsets[next_idx][1]]
+        remark = result.content[offsets[pre_idx][1]:offsets[next_idx][0]] if table_merge.is_horizontal else ""
+
+        if merged_tables and merged_tables[-1].table_idx_list[-1] == pre_idx:
+            merged = merged_tables[-1]
+            if table_merge.is_vertical:
+                merged.append_vertical(next_idx, offsets[next_idx][1], markdown)
+            else:
+                merged.append_horizontal(next_idx, offsets[next_idx][1], markdown, remark)
+            continue
+
+        merged = MergedTable(pre_idx, *offsets[pre_idx], result.content[offsets[pre_idx][0]:offsets[pre_idx][1]])
+        if table_merge.is_vertical:
+            merged.append_vertical(next_idx, offsets[next_idx][1], markdown)
+            if table_merge.is_horizontal:
+                merged.remarks.append(remark.strip())
+        else:
+            merged.append_horizontal(next_idx, offsets[next_idx][1], markdown, remark.strip())
+        merged_tables.append(merged)
+    return merged_tables
+
+
+def iter_merged_markdown(result, merged_tables: Optional[List[MergedTable]] = None) -> Iterator[str]:
+    """
+    Rewrite the markdown content of a result with its cross-page tables merged.
+
+    Args:
+        result: The analysis result, analyzed with markdown output
+        merged_tables: Tables to substitute, computed with ``merge_tables`` when omitted
+
+    Yields:
+        Consecutive chunks of the rewritten content; join them for the full text
+    """
+    if merged_tables is None:
+        merged_tables = merge_tables(result)
+    start_idx = 0
+    for merged in merged_tables:
+        yield result.content[start_idx:merged.min_offset]
+        yield merged.content
+        if merged.remark:
+            yield merged.remark
+        start_idx = merged.max_offset
+    yield result.content[start_idx:]
@@ -0,0 +1,211 @@
+"""
+Named validators for post-processing rules, compiled once and shared.
+
+A validator is a pattern a value must fully match plus an optional check
+for what a regular expression cannot express, such as a check digit. The
+``ValidatorRegistry`` compiles each pattern when it is registered, checks
+lists of values in one call, and can test a value against many validators
+in a single walk of a ``CombinedAutomaton`` built from all their patterns.
+``default_registry`` holds the built-in validators: ICD-10 codes, US social
+security, employer identification and routing numbers, IBANs and VINs.
+"""
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .pattern_automaton import CombinedAutomaton, compile_pattern
+
+ENGINES = ("regex", "dfa")
+
+
+def _ssn_check(value: str) -> bool:
+    """Area, group and serial numbers the SSA never issues."""
+    area, group, serial = value.split("-")
+    return area not in ("000", "666") and not area.startswith("9") and group != "00" and serial != "0000"
+
+
+# Prefixes the IRS assigns to its campuses
+_EIN_PREFIXES = frozenset(f"{prefix:02d}" for low, high in (
+    (1, 6), (10, 16), (20, 27), (30, 39), (40, 48), (50, 68), (71, 77), (80, 88), (90, 95), (98, 99))
+    for prefix in range(low, high + 1))
+
+
+def _ein_check(value: str) -> bool:
+    return value[:2] in _EIN_PREFIXES
+
+
+def _routing_number_check(value: str) -> bool:
+    """ABA checksum: 3, 7 and 1 times the digits, cyclically, sum to a multiple of 10."""
+    digits = [int(char) for char in value]
+    return (3 * (digits[0] + digits[3] + digits[6]) + 7 * (digits[1] + digits[4] + digits[7])
+            + digits[2] + digits[5] + digits[8]) % 10 == 0
+
+
+def _iban_check(value: str) -> bool:
+    """ISO 13616 mod-97 check on the IBAN with its first four characters moved to the end."""
+    rearranged = value[4:] + value[:4]
+    return int("".join(str(int(char, 36)) for char in rearranged)) % 97 == 1
+
+
+_VIN_VALUES = {**{str(digit): digit for digit in range(10)},
+               **dict(zip("ABCDEFGH", range(1, 9))), **dict(zip("JKLMN", range(1, 6))), "P": 7, "R": 9,
+               **dict(zip("STUVWXYZ", range(2, 10)))}
+_VIN_WEIGHTS = (8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2)
+
+
+def _vin_check(value: str) -> bool:
+    """North American check digit in position 9: weighted sum mod 11, 10 written as X."""
+    remainder = sum(_VIN_VALUES[char] * weight for char, weight in zip(value, _VIN_WEIGHTS)) % 11
+    return value[8] == ("X" if remainder == 10 else str(remainder))
+
+
+@dataclass(frozen=True)
+class Validator:
+    """
+    A named rule that values must satisfy.
+
+    Attributes:
+        name: Name the validator is registered under
+        pattern: Regular expression valid values fully match, in the subset
+            ``PatternAutomaton`` supports so the validator can drive ``disambiguate``
+        check: Further test on values matching the pattern, e.g. a checksum;
+            a module-level function so the validator can be sent to worker processes
+    """
+    name: str
+    pattern: str
+    check: Optional[Callable[[str], bool]] = None
+    _fullmatch: Callable = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        compile_pattern(self.pattern)  # Fail early on syntax the automaton does not support
+        object.__setattr__(self, "_fullmatch", re.compile(self.pattern).fullmatch)
+
+    def __call__(self, value: str) -> bool:
+        """Whether ``value`` is valid."""
+        return self._fullmatch(value) is not None and (self.check is None or self.check(value))
+
+    def validate_many(self, values: Iterable[str]) -> List[bool]:
+        """Whether each of ``values`` is valid; the check only runs on values matching the pattern."""
+        fullmatch, check = self._fullmatch, self.check
+        if check is None:
+            return [fullmatch(value) is not None for value in values]
+        return [fullmatch(value) is not None and check(value) for value in values]
+
+    def filter(self, values: Iterable[str]) -> List[str]:
+        """The valid ``values``, in order."""
+        fullmatch, check = self._fullmatch, self.check
+        return [value for value in values if fullmatch(value) is not None and (check is None or check(value))]
+
+
+class ValidatorRegistry(Mapping):
+    """
+    Validators by name, with combined matching across several of them.
+
+    Behaves as a read-only mapping from name to ``Validator``, so a registry
+    can be passed wherever a ``{name: validator}`` dict is accepted, such as
+    ``BatchDisambiguator``.
+
+    Args:
+        validators: Validators to register
+    """
+
+    def __init__(self, validators: Iterable[Validator] = ()):
+        self._validators: Dict[str, Validator] = {}
+        # Combined matchers by (validator names, engine), rebuilt after a registration
+        self._matchers: Dict[Tuple[Tuple[str, ...], str], Callable[[str], Tuple[int, ...]]] = {}
+        for validator in validators:
+            self.add(validator)
+
+    def add(self, validator: Validator) -> Validator:
+        """Register ``validator``; raises ValueError if its name is taken."""
+        if validator.name in self._validators:
+            raise ValueError(f"Validator already registered: {validator.name}")
+        self._validators[validator.name] = validator
+        self._matchers.clear()
+        return validator
+
+    def register(self, name: str, pattern: str, check: Optional[Callable[[str], bool]] = None) -> Validator:
+        """Compile and register a validator; returns it."""
+        return self.add(Validator(name, pattern, check))
+
+    def __getitem__(self, name: str) -> Validator:
+        return self._validators[name]
+
+    def _validator(self, name: str) -> Validator:
+        if name not in self._validators:
+            raise ValueError(f"Unknown validator: {name}")
+        return self._validators[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._validators)
+
+    def __len__(self) -> int:
+        return len(self._validators)
+
+    def validate(self, name: str, value: str) -> bool:
+        """Whether ``value`` passes the validator ``name``."""
+        return self._validator(name)(value)
+
+    def validate_many(self, name: str, values: Iterable[str]) -> List[bool]:
+        """Whether each of ``values`` passes the validator ``name``."""
+        return self._validator(name).validate_many(values)
+
+    def _matcher(self, names: Tuple[str, ...], engine: str) -> Callable[[str], Tuple[int, ...]]:
+        """Function from a value to the indexes into ``names`` of the patterns it matches, cached."""
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        key = (names, engine)
+        if key not in self._matchers:
+            validators = [self._validator(name) for name in names]
+            if engine == "dfa":
+                self._matchers[key] = CombinedAutomaton([validator.pattern for validator in validators]).matching
+            else:
+                fullmatches = [validator._fullmatch for validator in validators]
+                self._matchers[key] = lambda value: tuple(
+                    index for index, fullmatch in enumerate(fullmatches) if fullmatch(value) is not None)
+        return self._matchers[key]
+
+    def matching(self, value: str, names: Optional[Sequence[str]] = None, engine: str = "dfa") -> List[str]:
+        """
+        The validators ``value`` passes.
+
+        Args:
+            value: Value to test
+            names: Validators to test against, all registered ones by default
+            engine: ``"dfa"`` walks one automaton combining every pattern, so the
+                cost depends on the length of the value rather than the number
+                of validators; ``"regex"`` runs each compiled pattern in turn
+
+        Returns:
+            Names of the passed validators, in the order of ``names``
+        """
+        return self.matching_many([value], names, engine)[0]
+
+    def matching_many(self, values: Iterable[str], names: Optional[Sequence[str]] = None,
+                      engine: str = "dfa") -> List[List[str]]:
+        """The validators each of ``values`` passes, as for ``matching``."""
+        names = tuple(self._validators if names is None else names)
+        matcher = self._matcher(names, engine)
+        validators = [self._validator(name) for name in names]
+        matches = []
+        for value in values:
+            matches.append([validators[index].name for index in matcher(value)
+                            if validators[index].check is None or validators[index].check(value)])
+        return matches
+
+
+@lru_cache(maxsize=1)
+def default_registry() -> ValidatorRegistry:
+    """The shared registry of built-in validators."""
+    return ValidatorRegistry([
+        # ICD-10: a letter other than U, two digits, then optionally a dot and one or two digits
+        Validator("ICD10", r"^[A-TV-Z]\d\d(\.\d{1,2})?$"),
+        Validator("SSN", r"^\d{3}-\d{2}-\d{4}$", _ssn_check),
+        Validator("EIN", r"^\d{2}-\d{7}$", _ein_check),
+        Validator("RoutingNumber", r"^\d{9}$", _routing_number_check),
+        # Compact form, without the spaces IBANs are often printed with
+        Validator("IBAN", r"^[A-Z]{2}\d{2}[A-Z0-9]{11,30}$", _iban_check),
+        Validator("VIN", r"^[A-HJ-NPR-Z0-9]{17}$", _vin_check),
+    ])
@@ -0,0 +1,82 @@
+import pytest
+import os
+import time
+from my_project.utils.analysis_cache import AnalysisCache
+from my_project.testing.fake_service import canned_layout_result
+
+@pytest.fixture
+def document(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"%PDF-1.5 invoice")
+    return path
+
+def test_key_depends_on_content_model_and_features(tmp_path, document):
+    copy = tmp_path / "copy.pdf"
+    copy.write_bytes(document.read_bytes())
+    other = tmp_path / "other.pdf"
+    other.write_bytes(b"%PDF-1.5 receipt")
+
+    key = AnalysisCache.key_for(document, "prebuilt-layout")
+    assert AnalysisCache.key_for(copy, "prebuilt-layout") == key
+    assert AnalysisCache.key_for(other, "prebuilt-layout") != key
+    assert AnalysisCache.key_for(document, "prebuilt-read") != key
+    assert AnalysisCache.key_for(document, "prebuilt-layout", ["ocrHighResolution"]) != key
+    assert (AnalysisCache.key_for(document, "prebuilt-layout", ["a", "b"])
+            == AnalysisCache.key_for(document, "prebuilt-layout", ["b", "a"]))
+
+def test_get_and_put_round_trip(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache")
+    assert cache.get("missing") is None
+
+    cache.put("key", canned_layout_result())
+    result = cache.get("key")
+
+    assert result.pages[0].words[0].content == "w1_0"
+    assert result.pages[0].words[0].polygon[0].x == 1.0
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["bytes"] > 0
+
+def test_age_based_eviction(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache", max_age_seconds=60)
+    cache.put("key", canned_layout_result())
+    path = tmp_path / "cache" / "key.json"
+    stale = time.time() - 120
+    os.utime(path, (stale, stale))
+
+    assert cache.get("key") is None
+    assert not path.exists()
+    assert cache.stats()["evictions"] == 1
+
+def test_size_based_eviction_drops_least_recently_used(tmp_path):
+    result = canned_layout_result()
+    cache = AnalysisCache(tmp_path / "cache")
+    cache.put("a", result)
+    entry_size = cache.stats()["bytes"]
+
+    cache = AnalysisCache(tmp_path / "cache", max_bytes=int(entry_size * 2.5))
+    cache.put("b", result)
+    now = time.time()
+    os.utime(tmp_path / "cache" / "a.json", (now - 100, now - 100))
+    os.utime(tmp_path / "cache" / "b.json", (now - 200, now - 200))
+    assert cache.get("b") is not None
+    cache.put("c", result)
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["bytes"] <= entry_size * 2.5
+
+def test_size_is_recovered_from_existing_directory(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache")
+    cache.put("a", canned_layout_result())
+
+    assert AnalysisCache(tmp_path / "cache").stats()["bytes"] == cache.stats()["bytes"]
+
+def test_clear(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache")
+    cache.put("a", canned_layout_result())
+    cache.clear()
+
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
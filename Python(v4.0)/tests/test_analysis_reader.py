@@ -0,0 +1,100 @@
+import pytest
+import json
+import os
+from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.fake_service import canned_layout_result
+from my_project.utils.analysis_reader import AnalysisReader, build_index
+
+@pytest.fixture
+def analysis_path(tmp_path):
+    analyzer = LayoutAnalyzer('https://test.endpoint', 'test_key')
+    path = tmp_path / "sample_analysis.json"
+    analyzer._stream_json(canned_layout_result(page_count=4), path, indent=2)
+    return path
+
+def test_reader_decodes_pages_and_tables(analysis_path):
+    analysis = json.loads(analysis_path.read_text(encoding="utf-8"))
+
+    with AnalysisReader(analysis_path) as reader:
+        assert reader.page_count == 4
+        assert reader.table_count == 1
+        assert reader.page(0) == analysis["pages"][0]
+        assert reader.page(-1) == analysis["pages"][-1]
+        assert list(reader.pages([2, 1])) == [analysis["pages"][2], analysis["pages"][1]]
+        assert list(reader.tables()) == analysis["tables"]
+        assert reader.value("has_handwritten_content") is False
+        assert reader.value("missing", "default") == "default"
+
+def test_reader_writes_and_reuses_sidecar_index(analysis_path):
+    index_path = analysis_path.with_name(analysis_path.name + ".index.json")
+    with AnalysisReader(analysis_path):
+        pass
+    assert index_path.exists()
+
+    with open(index_path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    index["pages"] = index["pages"][:1]
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+
+    # A valid sidecar is trusted as is
+    with AnalysisReader(analysis_path) as reader:
+        assert reader.page_count == 1
+
+def test_reader_rebuilds_stale_index(analysis_path):
+    with AnalysisReader(analysis_path):
+        pass
+    analysis = json.loads(analysis_path.read_text(encoding="utf-8"))
+    analysis["pages"] = analysis["pages"][:2]
+    analysis_path.write_text(json.dumps(analysis), encoding="utf-8")
+
+    with AnalysisReader(analysis_path) as reader:
+        assert reader.page_count == 2
+        assert reader.page(1) == analysis["pages"][1]
+
+def test_build_index_handles_compact_and_tricky_strings():
+    analysis = {
+        "pages": [{"words": [{"content": 'a "quoted" [bracket] {brace} \\ é'}]}, {"words": []}],
+        "note": "top-level [string] with \"quotes\"",
+        "tables": [],
+        "has_handwritten_content": True,
+        "extra": {"nested": [1, 2]},
+    }
+    data = json.dumps(analysis, ensure_ascii=False).encode("utf-8")
+
+    index = build_index(data)
+
+    assert [json.loads(data[s:e]) for s, e in index["pages"]] == analysis["pages"]
+    assert index["tables"] == []
+    assert {k: json.loads(data[s:e]) for k, (s, e) in index["values"].items()} == {
+        "note": analysis["note"], "has_handwritten_content": True, "extra": {"nested": [1, 2]}}
+
+def test_reader_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        AnalysisReader(tmp_path / "missing.json")
+
+def test_reader_without_persisting_index(analysis_path, tmp_path):
+    with AnalysisReader(analysis_path, write_index=False) as reader:
+        assert reader.page_count == 4
+    assert not os.path.exists(str(analysis_path) + ".index.json")
+
+@pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() == 0, reason="root ignores directory permissions")
+def test_reader_in_read_only_directory(analysis_path):
+    folder = analysis_path.parent
+    os.chmod(folder, 0o555)
+    try:
+        with AnalysisReader(analysis_path) as reader:
+            assert reader.page_count == 4
+            assert reader.page(0)["page_number"] == 1
+    finally:
+        os.chmod(folder, 0o755)
+    assert sorted(path.name for path in folder.iterdir()) == [analysis_path.name]
+
+def test_reader_cleans_up_unwritable_index(analysis_path):
+    # A directory in the index's place makes replacing it fail after the temporary file is written
+    index_path = analysis_path.with_name(analysis_path.name + ".index.json")
+    (index_path / "blocker").mkdir(parents=True)
+
+    with AnalysisReader(analysis_path) as reader:
+        assert reader.page_count == 4
+    assert not index_path.with_name(index_path.name + ".tmp").exists()
@@ -0,0 +1,93 @@
+import pytest
+import asyncio
+import json
+import os
+from unittest.mock import patch
+from my_project.models.async_layout_analyzer import AsyncLayoutAnalyzer
+from my_project.testing.stub_server import StubDocumentIntelligenceServer
+from my_project.utils.analysis_cache import AnalysisCache
+
+@pytest.fixture
+def stub_server():
+    with StubDocumentIntelligenceServer(latency=0.05) as server:
+        yield server
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    pdf_path = tmp_path / "test.pdf"
+    pdf_path.write_bytes(b"%PDF-1.5")
+    return pdf_path
+
+def test_init_missing_credentials():
+    with patch.dict(os.environ, clear=True):
+        with pytest.raises(ValueError, match="Missing Azure credentials"):
+            AsyncLayoutAnalyzer()
+
+def test_analyze_document(stub_server, sample_pdf):
+    async def run():
+        async with AsyncLayoutAnalyzer(stub_server.endpoint, 'test_key') as analyzer:
+            return await analyzer.analyze_document(str(sample_pdf))
+
+    analysis = asyncio.run(run())
+
+    assert analysis["pages"][0]["words"][0]["content"] == "w1_0"
+    assert analysis["tables"][0]["cells"][0]["content"] == "w1_0"
+    assert stub_server.analyze_requests == 1
+
+def test_analyze_document_missing_file(stub_server):
+    async def run():
+        async with AsyncLayoutAnalyzer(stub_server.endpoint, 'test_key') as analyzer:
+            await analyzer.analyze_document("nonexistent_file.pdf")
+
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(run())
+
+def test_analyze_and_save_json(stub_server, sample_pdf, tmp_path):
+    output_path = tmp_path / "out" / "analysis.json"
+
+    async def run():
+        async with AsyncLayoutAnalyzer(stub_server.endpoint, 'test_key') as analyzer:
+            await analyzer.analyze_and_save_json(str(sample_pdf), str(output_path))
+
+    asyncio.run(run())
+
+    saved = json.loads(output_path.read_text(encoding="utf-8"))
+    assert saved["pages"][0]["page_number"] == 1
+
+def test_many_analyses_in_flight_on_one_loop(stub_server, sample_pdf):
+    stub_server.latency = 0.3
+
+    async def run():
+        async with AsyncLayoutAnalyzer(stub_server.endpoint, 'test_key') as analyzer:
+            return await asyncio.gather(*[analyzer.analyze_document(str(sample_pdf)) for _ in range(150)])
+
+    results = asyncio.run(run())
+
+    assert len(results) == 150
+    assert stub_server.max_in_flight > 100
+
+def test_analyze_document_served_from_cache(stub_server, sample_pdf, tmp_path):
+    cache = AnalysisCache(tmp_path / "cache")
+
+    async def run():
+        async with AsyncLayoutAnalyzer(stub_server.endpoint, 'test_key', cache=cache) as analyzer:
+            first = await analyzer.analyze_document(str(sample_pdf))
+            second = await analyzer.analyze_document(str(sample_pdf))
+            return first, second
+
+    first, second = asyncio.run(run())
+
+    assert json.loads(json.dumps(first)) == json.loads(json.dumps(second))
+    assert stub_server.analyze_requests == 1
+    assert cache.stats()["hits"] == 1
+
+def test_analyze_and_save_json_stream_and_ndjson(stub_server, sample_pdf, tmp_path):
+    async def run():
+        async with AsyncLayoutAnalyzer(stub_server.endpoint, 'test_key') as analyzer:
+            await analyzer.analyze_and_save_json(str(sample_pdf), str(tmp_path / "a.json"), stream=True)
+            await analyzer.analyze_and_save_ndjson(str(sample_pdf), str(tmp_path / "a.ndjson"))
+
+    asyncio.run(run())
+
+    assert json.loads((tmp_path / "a.json").read_text(encoding="utf-8"))["pages"][0]["page_number"] == 1
+    assert len((tmp_path / "a.ndjson").read_text(encoding="utf-8").splitlines()) == 3
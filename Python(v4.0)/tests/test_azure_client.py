@@ -1,8 +1,13 @@
 import pytest
-from my_project.utils.azure_client import test_azure_credentials
+from my_project.testing.stub_server import StubDocumentIntelligenceServer
+from my_project.utils.azure_client import (
+    SUCCESS_MESSAGE, CredentialProbe, clear_credentials_cache, test_azure_credentials, validate_credentials
+)
+from my_project.utils.client_registry import ClientRegistry
 import os
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
-from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+from azure.core.exceptions import ClientAuthenticationError, ResourceNotFoundError
 
 def test_missing_credentials():
     with patch.dict(os.environ, clear=True):
@@ -35,8 +40,8 @@ def test_invalid_credentials():
         assert not success
         assert any(text in message.lower() for text in ['invalid', 'error', 'failed'])
 
-@patch('azure.ai.formrecognizer.DocumentAnalysisClient.begin_analyze_document')
-def test_successful_connection(mock_analyze):
+@patch('azure.ai.formrecognizer.DocumentModelAdministrationClient.get_resource_details')
+def test_successful_connection(mock_details):
     with patch.dict(os.environ, {
         'AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT': 'https://test.endpoint',
         'AZURE_DOCUMENT_INTELLIGENCE_KEY': 'test_key'
@@ -44,22 +49,32 @@ def test_successful_connection(mock_analyze):
         success, message = test_azure_credentials()
         assert success
         assert "Successfully connected" in message
-        mock_analyze.assert_called_once_with("prebuilt-read", b"test")
+        mock_details.assert_called_once_with()
 
 @patch('azure.ai.formrecognizer.DocumentAnalysisClient.begin_analyze_document')
-def test_invalid_request_error(mock_analyze):
-    mock_analyze.side_effect = HttpResponseError(message="InvalidRequest: some error")
+@patch('azure.ai.formrecognizer.DocumentModelAdministrationClient.get_resource_details')
+def test_probe_does_not_start_an_analysis(mock_details, mock_analyze):
+    with patch.dict(os.environ, {
+        'AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT': 'https://test.endpoint',
+        'AZURE_DOCUMENT_INTELLIGENCE_KEY': 'test_key'
+    }):
+        assert test_azure_credentials()[0]
+    mock_analyze.assert_not_called()
+
+@patch('azure.ai.formrecognizer.DocumentModelAdministrationClient.get_resource_details')
+def test_authentication_error(mock_details):
+    mock_details.side_effect = ClientAuthenticationError(message="Access denied")
     with patch.dict(os.environ, {
         'AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT': 'https://test.endpoint',
         'AZURE_DOCUMENT_INTELLIGENCE_KEY': 'test_key'
     }):
         success, message = test_azure_credentials()
-        assert success  # Should still succeed as InvalidRequest means valid credentials
-        assert "Successfully connected" in message
+        assert not success
+        assert "Invalid credentials" in message
 
-@patch('azure.ai.formrecognizer.DocumentAnalysisClient.begin_analyze_document')
-def test_resource_not_found_error(mock_analyze):
-    mock_analyze.side_effect = ResourceNotFoundError("Resource not found")
+@patch('azure.ai.formrecognizer.DocumentModelAdministrationClient.get_resource_details')
+def test_resource_not_found_error(mock_details):
+    mock_details.side_effect = ResourceNotFoundError("Resource not found")
     with patch.dict(os.environ, {
         'AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT': 'https://test.endpoint',
         'AZURE_DOCUMENT_INTELLIGENCE_KEY': 'test_key'
@@ -79,4 +94,81 @@ def test_valid_credentials():
         
     success, message = test_azure_credentials()
     assert success
-    assert "Successfully connected" in message 
\ No newline at end of file
+    assert "Successfully connected" in message 
+
+@pytest.fixture
+def stub_server():
+    with StubDocumentIntelligenceServer(api_key='valid_key') as server:
+        yield server
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_probe_against_stub_uses_metadata_endpoint(stub_server):
+    probe = CredentialProbe(registry=ClientRegistry())
+
+    assert probe.check(stub_server.endpoint, 'valid_key') == (True, SUCCESS_MESSAGE)
+    assert stub_server.info_requests == 1
+    assert stub_server.analyze_requests == 0
+
+    success, message = probe.check(stub_server.endpoint, 'wrong_key')
+    assert not success
+    assert "Invalid credentials" in message
+    assert stub_server.unauthorized_requests == 1
+
+def test_probe_caches_outcomes_for_ttl(stub_server):
+    clock = _Clock()
+    probe = CredentialProbe(ttl_seconds=60, registry=ClientRegistry(), clock=clock)
+
+    for _ in range(100):
+        assert probe.check(stub_server.endpoint, 'valid_key')[0]
+        assert not probe.check(stub_server.endpoint, 'wrong_key')[0]
+    assert stub_server.info_requests == 1
+    assert stub_server.unauthorized_requests == 1
+    assert (probe.probes, probe.cache_hits) == (2, 198)
+
+    clock.now = 61
+    assert probe.check(stub_server.endpoint, 'valid_key')[0]
+    assert stub_server.info_requests == 2
+
+    assert probe.check(stub_server.endpoint, 'valid_key', refresh=True)[0]
+    assert stub_server.info_requests == 3
+
+def test_probe_sends_one_request_for_concurrent_callers(stub_server):
+    probe = CredentialProbe(registry=ClientRegistry())
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        outcomes = list(executor.map(lambda _: probe.check(stub_server.endpoint, 'valid_key'), range(64)))
+
+    assert all(success for success, _ in outcomes)
+    assert stub_server.info_requests == 1
+
+def test_probe_does_not_cache_unexpected_errors():
+    probe = CredentialProbe(registry=ClientRegistry())
+    with patch('azure.ai.formrecognizer.DocumentModelAdministrationClient.get_resource_details') as mock_details:
+        mock_details.side_effect = ConnectionError("network down")
+        success, message = probe.check('https://test.endpoint', 'flaky_key')
+        assert not success
+        assert "Unexpected error" in message
+
+        mock_details.side_effect = None
+        assert probe.check('https://test.endpoint', 'flaky_key')[0]
+        assert mock_details.call_count == 2
+
+@patch('azure.ai.formrecognizer.DocumentModelAdministrationClient.get_resource_details')
+def test_validate_credentials_uses_the_shared_probe(mock_details):
+    clear_credentials_cache()
+    assert validate_credentials('https://test.endpoint', 'cached_key')[0]
+    assert validate_credentials('https://test.endpoint', 'cached_key')[0]
+    assert mock_details.call_count == 1
+    clear_credentials_cache()
+
+def test_validate_credentials_missing():
+    with patch.dict(os.environ, clear=True):
+        success, message = validate_credentials()
+    assert not success
+    assert "Missing Azure credentials" in message
@@ -0,0 +1,97 @@
+import json
+from types import SimpleNamespace
+import pytest
+from my_project.utils.batch_disambiguation import BatchDisambiguator, FieldCorrection, disambiguate_results
+
+VALIDATORS = {"ICD10": r'^[A-TV-Z]\d\d(\.\d{1,2})?$', "Policy": r'^[A-Z]{3}\d{6}$'}
+
+def _result(diagnosis, policy, confidence=0.9):
+    return {"documents": [{"fields": {
+        "Diagnosis": {"content": diagnosis, "confidence": confidence},
+        "Policy": {"content": policy, "confidence": confidence},
+        "Items": {"valueArray": [{"valueObject": {"Code": {"content": diagnosis, "confidence": confidence}}}]},
+    }}]}
+
+def test_fields_are_corrected_with_provenance():
+    corrections = disambiguate_results([_result("l26.99", "P0L12345O")], VALIDATORS,
+                                       field_validators={"Diagnosis": "ICD10", "Code": "ICD10", "Policy": "Policy"})
+    by_location = {correction.location: correction for correction in corrections}
+
+    assert set(by_location) == {"documents[0].fields.Diagnosis", "documents[0].fields.Policy",
+                                "documents[0].fields.Items[0].Code"}
+    diagnosis = by_location["documents[0].fields.Diagnosis"]
+    assert diagnosis == FieldCorrection("0", "documents[0].fields.Diagnosis", "ICD10", "l26.99", 0.9,
+                                        "I26.99", pytest.approx(0.05), ((0, "l", "I"),), ())
+    assert diagnosis.corrected
+    assert by_location["documents[0].fields.Items[0].Code"].value == "I26.99"
+    assert by_location["documents[0].fields.Policy"].value == "POL123450"
+
+def test_fields_without_valid_candidates_are_reported():
+    [correction] = disambiguate_results([{"documents": [{"fields": {"ICD10": {"content": "U99"}}}]}], VALIDATORS)
+    assert correction.value is None and correction.alternatives == () and not correction.corrected
+    assert correction.confidence == 0.9
+
+def test_ranking_uses_each_occurrence_confidence():
+    batch = BatchDisambiguator({"Code": r"[0-9O]{2}"})
+    sure, unsure = batch.run([{"documents": [{"fields": {"Code": {"content": "0O", "confidence": confidence}}}]}
+                              for confidence in (0.95, 0.2)])
+    assert batch.searches == 1
+    assert sure.value == "0O" and sure.substitutions == () and sure.alternatives[-1] == "O0"
+    assert unsure.value == "O0" and unsure.substitutions == ((0, "0", "O"), (1, "O", "0"))
+    assert sorted(sure.alternatives + (sure.value,)) == sorted(unsure.alternatives + (unsure.value,))
+
+def test_cut_short_candidate_sets_are_searched_at_low_confidence():
+    from my_project.utils.disambiguation import disambiguate
+    # 256 valid readings, more than max_candidates keeps
+    batch = BatchDisambiguator({"Code": r"[0-9A-Z]{8}"}, max_workers=1)
+    sure, unsure, unsure_again = batch.run([{"documents": [{"fields": {"Code": {
+        "content": "00000000", "confidence": confidence}}}]} for confidence in (0.9, 0.3, 0.3)])
+
+    best = next(disambiguate("00000000", r"[0-9A-Z]{8}", 0.3))
+    assert (unsure.value, unsure.score) == (best.text, pytest.approx(best.score))
+    assert unsure.value == "OOOOOOOO" and unsure_again.alternatives == unsure.alternatives
+    assert sure.value == "00000000"
+    # One search at the default confidence, one at 0.3
+    assert batch.searches == 2
+
+def test_identical_strings_are_searched_once_across_batches():
+    batch = BatchDisambiguator(VALIDATORS, field_validators={"Diagnosis": "ICD10"}, max_workers=1)
+    batch.run([_result("l26.99", "x"), _result("l26.99", "x"), _result("A0l", "x")])
+    assert batch.searches == 2 and batch.reuses == 1
+    batch.run([_result("A0l", "x")])
+    assert batch.searches == 2 and batch.reuses == 2
+
+def test_scanned_words_and_cells_of_sdk_and_saved_results(tmp_path):
+    page = SimpleNamespace(words=[SimpleNamespace(content="E1l", confidence=0.8),
+                                  SimpleNamespace(content="hello", confidence=0.99)])
+    sdk_result = SimpleNamespace(documents=None, pages=[page], tables=[])
+    saved = tmp_path / "scan_analysis.json"
+    saved.write_text(json.dumps({"pages": [{"words": [{"content": "hello", "confidence": 0.9}]}],
+                                 "tables": [{"cells": [{"content": "Zl0.O"}]}]}), encoding="utf-8")
+
+    corrections = disambiguate_results([sdk_result, saved], VALIDATORS, scan_validators=["ICD10"])
+    assert [(c.source, c.location, c.value) for c in corrections] == [
+        ("0", "pages[0].words[0]", "E11"), (str(saved), "tables[0].cells[0]", "Z10.0")]
+    assert not (tmp_path / "scan_analysis.json.index.json").exists()
+
+def test_process_pool_matches_in_process_search():
+    results = [_result(f"{letter}l{digit}.O", "x") for letter in "ABCDEFGH" for digit in range(10)]
+    options = dict(field_validators={"Diagnosis": "ICD10"}, chunk_size=8)
+    pooled = disambiguate_results(results, VALIDATORS, max_workers=2, **options)
+    assert pooled == disambiguate_results(results, VALIDATORS, max_workers=1, **options)
+    assert pooled[0].value == "A10.0"
+
+def test_unknown_validator_and_unsupported_pattern():
+    with pytest.raises(ValueError, match="Unknown validator: SSN"):
+        BatchDisambiguator(VALIDATORS, scan_validators=["SSN"])
+    with pytest.raises(ValueError, match="Unsupported pattern"):
+        BatchDisambiguator({"Bad": r"(?=x)"})
+
+def test_registry_validators_check_candidates():
+    from my_project.utils.validators import default_registry
+    # 1/I and 0/O are all valid IBAN characters; only the mod-97 check tells the readings apart
+    results = [{"documents": [{"fields": {"IBAN": {"content": "GB29NWBK6O16I331926819"}}}]}]
+    [checked] = disambiguate_results(results, default_registry(), field_validators={"IBAN": "IBAN"}, max_workers=2)
+    assert checked.value == "GB29NWBK60161331926819" and checked.alternatives == ()
+    [unchecked] = disambiguate_results(results, {"IBAN": default_registry()["IBAN"].pattern})
+    assert unchecked.value == "GB29NWBK6O16I331926819" and len(unchecked.alternatives) == 31
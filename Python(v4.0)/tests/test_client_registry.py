@@ -0,0 +1,70 @@
+import os
+import pytest
+from unittest.mock import patch
+from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.stub_server import StubDocumentIntelligenceServer
+from my_project.utils.client_registry import (
+    ClientRegistry, configure_client_registry, get_client_registry, get_document_analysis_client
+)
+
+@pytest.fixture
+def stub_server():
+    with StubDocumentIntelligenceServer() as server:
+        yield server
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    pdf_path = tmp_path / "test.pdf"
+    pdf_path.write_bytes(b"%PDF-1.5")
+    return pdf_path
+
+def test_registry_hands_out_one_client_per_endpoint_key_and_version():
+    registry = ClientRegistry()
+    client = registry.get_client('https://test.endpoint', 'test_key')
+
+    assert registry.get_client('https://test.endpoint', 'test_key') is client
+    assert registry.get_client('https://test.endpoint', 'other_key') is not client
+    assert registry.get_client('https://test.endpoint', 'test_key', api_version="2022-08-31") is not client
+    assert registry.stats()["clients"] == 3
+    registry.close()
+
+def test_registry_requires_credentials():
+    with patch.dict(os.environ, clear=True):
+        with pytest.raises(ValueError, match="Missing Azure credentials"):
+            ClientRegistry().get_client()
+
+def test_analyzers_share_the_process_wide_client():
+    first = LayoutAnalyzer('https://shared.endpoint', 'test_key')
+    second = LayoutAnalyzer('https://shared.endpoint', 'test_key')
+
+    assert first.client is second.client
+    assert first.client is get_document_analysis_client('https://shared.endpoint', 'test_key')
+
+def test_registry_reuses_connections(stub_server, sample_pdf):
+    registry = ClientRegistry(pool_maxsize=4)
+    analyzers = [LayoutAnalyzer(stub_server.endpoint, 'test_key', registry=registry) for _ in range(3)]
+
+    for analyzer in analyzers:
+        analyzer.analyze_document(str(sample_pdf))
+
+    stats = registry.stats()
+    assert stats["clients"] == 1
+    assert stats["requests"] == stub_server.analyze_requests + stub_server.poll_requests
+    assert stats["connections_opened"] == stub_server.connections == 1
+    assert stats["connections_reused"] == stats["requests"] - 1
+    registry.close()
+
+def test_registry_without_keep_alive_opens_a_connection_per_request(stub_server, sample_pdf):
+    registry = ClientRegistry(keep_alive=False)
+    LayoutAnalyzer(stub_server.endpoint, 'test_key', registry=registry).analyze_document(str(sample_pdf))
+
+    assert stub_server.connections == registry.stats()["requests"] > 1
+    registry.close()
+
+def test_configure_client_registry_replaces_the_default():
+    previous = get_client_registry()
+    registry = configure_client_registry(pool_maxsize=32)
+
+    assert get_client_registry() is registry is not previous
+    assert registry.pool_maxsize == 32
+    configure_client_registry()
@@ -0,0 +1,80 @@
+import pytest
+import json
+import numpy as np
+from my_project.models.columnar import ColumnarPage
+from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.fake_service import FakeDocumentAnalysisClient, canned_layout_result
+
+@pytest.fixture
+def analyzer():
+    return LayoutAnalyzer('https://test.endpoint', 'test_key')
+
+def _as_json(analysis):
+    return json.loads(json.dumps(analysis, default=lambda page: page.to_dict()))
+
+def test_columnar_view_matches_dict_format(analyzer):
+    result = canned_layout_result(page_count=3, words_per_page=5)
+
+    as_dicts = analyzer._convert_result(result)
+    as_columns = analyzer._convert_result(result, "columnar")
+
+    assert isinstance(as_columns["pages"][0], ColumnarPage)
+    assert _as_json(as_columns) == _as_json(as_dicts)
+
+def test_columnar_arrays(analyzer):
+    page = analyzer._convert_result(canned_layout_result(words_per_page=4), "columnar")["pages"][0]
+
+    assert page.words.polygons.dtype == np.float32
+    assert page.words.polygons.shape == (4, 8)
+    assert page.words.confidences.tolist() == pytest.approx([0.99] * 4)
+    assert page.words.span_offsets.tolist() == [0, 5, 10, 15]
+    assert page.words.span_lengths.tolist() == [4, 4, 4, 4]
+    assert page.words.content == "w1_0w1_1w1_2w1_3"
+    assert page.lines.confidences is None
+    assert page.selection_marks.states.tolist() == [1]
+
+def test_columnar_view_indexing(analyzer):
+    page = analyzer._convert_result(canned_layout_result(words_per_page=3), "columnar")["pages"][0]
+
+    assert page["page_number"] == 1
+    assert len(page["words"]) == 3
+    assert page["words"][-1]["content"] == "w1_2"
+    assert [w["content"] for w in page["words"][1:]] == ["w1_1", "w1_2"]
+    assert page["selection_marks"][0]["state"] == "selected"
+    with pytest.raises(IndexError):
+        page["words"][3]
+    with pytest.raises(KeyError):
+        page["tables"]
+
+def test_unknown_result_format(analyzer):
+    with pytest.raises(ValueError, match="Unknown result format"):
+        analyzer._convert_result(canned_layout_result(), "xml")
+
+def test_analyze_document_columnar(analyzer, tmp_path):
+    analyzer.client = FakeDocumentAnalysisClient()
+    pdf_path = tmp_path / "test.pdf"
+    pdf_path.write_bytes(b"%PDF-1.5")
+
+    analysis = analyzer.analyze_document(str(pdf_path), result_format="columnar")
+
+    assert analysis["pages"][0]["words"][0]["content"] == "w1_0"
+    assert analysis["tables"][0]["cells"][0]["content"] == "w1_0"
+
+def test_columnar_is_smaller(analyzer):
+    result = canned_layout_result(page_count=2, words_per_page=500)
+    page = analyzer._convert_result(result, "columnar")["pages"][0]
+
+    # 500 words of 8 float32 coordinates, a confidence and two span ints each
+    assert page.words.nbytes < 500 * 80
+
+def test_missing_confidences_keep_arrays_parallel():
+    result = canned_layout_result(words_per_page=3)
+    page = result.pages[0]
+    page.words[1].confidence = None
+    page.words[2].confidence = 0.5
+
+    columns = ColumnarPage.from_sdk_page(page)
+
+    assert len(columns.words.confidences) == 3
+    assert [word["confidence"] for word in columns["words"]] == [0.99, None, 0.5]
+    assert columns["words"][1]["content"] == "w1_1"
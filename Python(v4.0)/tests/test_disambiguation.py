@@ -0,0 +1,48 @@
+import itertools
+import re
+import pytest
+from my_project.utils.disambiguation import CONFUSABLE_CHARACTERS, Candidate, ScoreProfile, disambiguate, score_profile
+
+ICD10 = r'^[A-TV-Z]\d\d(\.\d{1,2})?$'
+
+def _brute_force(text, pattern):
+    options = [[char, *CONFUSABLE_CHARACTERS.get(char, ())] for char in text]
+    return {"".join(chars) for chars in itertools.product(*options) if re.fullmatch(pattern, "".join(chars))}
+
+@pytest.mark.parametrize("text", ["126.99", "l26.99", "O1O.1", "A12.3", "U12", "", "I0l"])
+def test_candidates_are_all_valid_substitutions(text):
+    candidates = list(disambiguate(text, ICD10))
+    assert {candidate.text for candidate in candidates} == _brute_force(text, ICD10)
+    assert len(candidates) == len({candidate.text for candidate in candidates})
+
+def test_candidates_ranked_by_confidence():
+    candidates = list(disambiguate("10", r"[0-9IlO]{2}", confidence=0.9))
+    scores = [candidate.score for candidate in candidates]
+    assert scores == sorted(scores, reverse=True)
+    assert candidates[0] == Candidate("10", pytest.approx(0.81), ())
+    assert candidates[1].substitutions in (((0, "1", "I"),), ((0, "1", "l"),), ((1, "0", "O"),))
+    assert len(candidates) == 6
+
+    # A low confidence favours substitutions over the reading
+    assert next(disambiguate("10", r"[0-9IlO]{2}", confidence=0.1)).text != "10"
+
+def test_candidates_are_lazy_and_limited():
+    text = "1" * 40  # 3 ** 40 strings: only a lazy search can return the first ones
+    first = next(disambiguate(text, r"[1Il]+"))
+    assert first.text == text and first.substitutions == ()
+    assert len(list(disambiguate(text, r"[1Il]+", limit=5))) == 5
+    assert list(disambiguate(text, r"[1Il]+", limit=0)) == []
+    assert [candidate.text for candidate in disambiguate(text, r"I+")] == ["I" * 40]
+
+def test_custom_confusions():
+    candidates = disambiguate("S5B", r"\d{2}8", confusions={"S": ("5",), "B": ("8",)})
+    assert [candidate.text for candidate in candidates] == ["558"]
+
+def test_score_profile_reproduces_scores_at_any_confidence():
+    for confidence in (0.3, 0.9, 1.0):
+        for candidate in disambiguate("l0I", r"[0-9IlO]+", confidence=confidence):
+            profile = score_profile("l0I", candidate.text)
+            assert profile.score(confidence) == pytest.approx(candidate.score)
+    assert score_profile("l0I", "10I") == ScoreProfile(kept=2, swapped=1, factor=0.5)
+    with pytest.raises(ValueError, match="not a substitution"):
+        score_profile("l0I", "x0I")
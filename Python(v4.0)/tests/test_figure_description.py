@@ -0,0 +1,152 @@
+import asyncio
+import base64
+import time
+from types import SimpleNamespace
+
+import fitz
+import pytest
+from my_project.testing.fake_describer import FakeDescriber
+from my_project.utils.figure_description import AzureOpenAIDescriber, FigureDescriptionStage, image_data_url
+from my_project.utils.figure_extractor import FigureCrop, FigureExtractor, FigureRegion
+
+def _crop(figure, data=None, region=0):
+    data = data if data is not None else f"image {figure}".encode()
+    return FigureCrop(FigureRegion(figure, region, 1, (0.0, 0.0, 1.0, 1.0)), data, "png", 10, 10)
+
+def test_concurrency_is_bounded():
+    describer = FakeDescriber(latency=0.05)
+    stage = FigureDescriptionStage(describer, max_concurrency=4)
+    crops = [_crop(figure) for figure in range(20)]
+
+    start = time.perf_counter()
+    descriptions = asyncio.run(stage.describe_all(crops))
+    elapsed = time.perf_counter() - start
+
+    assert describer.max_in_flight == 4
+    assert elapsed < 20 * 0.05 / 2
+    assert [description.crop for description in descriptions] == crops
+    assert descriptions[3].description == FakeDescriber.description(b"image 3")
+
+def test_identical_images_are_described_once():
+    describer = FakeDescriber(latency=0.02)
+    stage = FigureDescriptionStage(describer, max_concurrency=8)
+    # Figures 0 to 4 share one image; they are in flight together, so they wait for the same request
+    crops = [_crop(figure, b"logo") for figure in range(5)] + [_crop(5)]
+
+    descriptions = asyncio.run(stage.describe_all(crops))
+
+    assert len(describer.calls) == stage.requests == 2
+    assert stage.cache_hits == 4
+    assert [description.cached for description in descriptions] == [False, True, True, True, True, False]
+    assert len({description.description for description in descriptions[:5]}) == 1
+
+    # The cache outlives the run
+    again = asyncio.run(stage.describe_all([_crop(9, b"logo")]))
+    assert again[0].cached and len(describer.calls) == 2
+
+def test_captions_are_part_of_the_key():
+    describer = FakeDescriber()
+    stage = FigureDescriptionStage(describer)
+    crops = [_crop(0, b"chart"), _crop(1, b"chart")]
+
+    descriptions = asyncio.run(stage.describe_all(crops, captions={1: "Figure 2: Sales"}))
+
+    assert [description.caption for description in descriptions] == ["", "Figure 2: Sales"]
+    assert descriptions[1].description == FakeDescriber.description(b"chart", "Figure 2: Sales")
+    assert [call["caption"] for call in describer.calls] == ["", "Figure 2: Sales"]
+    assert FigureDescriptionStage.cache_key(b"chart") != FigureDescriptionStage.cache_key(b"chart", "Figure 2: Sales")
+
+def test_stream_yields_in_completion_order():
+    describer = FakeDescriber(latency=lambda image: 0.1 if image == b"slow" else 0.0)
+    stage = FigureDescriptionStage(describer)
+
+    async def run():
+        return [description.crop.region.figure async for description in
+                stage.stream([_crop(0, b"slow"), _crop(1), _crop(2)])]
+
+    figures = asyncio.run(run())
+
+    assert figures[-1] == 0 and sorted(figures) == [0, 1, 2]
+
+def test_stream_pulls_sync_iterators_in_a_thread():
+    stage = FigureDescriptionStage(FakeDescriber(latency=0.05), max_concurrency=4)
+
+    def slow_crops():
+        for figure in range(4):
+            time.sleep(0.05)  # Like a page rendering
+            yield _crop(figure)
+
+    start = time.perf_counter()
+    descriptions = asyncio.run(stage.describe_all(slow_crops()))
+
+    # Rendering and describing overlap
+    assert time.perf_counter() - start < 4 * 0.05 + 4 * 0.05
+    assert [description.crop.region.figure for description in descriptions] == [0, 1, 2, 3]
+
+def test_async_iterators_and_backpressure():
+    stage = FigureDescriptionStage(FakeDescriber(latency=0.01), max_concurrency=2)
+    produced = []
+
+    async def crops():
+        for figure in range(10):
+            produced.append(figure)
+            yield _crop(figure)
+
+    async def run():
+        held = []
+        async for description in stage.stream(crops()):
+            # No more than 2 * max_concurrency crops are taken in ahead of the results
+            held.append(len(produced) - (len(held) + 1))
+        return held
+
+    assert max(asyncio.run(run())) <= 4
+
+def test_errors_propagate():
+    describer = FakeDescriber(latency=0.01, errors={b"broken": RuntimeError("model unavailable")})
+    stage = FigureDescriptionStage(describer)
+
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        asyncio.run(stage.describe_all([_crop(0), _crop(1, b"broken"), _crop(2)]))
+    assert FigureDescriptionStage.cache_key(b"broken") not in stage.cache
+
+def test_invalid_concurrency():
+    with pytest.raises(ValueError):
+        FigureDescriptionStage(FakeDescriber(), max_concurrency=0)
+
+def test_streams_crops_from_the_extractor(tmp_path):
+    pdf_path = tmp_path / "figures.pdf"
+    with fitz.open() as document:
+        for _ in range(3):
+            document.new_page().draw_rect(fitz.Rect(72, 72, 216, 216), color=(0, 0, 0), fill=(1, 0, 0))
+        document.save(str(pdf_path))
+    regions = [FigureRegion(page, 0, page + 1, (1.0, 1.0, 3.0, 3.0)) for page in range(3)]
+    describer = FakeDescriber()
+    stage = FigureDescriptionStage(describer)
+
+    crops = FigureExtractor(dpi=72, max_workers=1).iter_crops(pdf_path, regions, tmp_path / "cropped")
+    descriptions = asyncio.run(stage.describe_all(crops))
+
+    # The pages look alike, so their crops are too
+    assert stage.requests == 1 and stage.cache_hits == 2
+    assert describer.calls[0]["mime_type"] == "image/png"
+    assert all(open(description.crop.path, "rb").read() == description.crop.data for description in descriptions)
+
+def test_azure_openai_describer_request():
+    requests = []
+
+    async def create(**kwargs):
+        requests.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="A bar chart"))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    describer = AzureOpenAIDescriber("https://example.openai.azure.com", "key", "gpt-4v", max_tokens=100,
+                                     client=client)
+
+    assert asyncio.run(describer(b"\x89PNG", "image/png", "Figure 1")) == "A bar chart"
+    request = requests[0]
+    assert request["model"] == "gpt-4v" and request["max_tokens"] == 100
+    text, image = request["messages"][1]["content"]
+    assert text["text"] == "Describe this image (note: it has image caption: Figure 1):"
+    assert image["image_url"]["url"] == "data:image/png;base64," + base64.b64encode(b"\x89PNG").decode()
+    assert describer.messages(b"", "image/png", "")[1]["content"][0]["text"] == "Describe this image:"
+    assert image_data_url(b"abc", "image/webp") == "data:image/webp;base64,YWJj"
@@ -0,0 +1,118 @@
+import importlib.util
+from types import SimpleNamespace
+
+import fitz
+import numpy as np
+import pytest
+from azure.ai.formrecognizer import Point
+from my_project.utils.figure_extractor import FigureExtractor, FigureRegion, figure_regions
+
+def _rectangle(left, top, right, bottom):
+    return [left, top, right, top, right, bottom, left, bottom]
+
+@pytest.fixture
+def figure_pdf(tmp_path):
+    pdf_path = tmp_path / "figures.pdf"
+    with fitz.open() as document:
+        for number in range(3):
+            page = document.new_page()
+            page.insert_text((72, 72), f"Page {number + 1}", fontsize=24)
+            page.draw_rect(fitz.Rect(72, 144, 288, 360), color=(1, 0, 0), fill=(0, 0.5, 1))
+            page.draw_circle((400, 500), 60 + 10 * number, color=(0, 0, 0), fill=(1, 1, 0))
+        document.save(str(pdf_path))
+    return pdf_path
+
+@pytest.fixture
+def analysis():
+    """Two figures on page 1, one on page 3 with a caption region to leave out."""
+    return {"figures": [
+        {"boundingRegions": [{"pageNumber": 1, "polygon": _rectangle(1.0, 2.0, 4.0, 5.0)}]},
+        {"boundingRegions": [{"pageNumber": 1, "polygon": _rectangle(4.5, 6.0, 6.5, 8.0)}]},
+        {"boundingRegions": [{"pageNumber": 3, "polygon": _rectangle(4.5, 6.0, 6.7, 8.2)},
+                             {"pageNumber": 3, "polygon": _rectangle(4.5, 8.3, 6.7, 8.6)}],
+         "caption": {"content": "Figure 3",
+                     "boundingRegions": [{"pageNumber": 3, "polygon": _rectangle(4.5, 8.3, 6.7, 8.6)}]}},
+    ]}
+
+def _pixels(pixmap):
+    return np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.width, pixmap.n).astype(int)
+
+def _clip_render(pdf_path, region, dpi=300):
+    """A region rendered on its own, as the figure notebook used to crop it."""
+    with fitz.open(str(pdf_path)) as document:
+        page = document.load_page(region.page_number - 1)
+        clip = fitz.Rect([value * 72 for value in region.box])
+        return _pixels(page.get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72), clip=clip, alpha=False))
+
+def test_figure_regions_skip_captions(analysis):
+    regions = figure_regions(analysis)
+
+    assert [(region.figure, region.region, region.page_number) for region in regions] == [(0, 0, 1), (1, 0, 1),
+                                                                                             (2, 0, 3)]
+    assert regions[2].box == (4.5, 6.0, 6.7, 8.2)
+
+def test_figure_regions_from_sdk_models():
+    region = SimpleNamespace(page_number=2, polygon=[Point(1, 1), Point(3, 1), Point(3, 2), Point(1, 2)])
+    result = SimpleNamespace(figures=[SimpleNamespace(bounding_regions=[region], caption=None)])
+
+    assert figure_regions(result) == [FigureRegion(0, 0, 2, (1.0, 1.0, 3.0, 2.0))]
+
+def test_crops_match_clip_rendering(figure_pdf, analysis):
+    regions = figure_regions(analysis)
+
+    crops = FigureExtractor(max_workers=1).extract(figure_pdf, regions)
+
+    assert [crop.region for crop in crops] == regions
+    for crop, region in zip(crops, regions):
+        assert crop.mime_type == "image/png" and crop.path is None
+        cropped, clipped = _pixels(fitz.Pixmap(crop.data)), _clip_render(figure_pdf, region)
+        assert cropped.shape == clipped.shape == (crop.height, crop.width, 3)
+        # Only anti-aliasing where the circle crosses the crop edge may differ
+        different = (cropped != clipped).any(axis=2)
+        assert different.sum() < 10 and not different[1:-1, 1:-1].any()
+
+def test_process_pool_matches_in_process(figure_pdf, analysis):
+    regions = figure_regions(analysis)
+
+    serial = FigureExtractor(dpi=150, max_workers=1).extract(figure_pdf, regions)
+    pooled = FigureExtractor(dpi=150, max_workers=2).extract(figure_pdf, regions)
+
+    assert [crop.data for crop in pooled] == [crop.data for crop in serial]
+
+def test_iter_crops_streams_in_page_order(figure_pdf):
+    regions = [FigureRegion(0, 0, 3, (1, 1, 2, 2)), FigureRegion(1, 0, 1, (1, 1, 2, 2)),
+               FigureRegion(2, 0, 2, (1, 1, 2, 2))]
+
+    crops = list(FigureExtractor(dpi=72, max_workers=1).iter_crops(figure_pdf, regions))
+
+    assert [crop.region.page_number for crop in crops] == [1, 2, 3]
+    assert all((crop.width, crop.height) == (72, 72) for crop in crops)
+
+def test_extract_writes_files(figure_pdf, analysis, tmp_path):
+    regions = figure_regions(analysis) + [FigureRegion(2, 1, 3, (1.0, 1.0, 2.0, 2.0))]
+    output_folder = tmp_path / "cropped"
+
+    crops = FigureExtractor(dpi=72, max_workers=1).extract(figure_pdf, regions, output_folder)
+
+    assert sorted(path.name for path in output_folder.iterdir()) == [
+        "figures_cropped_image_0.png", "figures_cropped_image_1.png", "figures_cropped_image_2.png",
+        "figures_cropped_image_2_1.png"]
+    for crop in crops:
+        with open(crop.path, "rb") as image:
+            assert image.read() == crop.data
+
+def test_region_outside_page(figure_pdf):
+    with pytest.raises(ValueError, match="outside page 1"):
+        FigureExtractor(max_workers=1).extract(figure_pdf, [FigureRegion(0, 0, 1, (20.0, 20.0, 21.0, 21.0))])
+
+def test_image_formats():
+    with pytest.raises(ValueError, match="Unknown image format: gif"):
+        FigureExtractor(image_format="gif")
+    if importlib.util.find_spec("PIL") is None:
+        with pytest.raises(ImportError):
+            FigureExtractor(image_format="webp")
+    else:
+        assert FigureExtractor(image_format="webp").image_format == "webp"
+
+def test_no_regions(figure_pdf):
+    assert FigureExtractor().extract(figure_pdf, []) == []
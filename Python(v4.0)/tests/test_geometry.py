@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from my_project import geometry
+from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.fake_service import canned_layout_result
+
+SQUARE = [0.0, 0.0, 2.0, 0.0, 2.0, 2.0, 0.0, 2.0]
+
+def test_as_polygons_accepts_every_polygon_format():
+    page = canned_layout_result().pages[0]
+    columnar = LayoutAnalyzer('https://test.endpoint', 'test_key')._convert_result(
+        canned_layout_result(), "columnar")["pages"][0]
+    as_dict = LayoutAnalyzer('https://test.endpoint', 'test_key')._convert_page(page)
+
+    expected = np.array([[[1.0, 1.0], [1.8, 1.0], [1.8, 1.2], [1.0, 1.2]]])
+    assert np.allclose(geometry.as_polygons([[1.0, 1.0, 1.8, 1.0, 1.8, 1.2, 1.0, 1.2]]), expected)
+    assert np.allclose(geometry.as_polygons([page.words[0].polygon]), expected)
+    assert np.allclose(geometry.as_polygons([as_dict["words"][0]["polygon"]]), expected)
+    assert np.allclose(geometry.as_polygons(columnar.words.polygons)[:1], expected)
+    assert geometry.as_polygons([]).shape == (0, 0, 2)
+    with pytest.raises(ValueError, match="pairs"):
+        geometry.as_polygons([[1.0, 2.0, 3.0]])
+
+def test_ragged_polygons_are_nan_padded():
+    polygons = geometry.as_polygons([[0, 0, 4, 0, 0, 3], SQUARE, []])
+
+    assert polygons.shape == (3, 4, 2)
+    assert np.isnan(polygons[0, 3]).all()
+    assert geometry.point_counts(polygons).tolist() == [3, 4, 0]
+
+def test_bounding_boxes_and_areas():
+    rotated = [1.0, 0.0, 2.0, 1.0, 1.0, 2.0, 0.0, 1.0]
+    polygons = [SQUARE, rotated, [0, 0, 4, 0, 0, 3], []]
+
+    boxes = geometry.bounding_boxes(polygons)
+
+    assert boxes[:3].tolist() == [[0, 0, 2, 2], [0, 0, 2, 2], [0, 0, 4, 3]]
+    assert np.isnan(boxes[3]).all()
+    assert geometry.areas(polygons).tolist() == [4.0, 2.0, 6.0, 0.0]
+    assert geometry.box_areas(boxes[:3]).tolist() == [4.0, 4.0, 12.0]
+
+def test_iou_and_containment():
+    shifted = [1.0, 0.0, 3.0, 0.0, 3.0, 2.0, 1.0, 2.0]
+    inner = [0.5, 0.5, 1.0, 0.5, 1.0, 1.0, 0.5, 1.0]
+
+    overlap = geometry.iou([SQUARE, shifted], [SQUARE, shifted, inner, []])
+
+    assert overlap.shape == (2, 4)
+    assert overlap[0].tolist() == pytest.approx([1.0, 1 / 3, 0.0625, 0.0])
+    assert geometry.contains([SQUARE, shifted], [inner, shifted]).tolist() == [[True, False], [False, True]]
+    assert geometry.contains([SQUARE], [[2.05, 0, 2.05, 2]], tolerance=0.1).tolist() == [[True]]
+
+def test_convert_units():
+    boxes = geometry.bounding_boxes([SQUARE])
+
+    assert geometry.convert_units(boxes, "inch", "point").tolist() == [[0, 0, 144, 144]]
+    assert geometry.convert_units([SQUARE], "pixel", "inch", dpi=200)[0, 2].tolist() == [0.01, 0.01]
+    assert geometry.unit_scale("point", "pixel", dpi=144) == 2.0
+    with pytest.raises(ValueError, match="Unknown unit: cm"):
+        geometry.unit_scale("inch", "cm")
+
+def test_drop_duplicate_points_keeps_order():
+    polygons = geometry.drop_duplicate_points([[[[1, 1], [2, 1]], [[2, 1], [2, 2]]], [[[0, 0], [0, 0]]]])
+
+    assert geometry.point_counts(polygons).tolist() == [3, 1]
+    assert polygons[0, :3].tolist() == [[1, 1], [2, 1], [2, 2]]
+
+def test_pair_points():
+    assert geometry.pair_points([1, 2, 3, 4]) == [[1, 2], [3, 4]]
+    assert geometry.pair_points([]) == []
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# Modules that must not be loaded just by importing my_project
+HEAVY_PREFIXES = ("azure", "dotenv", "requests", "aiohttp", "numpy", "fitz", "pymupdf")
+
+def _import_times(module):
+    """Import ``module`` in a fresh interpreter under ``-X importtime``."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return completed.stdout, times
+
+def test_import_my_project_has_no_side_effects():
+    stdout, times = _import_times("my_project")
+
+    assert stdout == ""
+    assert "my_project" in times
+    heavy = [name for name in times if name.split(".")[0] in HEAVY_PREFIXES]
+    assert heavy == []
+
+def test_import_my_project_is_fast():
+    _, times = _import_times("my_project")
+    # Microseconds; the package itself only imports the standard library
+    assert times["my_project"] < 50_000
+
+def test_lazy_attributes_still_resolve():
+    import my_project
+    from my_project.utils.azure_client import test_azure_credentials, validate_credentials
+
+    assert my_project.test_azure_credentials is test_azure_credentials
+    assert my_project.validate_credentials is validate_credentials
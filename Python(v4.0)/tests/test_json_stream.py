@@ -0,0 +1,46 @@
+import pytest
+import io
+import json
+from my_project.utils.json_stream import write_analysis_json, write_analysis_ndjson, read_analysis_ndjson
+
+PAGES = [
+    {"page_number": 1, "words": [{"content": "Héllo", "polygon": [[[1.0, 2.0], [3.0, 4.0]]]}]},
+    {"page_number": 2, "words": []},
+]
+TABLES = [{"row_count": 1, "column_count": 2, "cells": []}]
+
+@pytest.mark.parametrize("indent", [None, 0, 2, 4])
+@pytest.mark.parametrize("pages,tables", [(PAGES, TABLES), ([], []), (PAGES, [])])
+def test_streamed_json_matches_json_dump(indent, pages, tables):
+    analysis = {"pages": pages, "tables": tables, "has_handwritten_content": True}
+    out = io.StringIO()
+
+    write_analysis_json(out, iter(pages), iter(tables), True, indent=indent)
+
+    assert out.getvalue() == json.dumps(analysis, indent=indent, ensure_ascii=False)
+
+def test_streamed_json_consumes_lazily():
+    out = io.StringIO()
+    written = []
+
+    def pages():
+        for page in PAGES:
+            yield page
+            written.append(len(out.getvalue()))
+
+    write_analysis_json(out, pages(), [], False)
+
+    # The first page was on disk before the second one was produced
+    assert written[0] > len('{"pages": [')
+
+def test_ndjson_round_trip(tmp_path):
+    path = tmp_path / "analysis.ndjson"
+    with open(path, "w", encoding="utf-8") as f:
+        write_analysis_ndjson(f, iter(PAGES), iter(TABLES), False)
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    records = list(read_analysis_ndjson(path))
+
+    assert len(lines) == 4
+    assert records == [("page", PAGES[0]), ("page", PAGES[1]), ("table", TABLES[0]),
+                       ("summary", {"has_handwritten_content": False})]
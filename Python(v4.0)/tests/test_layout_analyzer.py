@@ -1,7 +1,14 @@
 import pytest
 from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.fake_service import FakeDocumentAnalysisClient, canned_layout_result
+from my_project.utils.json_stream import read_analysis_ndjson
+from my_project.utils.analysis_cache import AnalysisCache
+from azure.core.exceptions import HttpResponseError
 from unittest.mock import patch, Mock
+from pathlib import Path
+import json
 import os
+import time
 
 def test_init_with_env_vars():
     with patch.dict(os.environ, {
@@ -58,4 +65,127 @@ def test_analyze_and_save_results(tmp_path):
         
     assert output_path.exists()
     content = output_path.read_text()
-    assert "Analyzing layout from page" in content 
\ No newline at end of file
+    assert "Analyzing layout from page" in content 
+
+def _write_documents(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"doc_{i}.pdf"
+        path.write_bytes(f"%PDF-1.5 {i}".encode())
+        paths.append(str(path))
+    return paths
+
+def test_analyze_many_yields_every_document(tmp_path):
+    analyzer = LayoutAnalyzer('https://test.endpoint', 'test_key')
+    analyzer.client = FakeDocumentAnalysisClient(latency=0.01)
+    paths = _write_documents(tmp_path, 5)
+
+    results = list(analyzer.analyze_many(paths, max_in_flight=2))
+
+    assert sorted(r.document_path for r in results) == sorted(paths)
+    assert all(r.ok for r in results)
+    assert results[0].analysis["pages"][0]["words"][0]["content"] == "w1_0"
+    assert all(r.total_seconds >= r.service_seconds > 0 for r in results)
+
+def test_analyze_many_bounds_in_flight_and_overlaps(tmp_path):
+    analyzer = LayoutAnalyzer('https://test.endpoint', 'test_key')
+    analyzer.client = FakeDocumentAnalysisClient(latency=0.2)
+    paths = _write_documents(tmp_path, 8)
+
+    start = time.perf_counter()
+    results = list(analyzer.analyze_many(paths, max_in_flight=4))
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == 8
+    assert analyzer.client.max_in_flight == 4
+    assert elapsed < 8 * 0.2
+
+def test_analyze_many_yields_in_completion_order(tmp_path):
+    paths = _write_documents(tmp_path, 2)
+    slow = Path(paths[0]).read_bytes()
+    analyzer = LayoutAnalyzer('https://test.endpoint', 'test_key')
+    analyzer.client = FakeDocumentAnalysisClient(latency=lambda data: 0.3 if data == slow else 0.01)
+
+    results = list(analyzer.analyze_many(paths, max_in_flight=2))
+
+    assert [r.document_path for r in results] == [paths[1], paths[0]]
+
+def test_analyze_many_reports_errors_per_document(tmp_path):
+    paths = _write_documents(tmp_path, 2)
+    failing = Path(paths[1]).read_bytes()
+    analyzer = LayoutAnalyzer('https://test.endpoint', 'test_key')
+    analyzer.client = FakeDocumentAnalysisClient(errors={failing: HttpResponseError(message="boom")})
+    missing = str(tmp_path / "missing.pdf")
+
+    results = {r.document_path: r for r in analyzer.analyze_many(paths + [missing])}
+
+    assert results[paths[0]].ok
+    assert isinstance(results[paths[1]].error, HttpResponseError)
+    assert isinstance(results[missing].error, FileNotFoundError)
+
+def test_analyze_many_rejects_empty_window():
+    analyzer = LayoutAnalyzer('https://test.endpoint', 'test_key')
+    with pytest.raises(ValueError):
+        list(analyzer.analyze_many([], max_in_flight=0))
+
+def test_analyze_document_served_from_cache(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache")
+    analyzer = LayoutAnalyzer('https://test.endpoint', 'test_key', cache=cache)
+    analyzer.client = FakeDocumentAnalysisClient()
+    pdf_path = tmp_path / "test.pdf"
+    pdf_path.write_bytes(b"%PDF-1.5")
+
+    first = analyzer.analyze_document(str(pdf_path))
+    # A hit must not touch the client at all
+    analyzer.client = None
+    second = analyzer.analyze_document(str(pdf_path))
+    output_path = tmp_path / "analysis.json"
+    analyzer.analyze_and_save_json(str(pdf_path), str(output_path))
+
+    assert json.loads(json.dumps(first)) == json.loads(json.dumps(second))
+    assert json.loads(output_path.read_text(encoding="utf-8")) == json.loads(json.dumps(first))
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+def test_analyze_many_uses_cache(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache")
+    analyzer = LayoutAnalyzer('https://test.endpoint', 'test_key', cache=cache)
+    analyzer.client = FakeDocumentAnalysisClient()
+    paths = _write_documents(tmp_path, 3)
+    analyzer.analyze_document(paths[0])
+
+    results = {r.document_path: r for r in analyzer.analyze_many(paths)}
+
+    assert results[paths[0]].cached
+    assert not results[paths[1]].cached
+    assert len(analyzer.client.calls) == 3
+    assert cache.stats()["entries"] == 3
+
+def test_analyze_and_save_json_stream_matches_default(tmp_path):
+    analyzer = LayoutAnalyzer('https://test.endpoint', 'test_key')
+    analyzer.client = FakeDocumentAnalysisClient()
+    pdf_path = tmp_path / "test.pdf"
+    pdf_path.write_bytes(b"%PDF-1.5")
+
+    analyzer.analyze_and_save_json(str(pdf_path), str(tmp_path / "full.json"))
+    analyzer.analyze_and_save_json(str(pdf_path), str(tmp_path / "compact.json"), stream=True)
+    analyzer.analyze_and_save_json(str(pdf_path), str(tmp_path / "indented.json"), stream=True, indent=2)
+
+    full = (tmp_path / "full.json").read_text(encoding="utf-8")
+    compact = (tmp_path / "compact.json").read_text(encoding="utf-8")
+    assert "\n" not in compact
+    assert json.loads(compact) == json.loads(full)
+    assert (tmp_path / "indented.json").read_text(encoding="utf-8") == full
+
+def test_analyze_and_save_ndjson(tmp_path):
+    analyzer = LayoutAnalyzer('https://test.endpoint', 'test_key')
+    analyzer.client = FakeDocumentAnalysisClient(result=canned_layout_result(page_count=3))
+    pdf_path = tmp_path / "test.pdf"
+    pdf_path.write_bytes(b"%PDF-1.5")
+    output_path = tmp_path / "out" / "analysis.ndjson"
+
+    analyzer.analyze_and_save_ndjson(str(pdf_path), str(output_path))
+
+    records = list(read_analysis_ndjson(output_path))
+    assert [kind for kind, _ in records] == ["page", "page", "page", "table", "summary"]
+    assert records[2][1]["page_number"] == 3
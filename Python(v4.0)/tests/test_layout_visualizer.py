@@ -41,4 +41,104 @@ def test_visualization(tmp_path):
 
     # Check that output file exists and is larger than input
     assert output_path.exists()
-    assert output_path.stat().st_size > pdf_path.stat().st_size 
\ No newline at end of file
+    assert output_path.stat().st_size > pdf_path.stat().st_size 
+
+def _write_sample(tmp_path, page_count):
+    from my_project.models.layout_analyzer import LayoutAnalyzer
+    from my_project.testing.fake_service import canned_layout_result
+
+    pdf_path = tmp_path / "sample.pdf"
+    doc = fitz.open()
+    for _ in range(page_count):
+        doc.new_page(width=612, height=792)
+    doc.save(pdf_path)
+    doc.close()
+
+    analysis_path = tmp_path / "sample_analysis.json"
+    analyzer = LayoutAnalyzer('https://test.endpoint', 'test_key')
+    analyzer._stream_json(canned_layout_result(page_count=page_count, words_per_page=4), analysis_path)
+    return pdf_path, analysis_path
+
+def test_process_analysis_draws_every_page_with_one_shape_per_type(tmp_path):
+    pdf_path, analysis_path = _write_sample(tmp_path, 3)
+    output_path = tmp_path / "annotated.pdf"
+
+    LayoutVisualizer(str(pdf_path), str(analysis_path), str(output_path)).process_analysis()
+
+    with fitz.open(output_path) as doc:
+        assert doc.page_count == 3
+        # Fill and stroke of a shape are reported as separate drawings
+        drawings = [[d for d in doc[i].get_drawings() if d["type"] == "f"] for i in range(3)]
+    # Page 1 holds the table and its cell; every page has lines, words and a selection mark
+    assert [len(page) for page in drawings] == [5, 3, 3]
+    words = [d for d in drawings[1] if d["fill"] == pytest.approx(LayoutVisualizer.COLORS['word'])]
+    assert len(words) == 1
+    assert len(words[0]["items"]) == 4 * 4
+
+def test_table_regions_are_grouped_by_page_once():
+    square = [[1.0, 1.0], [2.0, 1.0], [2.0, 2.0], [1.0, 2.0]]
+    tables = [{"bounding_regions": [{"page_number": 1, "polygon": square}, {"page_number": 2, "polygon": square}],
+               "cells": [{"bounding_regions": [{"page_number": 2, "polygon": square}]},
+                         {"bounding_regions": [{"polygon": square}, {"page_number": 3, "polygon": []}]}]}]
+
+    regions = LayoutVisualizer._table_regions(tables)
+
+    assert {page: {kind: len(polygons) for kind, polygons in by_kind.items()} for page, by_kind in regions.items()} == {
+        1: {"table": 1, "cell": 0}, 2: {"table": 1, "cell": 1}, None: {"table": 0, "cell": 1}}
+    visualizer = LayoutVisualizer.__new__(LayoutVisualizer)
+    polygons = visualizer._page_polygons({"page_number": 2}, regions)
+    # Regions without a page number are drawn on every page
+    assert (len(polygons["table"]), len(polygons["cell"])) == (1, 2)
+
+def test_process_analysis_with_workers_matches_single_process(tmp_path):
+    pdf_path, analysis_path = _write_sample(tmp_path, 5)
+    serial_path = tmp_path / "serial.pdf"
+    pooled_path = tmp_path / "pooled.pdf"
+
+    LayoutVisualizer(str(pdf_path), str(analysis_path), str(serial_path)).process_analysis()
+    LayoutVisualizer(str(pdf_path), str(analysis_path), str(pooled_path)).process_analysis(workers=2)
+
+    with fitz.open(serial_path) as serial, fitz.open(pooled_path) as pooled:
+        assert pooled.page_count == serial.page_count == 5
+        for i in range(5):
+            assert len(pooled[i].get_drawings()) == len(serial[i].get_drawings())
+
+def test_draw_polygon_does_not_print(tmp_path, capsys):
+    pdf_path, analysis_path = _write_sample(tmp_path, 1)
+    visualizer = LayoutVisualizer(str(pdf_path), str(analysis_path), str(tmp_path / "annotated.pdf"))
+
+    with fitz.open(pdf_path) as doc:
+        visualizer._draw_polygon(doc[0], [[[1.0, 1.0], [2.0, 1.0]], [[2.0, 2.0], [1.0, 2.0]]], 'word')
+    visualizer.process_analysis()
+
+    assert capsys.readouterr().out == ""
+
+def test_metrics_tracer_reports_counts_per_element_type_and_page(tmp_path):
+    from examples.visualize_analysis import VisualizerMetrics
+
+    pdf_path, analysis_path = _write_sample(tmp_path, 2)
+    metrics = VisualizerMetrics()
+    LayoutVisualizer(str(pdf_path), str(analysis_path), str(tmp_path / "annotated.pdf"),
+                     tracer=metrics).process_analysis()
+
+    summary = metrics.summary()
+    assert summary["pages"] == 2
+    assert summary["elements"] == 2 * (1 + 4 + 1) + 2
+    assert {key: value["count"] for key, value in summary["by_element_type"].items()} == {
+        'line': 2, 'word': 8, 'table': 1, 'cell': 1, 'selection_mark': 2}
+    assert metrics.by_page[1]["count"] == 8
+    assert metrics.by_page[2]["count"] == 6
+
+def test_metrics_tracer_collects_events_from_workers(tmp_path):
+    from examples.visualize_analysis import VisualizerMetrics
+    import io
+
+    pdf_path, analysis_path = _write_sample(tmp_path, 4)
+    stream = io.StringIO()
+    metrics = VisualizerMetrics(stream=stream)
+    LayoutVisualizer(str(pdf_path), str(analysis_path), str(tmp_path / "annotated.pdf"),
+                     tracer=metrics).process_analysis(workers=2)
+
+    assert sorted(metrics.by_page) == [1, 2, 3, 4]
+    assert stream.getvalue().count("\n") == 4
+    assert stream.getvalue().startswith("Page 1: 8 elements")
@@ -0,0 +1,57 @@
+import random
+from types import SimpleNamespace
+from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.fake_service import canned_layout_result
+from my_project.testing.synthetic_pages import synthetic_page
+from my_project.utils.line_words import assign_words_to_lines
+
+def _span(offset, length):
+    return SimpleNamespace(offset=offset, length=length)
+
+def _scan(page):
+    """The per-line scan of the samples' get_words, returning word indexes."""
+    return [[i for i, word in enumerate(page.words)
+             if any(word.span.offset >= span.offset
+                    and word.span.offset + word.span.length <= span.offset + span.length for span in line.spans)]
+            for line in page.lines]
+
+def test_sdk_page_matches_scan():
+    page = canned_layout_result(page_count=2, words_per_page=5).pages[1]
+    assert assign_words_to_lines(page) == _scan(page) == [[0, 1, 2, 3, 4]]
+
+def test_analysis_dict_and_columnar_pages():
+    analyzer = LayoutAnalyzer('https://test.endpoint', 'test_key')
+    result = canned_layout_result(words_per_page=4)
+    expected = [[0, 1, 2, 3]]
+
+    assert assign_words_to_lines(analyzer._convert_result(result)["pages"][0]) == expected
+    assert assign_words_to_lines(analyzer._convert_result(result, "columnar")["pages"][0]) == expected
+
+def test_dense_synthetic_page():
+    page = synthetic_page(word_count=1000, words_per_line=12)
+    mapping = assign_words_to_lines(page)
+
+    assert len(mapping) == len(page["lines"]) == 84
+    assert mapping[0] == list(range(12))
+    assert mapping[-1] == list(range(996, 1000))
+    for line, indexes in zip(page["lines"], mapping):
+        assert " ".join(page["words"][i]["content"] for i in indexes) == line["content"]
+
+def test_multiple_and_overlapping_spans_match_scan():
+    rng = random.Random(7)
+    for _ in range(20):
+        words = []
+        for _ in range(rng.randint(0, 60)):
+            offset = rng.randint(0, 200)
+            words.append(SimpleNamespace(span=_span(offset, rng.randint(0, 8))))
+        lines = [SimpleNamespace(spans=[_span(rng.randint(0, 200), rng.randint(0, 40))
+                                        for _ in range(rng.randint(0, 3))]) for _ in range(rng.randint(0, 15))]
+        page = SimpleNamespace(words=words, lines=lines)
+
+        assert assign_words_to_lines(page) == _scan(page)
+
+def test_words_without_spans_and_pages_without_lines():
+    page = SimpleNamespace(words=[SimpleNamespace(span=None), SimpleNamespace(span=_span(0, 3))],
+                           lines=[SimpleNamespace(spans=[_span(0, 10)])])
+    assert assign_words_to_lines(page) == [[1]]
+    assert assign_words_to_lines(SimpleNamespace(words=page.words, lines=None)) == []
@@ -0,0 +1,42 @@
+import random
+import re
+import pytest
+from my_project.utils.pattern_automaton import DEAD, PatternAutomaton, compile_pattern
+
+PATTERNS = [
+    r'^[A-TV-Z]\d\d(\.\d{1,2})?$',
+    r'^[A-HJ-NPR-Z0-9]{17}$',
+    r'^\d{3}-\d{2}-\d{4}$',
+    r'(ab|a)*b+',
+    r'a{2,}c?',
+    r'[^0-9a-]x',
+    r'(?:a|)b{0,2}.',
+    r'[\d.-]+\S?',
+    r'x\.y\\z',
+]
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_fullmatch_agrees_with_re(pattern):
+    automaton, expression = PatternAutomaton(pattern), re.compile(pattern)
+    rng = random.Random(pattern)
+    for _ in range(2000):
+        text = "".join(rng.choice("ab0129.-xyzAIlO\\ ") for _ in range(rng.randint(0, 8)))
+        assert automaton.fullmatch(text) == (expression.fullmatch(text) is not None), text
+
+def test_step_reports_dead_prefixes():
+    automaton = PatternAutomaton(r'^[A-TV-Z]\d\d(\.\d{1,2})?$')
+    state = automaton.step(automaton.start, "A")
+    assert state != DEAD and not automaton.accepts(state)
+    assert automaton.step(automaton.start, "U") == DEAD
+    assert automaton.step(state, "x") == DEAD
+    state = automaton.step(automaton.step(state, "1"), "2")
+    assert automaton.accepts(state)
+    assert automaton.step(DEAD, "1") == DEAD
+
+def test_compile_pattern_is_cached():
+    assert compile_pattern(r"\d+") is compile_pattern(r"\d+")
+
+@pytest.mark.parametrize("pattern", [r"(a", r"a)", r"[ab", r"*a", r"(?=a)", r"\bword", r"a^b"])
+def test_unsupported_patterns_raise(pattern):
+    with pytest.raises(ValueError, match="Unsupported pattern"):
+        PatternAutomaton(pattern)
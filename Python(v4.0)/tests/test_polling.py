@@ -0,0 +1,111 @@
+import asyncio
+import fitz
+import pytest
+from my_project.models.async_layout_analyzer import AsyncLayoutAnalyzer
+from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.stub_server import StubDocumentIntelligenceServer
+from my_project.utils.client_registry import ClientRegistry
+from my_project.utils.polling import (
+    DocumentProfile, ExponentialSchedule, FixedSchedule, LearnedSchedule, OperationTiming, PollingPolicy,
+    service_duration
+)
+
+def _pdf(pages, **save_options):
+    with fitz.open() as document:
+        for _ in range(pages):
+            document.new_page()
+        return document.tobytes(**save_options)
+
+def _timing(pages, service_seconds):
+    return OperationTiming(DocumentProfile(pages), polls=1, observed_seconds=service_seconds,
+                           service_seconds=service_seconds)
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    pdf_path = tmp_path / "test.pdf"
+    pdf_path.write_bytes(_pdf(3))
+    return pdf_path
+
+def test_document_profile_counts_pdf_pages(tmp_path):
+    pdf = _pdf(7)
+    assert DocumentProfile.from_bytes(pdf) == DocumentProfile(7, len(pdf))
+    assert DocumentProfile.from_bytes(b"\x89PNG\r\n").page_count == 1
+    # Page objects inside compressed object streams are counted too
+    compressed = _pdf(300, use_objstms=1, deflate=True)
+    assert DocumentProfile.from_bytes(compressed).page_count == 300
+    path = tmp_path / "compressed.pdf"
+    path.write_bytes(compressed)
+    assert DocumentProfile.from_path(path) == DocumentProfile(300, len(compressed))
+    (tmp_path / "image.png").write_bytes(b"\x89PNG\r\n")
+    assert DocumentProfile.from_path(tmp_path / "image.png") == DocumentProfile(1, 6)
+
+def test_service_duration_from_timestamps():
+    body = ('{"status": "succeeded", "createdDateTime": "2024-01-01T00:00:00Z", '
+            '"lastUpdatedDateTime": "2024-01-01T00:00:02.5000001Z", "analyzeResult": {}}')
+    assert service_duration(body) == pytest.approx(2.5)
+    assert service_duration('{"status": "running"}') is None
+
+def test_fixed_and_exponential_schedules():
+    profile = DocumentProfile(page_count=100)
+    assert [FixedSchedule(2.0).delay(profile, polls, 0) for polls in range(3)] == [2.0, 2.0, 2.0]
+
+    schedule = ExponentialSchedule(minimum=0.5, maximum=1.5, factor=2, base_seconds=1, seconds_per_page=0.1,
+                                   seconds_per_megabyte=0, first_fraction=0.5)
+    assert [schedule.delay(profile, polls, 0) for polls in range(4)] == [5.5, 0.5, 1.0, 1.5]
+    # Small documents are checked sooner than large ones
+    assert schedule.delay(DocumentProfile(page_count=1), 0, 0) < schedule.delay(profile, 0, 0)
+
+def test_learned_schedule_predicts_from_page_counts():
+    schedule = LearnedSchedule(fallback=FixedSchedule(1.0), min_samples=3)
+    assert schedule.delay(DocumentProfile(10), 0, 0) == 1.0
+
+    for _ in range(3):
+        schedule.observe(_timing(1, 1.5))
+    # Only one page count seen so far: other sizes fall back
+    assert schedule.predict(DocumentProfile(1)) == pytest.approx(1.5)
+    assert schedule.predict(DocumentProfile(100)) is None
+
+    schedule.observe(_timing(101, 11.5))
+    assert schedule.predict(DocumentProfile(51)) == pytest.approx(6.5)
+    assert schedule.delay(DocumentProfile(51), 0, elapsed=0.5) == pytest.approx(6.0)
+
+def test_policy_records_polls_and_idle_time(sample_pdf):
+    policy = PollingPolicy(FixedSchedule(0.1))
+    with StubDocumentIntelligenceServer(latency=0.25) as server:
+        analyzer = LayoutAnalyzer(server.endpoint, 'test_key', registry=ClientRegistry(), polling=policy)
+        analyzer.analyze_document(str(sample_pdf))
+
+    timing, = policy.timings
+    assert timing.profile.page_count == 3
+    assert timing.polls == server.poll_requests == 3
+    assert timing.service_seconds == pytest.approx(0.25)
+    assert 0 <= timing.idle_seconds < 0.1
+    assert policy.summary()["operations"] == 1
+
+def test_learned_schedule_polls_once_per_document(sample_pdf):
+    policy = PollingPolicy(LearnedSchedule(fallback=FixedSchedule(0.05)))
+    with StubDocumentIntelligenceServer(latency=0.2) as server:
+        analyzer = LayoutAnalyzer(server.endpoint, 'test_key', registry=ClientRegistry(), polling=policy)
+        for _ in range(3):
+            analyzer.analyze_document(str(sample_pdf))
+        warm_up_polls = server.poll_requests
+        for _ in range(3):
+            analyzer.analyze_document(str(sample_pdf))
+
+    assert warm_up_polls > 3
+    assert server.poll_requests - warm_up_polls == 3
+
+def test_async_analyzer_uses_policy(sample_pdf):
+    policy = PollingPolicy(FixedSchedule(0.05))
+
+    async def run(endpoint):
+        async with AsyncLayoutAnalyzer(endpoint, 'test_key', polling=policy) as analyzer:
+            return await analyzer.analyze_document(str(sample_pdf))
+
+    with StubDocumentIntelligenceServer(latency=0.1) as server:
+        analysis = asyncio.run(run(server.endpoint))
+
+    assert analysis["pages"]
+    timing, = policy.timings
+    assert timing.polls == server.poll_requests
+    assert timing.profile.page_count == 3
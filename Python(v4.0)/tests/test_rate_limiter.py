@@ -0,0 +1,122 @@
+import threading
+import time
+import pytest
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.stub_server import StubDocumentIntelligenceServer
+from my_project.utils.client_registry import ClientRegistry
+from my_project.utils.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    pdf_path = tmp_path / "test.pdf"
+    pdf_path.write_bytes(b"%PDF-1.5")
+    return pdf_path
+
+def test_parse_retry_after_prefers_milliseconds():
+    assert parse_retry_after({"Retry-After": "2", "retry-after-ms": "250"}) == 0.25
+    assert parse_retry_after({"Retry-After": "2"}) == 2.0
+    assert parse_retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) is None
+    assert parse_retry_after({}) is None
+
+def test_limiter_spaces_requests_at_its_rate():
+    clock = _Clock()
+    limiter = AdaptiveRateLimiter(rate=10, clock=clock)
+
+    assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0)
+    clock.now = 0.1
+    assert limiter.acquire(timeout=0)
+    assert limiter.stats()["acquired"] == 2
+
+def test_limiter_backs_off_and_pauses_on_throttling():
+    clock = _Clock()
+    limiter = AdaptiveRateLimiter(rate=10, min_rate=4, clock=clock)
+
+    limiter.on_throttled(retry_after=2.0)
+    assert limiter.rate == 5
+    # A burst of 429s for requests already in flight lowers the rate only once
+    limiter.on_throttled(retry_after=2.0)
+    assert limiter.rate == 5
+
+    clock.now = 1.9
+    assert not limiter.acquire(timeout=0)
+    clock.now = 2.2
+    assert limiter.acquire(timeout=0)
+
+    limiter.on_throttled()
+    assert limiter.rate == 4
+    assert limiter.stats()["throttled"] == 3
+
+def test_limiter_climbs_back_after_successes():
+    limiter = AdaptiveRateLimiter(rate=10, max_rate=10.5, increase=0.2)
+    for _ in range(5):
+        limiter.on_success()
+    assert limiter.rate == 10.5
+
+def test_limiter_reports_queue_depth():
+    limiter = AdaptiveRateLimiter(rate=1, min_rate=1, max_rate=1)
+    assert limiter.acquire()
+    limiter.on_throttled(retry_after=0.5)
+
+    waiters = [threading.Thread(target=limiter.acquire) for _ in range(3)]
+    for waiter in waiters:
+        waiter.start()
+    deadline = time.monotonic() + 2
+    while limiter.queue_depth < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert limiter.queue_depth == 3
+
+    for waiter in waiters:
+        waiter.join(timeout=10)
+    assert limiter.queue_depth == 0
+
+def test_stub_throttles_beyond_its_quota():
+    with StubDocumentIntelligenceServer(quota_tps=2) as server:
+        url = f"{server.endpoint}/formrecognizer/documentModels/prebuilt-layout:analyze"
+        statuses = [requests.post(url, data=b"%PDF-1.5") for _ in range(3)]
+
+    assert [response.status_code for response in statuses] == [202, 202, 429]
+    assert statuses[2].headers["Retry-After"] == "1"
+    assert 0 < int(statuses[2].headers["retry-after-ms"]) <= 500
+    assert server.throttled_requests == 1
+    assert server.analyze_requests == 2
+
+def test_shared_limiter_absorbs_throttling(sample_pdf):
+    limiter = AdaptiveRateLimiter(rate=20, max_rate=40)
+    with StubDocumentIntelligenceServer(quota_tps=10) as server:
+        registry = ClientRegistry(rate_limiter=limiter)
+        analyzer = LayoutAnalyzer(server.endpoint, 'test_key', registry=registry)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: analyzer.analyze_document(str(sample_pdf)), range(24)))
+        registry.close()
+
+    assert len(results) == 24
+    assert server.analyze_requests == 24
+    assert limiter.stats()["throttled"] == server.throttled_requests
+    assert limiter.rate < 20
+
+def test_throttled_polls_are_retried(sample_pdf):
+    limiter = AdaptiveRateLimiter(rate=20)
+    with StubDocumentIntelligenceServer(latency=0.05, poll_after_ms=1, throttle_polls=2) as server:
+        registry = ClientRegistry(rate_limiter=limiter)
+        analyzer = LayoutAnalyzer(server.endpoint, 'test_key', registry=registry)
+
+        result = analyzer.analyze_document(str(sample_pdf))
+        registry.close()
+
+    assert result is not None
+    assert server.throttled_polls == 2
+    assert server.poll_requests >= 1
+    assert server.analyze_requests == 1
+    # Poll 429s are the SDK's to retry; the limiter only meters submissions
+    assert limiter.stats()["throttled"] == 0
@@ -0,0 +1,102 @@
+import fitz
+import pytest
+from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.fake_service import canned_layout_result, layout_result_for_document
+from my_project.testing.stub_server import StubDocumentIntelligenceServer
+from my_project.utils.analysis_cache import AnalysisCache
+from my_project.utils.client_registry import ClientRegistry
+from my_project.utils.sharding import count_pages, format_page_range, page_ranges, split_pdf, stitch_results
+
+@pytest.fixture
+def large_pdf(tmp_path):
+    pdf_path = tmp_path / "large.pdf"
+    with fitz.open() as document:
+        for _ in range(23):
+            document.new_page()
+        document.save(str(pdf_path))
+    return pdf_path
+
+@pytest.fixture
+def stub_server():
+    with StubDocumentIntelligenceServer(result=layout_result_for_document, latency=0.05) as server:
+        yield server
+
+def _assert_spans_match_content(result):
+    for page in result.pages:
+        for word in page.words:
+            assert result.content[word.span.offset:word.span.offset + word.span.length] == word.content
+
+def test_page_ranges():
+    assert page_ranges(23, 10) == [(1, 10), (11, 20), (21, 23)]
+    assert page_ranges(5, 10) == [(1, 5)]
+    assert [format_page_range(page_range) for page_range in page_ranges(11, 10)] == ["1-10", "11"]
+    with pytest.raises(ValueError):
+        page_ranges(5, 0)
+
+def test_split_pdf(large_pdf):
+    assert count_pages(large_pdf) == 23
+    shards = list(split_pdf(large_pdf, [(1, 10), (11, 23)]))
+    assert [count_pages(shard) for shard in shards] == [10, 13]
+    assert count_pages(b"not a pdf") == 1
+
+def test_stitch_matches_single_result():
+    single = canned_layout_result(page_count=7)
+    shards = [canned_layout_result(page_count=3), canned_layout_result(page_count=3, first_page=4),
+              canned_layout_result(page_count=1, first_page=7)]
+
+    stitched = stitch_results(shards)
+
+    assert stitched.to_dict() == single.to_dict()
+
+def test_stitch_rebases_local_page_numbers_and_element_references():
+    first, second = canned_layout_result(page_count=2), canned_layout_result(page_count=2)
+    second.tables[0].elements = ["/tables/0", "/paragraphs/3", "/unknown/1"]
+
+    stitched = stitch_results([first, second], page_shifts=[0, 2])
+
+    assert [page.page_number for page in stitched.pages] == [1, 2, 3, 4]
+    assert [table.bounding_regions[0].page_number for table in stitched.tables] == [1, 3]
+    assert stitched.tables[1].spans[0].offset == len("w1_0 w1_1 w1_2\nw2_0 w2_1 w2_2\n")
+    assert stitched.tables[1].elements == ["/tables/1", "/paragraphs/3", "/unknown/1"]
+    _assert_spans_match_content(stitched)
+
+def test_sharded_analysis_matches_single_call(stub_server, large_pdf):
+    analyzer = LayoutAnalyzer(stub_server.endpoint, 'test_key', registry=ClientRegistry())
+
+    single = analyzer.analyze_document(str(large_pdf))
+    sharded = analyzer.analyze_document_sharded(str(large_pdf), shard_pages=5, max_in_flight=3)
+
+    assert sharded == single
+    assert stub_server.analyze_requests == 1 + 5
+    assert stub_server.max_in_flight <= 3
+
+def test_locally_split_analysis(stub_server, large_pdf):
+    analyzer = LayoutAnalyzer(stub_server.endpoint, 'test_key', registry=ClientRegistry())
+
+    result = analyzer._sharded_result(str(large_pdf), shard_pages=10, split="local", max_in_flight=4)
+
+    assert [page.page_number for page in result.pages] == list(range(1, 24))
+    # Every uploaded shard is a separate document starting at page 1
+    assert [table.bounding_regions[0].page_number for table in result.tables] == [1, 11, 21]
+    _assert_spans_match_content(result)
+
+def test_small_documents_are_not_sharded(stub_server, large_pdf):
+    analyzer = LayoutAnalyzer(stub_server.endpoint, 'test_key', registry=ClientRegistry())
+    analysis = analyzer.analyze_document_sharded(str(large_pdf), shard_pages=50)
+
+    assert len(analysis["pages"]) == 23
+    assert stub_server.analyze_requests == 1
+
+def test_sharded_analysis_uses_cache(stub_server, large_pdf, tmp_path):
+    analyzer = LayoutAnalyzer(stub_server.endpoint, 'test_key', registry=ClientRegistry(),
+                              cache=AnalysisCache(tmp_path / "cache"))
+    first = analyzer.analyze_document_sharded(str(large_pdf), shard_pages=10)
+    second = analyzer.analyze_document_sharded(str(large_pdf), shard_pages=10)
+
+    assert first == second
+    assert stub_server.analyze_requests == 3
+
+def test_unknown_split_mode(large_pdf):
+    analyzer = LayoutAnalyzer('https://test.endpoint', 'test_key', registry=ClientRegistry())
+    with pytest.raises(ValueError, match="Unknown split mode"):
+        analyzer.analyze_document_sharded(str(large_pdf), split="cloud")
@@ -0,0 +1,62 @@
+import random
+from types import SimpleNamespace
+import pytest
+from my_project.testing.synthetic_pages import synthetic_result
+from my_project.utils.span_index import SpanIndex
+
+def _span(offset, length):
+    return SimpleNamespace(offset=offset, length=length)
+
+def _scan(elements, test):
+    """Indexes of the elements with a span passing ``test(offset, end)``, by linear scan."""
+    return [i for i, element in enumerate(elements)
+            if any(test(span.offset, span.offset + span.length) for span in element.spans)]
+
+def test_lookup_maps_offsets_to_elements_of_every_kind():
+    result = synthetic_result(page_count=2, words_per_page=30, figure_every=2)
+    index = SpanIndex(result)
+    word = result["pages"][1]["words"][3]
+
+    found = index.lookup(word["span"]["offset"])
+    assert found["words"].tolist() == [33]
+    assert index.page_of["words"][33] == 1
+    assert found["lines"].tolist() == [3] and found["paragraphs"].tolist() == [0]
+    assert found["languages"].tolist() == [0] and found["tables"].tolist() == []
+    assert index.get("words", found["words"]) == [word]
+
+def test_queries_match_linear_scan():
+    rng = random.Random(3)
+    for _ in range(20):
+        paragraphs = [SimpleNamespace(spans=[_span(rng.randint(0, 300), rng.randint(0, 50))
+                                             for _ in range(rng.randint(0, 3))]) for _ in range(rng.randint(0, 40))]
+        index = SpanIndex(SimpleNamespace(content="x" * 400, pages=[], paragraphs=paragraphs), kinds=["paragraphs"])
+        for _ in range(20):
+            start = rng.randint(0, 350)
+            end = start + rng.randint(0, 60)
+            assert index.overlapping("paragraphs", start, end).tolist() == _scan(
+                paragraphs, lambda offset, stop: offset < end and stop > start)
+            assert index.covering("paragraphs", start, end).tolist() == _scan(
+                paragraphs, lambda offset, stop: offset <= start and stop >= end)
+            assert index.within("paragraphs", start, end).tolist() == _scan(
+                paragraphs, lambda offset, stop: offset >= start and stop <= end)
+
+def test_text_and_zero_copy_view():
+    content = "Grüße, 世界! done"
+    styles = [SimpleNamespace(spans=[_span(8, 2), _span(0, 5)]), SimpleNamespace(spans=[_span(11, 4)])]
+    index = SpanIndex({"content": content, "styles": styles})
+
+    assert index.text(7, 9) == content[7:9]
+    assert index.text_of("styles", [0, 1], ",") == "Grüße,界!,done"
+    assert index.spans("styles", [1, 0]) == [(0, 5), (8, 10), (11, 15)]
+    view = index.view(7, 9)
+    assert isinstance(view, memoryview) and view.obj is index.view(0, 1).obj
+    assert str(view, "utf-32-le") == "世界"
+
+def test_result_without_kinds_and_unknown_kind():
+    index = SpanIndex(SimpleNamespace(content="abc", pages=None))
+    assert len(index) == 0
+    assert index.overlapping("figures", 0, 3).tolist() == []
+    with pytest.raises(ValueError, match="Unknown element kind: cells"):
+        SpanIndex({"content": ""}, kinds=["cells"])
+    with pytest.raises(ValueError, match="Unknown element kind: words"):
+        SpanIndex({"content": ""}, kinds=["paragraphs"]).overlapping("words", 0, 1)
@@ -0,0 +1,115 @@
+import random
+import numpy as np
+import pytest
+from my_project.geometry import bounding_boxes
+from my_project.models.layout_analyzer import LayoutAnalyzer
+from my_project.testing.fake_service import canned_layout_result
+from my_project.testing.synthetic_pages import synthetic_page
+from my_project.utils.spatial_index import GridIndex, PageSpatialIndex
+
+@pytest.fixture
+def analyzer():
+    return LayoutAnalyzer('https://test.endpoint', 'test_key')
+
+def _random_boxes(count, seed=0):
+    rng = random.Random(seed)
+    boxes = []
+    for _ in range(count):
+        left, top = rng.uniform(0, 8), rng.uniform(0, 11)
+        boxes.append((left, top, left + rng.uniform(0, 2), top + rng.uniform(0, 0.5)))
+    return np.array(boxes)
+
+def _distance(box, x, y):
+    return np.hypot(max(box[0] - x, 0, x - box[2]), max(box[1] - y, 0, y - box[3]))
+
+def test_grid_queries_match_brute_force():
+    boxes = _random_boxes(2000)
+    grid = GridIndex(boxes)
+    rng = random.Random(1)
+
+    for _ in range(50):
+        left, top = rng.uniform(-1, 9), rng.uniform(-1, 12)
+        region = (left, top, left + rng.uniform(0, 3), top + rng.uniform(0, 3))
+        touching = [i for i, b in enumerate(boxes)
+                    if b[0] <= region[2] and b[2] >= region[0] and b[1] <= region[3] and b[3] >= region[1]]
+        inside = [i for i, b in enumerate(boxes)
+                  if b[0] >= region[0] and b[2] <= region[2] and b[1] >= region[1] and b[3] <= region[3]]
+        assert grid.intersecting(region).tolist() == touching
+        assert grid.intersecting(region, min_overlap=1.0).tolist() == inside
+
+        x, y = rng.uniform(-2, 10), rng.uniform(-2, 13)
+        assert grid.containing(x, y).tolist() == [i for i, b in enumerate(boxes)
+                                                  if b[0] <= x <= b[2] and b[1] <= y <= b[3]]
+        expected = sorted(range(len(boxes)), key=lambda i: (_distance(boxes[i], x, y), i))[:5]
+        assert grid.nearest(x, y, k=5).tolist() == expected
+
+def test_nearest_from_the_margins():
+    boxes = np.array([[0.0954, 1, 0.5, 1.2], [3, 3, 4, 4]])
+    grid = GridIndex(boxes)
+    # Rounding of the query square's edges must not lose the box at the grid's origin
+    assert all(grid.nearest(x, 1.1).tolist() == [0] for x in np.linspace(-5, 0, 1000))
+    assert all(grid.nearest(0.3, y).tolist() == [0] for y in np.linspace(-5, 1, 1000))
+
+    boxes = _random_boxes(300, seed=2)
+    grid = GridIndex(boxes)
+    rng = random.Random(3)
+    for _ in range(200):
+        x, y = rng.uniform(-20, 30), rng.uniform(-20, 30)
+        expected = sorted(range(len(boxes)), key=lambda i: (_distance(boxes[i], x, y), i))[:3]
+        assert grid.nearest(x, y, k=3).tolist() == expected
+
+def test_grid_on_a_flat_extent():
+    # Zero-width boxes on one vertical line
+    boxes = np.array([[2.0, i, 2.0, i + 0.1] for i in range(20)])
+    grid = GridIndex(boxes)
+
+    assert grid.shape.prod() <= len(boxes)
+    assert grid.nearest(-1.0, 5.05).tolist() == [5]
+    assert grid.intersecting((1, 3, 3, 4)).tolist() == [3, 4]
+
+def test_grid_skips_empty_boxes_and_handles_small_inputs():
+    grid = GridIndex(np.array([[np.nan] * 4, [1.0, 1.0, 2.0, 2.0]]))
+    assert grid.intersecting((0, 0, 10, 10)).tolist() == [1]
+    assert grid.nearest(5, 5, k=3).tolist() == [1]
+    assert GridIndex(np.empty((0, 4))).nearest(0, 0).tolist() == []
+
+def test_page_index_over_analyzer_output(analyzer):
+    analysis = analyzer._convert_result(canned_layout_result(page_count=2, words_per_page=4))
+    first, second = PageSpatialIndex.from_analysis(analysis)
+
+    # Words are 0.8 inch wide at x = 1, 2, 3, 4 on y 1.0 to 1.2
+    assert first.query_region("words", (1.9, 0.9, 3.9, 1.3), min_overlap=1.0).tolist() == [1, 2]
+    assert [word["content"] for word in first.get("words", first.query_point("words", 3.5, 1.1))] == ["w1_2"]
+    assert first.nearest("words", 10.0, 1.1).tolist() == [3]
+    # Left of and above every word
+    assert first.nearest("words", -5.0, 1.1).tolist() == [0]
+    assert first.nearest("words", 2.4, -5.0).tolist() == [1]
+    assert first.query_point("selection_marks", 0.6, 2.1).tolist() == [0]
+    assert first.query_point("lines", 4.5, 1.1).tolist() == [0]
+    # The table only has a region on page 1
+    assert first.query_region("cells", (0, 0, 8.5, 11)).tolist() == [0]
+    assert first.cell_tables.tolist() == [0]
+    assert second.query_region("cells", (0, 0, 8.5, 11)).tolist() == []
+    with pytest.raises(ValueError, match="Unknown element kind"):
+        first.query_point("figures", 1, 1)
+
+def test_columnar_pages_give_the_same_answers(analyzer):
+    result = canned_layout_result(words_per_page=6)
+    as_dicts = PageSpatialIndex(analyzer._convert_result(result)["pages"][0])
+    as_columns = PageSpatialIndex(analyzer._convert_result(result, "columnar")["pages"][0])
+
+    region = (2.5, 0, 5.5, 2)
+    assert as_columns.query_region("words", region).tolist() == as_dicts.query_region("words", region).tolist()
+    assert as_columns.get("words", [0])[0]["content"] == "w1_0"
+
+def test_dense_synthetic_page():
+    page = synthetic_page(word_count=5000, words_per_line=20)
+    index = PageSpatialIndex(page)
+    boxes = bounding_boxes([word["polygon"] for word in page["words"]])
+
+    # The words of the third line lie entirely inside its polygon's box
+    line_box = tuple(bounding_boxes([page["lines"][2]["polygon"]])[0])
+    assert index.query_region("words", line_box, min_overlap=1.0).tolist() == list(range(40, 60))
+    center = (boxes[1234, :2] + boxes[1234, 2:]) / 2
+    assert index.query_point("words", *center).tolist() == [1234]
+    assert index.nearest("words", *center, k=1).tolist() == [1234]
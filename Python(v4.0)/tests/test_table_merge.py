@@ -0,0 +1,109 @@
+import random
+import pytest
+from types import SimpleNamespace
+from my_project.testing.synthetic_tables import synthetic_cross_page_result
+from my_project.utils.table_merge import (
+    MergedTable, ParagraphOffsetIndex, TableMerge, find_merge_table_candidates, find_table_merges,
+    check_tables_are_horizontal_distribution, get_table_span_offsets, iter_merged_markdown, merge_tables,
+    table_edge_flags
+)
+
+def _paragraph(offset, role=None):
+    return SimpleNamespace(role=role, spans=[SimpleNamespace(offset=offset, length=1)])
+
+def _scan_paragraphs(paragraphs, start, end):
+    """Reference implementation: scan every paragraph span."""
+    return any(start < span.offset < end and paragraph.role not in ("pageHeader", "pageFooter", "pageNumber")
+               for paragraph in paragraphs for span in paragraph.spans)
+
+def test_paragraph_index_ignores_page_furniture_and_bounds():
+    index = ParagraphOffsetIndex([_paragraph(10, "pageHeader"), _paragraph(20, "pageNumber"),
+                                  _paragraph(30), _paragraph(40, "title")])
+
+    assert not index.has_paragraph_between(0, 25)
+    assert not index.has_paragraph_between(30, 40)  # Both bounds are exclusive
+    assert index.has_paragraph_between(29, 31)
+    assert index.has_paragraph_between(35, 45)
+    assert not index.has_paragraph_between(40, 100)
+    assert not ParagraphOffsetIndex(None).has_paragraph_between(0, 100)
+
+def test_paragraph_index_matches_linear_scan():
+    rng = random.Random(7)
+    roles = [None, "pageHeader", "pageFooter", "pageNumber", "sectionHeading"]
+    paragraphs = [_paragraph(rng.randrange(1000), rng.choice(roles)) for _ in range(300)]
+    index = ParagraphOffsetIndex(paragraphs)
+
+    for _ in range(500):
+        start = rng.randrange(1000)
+        end = start + rng.randrange(50)
+        assert index.has_paragraph_between(start, end) == _scan_paragraphs(paragraphs, start, end)
+
+def test_get_table_span_offsets():
+    table = SimpleNamespace(spans=[SimpleNamespace(offset=50, length=10), SimpleNamespace(offset=20, length=5)])
+    assert get_table_span_offsets(table) == (20, 60)
+    assert get_table_span_offsets(SimpleNamespace(spans=[])) == (-1, -1)
+
+def test_find_table_merges_on_continuous_tables():
+    result = synthetic_cross_page_result(page_count=9, rows_per_page=3, break_every=4)
+
+    candidates, table_spans = find_merge_table_candidates(result.tables)
+    assert [candidate.pre_table_idx for candidate in candidates] == list(range(8))
+    assert [span.idx for span in table_spans] == list(range(9))
+
+    # Pages 5 and 9 start new tables after a body paragraph
+    assert find_table_merges(result) == [TableMerge(i, True, False) for i in (0, 1, 2, 4, 5, 6)]
+
+def test_find_table_merges_detects_horizontal_tables():
+    result = synthetic_cross_page_result(page_count=2, rows_per_page=3, break_every=1)
+    assert find_table_merges(result) == []
+
+    result.tables[0].bounding_regions[0].polygon = [0.5, 1.0, 8.48, 1.0, 8.48, 10.0, 0.5, 10.0]
+    result.tables[1].bounding_regions[0].polygon = [0.05, 1.0, 8.0, 1.0, 8.0, 10.0, 0.05, 10.0]
+    assert check_tables_are_horizontal_distribution(result, 0)
+    assert find_table_merges(result) == [TableMerge(0, False, True)]
+
+def test_merged_table_appends_vertical_and_horizontal_fragments():
+    table = MergedTable(0, 0, 10, "| A | B |\n| - | - |\n| 1 | 2 |\n")
+    table.append_vertical(1, 20, "| A | B |\n| - | - |\n| 3 | 4 |")
+    assert table.content == "| A | B |\n| - | - |\n| 1 | 2 |\n| A | B |\n| 3 | 4 |"
+
+    with pytest.raises(ValueError):
+        table.append_vertical(2, 30, "| A | B | C |\n| 5 | 6 | 7 |")
+
+    table.append_horizontal(2, 30, "| C |\n| - |\n| 5 |\n| 6 |", " (continued)")
+    assert table.content == "| A | B | C |\n| - | - | - |\n| 1 | 2 | 5 |\n| A | B | 6 |"
+    assert table.table_idx_list == [0, 1, 2]
+    assert (table.min_offset, table.max_offset, table.remark) == (0, 30, " (continued)")
+
+def test_iter_merged_markdown_rewrites_continuous_tables():
+    result = synthetic_cross_page_result(page_count=5, rows_per_page=2, column_count=2, break_every=3)
+
+    merged_tables = merge_tables(result)
+    assert [table.table_idx_list for table in merged_tables] == [[0, 1, 2], [3, 4]]
+
+    chunks = list(iter_merged_markdown(result, merged_tables))
+    content = "".join(chunks)
+    assert len(chunks) == 5
+    assert content.count("| - | - |") == 2
+    assert content.count("| Column 0 | Column 1 |") == 5
+    # Later fragments keep their header row but lose the separator below it
+    expected_rows = ["| Column 0 | Column 1 |", "| - | - |", "| p1r0c0 | p1r0c1 |", "| p1r1c0 | p1r1c1 |"]
+    for page in (2, 3):
+        expected_rows += ["| Column 0 | Column 1 |", f"| p{page}r0c0 | p{page}r0c1 |", f"| p{page}r1c0 | p{page}r1c1 |"]
+    assert merged_tables[0].content == "\n".join(expected_rows)
+    assert content.endswith("| p5r1c0 | p5r1c1 |")
+
+def test_iter_merged_markdown_without_merges_returns_content():
+    result = synthetic_cross_page_result(page_count=3, rows_per_page=2, break_every=1)
+    assert "".join(iter_merged_markdown(result)) == result.content
+
+def test_table_edge_flags_cover_every_region():
+    result = synthetic_cross_page_result(page_count=3, rows_per_page=2)
+    result.tables[1].bounding_regions.append(
+        SimpleNamespace(page_number=2, polygon=[0.0, 10.5, 8.5, 10.5, 8.5, 11.0, 0.0, 11.0]))
+
+    reaches_right, reaches_left = table_edge_flags(result)
+
+    assert reaches_right.tolist() == [False, True, False]
+    assert reaches_left.tolist() == [False, True, False]
+    assert not check_tables_are_horizontal_distribution(result, 0, (reaches_right, reaches_left))
@@ -0,0 +1,63 @@
+import pickle
+import re
+import pytest
+from my_project.utils.pattern_automaton import CombinedAutomaton
+from my_project.utils.validators import Validator, ValidatorRegistry, default_registry
+
+VALID = {
+    "ICD10": ["A12", "J45.90", "Z99.1"],
+    "SSN": ["123-45-6789", "772-11-0001"],
+    "EIN": ["12-3456789", "98-0000001"],
+    "RoutingNumber": ["021000021", "011000015", "122105278"],
+    "IBAN": ["DE89370400440532013000", "GB29NWBK60161331926819"],
+    "VIN": ["1HGCM82633A004352", "1M8GDM9AXKP042788"],
+}
+INVALID = {
+    "ICD10": ["U07.1", "A1", "A12.345"],
+    "SSN": ["000-12-3456", "666-12-3456", "912-34-5678", "123-00-4567", "123-45-0000", "123456789"],
+    "EIN": ["00-1234567", "07-1234567", "123456789"],
+    "RoutingNumber": ["021000022", "12345678"],
+    "IBAN": ["DE89370400440532013001", "DE89 3704 0044 0532 0130 00"],
+    "VIN": ["1HGCM82633A004353", "1HGCM82633A00435I"],
+}
+
+@pytest.mark.parametrize("name", sorted(VALID))
+def test_builtin_validators(name):
+    registry = default_registry()
+    assert registry.validate_many(name, VALID[name]) == [True] * len(VALID[name])
+    assert registry.validate_many(name, INVALID[name]) == [False] * len(INVALID[name])
+    assert registry[name].filter(VALID[name] + INVALID[name]) == VALID[name]
+
+def test_matching_with_both_engines():
+    registry = default_registry()
+    values = [value for values in VALID.values() for value in values] + ["hello", "", "123-45-678"]
+    expected = [[name for name in registry if registry.validate(name, value)] for value in values]
+    assert registry.matching_many(values, engine="dfa") == registry.matching_many(values, engine="regex") == expected
+    assert registry.matching("021000021") == ["RoutingNumber"]
+    assert registry.matching("12-3456789", names=["SSN", "EIN"]) == ["EIN"]
+    with pytest.raises(ValueError, match="Unknown engine: nfa"):
+        registry.matching("x", engine="nfa")
+
+def test_combined_automaton_reports_every_matching_pattern():
+    patterns = [r"\d+", r"[0-9a-f]+", r"a.c", r"(ab)*"]
+    automaton = CombinedAutomaton(patterns)
+    for text in ["123", "abc", "a1c", "abab", "", "xyz", "12f"]:
+        assert automaton.matching(text) == tuple(i for i, p in enumerate(patterns) if re.fullmatch(p, text))
+
+def test_registration_and_lookup():
+    registry = ValidatorRegistry(default_registry().values())
+    policy = registry.register("Policy", r"^POL\d{6}$")
+    assert registry.validate("Policy", "POL123456") and not policy("POL12345")
+    assert registry.matching("POL123456") == ["Policy"]  # Combined matchers are rebuilt
+    assert len(registry) == 7 and "Policy" in registry and "Policy" not in default_registry()
+    with pytest.raises(ValueError, match="already registered: Policy"):
+        registry.register("Policy", r"\d")
+    with pytest.raises(ValueError, match="Unknown validator: Nope"):
+        registry.validate("Nope", "x")
+    with pytest.raises(ValueError, match="Unsupported pattern"):
+        Validator("Lookahead", r"^(?!000)\d{3}$")
+
+def test_validators_are_shared_and_picklable():
+    assert default_registry() is default_registry()
+    vin = pickle.loads(pickle.dumps(default_registry()["VIN"]))
+    assert vin == default_registry()["VIN"] and vin("1HGCM82633A004352")